@@ -16,8 +16,24 @@ import secrets
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
+
+
+def socketio_async_mode():
+    """Socket.IO async mode chosen by run.py (``SOCKETIO_ASYNC_MODE``), default threading."""
+    mode = (os.environ.get('SOCKETIO_ASYNC_MODE') or 'threading').strip().lower()
+    if mode == 'eventlet':
+        # Only usable when the standard library was monkey-patched before import
+        try:
+            from eventlet.patcher import is_monkey_patched
+            if is_monkey_patched('socket'):
+                return mode
+        except ImportError:
+            pass
+    return 'threading'
+
+
 # SocketIO configuration - will be updated based on server choice in run.py
-socketio = SocketIO(cors_allowed_origins="*", async_mode="threading")
+socketio = SocketIO(cors_allowed_origins="*", async_mode=socketio_async_mode())
 
 # Pending WebSocket login nonces: {nonce: {user_id, remember_me, redirect_to, expiry}}
 _pending_ws_logins = {}
@@ -373,6 +389,11 @@ def handle_assistant_chat_message(data):
             save_chat_message(message)
             socketio.emit('assistant_chat_message', message, room=sender)
             socketio.emit('assistant_chat_message', message, room=recipient)
+            try:
+                from app.utils.mobile_push import publish_chat_message
+                publish_chat_message(getattr(user, 'scouting_team_number', None), message, [sender, recipient])
+            except Exception:
+                pass
         # If not in same team, silently ignore the message
 
 @socketio.on('assistant_chat_history_request')
@@ -571,6 +592,11 @@ def handle_group_chat_message(data):
         # Emit to the team+group room
         room_name = f"group_{team_number}_{group}"
         socketio.emit('group_message', message, room=room_name)
+        try:
+            from app.utils.mobile_push import publish_group_message
+            publish_group_message(team_number, group, message)
+        except Exception:
+            pass
     except Exception:
         pass
 
@@ -1033,6 +1059,27 @@ def create_app(test_config=None, use_postgres=False):
     
     # Initialize database
     db.init_app(app)
+    # Per-table data version counters used for conditional GET ETags
+    from app.utils.change_tracking import register_data_version_listeners
+    register_data_version_listeners()
+    # Keep the per-team trend series current as scouting data is committed
+    from app.utils.trend_series import register_trend_series_listeners
+    register_trend_series_listeners()
+    # Feed committed notification queue rows to the worker's in-memory timer
+    from app.utils.notification_timer import register_notification_timer_listeners
+    register_notification_timer_listeners()
+    # Keep per-event end-of-day aggregates current as match results arrive
+    from app.utils.event_day_summary import register_event_day_listeners
+    register_event_day_listeners()
+    # Stamp scouting, pit and qualitative writes with the alliance sync change sequence
+    from app.utils.alliance_sync import register_change_sequence_listeners
+    register_change_sequence_listeners()
+    # Snapshot alliance link rows and kept alliance data before originals change
+    from app.utils.alliance_links import register_alliance_link_listeners
+    register_alliance_link_listeners()
+    # Turn committed matches and scouting entries into live mobile deltas
+    from app.utils.mobile_push import register_mobile_push_listeners
+    register_mobile_push_listeners()
     migrate.init_app(app, db)
     
     # Apply SQLite performance optimizations
@@ -1078,6 +1125,10 @@ def create_app(test_config=None, use_postgres=False):
         return User.query.get(int(user_id))
     
     # Initialize SocketIO
+    # Authenticated /mobile namespace for live match, scouting and chat deltas
+    # (registered before init_app so every app's server gets the handlers)
+    from app.utils.mobile_push import register_mobile_socket_handlers
+    register_mobile_socket_handlers(socketio)
     socketio.init_app(app)
 
     # ---- Session cleanup ------------------------------------------------
@@ -1831,6 +1882,24 @@ def create_app(test_config=None, use_postgres=False):
     except Exception as e:
         app.logger.error(f" Failed to start EPA refresh scheduler: {e}")
 
+    # Keep current-event /graphs cache entries warm before their TTL lapses
+    if not app.config.get('TESTING'):
+        try:
+            from app.utils.graph_prewarm import start_graph_prewarmer
+            start_graph_prewarmer(app)
+            app.logger.info(" Graph cache prewarmer started")
+        except Exception as e:
+            app.logger.error(f" Failed to start graph cache prewarmer: {e}")
+
+    # Start pit robot image compression worker (tests compress inline)
+    if not app.config.get('TESTING'):
+        try:
+            from app.utils.image_worker import start_pit_image_worker
+            start_pit_image_worker(app)
+            app.logger.info(" Pit image worker started")
+        except Exception as e:
+            app.logger.error(f" Failed to start pit image worker: {e}")
+
     # Start schedule-offset refresh scheduler (updates every 15 min)
     try:
         from app.utils.schedule_offset_scheduler import start_schedule_offset_scheduler
@@ -1877,4 +1946,21 @@ def create_app(test_config=None, use_postgres=False):
             except Exception:
                 pass
 
+    # Resolve the signed-in team's alliance scope once per request so the
+    # team isolation filters and effective-config helpers share it.  Token
+    # and API-key requests under /api/ pick their team in their own hooks
+    # (and must not trigger a session user lookup); they build it lazily.
+    @app.before_request
+    def load_team_isolation_scope():
+        try:
+            from flask_login import current_user
+            if request.endpoint == 'static' or (request.path or '').startswith('/api/'):
+                return None
+            if not getattr(current_user, 'is_authenticated', False):
+                return None
+            from app.utils.request_scope import get_scope
+            get_scope()
+        except Exception:
+            pass
+
     return app
\ No newline at end of file
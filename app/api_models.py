@@ -7,6 +7,9 @@ from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 import secrets
 import string
+import threading
+import time
+import atexit
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, Float, JSON
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
@@ -258,6 +261,15 @@ def create_api_key(name, team_number, created_by, description=None, permissions=
         api_db.close_session(session)
 
 
+def _invalidate_cached_key(key_hash):
+    """Drop a key from the authentication cache after it changes."""
+    try:
+        from app.utils.api_auth import invalidate_api_key_cache
+        invalidate_api_key_cache(key_hash)
+    except Exception:
+        pass
+
+
 def deactivate_api_key(api_key_id, team_number):
     """Deactivate an API key (soft delete)"""
     session = api_db.get_session()
@@ -268,6 +280,7 @@ def deactivate_api_key(api_key_id, team_number):
         
         api_key.is_active = False
         session.commit()
+        _invalidate_cached_key(api_key.key_hash)
         return True
     finally:
         api_db.close_session(session)
@@ -283,6 +296,7 @@ def reactivate_api_key(api_key_id, team_number):
 
         api_key.is_active = True
         session.commit()
+        _invalidate_cached_key(api_key.key_hash)
         return True
     finally:
         api_db.close_session(session)
@@ -298,83 +312,202 @@ def delete_api_key_permanently(api_key_id, team_number):
 
         session.delete(api_key)
         session.commit()
+        _invalidate_cached_key(api_key.key_hash)
         return True
     finally:
         api_db.close_session(session)
 
 
+class TokenBucketRateLimiter:
+    """In-process token bucket per API key.
+
+    Each key holds up to ``rate_limit_per_hour`` tokens refilled continuously,
+    so scripted clients get a smooth hourly budget without a database
+    read-modify-commit on every request.
+    """
+
+    def __init__(self):
+        self._buckets = {}  # api_key_id -> [tokens, last_refill_ts, capacity]
+        self._lock = threading.Lock()
+
+    def consume(self, api_key_id, rate_limit_per_hour):
+        """Take one token. Returns (allowed, requests_used_in_current_budget)."""
+        capacity = float(max(1, rate_limit_per_hour or 1))
+        refill_per_sec = capacity / 3600.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(api_key_id)
+            if bucket is None or bucket[2] != capacity:
+                bucket = [capacity, now, capacity]
+                self._buckets[api_key_id] = bucket
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_sec)
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                return False, int(capacity)
+            bucket[0] = tokens - 1.0
+            return True, int(capacity - bucket[0])
+
+    def reset(self, api_key_id=None):
+        with self._lock:
+            if api_key_id is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(api_key_id, None)
+
+
+class ApiUsageBuffer:
+    """Collects API usage in memory and writes it to apis.db in batches.
+
+    A flush inserts all pending ``ApiUsage`` rows, applies the aggregated
+    request counters to each ``ApiKey`` and records per-hour totals in
+    ``ApiRateLimit`` -- one commit per flush instead of two per request.
+    """
+
+    FLUSH_INTERVAL = 5  # seconds
+    MAX_PENDING = 500
+    # Rows kept for retry while apis.db is failing; the oldest are dropped beyond this
+    MAX_BACKLOG = 50000
+
+    def __init__(self):
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    def add(self, record):
+        with self._lock:
+            self._pending.append(record)
+            pending = len(self._pending)
+        self._ensure_thread()
+        if pending >= self.MAX_PENDING:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing API usage: {e}")
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name='api-usage-flush', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing API usage: {e}")
+
+    def flush(self):
+        """Write all pending usage to the database. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch or api_db.Session is None:
+                if batch:
+                    self._requeue(batch)
+                return 0
+
+            key_totals = {}
+            window_totals = {}
+            for rec in batch:
+                totals = key_totals.setdefault(rec['api_key_id'], {'total': 0, 'ok': 0, 'failed': 0, 'last': None})
+                totals['total'] += 1
+                if 200 <= rec['status_code'] < 300:
+                    totals['ok'] += 1
+                else:
+                    totals['failed'] += 1
+                if totals['last'] is None or rec['timestamp'] > totals['last']:
+                    totals['last'] = rec['timestamp']
+                if rec['status_code'] != 429 and rec['api_key_id']:
+                    window = rec['timestamp'].replace(minute=0, second=0, microsecond=0)
+                    window_totals[(rec['api_key_id'], window)] = window_totals.get((rec['api_key_id'], window), 0) + 1
+
+            session = api_db.get_session()
+            try:
+                session.bulk_insert_mappings(ApiUsage, batch)
+
+                keys = session.query(ApiKey).filter(ApiKey.id.in_(list(key_totals.keys()))).all()
+                for api_key in keys:
+                    totals = key_totals[api_key.id]
+                    api_key.total_requests = (api_key.total_requests or 0) + totals['total']
+                    api_key.successful_requests = (api_key.successful_requests or 0) + totals['ok']
+                    api_key.failed_requests = (api_key.failed_requests or 0) + totals['failed']
+                    api_key.last_used_at = totals['last']
+
+                for (api_key_id, window_start), count in window_totals.items():
+                    rate_limit_record = session.query(ApiRateLimit).filter_by(
+                        api_key_id=api_key_id,
+                        window_start=window_start
+                    ).first()
+                    if rate_limit_record:
+                        rate_limit_record.request_count = (rate_limit_record.request_count or 0) + count
+                    else:
+                        session.add(ApiRateLimit(api_key_id=api_key_id, window_start=window_start, request_count=count))
+
+                session.commit()
+                return len(batch)
+            except Exception:
+                session.rollback()
+                # Keep the rows for the next flush instead of dropping them
+                self._requeue(batch)
+                raise
+            finally:
+                api_db.close_session(session)
+
+    def _requeue(self, batch):
+        """Put an unwritten batch back ahead of rows recorded since it was taken."""
+        with self._lock:
+            self._pending[:0] = batch
+            overflow = len(self._pending) - self.MAX_BACKLOG
+            if overflow > 0:
+                del self._pending[:overflow]
+        if overflow > 0:
+            print(f"API usage backlog full, dropped {overflow} oldest rows")
+
+
+_rate_limiter = TokenBucketRateLimiter()
+_usage_buffer = ApiUsageBuffer()
+atexit.register(lambda: _usage_buffer.flush())
+
+
+def flush_api_usage():
+    """Write buffered API usage to apis.db immediately."""
+    return _usage_buffer.flush()
+
+
 def record_api_usage(api_key_id, endpoint, method, status_code, ip_address=None, user_agent=None, 
                     request_size=0, response_size=0, response_time_ms=0, error_message=None):
-    """Record API usage for analytics and monitoring"""
-    usage_record = ApiUsage(
-        api_key_id=api_key_id,
-        endpoint=endpoint,
-        method=method,
-        status_code=status_code,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        request_size=request_size,
-        response_size=response_size,
-        response_time_ms=response_time_ms,
-        error_message=error_message
-    )
-    
-    session = api_db.get_session()
-    try:
-        session.add(usage_record)
-        
-        # Update API key statistics
-        api_key = session.query(ApiKey).filter_by(id=api_key_id).first()
-        if api_key:
-            api_key.total_requests += 1
-            api_key.last_used_at = datetime.now(timezone.utc)
-            if 200 <= status_code < 300:
-                api_key.successful_requests += 1
-            else:
-                api_key.failed_requests += 1
-        
-        session.commit()
-    finally:
-        api_db.close_session(session)
+    """Record API usage for analytics and monitoring (buffered; see ApiUsageBuffer)"""
+    _usage_buffer.add({
+        'api_key_id': api_key_id,
+        'endpoint': endpoint,
+        'method': method,
+        'status_code': status_code,
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+        'request_size': request_size,
+        'response_size': response_size,
+        'response_time_ms': response_time_ms,
+        'error_message': error_message,
+        'timestamp': datetime.now(timezone.utc),
+    })
 
 
 def check_rate_limit(api_key_id, rate_limit_per_hour):
     """Check if an API key has exceeded its rate limit"""
-    current_time = datetime.now(timezone.utc)
-    window_start = current_time.replace(minute=0, second=0, microsecond=0)
-    
-    session = api_db.get_session()
-    try:
-        # Get or create rate limit record for this hour
-        rate_limit_record = session.query(ApiRateLimit).filter_by(
-            api_key_id=api_key_id, 
-            window_start=window_start
-        ).first()
-        
-        if not rate_limit_record:
-            rate_limit_record = ApiRateLimit(
-                api_key_id=api_key_id,
-                window_start=window_start,
-                request_count=0
-            )
-            session.add(rate_limit_record)
-        
-        # Check if rate limit is exceeded
-        if rate_limit_record.request_count >= rate_limit_per_hour:
-            return False, rate_limit_record.request_count
-        
-        # Increment the count
-        rate_limit_record.request_count += 1
-        session.commit()
-        
-        return True, rate_limit_record.request_count
-    finally:
-        api_db.close_session(session)
+    return _rate_limiter.consume(api_key_id, rate_limit_per_hour)
 
 
 def get_api_usage_stats(api_key_id, days=30):
     """Get usage statistics for an API key"""
     start_date = datetime.now(timezone.utc) - timedelta(days=days)
+    flush_api_usage()
     
     session = api_db.get_session()
     try:
@@ -1030,47 +1030,33 @@ class Assistant:
             if not team:
                 return {"text": f"Team {team_number} not found in the database."}
             
-            # Get all scouting entries ordered by match
-            # Exclude alliance-copied data when not in alliance mode
+            # Ordered per-match points from the shared trend series, excluding
+            # alliance-copied data when not in alliance mode
+            from app.utils.trend_series import team_series, half_averages, linear_fit, ALL_SCOUTING_TEAMS
             scouting_team_num = self._get_scouting_team_number()
-            query = ScoutingData.query.filter_by(team_id=team.id)
-            if scouting_team_num:
-                query = query.filter_by(scouting_team_number=scouting_team_num)
-            # Exclude alliance-copied data
-            from sqlalchemy import or_
-            query = query.filter(
-                or_(
-                    ScoutingData.scout_name == None,
-                    ~ScoutingData.scout_name.like('[Alliance-%')
-                )
-            )
-            entries = query.join(Match).order_by(Match.match_number).all()
-            
-            if len(entries) < 3:
+            rows = [
+                r for r in team_series(team.id, scouting_team_num or ALL_SCOUTING_TEAMS)
+                if r['match_number'] is not None and not (r['scout_name'] or '').startswith('[Alliance-')
+            ]
+            rows.sort(key=lambda r: r['match_number'])
+
+            if len(rows) < 3:
                 return {"text": f"Not enough data to analyze trends for Team {team_number}. Need at least 3 matches."}
-            
-            # Calculate trends over time
-            match_scores = []
-            for entry in entries:
-                # Use calculate_metric to get point values
-                auto = entry.calculate_metric('apt') or 0
-                teleop = entry.calculate_metric('tpt') or 0
-                endgame = entry.calculate_metric('ept') or 0
-                total = entry.calculate_metric('tot') or (auto + teleop + endgame)
-                match_scores.append({
-                    'match': entry.match_id,
-                    'match_number': entry.match.match_number if entry.match else 0,
-                    'total': total,
-                    'score': total,  # Add for visualizer compatibility
-                    'auto': auto,
-                    'teleop': teleop,
-                    'endgame': endgame
-                })
-            
+
+            match_scores = [{
+                'match': r['match_id'],
+                'match_number': r['match_number'],
+                'total': r['total'],
+                'score': r['total'],  # Add for visualizer compatibility
+                'auto': r['auto'],
+                'teleop': r['teleop'],
+                'endgame': r['endgame']
+            } for r in rows]
+
             # Analyze trend direction
-            first_half_avg = sum(m['total'] for m in match_scores[:len(match_scores)//2]) / (len(match_scores)//2)
-            second_half_avg = sum(m['total'] for m in match_scores[len(match_scores)//2:]) / (len(match_scores) - len(match_scores)//2)
-            
+            totals = [m['total'] for m in match_scores]
+            first_half_avg, second_half_avg = half_averages(totals)
+
             trend_diff = second_half_avg - first_half_avg
             trend_pct = (trend_diff / max(first_half_avg, 1)) * 100
             
@@ -1121,21 +1107,9 @@ class Assistant:
             else:
                 response_text += f"  • Teleoperated: Declining ({teleop_trend:.1f})\n"
             
-            # Calculate linear regression for trend line
-            x_vals = list(range(len(match_scores)))
-            y_vals = [m['total'] for m in match_scores]
-            
-            # Simple linear regression
-            n = len(x_vals)
-            x_mean = sum(x_vals) / n
-            y_mean = sum(y_vals) / n
-            
-            numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_vals, y_vals))
-            denominator = sum((x - x_mean) ** 2 for x in x_vals)
-            
-            slope = numerator / denominator if denominator != 0 else 0
-            intercept = y_mean - slope * x_mean
-            
+            # Linear regression for trend line
+            slope, intercept = linear_fit(range(len(totals)), totals)
+
             return {
                 "text": response_text,
                 "trend_data": {
@@ -1735,14 +1709,15 @@ setTimeout(function() {{
         
         # Get top teams for this metric from database
         try:
-            from sqlalchemy import desc
-            # Query teams with calculated metrics
+            import heapq
+            from app.utils.team_rankings import team_metrics_map
+            # Metrics are shared with the other ranking views and cached per data version
             all_teams = Team.query.filter_by(scouting_team_number=current_user.scouting_team_number).all()
+            metrics_by_team = team_metrics_map([team.id for team in all_teams])
             team_scores = []
             
             for team in all_teams:
-                analytics = calculate_team_metrics(team.id)
-                stats = analytics.get('metrics', {})
+                stats = metrics_by_team.get(team.id, {}).get('metrics', {})
                 score = stats.get(matched_metric, 0)
                 if score and score > 0:
                     team_scores.append({
@@ -1751,9 +1726,8 @@ setTimeout(function() {{
                         'stats': stats
                     })
             
-            # Sort by score
-            team_scores.sort(key=lambda x: x['score'], reverse=True)
-            top_teams = team_scores[:5]
+            # Partial sort: only the top five are ordered
+            top_teams = heapq.nlargest(5, team_scores, key=lambda x: x['score'])
             
             if not top_teams:
                 return {
@@ -149,17 +149,28 @@ class Visualizer:
         # methods should raise clear errors if they require those libs.
 
         try:
-            # Call the appropriate visualization method
-            figure = visualization_methods[vis_type](data)
+            def _render_png():
+                # Call the appropriate visualization method
+                figure = visualization_methods[vis_type](data)
+                try:
+                    return self.figure_to_png(figure)
+                finally:
+                    # Close the figure to free memory
+                    try:
+                        plt.close(figure)
+                    except Exception:
+                        pass
 
-            # Convert plot to base64-encoded image
-            img_data = self.figure_to_base64(figure)
-
-            # Close the figure to free memory
+            # The image depends only on the type and the data passed in, so
+            # identical requests are served from the on-disk render cache.
             try:
-                plt.close(figure)
-            except Exception:
-                pass
+                from app.utils.render_cache import get_or_render, render_key
+                key = render_key({'view': 'assistant_visualizer', 'type': vis_type, 'data': data}, tables=())
+                png = get_or_render(key, 'png', _render_png)
+            except RuntimeError:
+                # No application context (e.g. scripts): render directly
+                png = _render_png()
+            img_data = base64.b64encode(png).decode('utf-8')
 
             return {
                 "image": img_data,
@@ -172,13 +183,15 @@ class Visualizer:
                 "message": f"Failed to generate visualization: {str(e)}"
             }
     
-    def figure_to_base64(self, fig) -> str:
-        """Convert a matplotlib figure to base64-encoded PNG"""
+    def figure_to_png(self, fig) -> bytes:
+        """Render a matplotlib figure to PNG bytes"""
         buf = io.BytesIO()
         fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_data = base64.b64encode(buf.getvalue()).decode('utf-8')
-        return img_data
+        return buf.getvalue()
+
+    def figure_to_base64(self, fig) -> str:
+        """Convert a matplotlib figure to base64-encoded PNG"""
+        return base64.b64encode(self.figure_to_png(fig)).decode('utf-8')
     
     def plot_team_performance(self, data: Dict[str, Any]):
         """Plot a team's performance across multiple metrics"""
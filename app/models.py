@@ -338,29 +338,68 @@ class StatboticsCache(ConcurrentModelMixin, db.Model):
                 scouting_team_number=scouting_team_number,
             )
             db.session.add(row)
-        if epa_dict:
-            row.epa_total = epa_dict.get('total')
-            row.epa_auto = epa_dict.get('auto')
-            row.epa_teleop = epa_dict.get('teleop')
-            row.epa_endgame = epa_dict.get('endgame')
-            row.rank_world = epa_dict.get('rank_world')
-            row.rank_country = epa_dict.get('rank_country')
-            row.is_miss = False
-        else:
-            row.epa_total = None
-            row.epa_auto = None
-            row.epa_teleop = None
-            row.epa_endgame = None
-            row.rank_world = None
-            row.rank_country = None
-            row.is_miss = True
-        row.fetched_at = datetime.now(timezone.utc)
+        row._apply_epa(epa_dict)
         try:
             db.session.commit()
         except Exception:
             db.session.rollback()
         return row
 
+    @classmethod
+    def bulk_upsert(cls, year, epa_by_team, scouting_team_number=None):
+        """Insert or update many teams for one year in a single transaction.
+
+        *epa_by_team* maps team number -> EPA dict (or ``None`` for a miss).
+        Returns the number of rows written.
+        """
+        if not epa_by_team:
+            return 0
+        year = int(year)
+        wanted = {int(tn): epa for tn, epa in epa_by_team.items()}
+        existing = {}
+        numbers = sorted(wanted)
+        for start in range(0, len(numbers), 500):
+            chunk = numbers[start:start + 500]
+            for row in cls.query.filter(
+                cls.team_number.in_(chunk),
+                cls.year == year,
+                cls.scouting_team_number.is_(None) if scouting_team_number is None
+                else cls.scouting_team_number == scouting_team_number,
+            ).all():
+                existing[row.team_number] = row
+        for tn, epa_dict in wanted.items():
+            row = existing.get(tn)
+            if row is None:
+                row = cls(team_number=tn, year=year,
+                          scouting_team_number=scouting_team_number)
+                db.session.add(row)
+            row._apply_epa(epa_dict)
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(wanted)
+
+    def _apply_epa(self, epa_dict):
+        if epa_dict:
+            self.epa_total = epa_dict.get('total')
+            self.epa_auto = epa_dict.get('auto')
+            self.epa_teleop = epa_dict.get('teleop')
+            self.epa_endgame = epa_dict.get('endgame')
+            self.rank_world = epa_dict.get('rank_world')
+            self.rank_country = epa_dict.get('rank_country')
+            self.is_miss = False
+        else:
+            self.epa_total = None
+            self.epa_auto = None
+            self.epa_teleop = None
+            self.epa_endgame = None
+            self.rank_world = None
+            self.rank_country = None
+            self.is_miss = True
+        self.fetched_at = datetime.now(timezone.utc)
+
     def to_epa_dict(self):
         """Return the data in the standard EPA dict format."""
         if self.is_miss:
@@ -457,25 +496,60 @@ class StatboticsMatchCache(ConcurrentModelMixin, db.Model):
             )
             db.session.add(row)
 
-        if isinstance(matches, list):
-            try:
-                payload = [m for m in matches if isinstance(m, dict)]
-                row.matches_json = json.dumps(payload)
-                row.is_miss = False
-            except Exception:
-                row.matches_json = '[]'
-                row.is_miss = True
-        else:
-            row.matches_json = None
-            row.is_miss = True
-
-        row.fetched_at = datetime.now(timezone.utc)
+        row._apply_matches(matches)
         try:
             db.session.commit()
         except Exception:
             db.session.rollback()
         return row
 
+    @classmethod
+    def bulk_upsert(cls, event_key, matches_by_team, year=None):
+        """Insert or update the rows of many teams for one event key at once.
+
+        *matches_by_team* maps team number -> list of TeamMatch dicts (or
+        ``None`` for a miss). Returns the number of rows written.
+        """
+        if not matches_by_team:
+            return 0
+        norm_event = cls._norm_event_key(event_key)
+        norm_year = cls._norm_year(year)
+        wanted = {int(tn): rows for tn, rows in matches_by_team.items()}
+        existing = {
+            row.team_number: row
+            for row in cls.query.filter(
+                cls.event_key == norm_event,
+                cls.year == norm_year,
+                cls.team_number.in_(sorted(wanted)),
+            ).all()
+        }
+        for tn, rows in wanted.items():
+            row = existing.get(tn)
+            if row is None:
+                row = cls(team_number=tn, event_key=norm_event, year=norm_year)
+                db.session.add(row)
+            row._apply_matches(rows)
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(wanted)
+
+    def _apply_matches(self, matches):
+        if isinstance(matches, list):
+            try:
+                payload = [m for m in matches if isinstance(m, dict)]
+                self.matches_json = json.dumps(payload)
+                self.is_miss = False
+            except Exception:
+                self.matches_json = '[]'
+                self.is_miss = True
+        else:
+            self.matches_json = None
+            self.is_miss = True
+        self.fetched_at = datetime.now(timezone.utc)
+
     def to_matches(self):
         if self.is_miss:
             return None
@@ -597,6 +671,69 @@ class TbaOprCache(ConcurrentModelMixin, db.Model):
         return f'<TbaOprCache team={self.team_number} event={self.event_key} opr={self.opr}>'
 
 
+class UpstreamFingerprint(ConcurrentModelMixin, db.Model):
+    """Last-seen validators and content hash for an upstream resource.
+
+    ``scope='url'`` rows track a single FIRST/TBA URL (``ETag`` /
+    ``Last-Modified`` plus a hash of the body) and are shared by all
+    scouting teams.  Other scopes record, per scouting team, the combined
+    event fingerprint that was last applied by a refresh job so an unchanged
+    upstream can be skipped entirely.
+    """
+    __tablename__ = 'upstream_fingerprint'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'resource_key', 'scouting_team_number',
+                            name='uq_upstream_fingerprint_scope_key_team'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(32), nullable=False, index=True)
+    resource_key = db.Column(db.String(255), nullable=False, index=True)
+    scouting_team_number = db.Column(db.Integer, nullable=True, index=True)
+
+    etag = db.Column(db.String(255), nullable=True)
+    last_modified = db.Column(db.String(64), nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True)
+
+    checked_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    changed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    @classmethod
+    def lookup(cls, scope, resource_key, scouting_team_number=None):
+        query = cls.query.filter_by(scope=scope, resource_key=resource_key)
+        if scouting_team_number is None:
+            query = query.filter(cls.scouting_team_number.is_(None))
+        else:
+            query = query.filter_by(scouting_team_number=scouting_team_number)
+        return query.first()
+
+    @classmethod
+    def record(cls, scope, resource_key, content_hash, scouting_team_number=None,
+               etag=None, last_modified=None, commit=True):
+        """Insert or update a fingerprint; ``changed_at`` moves only when the hash changes."""
+        now = datetime.now(timezone.utc)
+        row = cls.lookup(scope, resource_key, scouting_team_number)
+        if row is None:
+            row = cls(scope=scope, resource_key=resource_key,
+                      scouting_team_number=scouting_team_number, changed_at=now)
+            db.session.add(row)
+        elif row.content_hash != content_hash:
+            row.changed_at = now
+        row.content_hash = content_hash
+        row.etag = etag
+        row.last_modified = last_modified
+        row.checked_at = now
+        if commit:
+            try:
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        return row
+
+    def __repr__(self):
+        return f'<UpstreamFingerprint {self.scope}:{self.resource_key} team={self.scouting_team_number}>'
+
+
 class Team(ConcurrentModelMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     team_number = db.Column(db.Integer, nullable=False)
@@ -607,6 +744,7 @@ class Team(ConcurrentModelMixin, db.Model):
     starting_points = db.Column(db.Float, nullable=True, default=0)
     starting_points_threshold = db.Column(db.Integer, nullable=True, default=2)
     starting_points_enabled = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))  # Last change (incremental exports)
     # Define relationship with ScoutingData
     scouting_data = db.relationship('ScoutingData', backref='team', lazy=True)
     # Track which events this team has participated in
@@ -641,6 +779,7 @@ class Event(db.Model):
     scouting_team_number = db.Column(db.Integer, nullable=True)
     schedule_offset = db.Column(db.Integer, nullable=True)  # Current schedule offset in minutes (positive = behind, negative = ahead)
     offset_updated_at = db.Column(db.DateTime, nullable=True)  # When schedule_offset was last computed
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))  # Last change (incremental exports)
     matches = db.relationship('Match', backref='event', lazy=True, cascade='all, delete-orphan')
     # include team list entries so SQLAlchemy will delete them when the event is removed
     team_list_entries = db.relationship(
@@ -681,6 +820,7 @@ class Match(ConcurrentModelMixin, db.Model):
     comp_level = db.Column(db.String(20), nullable=True)  # TBA comp_level: qm, ef, qf, sf, f
     set_number = db.Column(db.Integer, nullable=True, default=0)  # Playoff set number (1-N)
     scouting_team_number = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))  # Last change (incremental exports)
     scouting_data = db.relationship('ScoutingData', backref='match', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
     
     def __repr__(self):
@@ -759,6 +899,8 @@ class ScoutingData(ConcurrentModelMixin, db.Model):
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     alliance = db.Column(db.String(10))  # 'red' or 'blue'
     data_json = db.Column(db.Text, nullable=False)  # JSON data based on game config
+    # Position in the shared scouting change sequence (see app/utils/alliance_sync.py)
+    change_seq = db.Column(db.BigInteger, nullable=True, index=True)
 
     # Accessor to the User who submitted this entry (optional)
     @property
@@ -1501,6 +1643,8 @@ class PitScoutingData(db.Model):
     is_uploaded = db.Column(db.Boolean, default=False)
     upload_timestamp = db.Column(db.DateTime, nullable=True)
     device_id = db.Column(db.String(100), nullable=True)  # To track which device created the data
+    # Position in the shared scouting change sequence (see app/utils/alliance_sync.py)
+    change_seq = db.Column(db.BigInteger, nullable=True, index=True)
     
     # Relationships
     team = db.relationship('Team', backref=db.backref('pit_scouting_data', lazy=True))
@@ -1597,6 +1741,11 @@ class PitScoutingImage(db.Model):
     image_data = db.Column(db.LargeBinary, nullable=False)
     original_size = db.Column(db.Integer, nullable=True)
     compressed_size = db.Column(db.Integer, nullable=True)
+    # 'processing' while the background worker compresses the upload (image_data
+    # holds the original bytes until then), 'ready' once done, 'failed' on error.
+    status = db.Column(db.String(20), nullable=False, default='ready')
+    webp_data = db.Column(db.LargeBinary, nullable=True)
+    avif_data = db.Column(db.LargeBinary, nullable=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -1658,6 +1807,8 @@ class QualitativeScoutingData(db.Model):
     #   }
     # }
     data_json = db.Column(db.Text, nullable=False)
+    # Position in the shared scouting change sequence (see app/utils/alliance_sync.py)
+    change_seq = db.Column(db.BigInteger, nullable=True, index=True)
     
     # Relationships
     # configure cascade on the backref so ORM deletions also remove children
@@ -1918,6 +2069,64 @@ class ScoutingAllianceSync(db.Model):
     def __repr__(self):
         return f'<Sync {self.data_type} from {self.from_team_number} to {self.to_team_number}>'
 
+class ChangeSequence(db.Model):
+    """Named, monotonically increasing counter handed out to changed rows.
+
+    Values are taken with ``UPDATE ... SET value = value + n`` inside the
+    writing transaction, so the row stays locked until commit and sequence
+    order matches commit order.
+    """
+    __tablename__ = 'change_sequence'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ChangeSequence {self.name}={self.value}>'
+
+
+class AllianceDataGrant(db.Model):
+    """Read access a team keeps to an alliance's shared entries after leaving alliance mode.
+
+    Instead of copying every shared row into the team's own tables with an
+    ``[Alliance-N]`` scout name, the team's queries also match the original
+    entries that the alliance's active shared rows point at, as of
+    ``granted_at`` / ``granted_seq`` (see ``team_isolation.granted_entry_ids``).
+    ``alliance_links`` copies an entry to the team before it changes or
+    leaves the grant, so the kept data stays as it was when granted.
+    """
+    __tablename__ = 'alliance_data_grant'
+    __table_args__ = (
+        db.UniqueConstraint('team_number', 'alliance_id', name='uq_alliance_data_grant_team_alliance'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    team_number = db.Column(db.Integer, nullable=False, index=True)
+    alliance_id = db.Column(db.Integer, db.ForeignKey('scouting_alliance.id'), nullable=False)
+    granted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    granted_seq = db.Column(db.BigInteger, nullable=True)  # change_seq high-water mark when granted
+
+    def __repr__(self):
+        return f'<AllianceDataGrant team={self.team_number} alliance={self.alliance_id}>'
+
+
+class AllianceSyncCursor(db.Model):
+    """High-water mark of a member team's changes already shared with an alliance."""
+    __tablename__ = 'alliance_sync_cursor'
+    __table_args__ = (
+        db.UniqueConstraint('alliance_id', 'team_number', name='uq_alliance_sync_cursor_alliance_team'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    alliance_id = db.Column(db.Integer, db.ForeignKey('scouting_alliance.id'), nullable=False, index=True)
+    team_number = db.Column(db.Integer, nullable=False)
+    last_seq = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<AllianceSyncCursor alliance={self.alliance_id} team={self.team_number} seq={self.last_seq}>'
+
+
 class ScoutingAllianceChat(db.Model):
     """Model for chat messages between alliance members"""
     __tablename__ = 'scouting_alliance_chat'
@@ -1950,10 +2159,48 @@ class ScoutingAllianceChat(db.Model):
         }
 
 
-class AllianceSharedScoutingData(db.Model):
-    """Model to store copies of scouting data shared with alliances.
-    
-    When data is synced to an alliance, a copy is made here so that deleting
+class AllianceSharedLinkMixin:
+    """Link-row behaviour shared by the ``AllianceShared*`` tables.
+
+    A shared row links an alliance to one source entry.  While it is a link
+    (``is_link``) the payload is not stored again: ``data_json`` reads
+    through to the original entry.  The row keeps its own copy only when it
+    has to outlive or override the original: just before the original is
+    deleted (``alliance_links`` snapshots it) or when an alliance admin
+    edits the shared entry.
+    """
+    is_link = db.Column(db.Boolean, default=False, nullable=False)
+
+    @property
+    def data_json(self):
+        if self.is_link:
+            original = self.original
+            if original is not None:
+                return original.data_json
+        return self._data_json or '{}'
+
+    @data_json.setter
+    def data_json(self, value):
+        # Storing a payload turns the link into a snapshot / override
+        self._data_json = value
+        self.is_link = False
+
+    def link_to(self, original):
+        """Point this row at *original* instead of holding a copy of its payload."""
+        setattr(self, self.ORIGINAL_ID_ATTR, original.id)
+        if original.id is None:
+            # Not flushed yet: nothing to link to, keep a copy
+            self.data_json = original.data_json
+            return
+        self._data_json = ''
+        self.is_link = True
+
+
+class AllianceSharedScoutingData(AllianceSharedLinkMixin, db.Model):
+    """Scouting data shared with an alliance.
+    
+    Rows link to the original entry (see ``AllianceSharedLinkMixin``); the
+    payload is snapshotted here before the original is deleted, so deleting
     the original doesn't affect other alliance members' access to the data.
     """
     __tablename__ = 'alliance_shared_scouting_data'
@@ -1975,7 +2222,7 @@ class AllianceSharedScoutingData(db.Model):
     scouting_station = db.Column(db.Integer)
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     alliance = db.Column(db.String(10))  # 'red' or 'blue'
-    data_json = db.Column(db.Text, nullable=False)  # JSON data based on game config
+    _data_json = db.Column('data_json', db.Text, nullable=False)  # JSON data; '' while linked
     
     # Metadata for alliance sharing
     shared_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1988,6 +2235,10 @@ class AllianceSharedScoutingData(db.Model):
     alliance_rel = db.relationship('ScoutingAlliance', backref='shared_scouting_data')
     match = db.relationship('Match', backref=db.backref('alliance_shared_scouting_data', lazy=True, cascade='all, delete-orphan'))
     team = db.relationship('Team')
+    original = db.relationship('ScoutingData', viewonly=True, lazy='selectin',
+                               primaryjoin='foreign(AllianceSharedScoutingData.original_scouting_data_id) == ScoutingData.id')
+    
+    ORIGINAL_ID_ATTR = 'original_scouting_data_id'
     
     def __repr__(self):
         return f'<AllianceSharedScoutingData Alliance {self.alliance_id} Team {self.team.team_number if self.team else "?"} Match {self.match.match_number if self.match else "?"}>'
@@ -2028,10 +2279,9 @@ class AllianceSharedScoutingData(db.Model):
     
     @classmethod
     def create_from_scouting_data(cls, scouting_data, alliance_id, shared_by_team):
-        """Create a shared copy from original ScoutingData"""
-        return cls(
+        """Create a shared link to original ScoutingData"""
+        shared = cls(
             alliance_id=alliance_id,
-            original_scouting_data_id=scouting_data.id,
             source_scouting_team_number=scouting_data.scouting_team_number,
             match_id=scouting_data.match_id,
             team_id=scouting_data.team_id,
@@ -2040,9 +2290,10 @@ class AllianceSharedScoutingData(db.Model):
             scouting_station=scouting_data.scouting_station,
             timestamp=scouting_data.timestamp,
             alliance=scouting_data.alliance,
-            data_json=scouting_data.data_json,
             shared_by_team=shared_by_team
         )
+        shared.link_to(scouting_data)
+        return shared
     
     @property
     def scouting_team_number(self):
@@ -2105,10 +2356,11 @@ class AllianceSharedScoutingData(db.Model):
         return temp_data._evaluate_formula(formula, local_dict)
 
 
-class AllianceSharedPitData(db.Model):
-    """Model to store copies of pit scouting data shared with alliances.
+class AllianceSharedPitData(AllianceSharedLinkMixin, db.Model):
+    """Pit scouting data shared with an alliance.
     
-    When pit data is synced to an alliance, a copy is made here so that deleting
+    Rows link to the original entry (see ``AllianceSharedLinkMixin``); the
+    payload is snapshotted here before the original is deleted, so deleting
     the original doesn't affect other alliance members' access to the data.
     """
     __tablename__ = 'alliance_shared_pit_data'
@@ -2128,7 +2380,7 @@ class AllianceSharedPitData(db.Model):
     scout_name = db.Column(db.String(50), nullable=False)
     scout_id = db.Column(db.Integer, nullable=True)
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    data_json = db.Column(db.Text, nullable=False)  # JSON data
+    _data_json = db.Column('data_json', db.Text, nullable=False)  # JSON data; '' while linked
     local_id = db.Column(db.String(36), nullable=True)  # UUID for tracking
     
     # Metadata for alliance sharing
@@ -2142,6 +2394,10 @@ class AllianceSharedPitData(db.Model):
     alliance_rel = db.relationship('ScoutingAlliance', backref='shared_pit_data')
     team = db.relationship('Team')
     event = db.relationship('Event')
+    original = db.relationship('PitScoutingData', viewonly=True, lazy='selectin',
+                               primaryjoin='foreign(AllianceSharedPitData.original_pit_data_id) == PitScoutingData.id')
+    
+    ORIGINAL_ID_ATTR = 'original_pit_data_id'
     
     def __repr__(self):
         return f'<AllianceSharedPitData Alliance {self.alliance_id} Team {self.team.team_number if self.team else "?"}>'
@@ -2181,28 +2437,29 @@ class AllianceSharedPitData(db.Model):
     
     @classmethod
     def create_from_pit_data(cls, pit_data, alliance_id, shared_by_team):
-        """Create a shared copy from original PitScoutingData"""
+        """Create a shared link to original PitScoutingData"""
         import uuid
-        return cls(
+        shared = cls(
             alliance_id=alliance_id,
-            original_pit_data_id=pit_data.id,
             source_scouting_team_number=pit_data.scouting_team_number,
             team_id=pit_data.team_id,
             event_id=pit_data.event_id,
             scout_name=pit_data.scout_name,
             scout_id=pit_data.scout_id,
             timestamp=pit_data.timestamp,
-            data_json=pit_data.data_json,
             local_id=str(uuid.uuid4()),
             shared_by_team=shared_by_team
         )
+        shared.link_to(pit_data)
+        return shared
 
 
-class AllianceSharedQualitativeData(db.Model):
-    """Model to store copies of qualitative scouting data shared with alliances.
+class AllianceSharedQualitativeData(AllianceSharedLinkMixin, db.Model):
+    """Qualitative scouting data shared with an alliance.
     
-    When qualitative data is synced to an alliance, a copy is made here so that
-    deleting the original doesn't affect other alliance members' access to the data.
+    Rows link to the original entry (see ``AllianceSharedLinkMixin``); the
+    payload is snapshotted here before the original is deleted, so deleting
+    the original doesn't affect other alliance members' access to the data.
     """
     __tablename__ = 'alliance_shared_qualitative_data'
     
@@ -2222,7 +2479,7 @@ class AllianceSharedQualitativeData(db.Model):
     scout_id = db.Column(db.Integer, nullable=True)
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     alliance_scouted = db.Column(db.String(10), nullable=False)  # 'red', 'blue', 'both', or 'team_XXXX'
-    data_json = db.Column(db.Text, nullable=False)  # JSON data
+    _data_json = db.Column('data_json', db.Text, nullable=False)  # JSON data; '' while linked
     
     # Metadata for alliance sharing
     shared_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -2234,6 +2491,10 @@ class AllianceSharedQualitativeData(db.Model):
     # Relationships
     alliance_rel = db.relationship('ScoutingAlliance', backref='shared_qualitative_data')
     match = db.relationship('Match', backref=db.backref('shared_qualitative_scouting_data', lazy=True, cascade='all, delete-orphan'))
+    original = db.relationship('QualitativeScoutingData', viewonly=True, lazy='selectin',
+                               primaryjoin='foreign(AllianceSharedQualitativeData.original_qualitative_data_id) == QualitativeScoutingData.id')
+    
+    ORIGINAL_ID_ATTR = 'original_qualitative_data_id'
     
     def __repr__(self):
         return f'<AllianceSharedQualitativeData Alliance {self.alliance_id} Match {self.match_id}>'
@@ -2279,10 +2540,9 @@ class AllianceSharedQualitativeData(db.Model):
     
     @classmethod
     def create_from_qualitative_data(cls, qual_data, alliance_id, shared_by_team):
-        """Create a shared copy from original QualitativeScoutingData"""
-        return cls(
+        """Create a shared link to original QualitativeScoutingData"""
+        shared = cls(
             alliance_id=alliance_id,
-            original_qualitative_data_id=qual_data.id,
             source_scouting_team_number=qual_data.scouting_team_number,
             match_id=qual_data.match_id,
             scouting_team_number=qual_data.scouting_team_number,
@@ -2290,9 +2550,10 @@ class AllianceSharedQualitativeData(db.Model):
             scout_id=qual_data.scout_id,
             timestamp=qual_data.timestamp,
             alliance_scouted=qual_data.alliance_scouted,
-            data_json=qual_data.data_json,
             shared_by_team=shared_by_team
         )
+        shared.link_to(qual_data)
+        return shared
 
 
 class AllianceDeletedData(db.Model):
@@ -2,6 +2,8 @@ from flask import Blueprint, render_template, request, jsonify, flash, redirect,
 from flask_socketio import emit, join_room, leave_room
 from app.models import AllianceSelection, Team, Event, Match, ScoutingData, DoNotPickEntry, AvoidEntry, db, team_event, DeclinedEntry, WantListEntry, TeamTagEntry
 from app.utils.analysis import calculate_team_metrics, get_epa_metrics_for_team
+from app.utils.team_rankings import team_metrics_map
+from app.utils.socket_batcher import emit_coalesced
 from app.utils.statbotics_api_utils import get_statbotics_team_matches
 from flask_login import current_user
 from app import socketio
@@ -147,12 +149,12 @@ def emit_alliance_update(event_id, alliance_data):
     socketio.emit('alliance_updated', alliance_data, room=f'alliance_event_{event_id}')
 
 def emit_recommendations_update(event_id):
-    """Emit recommendations update to all clients in the room"""
-    socketio.emit('recommendations_updated', {'event_id': event_id}, room=f'alliance_event_{event_id}')
+    """Signal a recommendations change; bursts are coalesced into one event per room"""
+    emit_coalesced('recommendations_updated', {'event_id': event_id}, room=f'alliance_event_{event_id}')
 
 def emit_lists_update(event_id, list_data):
-    """Emit lists update to all clients in the room"""
-    socketio.emit('lists_updated', list_data, room=f'alliance_event_{event_id}')
+    """Queue a list change; bursts go out as one ``{'event_id', 'changes'}`` message per room"""
+    emit_coalesced('lists_updated', list_data, room=f'alliance_event_{event_id}')
 
 @bp.route('/')
 def index():
@@ -562,6 +564,12 @@ def get_recommendations(event_param):
         do_not_pick_recommendations = []  # Separate list for do not pick teams
         teams_with_no_data = []  # For teams without scouting data
         
+        # Per-team metrics come from the ranking service, cached by data version
+        metrics_by_team = team_metrics_map([
+            t.id for t in all_teams
+            if not ((t.id in picked_teams) or (getattr(t, 'team_number', None) in picked_team_numbers))
+        ])
+
         for team in all_teams:
             team_key = team.team_number if getattr(team, 'team_number', None) is not None else team.id
             is_picked = (team.id in picked_teams) or (team_key in picked_team_numbers)
@@ -573,7 +581,9 @@ def get_recommendations(event_param):
                     'pick_note': ''
                 }))
                 try:
-                    analytics_result = calculate_team_metrics(team.id)
+                    analytics_result = metrics_by_team.get(team.id)
+                    if analytics_result is None:
+                        analytics_result = calculate_team_metrics(team.id)
                     metrics = analytics_result.get('metrics', {})
                     if metrics:
                         is_avoided = (team.id in avoid_teams) or (team_key in avoid_team_numbers)
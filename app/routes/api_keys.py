@@ -14,6 +14,7 @@ from app.api_models import (
 from app.models import Team, Event, Match, ScoutingData
 from app import db
 from app.routes.auth import admin_required, validate_csrf_token
+from app.utils.api_auth import invalidate_api_key_cache
 
 bp = Blueprint('api_keys', __name__, url_prefix='/api/keys')
 
@@ -210,6 +211,7 @@ def update_api_key(api_key_id):
                 api_key.permissions = data['permissions']
             
             session.commit()
+            invalidate_api_key_cache(api_key.key_hash)
             
             return jsonify({
                 'success': True,
@@ -2,10 +2,12 @@
 Main API Routes for Data Access and Operations
 Provides comprehensive API endpoints for accessing team data, sync operations, and actions
 """
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from datetime import datetime, timezone, timedelta
 import traceback
 import json
+import base64
+import zlib
 
 from app.utils.api_auth import (
     team_data_access_required, scouting_data_read_required, scouting_data_write_required,
@@ -13,7 +15,7 @@ from app.utils.api_auth import (
     get_current_api_key, has_api_permission
 )
 from app.models import (
-    Team, Event, Match, ScoutingData, User, Role, 
+    Team, Event, Match, ScoutingData, PitScoutingData, User, Role, 
     DoNotPickEntry, AvoidEntry, ScoutingAllianceEvent
 )
 from app import db
@@ -21,11 +23,17 @@ from app.utils.team_isolation import (
     filter_teams_by_scouting_team, filter_matches_by_scouting_team,
     filter_scouting_data_by_scouting_team, get_current_scouting_team_number
 )
+from app.utils.conditional_get import conditional_get
 from sqlalchemy import func
 
 bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
 
 
+def _api_etag_scope():
+    """Caller identity for conditional GET ETags on API v1 endpoints."""
+    return (get_current_api_team(),)
+
+
 @bp.route('/info', methods=['GET'])
 @team_data_access_required
 def api_info():
@@ -66,6 +74,7 @@ def api_info():
 # Team Data Endpoints
 @bp.route('/teams', methods=['GET'])
 @team_data_access_required
+@conditional_get(('team', 'event'), scope=_api_etag_scope)
 def get_teams():
     """Get teams data filtered by API key's scouting team"""
     try:
@@ -186,6 +195,7 @@ def get_team_details(team_id):
 # Event Data Endpoints
 @bp.route('/events', methods=['GET'])
 @team_data_access_required
+@conditional_get(('event', 'team', 'match'), scope=_api_etag_scope)
 def get_events():
     """Get events that have teams associated with API key's scouting team"""
     try:
@@ -345,6 +355,7 @@ def get_event_details(event_id):
 # Match Data Endpoints
 @bp.route('/matches', methods=['GET'])
 @scouting_data_read_required
+@conditional_get(('match', 'event'), scope=_api_etag_scope)
 def get_matches():
     """Get matches filtered by events that have teams from API key's scouting team"""
     try:
@@ -792,6 +803,173 @@ def health_check():
     })
 
 
+# ---------------------------------------------------------------------------
+# Streaming export helpers for /api/v1/all?format=ndjson
+# ---------------------------------------------------------------------------
+
+_STREAM_BATCH_SIZE = 500
+_STREAM_SECTIONS = ('teams', 'events', 'matches', 'scouting_data', 'pit_scouting_data')
+
+
+def _encode_stream_cursor(section_index, last_id, since, started_at):
+    raw = json.dumps({'s': section_index, 'id': last_id, 'since': since, 'started': started_at}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_stream_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    section_index = int(data.get('s', 0))
+    if section_index < 0 or section_index >= len(_STREAM_SECTIONS):
+        raise ValueError('cursor section out of range')
+    return section_index, int(data.get('id') or 0), data.get('since'), data.get('started')
+
+
+def _parse_since(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        # Timestamps are stored as naive UTC
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _iso(val):
+    return val.isoformat() if val is not None and hasattr(val, 'isoformat') else val
+
+
+def _loads_or_raw(value):
+    try:
+        return json.loads(value) if value else None
+    except Exception:
+        return value
+
+
+def _stream_section_query(section, team_number, after_id, since):
+    """Column-only query for one export section, ordered by id for cursoring."""
+    if section == 'teams':
+        model = Team
+        query = db.session.query(Team.id, Team.team_number, Team.team_name, Team.location)
+        row_to_dict = lambda r: {'id': r.id, 'team_number': r.team_number, 'team_name': r.team_name, 'location': r.location}
+    elif section == 'events':
+        model = Event
+        query = db.session.query(Event.id, Event.name, Event.code, Event.location, Event.start_date, Event.end_date)
+        row_to_dict = lambda r: {'id': r.id, 'name': r.name, 'code': r.code, 'location': r.location,
+                                 'start_date': _iso(r.start_date), 'end_date': _iso(r.end_date)}
+    elif section == 'matches':
+        model = Match
+        query = db.session.query(
+            Match.id, Match.match_number, Match.match_type, Match.event_id, Match.red_alliance,
+            Match.blue_alliance, Match.red_score, Match.blue_score, Match.winner
+        )
+        row_to_dict = lambda r: {'id': r.id, 'match_number': r.match_number, 'match_type': r.match_type,
+                                 'event_id': r.event_id, 'red_alliance': r.red_alliance, 'blue_alliance': r.blue_alliance,
+                                 'red_score': r.red_score, 'blue_score': r.blue_score, 'winner': r.winner}
+    elif section == 'scouting_data':
+        model = ScoutingData
+        query = db.session.query(
+            ScoutingData.id, ScoutingData.team_id, ScoutingData.match_id, ScoutingData.data_json,
+            ScoutingData.scout_name, ScoutingData.timestamp
+        )
+        row_to_dict = lambda r: {'id': r.id, 'team_id': r.team_id, 'match_id': r.match_id,
+                                 'data': _loads_or_raw(r.data_json), 'scout_name': r.scout_name,
+                                 'timestamp': _iso(r.timestamp)}
+    else:
+        model = PitScoutingData
+        query = db.session.query(
+            PitScoutingData.id, PitScoutingData.team_id, PitScoutingData.event_id, PitScoutingData.data_json,
+            PitScoutingData.scout_name, PitScoutingData.timestamp
+        )
+        row_to_dict = lambda r: {'id': r.id, 'team_id': r.team_id, 'event_id': r.event_id,
+                                 'data': _loads_or_raw(r.data_json), 'scout_name': r.scout_name,
+                                 'timestamp': _iso(r.timestamp)}
+
+    if since is not None:
+        changed_at = model.updated_at if section in ('teams', 'events', 'matches') else model.timestamp
+        query = query.filter(changed_at >= since)
+    query = query.filter(model.scouting_team_number == team_number)
+    if after_id:
+        query = query.filter(model.id > after_id)
+    query = query.order_by(model.id).execution_options(yield_per=_STREAM_BATCH_SIZE)
+    return query, row_to_dict
+
+
+def _generate_ndjson_export(team_number, start_section, after_id, since_raw, started_at, limit):
+    """Yield the export as newline-delimited JSON records.
+
+    Each data line is ``{"type": <section>, "data": {...}}``. The final line
+    is ``{"type": "end", ...}`` carrying ``next_cursor`` when ``limit`` cut the
+    page short, and ``since`` -- the time the first page of this export
+    started, to pass on the next incremental pull.
+    """
+    since = _parse_since(since_raw)
+    generated_at = datetime.now(timezone.utc).isoformat()
+    started_at = started_at or generated_at
+    dumps = lambda obj: json.dumps(obj, separators=(',', ':'), default=str) + '\n'
+
+    yield dumps({'type': 'meta', 'team_number': team_number, 'generated_at': generated_at, 'since': since_raw})
+
+    emitted = 0
+    for section_index in range(start_section, len(_STREAM_SECTIONS)):
+        section = _STREAM_SECTIONS[section_index]
+        query, row_to_dict = _stream_section_query(
+            section, team_number, after_id if section_index == start_section else 0, since
+        )
+        last_id = after_id if section_index == start_section else 0
+        for row in query:
+            if limit and emitted >= limit:
+                yield dumps({
+                    'type': 'end',
+                    'count': emitted,
+                    'next_cursor': _encode_stream_cursor(section_index, last_id, since_raw, started_at),
+                    'since': started_at,
+                })
+                return
+            yield dumps({'type': section, 'data': row_to_dict(row)})
+            last_id = row.id
+            emitted += 1
+
+    yield dumps({'type': 'end', 'count': emitted, 'next_cursor': None, 'since': started_at})
+
+
+def _gzip_chunks(chunks, flush_every=64 * 1024):
+    """Gzip a stream of text chunks, flushing compressed output periodically."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        out = compressor.compress(data)
+        pending += len(data)
+        if pending >= flush_every:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def _stream_dump_all(team_number):
+    """Build the streamed NDJSON response for /api/v1/all."""
+    try:
+        start_section, after_id, since_raw, started_at = 0, 0, request.args.get('since'), None
+        cursor = request.args.get('cursor')
+        if cursor:
+            start_section, after_id, since_raw, started_at = _decode_stream_cursor(cursor)
+        _parse_since(since_raw)  # validate before streaming starts
+        limit = request.args.get('limit', type=int) or 0
+    except Exception:
+        return jsonify({'error': 'Invalid cursor or since parameter'}), 400
+
+    body = _generate_ndjson_export(team_number, start_section, after_id, since_raw, started_at, max(0, limit))
+    headers = {'X-Accel-Buffering': 'no', 'Cache-Control': 'no-store'}
+    if 'gzip' in (request.headers.get('Accept-Encoding') or '').lower():
+        body = _gzip_chunks(body)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return Response(stream_with_context(body), mimetype='application/x-ndjson', headers=headers)
+
+
 @bp.route('/all', methods=['GET'])
 @team_data_access_required
 def api_dump_all():
@@ -800,11 +978,22 @@ def api_dump_all():
     This endpoint is intended for administrative exports. It respects API key
     team scoping (get_current_api_team()). Supports api_key via header or
     query param (GET) as other API endpoints do.
+
+    Pass ``format=ndjson`` (or ``Accept: application/x-ndjson``) to stream the
+    export one record per line, including pit scouting rows. The streamed mode
+    accepts ``since=<ISO timestamp>`` to limit every section to rows changed
+    since then (teams, events and matches by ``updated_at``, scouting and pit
+    rows by ``timestamp``; deletions are not reported), ``limit=<n>`` to page,
+    and ``cursor=`` from the previous page's final line to resume. It is
+    gzip-compressed when the client accepts it.
     """
     try:
         team_number = get_current_api_team()
         if team_number is None:
             return jsonify({'error': 'API key not associated with a scouting team'}), 403
+
+        if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+            return _stream_dump_all(team_number)
         # Use column-only queries to avoid lazy-loading relationships (which may pull User records)
         # Teams - select only scalar columns
         teams_rows = db.session.query(
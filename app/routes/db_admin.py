@@ -133,6 +133,21 @@ def api_database_status():
             'error': str(e)
         }), 500
 
+@db_admin_bp.route('/api/cache-stats')
+@login_required
+def api_cache_stats():
+    """API endpoint for in-memory cache hit rates and upstream API latency"""
+    if not current_user.has_role('superadmin'):
+        return jsonify({'error': 'Super Admin access required'}), 403
+
+    from app.utils.tiered_cache import get_cache_stats
+    from app.utils.http_client import get_host_latency_stats
+    return jsonify({
+        'success': True,
+        'caches': get_cache_stats(),
+        'upstream': get_host_latency_stats()
+    })
+
 @db_admin_bp.route('/optimize', methods=['POST'])
 @login_required
 def optimize_database():
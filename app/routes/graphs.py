@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, current_app, request, jsonify, url_for, redirect, flash, abort
+from flask import Blueprint, render_template, current_app, request, jsonify, url_for, redirect, flash, abort, make_response
 from flask_login import login_required, current_user
 from app.routes.auth import analytics_required, role_required
 import plotly.express as px
@@ -31,7 +31,9 @@ from app.utils.alliance_data import (
 import os
 import secrets
 import copy
-import time as _time
+from app.utils.tiered_cache import TieredCache
+from app.utils.render_cache import render_key, get_or_render, cached_render_response, render_cache, RENDER_TABLES
+from app.utils.plotly_compact import compact_figure_json, expand_figure, chart_template, CHART_TEMPLATE, dumps as compact_dumps
 import re
 
 
@@ -45,100 +47,22 @@ def get_theme_context():
 
 # Short-lived route-layer cache to prevent repeated heavy metric/EPA fetches
 # when /graphs is refreshed frequently.
-_GRAPH_METRICS_CACHE = {}
-_GRAPH_METRICS_CACHE_TTL_SECONDS = 600
-_GRAPH_METRICS_CACHE_CLEANUP_EVERY = 250
-_graph_metrics_cache_access_counter = 0
+_GRAPH_METRICS_CACHE = TieredCache('graph_metrics', maxsize=2000, ttl=600)
 
 # Cache external EPA/OPR lookups used directly in generate-graph rendering.
-_GRAPH_EPA_CACHE = {}
-_GRAPH_EPA_CACHE_TTL_SECONDS = 600
-_GRAPH_EPA_CACHE_CLEANUP_EVERY = 250
-_graph_epa_cache_access_counter = 0
-
-
-def _graph_metrics_cache_get(key):
-    """Return cached metrics result for *key* when still fresh."""
-    global _graph_metrics_cache_access_counter
-    entry = _GRAPH_METRICS_CACHE.get(key)
-    _graph_metrics_cache_access_counter += 1
-    if _graph_metrics_cache_access_counter >= _GRAPH_METRICS_CACHE_CLEANUP_EVERY:
-        _graph_metrics_cache_cleanup()
-    if not entry:
-        return None
-    payload, ts = entry
-    if (_time.time() - ts) <= _GRAPH_METRICS_CACHE_TTL_SECONDS:
-        return payload
-    return None
-
-
-def _graph_metrics_cache_set(key, payload):
-    """Store metrics payload in short-lived graphs cache."""
-    global _graph_metrics_cache_access_counter
-    _GRAPH_METRICS_CACHE[key] = (payload, _time.time())
-    _graph_metrics_cache_access_counter += 1
-    if _graph_metrics_cache_access_counter >= _GRAPH_METRICS_CACHE_CLEANUP_EVERY:
-        _graph_metrics_cache_cleanup()
-
-
-def _graph_metrics_cache_cleanup():
-    """Evict stale entries from route-level graphs cache."""
-    global _graph_metrics_cache_access_counter
-    _graph_metrics_cache_access_counter = 0
-    now = _time.time()
-    stale = [k for k, (_, ts) in list(_GRAPH_METRICS_CACHE.items())
-             if (now - ts) > _GRAPH_METRICS_CACHE_TTL_SECONDS]
-    for key in stale:
-        del _GRAPH_METRICS_CACHE[key]
-
-
-def _graph_epa_cache_get(key):
-    """Return cached EPA/OPR payload for *key* when still fresh."""
-    global _graph_epa_cache_access_counter
-    entry = _GRAPH_EPA_CACHE.get(key)
-    _graph_epa_cache_access_counter += 1
-    if _graph_epa_cache_access_counter >= _GRAPH_EPA_CACHE_CLEANUP_EVERY:
-        _graph_epa_cache_cleanup()
-    if not entry:
-        return None
-    payload, ts = entry
-    if (_time.time() - ts) <= _GRAPH_EPA_CACHE_TTL_SECONDS:
-        return payload
-    return None
-
-
-def _graph_epa_cache_set(key, payload):
-    """Store EPA/OPR payload in short-lived cache."""
-    global _graph_epa_cache_access_counter
-    _GRAPH_EPA_CACHE[key] = (payload, _time.time())
-    _graph_epa_cache_access_counter += 1
-    if _graph_epa_cache_access_counter >= _GRAPH_EPA_CACHE_CLEANUP_EVERY:
-        _graph_epa_cache_cleanup()
-
-
-def _graph_epa_cache_cleanup():
-    """Evict stale entries from EPA/OPR cache."""
-    global _graph_epa_cache_access_counter
-    _graph_epa_cache_access_counter = 0
-    now = _time.time()
-    stale = [k for k, (_, ts) in list(_GRAPH_EPA_CACHE.items())
-             if (now - ts) > _GRAPH_EPA_CACHE_TTL_SECONDS]
-    for key in stale:
-        del _GRAPH_EPA_CACHE[key]
+_GRAPH_EPA_CACHE = TieredCache('graph_epa', maxsize=2000, ttl=600)
 
 
 def _get_epa_metrics_cached(team_number, epa_source, force_refresh=False):
-    """Cached wrapper around get_epa_metrics_for_team for graph rendering."""
-    cache_key = (int(team_number), str(epa_source or 'scouted_only'))
-    if not force_refresh:
-        cached = _graph_epa_cache_get(cache_key)
-        if cached is not None:
-            return cached
+    """Cached wrapper around get_epa_metrics_for_team for graph rendering.
 
+    Concurrent callers for the same key share one computation.
+    """
     from app.utils.analysis import get_epa_metrics_for_team
-    payload = get_epa_metrics_for_team(team_number)
-    _graph_epa_cache_set(cache_key, payload)
-    return payload
+
+    cache_key = (int(team_number), str(epa_source or 'scouted_only'))
+    return _GRAPH_EPA_CACHE.get_or_load(cache_key, lambda: get_epa_metrics_for_team(team_number),
+                                        force=force_refresh)
 
 
 def _normalize_comp_level_for_graph_match(match_obj):
@@ -401,36 +325,57 @@ def _row_hover_label(row):
     return f"Match {(row or {}).get('match_number', 0)}"
 
 
-def _calculate_team_metrics_cached(team_id, event_id=None):
-    """Cached wrapper around calculate_team_metrics for /graphs routes."""
-    try:
-        from app.utils.analysis import get_current_epa_source
-        epa_source = get_current_epa_source() or 'scouted_only'
-    except Exception:
-        epa_source = 'scouted_only'
+# Resources the effective game config is resolved from
+_METRICS_CONFIG_TABLES = ('game_config', 'scouting_alliance')
 
-    cache_key = (int(team_id), int(event_id) if event_id is not None else 0, str(epa_source))
-    cached = _graph_metrics_cache_get(cache_key)
-    if cached is not None:
-        return cached
 
-    result = calculate_team_metrics(team_id, event_id=event_id)
-    _graph_metrics_cache_set(cache_key, result)
-    return result
+def _config_digest(game_config):
+    """Short content hash of an explicitly passed game config (``None`` for the effective one)."""
+    if game_config is None:
+        return None
+    import hashlib
+    return hashlib.md5(json.dumps(game_config, sort_keys=True, default=str).encode()).hexdigest()[:16]
 
 
-def _calculate_team_metrics_cached_force(team_id, event_id=None):
-    """Force-refresh wrapper that bypasses cache lookup for a metrics key."""
+def _team_metrics_cache_key(team_id, event_id=None, game_config=None):
+    """Metrics cache key for the current scope.
+
+    ``(team_id, event_id, epa_source, scouting_team, alliance_id, config)``:
+    the metrics read the scouting team's (or alliance's) entries and score
+    them with a game config, so both are part of the key.  *config* is the
+    config data versions plus the digest of *game_config* when one is passed.
+    """
+    from app.utils.change_tracking import get_data_versions
+    from app.utils.team_isolation import get_current_scouting_team_number
     try:
         from app.utils.analysis import get_current_epa_source
         epa_source = get_current_epa_source() or 'scouted_only'
     except Exception:
         epa_source = 'scouted_only'
 
-    cache_key = (int(team_id), int(event_id) if event_id is not None else 0, str(epa_source))
-    result = calculate_team_metrics(team_id, event_id=event_id)
-    _graph_metrics_cache_set(cache_key, result)
-    return result
+    return (int(team_id), int(event_id) if event_id is not None else 0, str(epa_source),
+            get_current_scouting_team_number(), get_active_alliance_id(),
+            (get_data_versions(_METRICS_CONFIG_TABLES), _config_digest(game_config)))
+
+
+def _calculate_team_metrics_cached(team_id, event_id=None, game_config=None):
+    """Cached wrapper around calculate_team_metrics for /graphs routes.
+
+    Also used by the mobile compare endpoint, which passes the token team's
+    *game_config* explicitly.
+    """
+    cache_key = _team_metrics_cache_key(team_id, event_id, game_config)
+    # One computation per key; concurrent viewers wait for its result
+    return _GRAPH_METRICS_CACHE.get_or_load(
+        cache_key, lambda: calculate_team_metrics(team_id, event_id=event_id, game_config=game_config))
+
+
+def _calculate_team_metrics_cached_force(team_id, event_id=None, game_config=None):
+    """Force-refresh wrapper that bypasses cache lookup for a metrics key."""
+    cache_key = _team_metrics_cache_key(team_id, event_id, game_config)
+    return _GRAPH_METRICS_CACHE.get_or_load(
+        cache_key, lambda: calculate_team_metrics(team_id, event_id=event_id, game_config=game_config),
+        force=True)
 
 
 def _invalidate_graph_epa_cache_for_teams(team_numbers):
@@ -439,12 +384,8 @@ def _invalidate_graph_epa_cache_for_teams(team_numbers):
     if not targets:
         return
 
-    stale = [
-        key for key in list(_GRAPH_EPA_CACHE.keys())
-        if isinstance(key, tuple) and len(key) >= 1 and int(key[0]) in targets
-    ]
-    for key in stale:
-        _GRAPH_EPA_CACHE.pop(key, None)
+    _GRAPH_EPA_CACHE.invalidate(
+        lambda key: isinstance(key, tuple) and len(key) >= 1 and int(key[0]) in targets)
 
 
 def _invalidate_graph_metrics_cache_for_team_ids(team_ids, event_ids=None):
@@ -457,20 +398,18 @@ def _invalidate_graph_metrics_cache_for_team_ids(team_ids, event_ids=None):
     if not target_team_ids:
         return
 
-    stale = []
-    for key in list(_GRAPH_METRICS_CACHE.keys()):
+    def _matches(key):
         if not isinstance(key, tuple) or len(key) < 2:
-            continue
+            return False
         key_team_id = int(key[0])
         key_event_id = int(key[1])
         if key_team_id not in target_team_ids:
-            continue
+            return False
         if target_event_ids is not None and key_event_id not in target_event_ids and key_event_id != 0:
-            continue
-        stale.append(key)
+            return False
+        return True
 
-    for key in stale:
-        _GRAPH_METRICS_CACHE.pop(key, None)
+    _GRAPH_METRICS_CACHE.invalidate(_matches)
 
 
 def prewarm_graph_caches_for_sync(event_code=None, team_numbers=None):
@@ -576,6 +515,15 @@ def _chart_theme():
     }
 
 
+def _figure_json(fig):
+    """Serialize a chart for the page in the compact format (see ``plotly_compact``).
+
+    Theme colours equal to ``_chart_theme()`` are left to the shared
+    template rather than repeated in every figure.
+    """
+    return compact_figure_json(fig, theme=_chart_theme())
+
+
 def _sanitize_public_widgets(widgets):
     """Return a deep-copied list of widgets for public consumption.
 
@@ -2436,6 +2384,138 @@ def create_share():
         flash('An error occurred while creating the shared graph. Please try again.', 'error')
         return redirect(url_for('graphs.index'))
 
+def _render_context_spec():
+    """Viewer-independent inputs that change how a chart renders."""
+    try:
+        from app.utils.analysis import get_current_epa_source
+        epa_source = get_current_epa_source() or 'scouted_only'
+    except Exception:
+        epa_source = 'scouted_only'
+    return {'theme': _chart_theme(), 'epa_source': epa_source}
+
+
+def _shared_graph_scope_spec():
+    """Scouting team and alliance the current block reads data as, for render keys."""
+    from app.utils.team_isolation import get_current_scouting_team_number
+    return {'scouting_team': get_current_scouting_team_number(), 'alliance_id': get_active_alliance_id()}
+
+
+def _shared_graph_plots_cached(plot_spec, all_teams, selected_event_obj, scouting_team_number):
+    """``_build_selected_graph_plots`` for a shared graph, served from the render cache.
+
+    Shared graphs are public, so the plots are built as the share's creator
+    (*scouting_team_number*) rather than as whoever is viewing.  The cached
+    entry holds the Plotly JSON plus the chosen Team ids; it is keyed by
+    *plot_spec*, that scope and the data versions of the tables the plots read.
+    """
+    from app.utils.team_isolation import scouting_team_scope
+    with scouting_team_scope(scouting_team_number):
+        return _shared_graph_plots_in_scope(plot_spec, all_teams, selected_event_obj)
+
+
+def _shared_graph_plots_in_scope(plot_spec, all_teams, selected_event_obj):
+    key = render_key(dict(plot_spec, view='shared_graph', scope=_shared_graph_scope_spec(),
+                          **_render_context_spec()))
+
+    def _build():
+        plots, teams = _build_selected_graph_plots(
+            selected_team_numbers=plot_spec['teams'],
+            all_teams=all_teams,
+            selected_event_ids=plot_spec['event_ids'],
+            selected_event_id=plot_spec['event_id'],
+            selected_event_obj=selected_event_obj,
+            selected_metric=plot_spec['metric'],
+            selected_graph_types=plot_spec['graph_types'],
+            selected_data_view=plot_spec['data_view'],
+            selected_sort=plot_spec['sort'],
+        )
+        return json.dumps({'plots': plots, 'team_ids': [t.id for t in teams]})
+
+    payload = json.loads(get_or_render(key, 'json', _build))
+    team_ids = payload.get('team_ids') or []
+    by_id = {t.id: t for t in Team.query.filter(Team.id.in_(team_ids)).all()} if team_ids else {}
+    teams = [by_id[tid] for tid in team_ids if tid in by_id]
+    return payload.get('plots') or {}, teams
+
+
+def _shared_graph_plot_spec(shared_graph):
+    """Stored selection of a shared graph, resolved the way ``view_shared`` does by default."""
+    selected_metric = shared_graph.metric or 'points'
+    if selected_metric.strip() == '' or selected_metric in ('total_points', 'tot'):
+        selected_metric = 'points'
+    event_ids = []
+    if shared_graph.event_id:
+        event = db.session.get(Event, int(shared_graph.event_id))
+        code = (getattr(event, 'code', '') or '').strip()
+        if code:
+            event_ids = [int(eid) for (eid,) in db.session.query(Event.id).filter(Event.code == code).all()]
+        if not event_ids:
+            event_ids = [int(shared_graph.event_id)]
+    return {
+        'teams': shared_graph.team_numbers_list,
+        'event_ids': event_ids,
+        'event_id': int(shared_graph.event_id) if shared_graph.event_id else None,
+        'metric': selected_metric,
+        'graph_types': shared_graph.graph_types_list or ['bar', 'line', 'scatter'],
+        'data_view': shared_graph.data_view or 'averages',
+        'sort': 'points_desc',
+    }
+
+
+@bp.route('/chart-template.js')
+def chart_template_js():
+    """Shared Plotly template referenced by compact figures, loaded once per page."""
+    body = "window.PLOTLY_TEMPLATES = window.PLOTLY_TEMPLATES || {};\nwindow.PLOTLY_TEMPLATES[%s] = %s;\n" % (
+        json.dumps(CHART_TEMPLATE), compact_dumps(chart_template(_chart_theme())))
+    response = make_response(body)
+    response.mimetype = 'application/javascript'
+    response.add_etag()
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response.make_conditional(request)
+
+
+@bp.route('/shared/<share_id>/image.<fmt>')
+def shared_graph_image(share_id, fmt):
+    """PNG/SVG rendering of one plot of a shared graph (no authentication required).
+
+    Intended for link previews; ``?plot=<name>`` picks the plot, otherwise
+    the first one is used.  Rendered images are cached on disk and served
+    with an ETag.
+    """
+    if fmt not in ('png', 'svg'):
+        abort(404)
+    shared_graph = SharedGraph.get_by_share_id(share_id)
+    if not shared_graph:
+        abort(404, description="Shared graph not found or has been removed.")
+    if shared_graph.is_expired():
+        abort(410, description="This shared graph has expired.")
+
+    plot_spec = _shared_graph_plot_spec(shared_graph)
+    event_obj = db.session.get(Event, plot_spec['event_id']) if plot_spec['event_id'] else None
+    all_teams = Team.query.order_by(Team.team_number).all()
+    plots, _teams = _shared_graph_plots_cached(plot_spec, all_teams, event_obj, shared_graph.created_by_team)
+    if not plots:
+        abort(404, description="No plots available for this shared graph.")
+    plot_name = request.args.get('plot')
+    if plot_name not in plots:
+        plot_name = next(iter(plots))
+
+    from app.utils.team_isolation import scouting_team_scope
+    with scouting_team_scope(shared_graph.created_by_team):
+        key = render_key(dict(plot_spec, view='shared_graph_image', plot=plot_name, fmt=fmt,
+                              scope=_shared_graph_scope_spec(), **_render_context_spec()))
+
+    def _build():
+        fig = go.Figure(expand_figure(plots[plot_name], theme=_chart_theme()))
+        return pio.to_image(fig, format=fmt, width=1200, height=630)
+
+    try:
+        return cached_render_response(key, fmt, _build)
+    except Exception as e:
+        current_app.logger.warning(f"Shared graph image render failed for {share_id}: {e}")
+        abort(503, description="Chart image rendering is unavailable.")
+
+
 @bp.route('/shared/<share_id>')
 def view_shared(share_id):
     """View a shared graph (no authentication required)"""
@@ -2573,12 +2653,14 @@ def view_shared(share_id):
     selected_team_set = {int(n) for n in team_numbers if n is not None}
     team_metrics = {}
     if selected_team_set:
-        for team in all_teams:
-            if int(team.team_number) not in selected_team_set:
-                continue
-            analytics_result = _calculate_team_metrics_cached(team.id)
-            metrics = analytics_result.get('metrics', {})
-            team_metrics[team.team_number] = metrics
+        from app.utils.team_isolation import scouting_team_scope
+        with scouting_team_scope(shared_graph.created_by_team):
+            for team in all_teams:
+                if int(team.team_number) not in selected_team_set:
+                    continue
+                analytics_result = _calculate_team_metrics_cached(team.id)
+                metrics = analytics_result.get('metrics', {})
+                team_metrics[team.team_number] = metrics
 
     all_teams_data = []
     for t in all_teams:
@@ -2590,17 +2672,17 @@ def view_shared(share_id):
         })
     all_teams_json = json.dumps(all_teams_data)
 
-    plots, teams = _build_selected_graph_plots(
-        selected_team_numbers=team_numbers,
-        all_teams=all_teams,
-        selected_event_ids=selected_event_ids,
-        selected_event_id=selected_event_id,
-        selected_event_obj=selected_event_obj,
-        selected_metric=selected_metric,
-        selected_graph_types=selected_graph_types,
-        selected_data_view=selected_data_view,
-        selected_sort=selected_sort,
-    )
+    plot_spec = {
+        'teams': team_numbers,
+        'event_ids': selected_event_ids,
+        'event_id': selected_event_id,
+        'metric': selected_metric,
+        'graph_types': selected_graph_types,
+        'data_view': selected_data_view,
+        'sort': selected_sort,
+    }
+    plots, teams = _shared_graph_plots_cached(plot_spec, all_teams, selected_event_obj,
+                                              shared_graph.created_by_team)
 
     if not teams:
         abort(404, description="No teams found for this shared graph.")
@@ -2803,6 +2885,35 @@ def public_page_download(token):
 
 @bp.route('/pages/public/<token>/render_widget/<int:widget_index>', methods=['POST'])
 def public_page_widget_render(token, widget_index):
+    """Render a single widget for a public shared page, via the render cache.
+
+    Every viewer of a share link asks for the same widgets, so the JSON
+    output is cached on disk keyed by the token, widget, request overrides
+    and the data versions of the tables it reads.  Revoking the share or
+    editing the page changes the key.
+    """
+    shares_file = os.path.join(current_app.instance_path, 'pages_shares.json')
+    spec = dict(_render_context_spec(), view='public_widget', token=token, widget=widget_index,
+                overrides=request.get_json(silent=True) or {})
+    key = render_key(spec, tables=RENDER_TABLES + ('custom_page',), files=(shares_file,))
+
+    if request.if_none_match.contains(key):
+        response = make_response('', 304)
+    else:
+        cached = render_cache.get(key, 'json')
+        if cached is not None:
+            response = make_response(cached)
+            response.mimetype = 'application/json'
+        else:
+            response = make_response(_render_public_page_widget(token, widget_index))
+            if response.status_code != 200:
+                return response
+            render_cache.put(key, 'json', response.get_data())
+    response.set_etag(key)
+    return response
+
+
+def _render_public_page_widget(token, widget_index):
         """Render a single widget for a public shared page identified by token.
 
         This mirrors pages_widget_render but validates the share token and uses
@@ -4473,7 +4584,7 @@ def _create_bar_chart(team_data, metric, data_view, sort='points_desc'):
                 margin=dict(l=40, r=20, t=50, b=60),
                 xaxis=dict(type='category', tickangle=-45)
             )
-            plots[f'{metric}_bar_avg'] = pio.to_json(fig)
+            plots[f'{metric}_bar_avg'] = _figure_json(fig)
     else:
         # Match-by-match bar chart
         fig = go.Figure()
@@ -4495,7 +4606,7 @@ def _create_bar_chart(team_data, metric, data_view, sort='points_desc'):
             margin=dict(l=40, r=20, t=50, b=60),
             barmode='group'
         )
-        plots[f'{metric}_bar_matches'] = pio.to_json(fig)
+        plots[f'{metric}_bar_matches'] = _figure_json(fig)
     
     return plots
 
@@ -4532,7 +4643,7 @@ def _create_line_chart(team_data, metric, data_view, sort='points_desc'):
             yaxis_title=metric.replace('_', ' ').title(),
             margin=dict(l=40, r=20, t=50, b=60)
         )
-        plots[f'{metric}_line_matches'] = pio.to_json(fig)
+        plots[f'{metric}_line_matches'] = _figure_json(fig)
     else:
         # Averages view: show a line across team averages (like index page)
         avg_data = []
@@ -4567,7 +4678,7 @@ def _create_line_chart(team_data, metric, data_view, sort='points_desc'):
                 margin=dict(l=40, r=20, t=50, b=60),
                 xaxis=dict(type='category', tickangle=-45)
             )
-            plots[f'{metric}_line_avg'] = pio.to_json(fig_line)
+            plots[f'{metric}_line_avg'] = _figure_json(fig_line)
 
     return plots
 
@@ -4597,7 +4708,7 @@ def _create_scatter_chart(team_data, metric, data_view):
             yaxis_title=metric.replace('_', ' ').title(),
             margin=dict(l=40, r=20, t=50, b=60)
         )
-        plots[f'{metric}_scatter_matches'] = pio.to_json(fig)
+        plots[f'{metric}_scatter_matches'] = _figure_json(fig)
     else:
         # Averages view: scatter of team averages
         avg_data = []
@@ -4624,7 +4735,7 @@ def _create_scatter_chart(team_data, metric, data_view):
                 margin=dict(l=40, r=20, t=50, b=60),
                 xaxis=dict(type='category', tickangle=-45)
             )
-            plots[f'{metric}_scatter_avg'] = pio.to_json(fig_scatter)
+            plots[f'{metric}_scatter_avg'] = _figure_json(fig_scatter)
 
     return plots
 
@@ -4658,7 +4769,7 @@ def _create_histogram_chart(team_data, metric, data_view):
             paper_bgcolor=theme_vals['paper_bg'],
             font=dict(color=theme_vals['text_main'])
         )
-        plots[f'{metric}_histogram'] = pio.to_json(fig)
+        plots[f'{metric}_histogram'] = _figure_json(fig)
     
     return plots
 
@@ -4689,7 +4800,7 @@ def _create_violin_chart(team_data, metric, data_view):
             paper_bgcolor=theme_vals['paper_bg'],
             font=dict(color=theme_vals['text_main'])
         )
-        plots[f'{metric}_violin'] = pio.to_json(fig)
+        plots[f'{metric}_violin'] = _figure_json(fig)
     
     return plots
 
@@ -4719,7 +4830,7 @@ def _create_box_chart(team_data, metric, data_view):
             paper_bgcolor=theme_vals['paper_bg'],
             font=dict(color=theme_vals['text_main'])
         )
-        plots[f'{metric}_box'] = pio.to_json(fig)
+        plots[f'{metric}_box'] = _figure_json(fig)
     
     return plots
 
@@ -4795,7 +4906,7 @@ def _create_sunburst_chart(team_data, metric, data_view):
                 paper_bgcolor=theme_vals['paper_bg'],
                 font=dict(color=theme_vals['text_main'])
             )
-            plots[f'{metric}_sunburst'] = pio.to_json(fig)
+            plots[f'{metric}_sunburst'] = _figure_json(fig)
     
     return plots
 
@@ -4832,7 +4943,7 @@ def _create_treemap_chart(team_data, metric, data_view):
             paper_bgcolor=theme_vals['paper_bg'],
             font=dict(color=theme_vals['text_main'])
         )
-        plots[f'{metric}_treemap'] = pio.to_json(fig)
+        plots[f'{metric}_treemap'] = _figure_json(fig)
     
     return plots
 
@@ -4875,7 +4986,7 @@ def _create_waterfall_chart(team_data, metric, data_view):
                 paper_bgcolor=theme_vals['paper_bg'],
                 font=dict(color=theme_vals['text_main'])
             )
-            plots[f'{metric}_waterfall'] = pio.to_json(fig)
+            plots[f'{metric}_waterfall'] = _figure_json(fig)
     
     return plots
 
@@ -5180,7 +5291,7 @@ def _create_sankey_chart(team_data, metric, data_view):
                     )
                 ]
             )
-            plots[f'{metric}_sankey'] = pio.to_json(fig)
+            plots[f'{metric}_sankey'] = _figure_json(fig)
     
     return plots
 
@@ -5229,7 +5340,7 @@ def _create_heatmap_chart(team_data, metric, data_view):
                 yaxis_title="Teams",
                 margin=dict(l=40, r=20, t=50, b=60)
             )
-            plots[f'{metric}_heatmap'] = pio.to_json(fig)
+            plots[f'{metric}_heatmap'] = _figure_json(fig)
     
     return plots
 
@@ -5273,7 +5384,7 @@ def _create_bubble_chart(team_data, metric, data_view):
             paper_bgcolor=theme_vals['paper_bg'],
             font=dict(color=theme_vals['text_main'])
         )
-        plots[f'{metric}_bubble'] = pio.to_json(fig)
+        plots[f'{metric}_bubble'] = _figure_json(fig)
     
     return plots
 
@@ -5314,7 +5425,7 @@ def _create_area_chart(team_data, metric, data_view):
             paper_bgcolor=theme_vals['paper_bg'],
             font=dict(color=theme_vals['text_main'])
         )
-        plots[f'{metric}_area'] = pio.to_json(fig)
+        plots[f'{metric}_area'] = _figure_json(fig)
     
     return plots
 
@@ -5410,7 +5521,7 @@ def _create_radar_chart(team_data, metric, data_view):
             legend=dict(orientation='h', yanchor='top', y=-0.18, xanchor='center', x=0.5)
         )
 
-        plots[f'{metric}_radar'] = pio.to_json(fig)
+        plots[f'{metric}_radar'] = _figure_json(fig)
     else:
         # Not enough data; return an info figure so the card displays a message
         theme_vals = _chart_theme()
@@ -5429,6 +5540,6 @@ def _create_radar_chart(team_data, metric, data_view):
             height=220,
             font=dict(color=theme_vals['text_main'])
         )
-        plots[f'{metric}_radar'] = pio.to_json(fig_info)
+        plots[f'{metric}_radar'] = _figure_json(fig_info)
 
     return plots
\ No newline at end of file
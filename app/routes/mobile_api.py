@@ -14,7 +14,9 @@ import jwt
 import base64
 import uuid
 import threading
+import time
 import math
+from collections import OrderedDict
 import statistics
 from typing import Optional
 
@@ -42,7 +44,10 @@ from app.utils.alliance_data import (
     get_all_matches_for_alliance
 )
 from app.utils.event_code_utils import build_year_prefixed_event_code, normalize_event_code
+from app.utils.conditional_get import conditional_get, ALLIANCE_SCOPE_TABLES
 from werkzeug.security import check_password_hash
+from sqlalchemy.orm import make_transient_to_detached
+from app.utils.change_tracking import get_data_versions
 from app.assistant.visualizer import Visualizer
 
 # Create blueprint
@@ -165,69 +170,11 @@ def enforce_mobile_auth():
             'error_code': 'AUTH_REQUIRED'
         }), 401
 
-    payload = verify_token(token)
-    if not payload:
-        return jsonify({
-            'success': False,
-            'error': 'Invalid or expired token',
-            'error_code': 'INVALID_TOKEN'
-        }), 401
-    # Log decoded token payload for debugging token/team mismatches
-    try:
-        print('DECODED_TOKEN_PAYLOAD:')
-        print(json.dumps(payload, indent=2))
-    except Exception:
-        pass
-
-    user = User.query.get(payload.get('user_id')) if payload.get('user_id') else None
-    if not user or not user.is_active:
-        return jsonify({
-            'success': False,
-            'error': 'User not found or inactive',
-            'error_code': 'USER_NOT_FOUND'
-        }), 401
-
-    # Determine team_number securely. For security, if the token includes a
-    # team_number it MUST match the user's DB scouting_team_number (when set).
-    # This prevents clients from presenting a token that claims to be one
-    # team while accessing another team's data. If the token omits a team
-    # number we fall back to the DB value.
-    token_team = payload.get('team_number')
-    team_number = None
-    try:
-        if token_team is not None:
-            db_team = getattr(user, 'scouting_team_number', None)
-            # If DB has a team and it doesn't match the token, reject the
-            # request (security failure).
-            if db_team is not None and str(token_team) != str(db_team):
-                current_app.logger.warning(
-                    f"mobile_api.auth: token team {token_team} does not match DB scouting_team_number {db_team} for user {user.id}; rejecting"
-                )
-                return jsonify({'success': False, 'error': 'Token team mismatch', 'error_code': 'TEAM_MISMATCH'}), 401
-            # Accept the token's team when provided (DB either matches or is unset)
-            team_number = token_team
-        else:
-            # No team in token: use the user's DB scouting_team_number
-            team_number = getattr(user, 'scouting_team_number', None)
-    except Exception:
-        team_number = payload.get('team_number')
-
-    # Attach to request so downstream handlers can use them just like
-    # the token_required decorator does.
-    request.mobile_user = user
-    request.mobile_team_number = team_number
-    # Ensure Flask's `g` object also has scouting_team_number so
-    # `app.utils.team_isolation` helpers see the same resolved team.
-    try:
-        g.scouting_team_number = team_number
-    except Exception:
-        pass
-    # Attempt to set flask-login's current_user to this token user so code
-    # that relies on current_user's scouting_team_number continues to work.
-    try:
-        login_user(user, remember=False, force=True)
-    except Exception:
-        pass
+    user, team_number, error_response = _authenticate_mobile_token(token)
+    if error_response is not None:
+        return error_response
+    _attach_mobile_identity(user, team_number)
+    token_team = getattr(request, 'mobile_token_team', None)
     # Log the resolved team information to help debug requests where the
     # token-provided team differs from the DB value. Keep this lightweight.
     try:
@@ -237,6 +184,10 @@ def enforce_mobile_auth():
         )
     except Exception:
         pass
+    # Verbose stdout request dumps (headers and raw body) are opt-in via
+    # MOBILE_API_VERBOSE_LOGGING since they are costly on busy event servers.
+    if not current_app.config.get('MOBILE_API_VERBOSE_LOGGING', False):
+        return None
     # Also print a concise debug line to stdout so it's visible in simple
     # dev server logs (some deployments only show access logs). This helps
     # when troubleshooting which scouting team is used for a request.
@@ -320,6 +271,167 @@ def verify_token(token):
         return None
 
 
+# ---------------------------------------------------------------------------
+# Verified token cache
+# ---------------------------------------------------------------------------
+# Maps a verified JWT to a snapshot of its user (columns + roles), resolved
+# scouting team and active alliance id so authenticated requests skip the
+# signature check and the User / alliance lookups. Entries are dropped when
+# the token expires, after _TOKEN_CACHE_TTL seconds, or as soon as any
+# user, role or alliance table changes (see change_tracking data versions).
+
+_TOKEN_CACHE_MAX = 512
+_TOKEN_CACHE_TTL = 120  # seconds
+_TOKEN_CACHE_TABLES = (
+    'user', 'role', 'team_alliance_status', 'scouting_alliance', 'scouting_alliance_member',
+)
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def invalidate_mobile_token_cache():
+    """Drop all cached token verifications."""
+    with _token_cache_lock:
+        _token_cache.clear()
+
+
+def _snapshot_columns(obj):
+    return {col.key: getattr(obj, col.key) for col in obj.__mapper__.column_attrs}
+
+
+def _user_from_snapshot(entry):
+    """Rebuild the cached user and attach it to the session without a SELECT."""
+    roles = []
+    for role_cols in entry['roles']:
+        role = Role(**role_cols)
+        make_transient_to_detached(role)
+        roles.append(role)
+    user = User(**entry['user'])
+    user.roles = roles
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def _cached_token_entry(token):
+    now = time.monotonic()
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is None:
+            return None
+        if (entry['exp'] <= time.time() or now - entry['cached_at'] > _TOKEN_CACHE_TTL
+                or entry['versions'] != get_data_versions(_TOKEN_CACHE_TABLES)):
+            _token_cache.pop(token, None)
+            return None
+        _token_cache.move_to_end(token)
+        return entry
+
+
+def _store_token_entry(token, payload, user, team_number, versions):
+    try:
+        alliance_id = get_active_alliance_id_for_team(team_number) if team_number is not None else None
+    except Exception:
+        return
+    entry = {
+        'exp': float(payload.get('exp') or 0),
+        'payload': payload,
+        'user': _snapshot_columns(user),
+        'roles': [_snapshot_columns(r) for r in user.roles],
+        'team_number': team_number,
+        'alliance_id': alliance_id,
+        'versions': versions,
+        'cached_at': time.monotonic(),
+    }
+    with _token_cache_lock:
+        _token_cache[token] = entry
+        _token_cache.move_to_end(token)
+        while len(_token_cache) > _TOKEN_CACHE_MAX:
+            _token_cache.popitem(last=False)
+
+
+def _authenticate_mobile_token(token):
+    """Verify a bearer token and resolve its user and scouting team.
+
+    Returns ``(user, team_number, None)`` on success or
+    ``(None, None, error_response)`` when the request must be rejected.
+    """
+    entry = _cached_token_entry(token)
+    if entry is not None:
+        try:
+            user = _user_from_snapshot(entry)
+            request.mobile_token_team = entry['payload'].get('team_number')
+            request.mobile_token = token
+            g.active_alliance_ids = {entry['team_number']: entry['alliance_id']}
+            return user, entry['team_number'], None
+        except Exception as e:
+            current_app.logger.debug(f"mobile_api: cached token snapshot unusable, re-verifying: {e}")
+
+    payload = verify_token(token)
+    if not payload:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Invalid or expired token',
+            'error_code': 'INVALID_TOKEN'
+        }), 401)
+
+    # Capture versions before reading so a concurrent change invalidates the entry
+    versions = get_data_versions(_TOKEN_CACHE_TABLES)
+    user = User.query.get(payload.get('user_id')) if payload.get('user_id') else None
+    if not user or not user.is_active:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'User not found or inactive',
+            'error_code': 'USER_NOT_FOUND'
+        }), 401)
+
+    # Determine team_number securely. For security, if the token includes a
+    # team_number it MUST match the user's DB scouting_team_number (when set).
+    # This prevents clients from presenting a token that claims to be one
+    # team while accessing another team's data. If the token omits a team
+    # number we fall back to the DB value.
+    token_team = payload.get('team_number')
+    team_number = None
+    try:
+        db_team = getattr(user, 'scouting_team_number', None)
+        if token_team is not None:
+            # If DB has a team and it doesn't match the token, reject the
+            # request (security failure).
+            if db_team is not None and str(token_team) != str(db_team):
+                current_app.logger.warning(
+                    f"mobile_api.auth: token team {token_team} does not match DB scouting_team_number {db_team} for user {user.id}; rejecting"
+                )
+                return None, None, (jsonify({'success': False, 'error': 'Token team mismatch', 'error_code': 'TEAM_MISMATCH'}), 401)
+            # Accept the token's team when provided (DB either matches or is unset)
+            team_number = token_team
+        else:
+            # No team in token: use the user's DB scouting_team_number
+            team_number = db_team
+    except Exception:
+        team_number = payload.get('team_number')
+
+    _store_token_entry(token, payload, user, team_number, versions)
+    request.mobile_token_team = token_team
+    request.mobile_token = token
+    return user, team_number, None
+
+
+def _attach_mobile_identity(user, team_number):
+    """Expose the authenticated mobile user to handlers and team isolation helpers."""
+    request.mobile_user = user
+    request.mobile_team_number = team_number
+    # Ensure Flask's `g` object also has scouting_team_number so
+    # `app.utils.team_isolation` helpers see the same resolved team.
+    try:
+        g.scouting_team_number = team_number
+    except Exception:
+        pass
+    # Set flask-login's current_user to this token user so code that relies
+    # on current_user's scouting_team_number continues to work.
+    try:
+        login_user(user, remember=False, force=True)
+    except Exception:
+        pass
+
+
 def token_required(f):
     """Decorator to require JWT authentication for mobile endpoints"""
     @wraps(f)
@@ -338,66 +450,50 @@ def token_required(f):
                 'error_code': 'AUTH_REQUIRED'
             }), 401
         
-        # Verify token
-        payload = verify_token(token)
-        if not payload:
-            return jsonify({
-                'success': False,
-                'error': 'Invalid or expired token',
-                'error_code': 'INVALID_TOKEN'
-            }), 401
-        
-        # Get user from database
-        user = User.query.get(payload['user_id'])
-        if not user or not user.is_active:
-            return jsonify({
-                'success': False,
-                'error': 'User not found or inactive',
-                'error_code': 'USER_NOT_FOUND'
-            }), 401
-        
-        # Add user info to request context. Use the same team resolution logic
-        # as enforce_mobile_auth for consistency and security:
-        # - If the token contains a team_number and the user's DB has a
-        #   scouting_team_number that differs -> reject the request.
-        # - If token contains a team_number and DB value is None or matches,
-        #   accept the token-provided team.
-        # - If token lacks a team_number, use the user's DB scouting_team_number.
-        token_team = payload.get('team_number')
-        team_number = None
-        try:
-            db_team = getattr(user, 'scouting_team_number', None)
-            if token_team is not None:
-                # If the DB has an authoritative team and it differs, reject.
-                if db_team is not None and str(token_team) != str(db_team):
-                    current_app.logger.warning(
-                        f"mobile_api.token_required: token team {token_team} does not match DB scouting_team_number {db_team} for user {user.id}; rejecting"
-                    )
-                    return jsonify({'success': False, 'error': 'Token team mismatch', 'error_code': 'TEAM_MISMATCH'}), 401
-                team_number = token_team
-            else:
-                # Token omitted team -> fall back to DB team's scouting_team_number
-                team_number = db_team
-        except Exception:
-            team_number = payload.get('team_number')
-
-        request.mobile_user = user
-        request.mobile_team_number = team_number
-        # Ensure flask `g` has the same team for helper functions
-        try:
-            g.scouting_team_number = team_number
-        except Exception:
-            pass
-        try:
-            login_user(user, remember=False, force=True)
-        except Exception:
-            pass
+        # enforce_mobile_auth normally resolved this token already
+        if getattr(request, 'mobile_user', None) is not None and getattr(request, 'mobile_token', None) == token:
+            return f(*args, **kwargs)
+
+        user, team_number, error_response = _authenticate_mobile_token(token)
+        if error_response is not None:
+            return error_response
+        _attach_mobile_identity(user, team_number)
         
         return f(*args, **kwargs)
     
     return decorated_function
 
 
+def _mobile_etag_scope():
+    """Caller identity for conditional GET ETags on mobile endpoints."""
+    user = getattr(request, 'mobile_user', None)
+    return (
+        getattr(user, 'id', None),
+        getattr(request, 'mobile_team_number', None),
+        request.headers.get('X-Mobile-Requested-Team'),
+    )
+
+
+def _mobile_config_files(config_name):
+    """Default and per-team config paths a mobile config response depends on."""
+    def files():
+        base_dir = os.getcwd()
+        team_number = getattr(request, 'mobile_team_number', None)
+        return [
+            os.path.join(base_dir, 'config', config_name),
+            os.path.join(base_dir, 'instance', 'configs', str(team_number), config_name),
+        ]
+    return files
+
+
+def _mobile_chat_state_files():
+    user = getattr(request, 'mobile_user', None)
+    if not user:
+        return []
+    from app.routes.main import get_user_chat_state_file
+    return [get_user_chat_state_file(user.username)]
+
+
 def sync_scouting_to_alliance(scouting_data_entry, team_number):
     """Sync scouting data to alliance shared tables if alliance mode is active for the team"""
     try:
@@ -1876,6 +1972,7 @@ def mobile_delete_user(user_id):
 
 @mobile_api.route('/teams', methods=['GET'])
 @token_required
+@conditional_get(('team', 'event', 'match', 'scouting_data', 'game_config') + ALLIANCE_SCOPE_TABLES, files=_mobile_config_files('game_config.json'), scope=_mobile_etag_scope)
 def get_teams():
     """
     Get list of teams filtered by user's scouting team
@@ -2421,6 +2518,7 @@ def get_team_details(team_id):
 
 @mobile_api.route('/events', methods=['GET'])
 @token_required
+@conditional_get(('event', 'team') + ALLIANCE_SCOPE_TABLES, scope=_mobile_etag_scope)
 def get_events():
     """
     Get list of events for user's scouting team
@@ -2613,6 +2711,7 @@ def get_events():
 
 @mobile_api.route('/matches', methods=['GET'])
 @token_required
+@conditional_get(('match', 'event', 'game_config') + ALLIANCE_SCOPE_TABLES, files=_mobile_config_files('game_config.json'), scope=_mobile_etag_scope)
 def get_matches():
     """
     Get matches for user's scouting team
@@ -3357,6 +3456,7 @@ def get_scouting_history():
 
 @mobile_api.route('/scouting/all', methods=['GET'])
 @token_required
+@conditional_get(('scouting_data', 'team', 'match', 'event', 'alliance_shared_scouting_data') + ALLIANCE_SCOPE_TABLES, scope=_mobile_etag_scope)
 def get_all_scouting_data():
     """
     Return scouting data rows for the scouting team with optional filters.
@@ -3669,6 +3769,7 @@ def submit_pit_scouting_data():
 
 @mobile_api.route('/config/game', methods=['GET'])
 @token_required
+@conditional_get(('game_config', 'scouting_team_settings') + ALLIANCE_SCOPE_TABLES, files=_mobile_config_files('game_config.json'), scope=_mobile_etag_scope)
 def get_game_config():
     """
     Get current game configuration for the mobile app
@@ -4795,6 +4896,7 @@ def set_game_config_team():
 
 @mobile_api.route('/config/pit', methods=['GET'])
 @token_required
+@conditional_get(('pit_config',) + ALLIANCE_SCOPE_TABLES, files=_mobile_config_files('pit_config.json'), scope=_mobile_etag_scope)
 def get_pit_config():
     """
     Return the pit configuration JSON for the mobile client's scouting team.
@@ -5207,8 +5309,9 @@ def mobile_graphs_compare():
                 # skip unknown teams
                 continue
 
-            # Compute aggregate metrics
-            analytics = calculate_team_metrics(team.id, event_id=resolved_event_id, game_config=team_config)
+            # Compute aggregate metrics (shared with /graphs, one computation per key)
+            from app.routes.graphs import _calculate_team_metrics_cached
+            analytics = _calculate_team_metrics_cached(team.id, event_id=resolved_event_id, game_config=team_config)
             metrics = analytics.get('metrics', {})
 
             metric_value = metrics.get(metric)
@@ -6789,7 +6892,7 @@ def _load_chat_state_for_user(user, team_number):
 
 @mobile_api.route('/chat/state', methods=['GET'])
 @token_required
-
+@conditional_get(files=_mobile_chat_state_files, scope=_mobile_etag_scope)
 def mobile_chat_state():
     """Return the per-user persisted chat state (unread count, joined groups, last source, etc.)
 
@@ -7277,6 +7380,11 @@ def chat_send():
                     socketio.emit('dm_message', message, room=other.username)
             except Exception:
                 pass
+            try:
+                from app.utils.mobile_push import publish_chat_message
+                publish_chat_message(team_number, message, [user.username, other.username])
+            except Exception:
+                pass
 
             # Also increment recipient's chat state unread count so their UI poll picks it up
             try:
@@ -7337,6 +7445,11 @@ def chat_send():
             hist = load_group_chat_history(team_number, f'alliance_{alliance.id}') or []
             hist.append(message)
             save_group_chat_history(team_number, f'alliance_{alliance.id}', hist)
+            try:
+                from app.utils.mobile_push import publish_group_message
+                publish_group_message(team_number, f'alliance_{alliance.id}', message)
+            except Exception:
+                pass
 
             return jsonify({'success': True, 'message': message}), 201
 
@@ -7355,6 +7468,11 @@ def chat_send():
             hist = load_group_chat_history(team_number, group) or []
             hist.append(message)
             save_group_chat_history(team_number, group, hist)
+            try:
+                from app.utils.mobile_push import publish_group_message
+                publish_group_message(team_number, group, message)
+            except Exception:
+                pass
             return jsonify({'success': True, 'message': message}), 201
 
         return jsonify({'success': False, 'error': 'Invalid send parameters', 'error_code': 'INVALID_PARAMS'}), 400
@@ -12,11 +12,12 @@ from app.utils.config_manager import get_id_to_perm_id_mapping, get_effective_ga
 from app.utils.sync_manager import SyncManager
 import os
 import io
-from PIL import Image, ImageOps
+from PIL import Image
 from PIL import UnidentifiedImageError
 from PIL.Image import DecompressionBombError
 from werkzeug.utils import secure_filename
 from app.utils.theme_manager import ThemeManager
+from app.utils.image_worker import pit_image_worker, process_pending_image, MAX_IMAGE_PIXELS
 from app.utils.config_manager import get_current_pit_config, save_pit_config, get_effective_pit_config, is_alliance_mode_active, load_pit_config
 from app.utils.team_isolation import (
     filter_teams_by_scouting_team, filter_matches_by_scouting_team, 
@@ -160,10 +161,31 @@ def _collect_pit_form_data(pit_config, req):
     return form_data
 
 
+_image_table_ready = False
+
+
+def _ensure_image_table():
+    """Create the pit image table once per process on deployments where automatic schema upgrade is delayed."""
+    global _image_table_ready
+    if _image_table_ready:
+        return
+    try:
+        image_engine = db.get_engine(bind='images')
+    except TypeError:
+        image_engine = db.get_engine(current_app, bind='images')
+    PitScoutingImage.__table__.create(bind=image_engine, checkfirst=True)
+    _image_table_ready = True
+
+
 def _save_compressed_robot_image(pit_data, upload_file):
-    """Compress and store a pit robot image in the database."""
+    """Validate a pit robot image and store it for background compression.
+
+    The original bytes are saved with ``status='processing'``; call
+    ``_dispatch_robot_image`` after committing to queue the compression.
+    Returns the ``PitScoutingImage`` row, or None when no file was given.
+    """
     if not upload_file or not upload_file.filename:
-        return
+        return None
 
     # Enforce server-wide image upload policy.
     if not _truthy(current_app.config.get('PIT_IMAGE_UPLOAD_SERVER_ENABLED', True)):
@@ -192,56 +214,67 @@ def _save_compressed_robot_image(pit_data, upload_file):
     if len(raw_bytes) > max_upload_bytes:
         raise ValueError('Image is too large. Maximum upload size is 20 MB.')
 
+    # Header-only check so obviously bad uploads are rejected before queueing;
+    # the full decode happens in the image worker.
     try:
-        # Constrain oversized/decompression-bomb images before decode.
-        Image.MAX_IMAGE_PIXELS = 40_000_000
-        image = Image.open(io.BytesIO(raw_bytes))
-        image.verify()
-        image = Image.open(io.BytesIO(raw_bytes))
-        image = ImageOps.exif_transpose(image)
-        image = image.convert('RGB')
-        image.thumbnail((1600, 1600), Image.Resampling.LANCZOS)
+        Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+        probe = Image.open(io.BytesIO(raw_bytes))
+        probe.verify()
+        raw_mime = Image.MIME.get(probe.format) or detected_mime or 'image/jpeg'
     except (UnidentifiedImageError, DecompressionBombError) as exc:
         raise ValueError(f'Invalid or unsafe image upload: {exc}')
     except Exception as exc:
         raise ValueError(f'Could not process uploaded image: {exc}')
 
-    compressed_io = io.BytesIO()
-    image.save(compressed_io, format='JPEG', quality=72, optimize=True)
-    compressed_bytes = compressed_io.getvalue()
-    if not compressed_bytes:
-        raise ValueError('Image compression failed.')
-
     stored_name = safe_filename.rsplit('.', 1)[0] if '.' in safe_filename else safe_filename
     if not stored_name:
         stored_name = f'robot_{pit_data.id}'
     stored_name = f'{stored_name[:120]}.jpg'
 
-    # Ensure table exists on deployments where automatic schema upgrade is delayed.
-    try:
-        image_engine = db.get_engine(bind='images')
-    except TypeError:
-        image_engine = db.get_engine(current_app, bind='images')
-    PitScoutingImage.__table__.create(bind=image_engine, checkfirst=True)
+    _ensure_image_table()
+
+    image_row = PitScoutingImage.query.filter_by(pit_data_id=pit_data.id).first()
+    if not image_row:
+        image_row = PitScoutingImage(pit_data_id=pit_data.id)
+        db.session.add(image_row)
+    image_row.scouting_team_number = getattr(current_user, 'scouting_team_number', None)
+    image_row.filename = stored_name
+    image_row.mime_type = raw_mime
+    image_row.image_data = raw_bytes
+    image_row.webp_data = None
+    image_row.avif_data = None
+    image_row.original_size = len(raw_bytes)
+    image_row.compressed_size = None
+    image_row.status = 'processing'
+    return image_row
+
+
+def _dispatch_robot_image(image_row):
+    """Queue a committed 'processing' image, compressing inline if the worker is unavailable."""
+    if image_row is None:
+        return
+    if not pit_image_worker.submit(image_row.id):
+        process_pending_image(image_row.id)
+
+
+def _wants_json():
+    return request.args.get('ajax') == '1' or request.accept_mimetypes.best == 'application/json'
 
-    existing_image = PitScoutingImage.query.filter_by(pit_data_id=pit_data.id).first()
-    if existing_image:
-        existing_image.filename = stored_name
-        existing_image.mime_type = 'image/jpeg'
-        existing_image.image_data = compressed_bytes
-        existing_image.original_size = len(raw_bytes)
-        existing_image.compressed_size = len(compressed_bytes)
-        existing_image.scouting_team_number = getattr(current_user, 'scouting_team_number', None)
-    else:
-        db.session.add(PitScoutingImage(
-            pit_data_id=pit_data.id,
-            scouting_team_number=getattr(current_user, 'scouting_team_number', None),
-            filename=stored_name,
-            mime_type='image/jpeg',
-            image_data=compressed_bytes,
-            original_size=len(raw_bytes),
-            compressed_size=len(compressed_bytes),
-        ))
+
+def _image_status_response(pit_data, image_row, message):
+    """JSON reply for XHR uploads: 202 while the image is still being processed."""
+    status = getattr(image_row, 'status', None) if image_row is not None else None
+    payload = {
+        'success': True,
+        'message': message,
+        'pit_data_id': pit_data.id,
+        'redirect_url': url_for('pit_scouting.view', id=pit_data.id),
+        'image_status': status,
+    }
+    if image_row is not None:
+        payload['image_id'] = image_row.id
+        payload['image_status_url'] = url_for('pit_scouting.robot_image_status', image_id=image_row.id)
+    return jsonify(payload), (202 if status == 'processing' else 200)
 
 def auto_sync_alliance_pit_data(pit_data_entry):
     """Automatically sync new pit scouting data to alliance members if alliance mode is active"""
@@ -685,11 +718,13 @@ def form():
                     existing_data.device_id = request.headers.get('User-Agent', 'Unknown')[:100]
                     existing_data.timestamp = datetime.now(timezone.utc)
 
+                    image_row = None
                     if image_upload_enabled and 'robot_image' in request.files:
                         upload_file = request.files.get('robot_image')
                         if upload_file and upload_file.filename:
-                            _save_compressed_robot_image(existing_data, upload_file)
+                            image_row = _save_compressed_robot_image(existing_data, upload_file)
                     db.session.commit()
+                    _dispatch_robot_image(image_row)
 
                     # Auto-sync and emit update
                     auto_sync_alliance_pit_data(existing_data)
@@ -697,9 +732,12 @@ def form():
                         emit_pit_data_update(current_event.id, 'updated', existing_data.to_dict())
 
                     if is_prescout:
-                        flash(f'Pre-scout data for Team {team_number} updated successfully!', 'success')
+                        message = f'Pre-scout data for Team {team_number} updated successfully!'
                     else:
-                        flash(f'Pit scouting data for Team {team_number} updated successfully!', 'success')
+                        message = f'Pit scouting data for Team {team_number} updated successfully!'
+                    if _wants_json():
+                        return _image_status_response(existing_data, image_row, message)
+                    flash(message, 'success')
                     return redirect(url_for('pit_scouting.view', id=existing_data.id))
                 except Exception as e:
                     db.session.rollback()
@@ -728,11 +766,13 @@ def form():
             db.session.add(pit_data)
             db.session.commit()
 
+            image_row = None
             if image_upload_enabled and 'robot_image' in request.files:
                 upload_file = request.files.get('robot_image')
                 if upload_file and upload_file.filename:
-                    _save_compressed_robot_image(pit_data, upload_file)
+                    image_row = _save_compressed_robot_image(pit_data, upload_file)
                     db.session.commit()
+                    _dispatch_robot_image(image_row)
             
             # Automatically sync to alliance members if alliance mode is active
             auto_sync_alliance_pit_data(pit_data)
@@ -742,9 +782,12 @@ def form():
                 emit_pit_data_update(target_event.id, 'added', pit_data.to_dict())
             
             if is_prescout:
-                flash(f'Pre-scout data for Team {team_number} saved successfully!', 'success')
+                message = f'Pre-scout data for Team {team_number} saved successfully!'
             else:
-                flash(f'Pit scouting data for Team {team_number} saved successfully!', 'success')
+                message = f'Pit scouting data for Team {team_number} saved successfully!'
+            if _wants_json():
+                return _image_status_response(pit_data, image_row, message)
+            flash(message, 'success')
             return redirect(url_for('pit_scouting.view', id=pit_data.id))
             
         except Exception as e:
@@ -1053,12 +1096,53 @@ def get_robot_image(image_id):
             if not shared_visible:
                 abort(403)
 
-    return send_file(
-        io.BytesIO(image.image_data),
-        mimetype=image.mime_type or 'image/jpeg',
+    # Until the worker finishes, image_data holds the original upload.
+    data = image.image_data
+    mimetype = image.mime_type or 'image/jpeg'
+    download_name = image.filename or f'robot_{image.id}.jpg'
+    if image.status == 'ready':
+        accepted = request.headers.get('Accept', '')
+        if image.avif_data and 'image/avif' in accepted:
+            data, mimetype = image.avif_data, 'image/avif'
+        elif image.webp_data and 'image/webp' in accepted:
+            data, mimetype = image.webp_data, 'image/webp'
+        if mimetype != 'image/jpeg':
+            download_name = download_name.rsplit('.', 1)[0] + '.' + mimetype.split('/')[1]
+
+    response = send_file(
+        io.BytesIO(data),
+        mimetype=mimetype,
         as_attachment=False,
-        download_name=(image.filename or f'robot_{image.id}.jpg')
+        download_name=download_name
     )
+    response.headers['Vary'] = 'Accept'
+    return response
+
+
+@bp.route('/image/<int:image_id>/status')
+@login_required
+def robot_image_status(image_id):
+    """Report background processing status of a pit robot image (202 while processing)."""
+    image = PitScoutingImage.query.get_or_404(image_id)
+    if not current_user.has_role('admin'):
+        from app.utils.team_isolation import filter_pit_scouting_data_by_scouting_team
+        visible_entry = filter_pit_scouting_data_by_scouting_team().filter(PitScoutingData.id == image.pit_data_id).first()
+        if not visible_entry:
+            abort(403)
+
+    payload = {
+        'success': True,
+        'image_id': image.id,
+        'status': image.status,
+        'original_size': image.original_size,
+        'compressed_size': image.compressed_size,
+        'variants': [fmt for fmt, blob in (('webp', image.webp_data), ('avif', image.avif_data)) if blob],
+        'image_url': url_for('pit_scouting.get_robot_image', image_id=image.id),
+    }
+    if image.status == 'processing':
+        payload['queue_depth'] = pit_image_worker.pending()
+        return jsonify(payload), 202
+    return jsonify(payload)
 
 @bp.route('/edit/<int:id>', methods=['GET', 'POST'])
 @login_required
@@ -1107,12 +1191,14 @@ def edit(id):
             pit_data.is_uploaded = True  # Data is saved directly to server
             pit_data.upload_timestamp = datetime.now(timezone.utc)
 
+            image_row = None
             if image_upload_enabled and 'robot_image' in request.files:
                 upload_file = request.files.get('robot_image')
                 if upload_file and upload_file.filename:
-                    _save_compressed_robot_image(pit_data, upload_file)
+                    image_row = _save_compressed_robot_image(pit_data, upload_file)
             
             db.session.commit()
+            _dispatch_robot_image(image_row)
             
             # Automatically sync to alliance members if alliance mode is active
             auto_sync_alliance_pit_data(pit_data)
@@ -1121,6 +1207,8 @@ def edit(id):
             if pit_data.event_id:
                 emit_pit_data_update(pit_data.event_id, 'updated', pit_data.to_dict())
             
+            if _wants_json():
+                return _image_status_response(pit_data, image_row, 'Pit scouting data updated successfully!')
             flash('Pit scouting data updated successfully!', 'success')
             return redirect(url_for('pit_scouting.view', id=id))
             
@@ -19,10 +19,13 @@ from app.utils.theme_manager import ThemeManager
 from app.utils.config_manager import load_game_config, load_pit_config
 from app.utils.team_isolation import get_current_scouting_team_number, dedupe_events_for_display
 from app.utils.event_code_utils import build_year_prefixed_event_code, normalize_event_code
-from datetime import datetime, timezone, timedelta
+from app.utils.socket_batcher import emit_coalesced
+from app.utils.alliance_sync import (
+    advance_cursor, collect_member_changes, current_change_seq, load_cursors, share_member_changes,
+)
+from datetime import datetime, timezone
 from app.utils.timezone_utils import utc_now_iso, iso_utc
 import json
-import uuid
 import os
 
 bp = Blueprint('scouting_alliances', __name__, url_prefix='/alliances/scouting')
@@ -1526,12 +1529,14 @@ def on_leave_alliance_room(data):
 def on_auto_sync_received(data):
     """Mark sync record as delivered when client acknowledges receipt."""
     try:
-        sync_id = data.get('sync_id')
-        if sync_id:
-            rec = ScoutingAllianceSync.query.get(sync_id)
-            if rec:
+        # Coalesced payloads carry every folded-in sync in ``sync_ids``
+        sync_ids = set(data.get('sync_ids') or [])
+        if data.get('sync_id'):
+            sync_ids.add(data['sync_id'])
+        if sync_ids:
+            for rec in ScoutingAllianceSync.query.filter(ScoutingAllianceSync.id.in_(sync_ids)).all():
                 rec.sync_status = 'synced'
-                db.session.commit()
+            db.session.commit()
     except Exception:
         current_app.logger.exception('Error acknowledging alliance sync')
 
@@ -1911,10 +1916,11 @@ def api_sync_alliance_data():
                     last_sync=datetime.now(timezone.utc)
                 )
                 db.session.add(sync_record)
+                db.session.flush()  # the client acknowledges by sync_id
                 sync_count += 1
                 
-                # Emit data via SocketIO
-                socketio.emit('alliance_data_sync_auto', {
+                # Queue data for SocketIO; repeated syncs to a team are coalesced
+                emit_coalesced('alliance_data_sync_auto', {
                     'from_team': current_team,
                     'alliance_name': alliance.alliance_name,
                     'scouting_data': scouting_data,
@@ -2928,165 +2934,52 @@ def perform_periodic_alliance_sync():
                 is_alliance_mode_active=True
             ).all()
             
-            for status in active_statuses:
+            if not active_statuses:
+                return
+
+            # One read of the committed change sequence; members whose cursor
+            # has caught up are skipped without touching their data
+            high = current_change_seq()
+            statuses = [(status, status.active_alliance) for status in active_statuses]
+            cursors = load_cursors((alliance.id, status.team_number) for status, alliance in statuses if alliance)
+            
+            for status, alliance in statuses:
                 try:
-                    # Get the alliance
-                    alliance = status.active_alliance
                     if not alliance:
                         continue
                     
                     current_team = status.team_number
+                    since = cursors.get((alliance.id, current_team), 0)
+                    if since >= high:
+                        continue  # Nothing new since the last cycle
                     alliance_events = alliance.get_shared_events()
                     
-                    # When no explicit shared events are configured we fall back to syncing
-                    # all available events so teams don't wonder why nothing ever goes out.
+                    # When no explicit shared events are configured we sync across
+                    # all events so teams don't wonder why nothing ever goes out.
+                    event_ids = None
                     if alliance_events:
                         # restrict to listed event codes
-                        events = Event.query.filter(Event.code.in_(alliance_events)).all()
-                        event_ids = [e.id for e in events]
+                        event_ids = [row.id for row in db.session.query(Event.id).filter(Event.code.in_(alliance_events))]
                         if not event_ids:
                             # couldn't resolve any codes? skip this alliance
                             current_app.logger.debug(f"Periodic sync: no matching Event records for codes {alliance_events} in alliance {alliance.id}")
                             continue
-                    else:
-                        # no filter defined, sync across all events
-                        events = Event.query.all()
-                        event_ids = [e.id for e in events]
-                        # if there are literally no events in the system, skip
-                        if not event_ids:
-                            continue
-                    
-                    # Get recent scouting data (last 5 minutes) to avoid re-syncing old data
-                    recent_time = datetime.now(timezone.utc) - timedelta(minutes=5)
                     
-                    # Get recent scouting data for this team
-                    # EXCLUDE entries that were received from alliance (have [Alliance- prefix)
-                    recent_scouting = ScoutingData.query.join(Match).filter(
-                        Match.event_id.in_(event_ids),
-                        ScoutingData.scouting_team_number == current_team,
-                        ScoutingData.timestamp >= recent_time,
-                        ~ScoutingData.scout_name.like('[Alliance-%')
-                    ).all()
-                    
-                    # Get recent pit data for this team
-                    # EXCLUDE entries that were received from alliance (have [Alliance- prefix)
-                    recent_pit = PitScoutingData.query.filter(
-                        PitScoutingData.scouting_team_number == current_team,
-                        PitScoutingData.timestamp >= recent_time,
-                        ~PitScoutingData.scout_name.like('[Alliance-%')
-                    ).all()
+                    # Only this team's own rows changed since the cursor
+                    # (entries received from the alliance are excluded)
+                    recent_scouting, recent_pit, recent_qualitative = collect_member_changes(
+                        current_team, since, high, event_ids
+                    )
                     
-                    # Always fetch recent qualitative; needed later for total count
-                    recent_qualitative = QualitativeScoutingData.query.join(Match).filter(
-                        Match.event_id.in_(event_ids),
-                        QualitativeScoutingData.scouting_team_number == current_team,
-                        QualitativeScoutingData.timestamp >= recent_time
-                    ).all()
+                    # Drop tombstoned rows and upsert the shared copies in bulk
+                    recent_scouting, recent_pit, recent_qualitative, shared_copies_created, shared_copies_updated = \
+                        share_member_changes(alliance.id, current_team, recent_scouting, recent_pit, recent_qualitative)
+                    advance_cursor(alliance.id, current_team, high)
                     
-                    # If no data whatsoever, skip
+                    # If no data whatsoever, just record the cursor
                     if not recent_scouting and not recent_pit and not recent_qualitative:
-                        continue  # No recent data to sync
-                    
-                    # Create shared copies in AllianceSharedScoutingData/AllianceSharedPitData
-                    shared_copies_created = 0
-                    
-                    for entry in recent_scouting:
-                        # Skip if this data was previously deleted by alliance admin
-                        if AllianceDeletedData.is_deleted(
-                            alliance_id=alliance.id,
-                            data_type='scouting',
-                            match_id=entry.match_id,
-                            team_id=entry.team_id,
-                            alliance_color=entry.alliance,
-                            source_team=current_team
-                        ):
-                            continue  # Skip - deleted data shouldn't be re-synced
-                        
-                        # Check if shared copy already exists
-                        existing_shared = AllianceSharedScoutingData.query.filter_by(
-                            alliance_id=alliance.id,
-                            original_scouting_data_id=entry.id
-                        ).first()
-                        
-                        if not existing_shared:
-                            existing_shared = AllianceSharedScoutingData.query.filter_by(
-                                alliance_id=alliance.id,
-                                match_id=entry.match_id,
-                                team_id=entry.team_id,
-                                alliance=entry.alliance,
-                                source_scouting_team_number=current_team
-                            ).first()
-                        
-                        if not existing_shared:
-                            shared_copy = AllianceSharedScoutingData.create_from_scouting_data(
-                                entry, alliance.id, current_team
-                            )
-                            db.session.add(shared_copy)
-                            shared_copies_created += 1
-                    
-                    for entry in recent_pit:
-                        # Skip if this data was previously deleted by alliance admin
-                        if AllianceDeletedData.is_deleted(
-                            alliance_id=alliance.id,
-                            data_type='pit',
-                            match_id=None,
-                            team_id=entry.team_id,
-                            alliance_color=None,
-                            source_team=current_team
-                        ):
-                            continue  # Skip - deleted data shouldn't be re-synced
-                        
-                        # Check if shared copy already exists
-                        existing_shared = AllianceSharedPitData.query.filter_by(
-                            alliance_id=alliance.id,
-                            original_pit_data_id=entry.id
-                        ).first()
-                        
-                        if not existing_shared:
-                            existing_shared = AllianceSharedPitData.query.filter_by(
-                                alliance_id=alliance.id,
-                                team_id=entry.team_id,
-                                source_scouting_team_number=current_team
-                            ).first()
-                        
-                        if not existing_shared:
-                            shared_copy = AllianceSharedPitData.create_from_pit_data(
-                                entry, alliance.id, current_team
-                            )
-                            db.session.add(shared_copy)
-                            shared_copies_created += 1
-                    
-                    # Create shared copies for recent qualitative data
-                    for entry in recent_qualitative:
-                        if AllianceDeletedData.is_deleted(
-                            alliance_id=alliance.id,
-                            data_type='qualitative',
-                            match_id=entry.match_id,
-                            team_id=None,
-                            alliance_color=entry.alliance_scouted,
-                            source_team=current_team
-                        ):
-                            continue
-                        
-                        existing_shared = AllianceSharedQualitativeData.query.filter_by(
-                            alliance_id=alliance.id,
-                            original_qualitative_data_id=entry.id
-                        ).first()
-                        
-                        if not existing_shared:
-                            existing_shared = AllianceSharedQualitativeData.query.filter_by(
-                                alliance_id=alliance.id,
-                                match_id=entry.match_id,
-                                alliance_scouted=entry.alliance_scouted,
-                                source_scouting_team_number=current_team
-                            ).first()
-                        
-                        if not existing_shared:
-                            shared_copy = AllianceSharedQualitativeData.create_from_qualitative_data(
-                                entry, alliance.id, current_team
-                            )
-                            db.session.add(shared_copy)
-                            shared_copies_created += 1
+                        db.session.commit()
+                        continue
                     
                     # Prepare sync data
                     scouting_data = []
@@ -3141,9 +3034,10 @@ def perform_periodic_alliance_sync():
                                 last_sync=datetime.now(timezone.utc)
                             )
                             db.session.add(sync_record)
+                            db.session.flush()  # the client acknowledges by sync_id
                             sync_count += 1
                             
-                            # Emit data via SocketIO to both team and alliance room
+                            # Queue data for the team and alliance rooms; one merged message per room per burst
                             payload = {
                                 'from_team': current_team,
                                 'alliance_name': alliance.alliance_name,
@@ -3153,14 +3047,15 @@ def perform_periodic_alliance_sync():
                                 'sync_id': sync_record.id,
                                 'type': 'periodic_sync'
                             }
-                            socketio.emit('alliance_data_sync_auto', payload, room=f'team_{member.team_number}')
-                            socketio.emit('alliance_data_sync_auto', payload, room=f'alliance_{alliance.id}')
+                            emit_coalesced('alliance_data_sync_auto', payload, room=f'team_{member.team_number}')
+                            emit_coalesced('alliance_data_sync_auto', payload, room=f'alliance_{alliance.id}')
                     
-                    if sync_count > 0 or shared_copies_created > 0:
-                        db.session.commit()
-                        print(f"Periodic sync: Team {current_team} synced {len(scouting_data)} scouting + {len(pit_data)} pit + {len(qualitative_data)} qualitative entries to {sync_count} alliance members, created {shared_copies_created} shared copies")
+                    # Commit the cursor together with the copies and sync records
+                    db.session.commit()
+                    print(f"Periodic sync: Team {current_team} synced {len(scouting_data)} scouting + {len(pit_data)} pit + {len(qualitative_data)} qualitative entries to {sync_count} alliance members, created {shared_copies_created} and updated {shared_copies_updated} shared copies")
                 
                 except Exception as e:
+                    db.session.rollback()
                     print(f"Error in periodic sync for team {status.team_number}: {str(e)}")
                     continue
     
@@ -4331,76 +4226,11 @@ def api_deactivate_alliance_with_data():
         data_moved_to_private = 0
         
         if remove_data:
-            # STEP 1: Move alliance shared data to private team data before deleting shared copies
-            # This preserves the team's data privately while removing it from the alliance
-            
-            # Get all shared scouting data from this team
-            shared_scouting_entries = AllianceSharedScoutingData.query.filter_by(
-                alliance_id=alliance_id,
-                source_scouting_team_number=current_team
-            ).all()
-            
-            for entry in shared_scouting_entries:
-                # Check if this data already exists in the team's private ScoutingData
-                existing_private = ScoutingData.query.filter_by(
-                    match_id=entry.match_id,
-                    team_id=entry.team_id,
-                    alliance=entry.alliance,
-                    scouting_team_number=current_team
-                ).first()
-                
-                if not existing_private:
-                    # Create a private copy of the data
-                    private_copy = ScoutingData(
-                        match_id=entry.match_id,
-                        team_id=entry.team_id,
-                        scouting_team_number=current_team,
-                        scout_name=entry.scout_name,
-                        scout_id=entry.scout_id,
-                        scouting_station=entry.scouting_station,
-                        alliance=entry.alliance,
-                        data_json=entry.data_json,
-                        timestamp=entry.timestamp
-                    )
-                    db.session.add(private_copy)
-                    data_moved_to_private += 1
-                
-                # Delete the shared copy
-                db.session.delete(entry)
-                shared_scouting_deleted += 1
-            
-            # Get all shared pit data from this team
-            shared_pit_entries = AllianceSharedPitData.query.filter_by(
-                alliance_id=alliance_id,
-                source_scouting_team_number=current_team
-            ).all()
-            
-            for entry in shared_pit_entries:
-                # Check if this data already exists in the team's private PitScoutingData
-                existing_private = PitScoutingData.query.filter_by(
-                    team_id=entry.team_id,
-                    scouting_team_number=current_team
-                ).first()
-                
-                if not existing_private:
-                    # Create a private copy of the data
-                    private_copy = PitScoutingData(
-                        team_id=entry.team_id,
-                        event_id=entry.event_id,
-                        scouting_team_number=current_team,
-                        scout_name=entry.scout_name,
-                        scout_id=entry.scout_id,
-                        data_json=entry.data_json,
-                        timestamp=entry.timestamp,
-                        local_id=str(uuid.uuid4())
-                    )
-                    db.session.add(private_copy)
-                    data_moved_to_private += 1
-                
-                # Delete the shared copy
-                db.session.delete(entry)
-                shared_pit_deleted += 1
-            
+            # Shared rows link to the team's private entries, so this is a bulk delete;
+            # only snapshots of entries deleted since sharing are copied back first
+            from app.utils.alliance_data import remove_team_data_from_alliance
+            shared_scouting_deleted, shared_pit_deleted, data_moved_to_private = \
+                remove_team_data_from_alliance(alliance_id, current_team)
             db.session.commit()
             
             message = f'Alliance mode deactivated. Removed {shared_scouting_deleted + shared_pit_deleted} entries from alliance. {data_moved_to_private} entries preserved as private team data.'
@@ -4425,11 +4255,13 @@ def api_deactivate_alliance_with_data():
 @bp.route('/api/copy-alliance-data-to-team', methods=['POST'])
 @login_required
 def api_copy_alliance_data_to_team():
-    """Copy all alliance data (from all member teams) to the current team's local storage.
+    """Keep the current team's access to all alliance data (from all member teams).
     
-    This allows a team to request a copy of all alliance data before disabling alliance mode.
-    The data is copied to the team's private ScoutingData and PitScoutingData tables.
-    Data from other teams is prefixed with [Alliance-TEAM#] in the scout_name field.
+    This allows a team to keep all alliance data before disabling alliance mode.
+    The team is granted read access to the other members' original entries
+    (no copies); only entries whose original was deleted are copied to the
+    team's private ScoutingData and PitScoutingData tables, prefixed with
+    [Alliance-TEAM#] in the scout_name field.
     """
     try:
         data = request.get_json()
@@ -4457,16 +4289,20 @@ def api_copy_alliance_data_to_team():
         from app.utils.alliance_data import copy_alliance_data_to_team
         stats = copy_alliance_data_to_team(alliance_id, current_team)
         
+        total_linked = stats['scouting_linked'] + stats['pit_linked']
         total_copied = stats['scouting_copied'] + stats['pit_copied']
         total_skipped = stats['scouting_skipped'] + stats['pit_skipped']
         
-        message = f'Copied {total_copied} entries to your team data. {total_skipped} entries already existed.'
+        message = (f'Your team keeps access to {total_linked} alliance entries. '
+                   f'Copied {total_copied} entries whose originals were deleted. {total_skipped} entries already existed.')
         if stats['errors']:
             message += f' {len(stats["errors"])} errors occurred.'
         
         return jsonify({
             'success': True,
             'message': message,
+            'scouting_linked': stats['scouting_linked'],
+            'pit_linked': stats['pit_linked'],
             'scouting_copied': stats['scouting_copied'],
             'scouting_skipped': stats['scouting_skipped'],
             'pit_copied': stats['pit_copied'],
@@ -4483,7 +4319,7 @@ def api_copy_alliance_data_to_team():
 @bp.route('/<int:alliance_id>/copy-all-data', methods=['POST'])
 @login_required
 def api_copy_all_alliance_data(alliance_id):
-    """Copy all alliance data (from all member teams) to the current team's local storage.
+    """Keep the current team's access to all alliance data (from all member teams).
     
     This is an alternative to /api/copy-alliance-data-to-team that accepts alliance_id in the URL.
     """
@@ -4504,16 +4340,20 @@ def api_copy_all_alliance_data(alliance_id):
         from app.utils.alliance_data import copy_alliance_data_to_team
         stats = copy_alliance_data_to_team(alliance_id, current_team)
         
+        total_linked = stats['scouting_linked'] + stats['pit_linked']
         total_copied = stats['scouting_copied'] + stats['pit_copied']
         total_skipped = stats['scouting_skipped'] + stats['pit_skipped']
         
-        message = f'Copied {total_copied} entries to your team data. {total_skipped} entries already existed.'
+        message = (f'Your team keeps access to {total_linked} alliance entries. '
+                   f'Copied {total_copied} entries whose originals were deleted. {total_skipped} entries already existed.')
         if stats['errors']:
             message += f' {len(stats["errors"])} errors occurred.'
         
         return jsonify({
             'success': True,
             'message': message,
+            'scouting_linked': stats['scouting_linked'],
+            'pit_linked': stats['pit_linked'],
             'scouting_copied': stats['scouting_copied'],
             'scouting_skipped': stats['scouting_skipped'],
             'pit_copied': stats['pit_copied'],
@@ -3,90 +3,42 @@ from app.models import Team, ScoutingData, Event
 from app.utils.config_manager import get_effective_game_config
 from app.utils.team_isolation import filter_teams_by_scouting_team, get_event_by_code
 from app.utils.alliance_data import get_scouting_data_for_team, get_active_alliance_id
-from statistics import mean
-import math
+from app.utils.trend_series import (
+    compute_trend, linear_fit, points_from_data, rows_from_entries, teams_series
+)
 
 bp = Blueprint('team_trends', __name__, url_prefix='/team-trends')
 
 
 def _simple_linear_regression(x_vals, y_vals):
     """Return slope and intercept for simple linear regression. x_vals and y_vals should be lists of numbers."""
-    if not x_vals or not y_vals or len(x_vals) != len(y_vals):
-        return 0, 0
-    n = len(x_vals)
-    x_mean = mean(x_vals)
-    y_mean = mean(y_vals)
-    num = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_vals, y_vals))
-    den = sum((x - x_mean) ** 2 for x in x_vals)
-    if den == 0:
-        return 0, y_mean
-    slope = num / den
-    intercept = y_mean - slope * x_mean
-    return slope, intercept
-
-
-def _compute_total_points_from_data(data):
+    return linear_fit(x_vals, y_vals)
+
+
+def _compute_total_points_from_data(data, game_config=None):
     """Compute a reasonable numeric 'total points' metric from arbitrary scouting `data`.
 
-    This mirrors the logic used in the single-team analyzer: prefer explicit
-    total_points fields if present, otherwise use the game config scoring
-    elements to compute a weighted total, and finally fall back to summing
-    numeric fields. Always returns a non-negative float.
+    See ``trend_series.points_from_data``; pass ``game_config`` when scoring
+    many entries so the config is not re-read for each one.
     """
-    total_points = None
-    if isinstance(data, dict):
-        total_points = data.get('total_points') or data.get('tot') or data.get('points')
-
-    if total_points is None:
-        # Use game config scoring elements to compute point totals if available
+    if game_config is None:
         game_config = get_effective_game_config() or {}
+    return points_from_data(data, game_config)
 
-        def compute_period_points(period_name):
-            pts = 0
-            period = game_config.get(period_name, {})
-            for el in period.get('scoring_elements', []):
-                perm_id = el.get('perm_id') or el.get('id')
-                # For counters and numeric fields, multiply by points if defined
-                if isinstance(data, dict) and perm_id in data:
-                    val = data.get(perm_id)
-                    try:
-                        val_num = float(val) if val is not None and val != '' else 0
-                    except Exception:
-                        val_num = 0
-                    # If element defines points per unit
-                    points_per = el.get('points') or el.get('point_value') or 0
-                    if isinstance(points_per, dict):
-                        # If points depend on option, skip complex mapping and try direct numeric
-                        pts += val_num
-                    else:
-                        try:
-                            pts += val_num * float(points_per)
-                        except Exception:
-                            pts += val_num
-                else:
-                    # no data for this element; skip
-                    pass
-            return pts
-
-        total_points = 0
-        total_points += compute_period_points('auto_period')
-        total_points += compute_period_points('teleop_period')
-        total_points += compute_period_points('endgame_period')
 
-        # As a final fallback, if still zero, sum numeric fields
-        if not total_points:
-            numeric_values = [v for v in (data.values() if isinstance(data, dict) else []) if isinstance(v, (int, float))]
-            total_points = sum(numeric_values) if numeric_values else 0
+def _team_points_rows(team):
+    """Ordered per-entry point rows for ``team``, alliance-aware.
 
-    try:
-        total_points = float(total_points)
-    except Exception:
-        total_points = 0
-
-    if total_points < 0:
-        total_points = 0
-
-    return total_points
+    In alliance mode rows come from the shared alliance tables; otherwise
+    they come from the incrementally maintained per-team series for the
+    current scouting team and its alliance partners.
+    """
+    if get_active_alliance_id():
+        entries, _ = get_scouting_data_for_team(team.id)
+        return rows_from_entries(entries)
+    from app.utils.team_isolation import get_alliance_team_numbers, get_current_scouting_team_number
+    numbers = [get_current_scouting_team_number()] + list(get_alliance_team_numbers() or [])
+    return teams_series(team.id, numbers)
 
 
 @bp.route('/')
@@ -186,19 +138,11 @@ def _analyze_team(team_number):
     except Exception:
         team = None
 
-    # Find all ScoutingData entries for this team - use alliance data if in alliance mode
+    # Ordered per-match points for this team - alliance data if in alliance mode
     try:
-        entries = []
-        if team:
-            # Use alliance-aware data retrieval
-            entries, is_alliance = get_scouting_data_for_team(team.id)
-            # Sort by timestamp
-            entries = sorted(entries, key=lambda x: x.timestamp if x.timestamp else x.id)
-        else:
-            # Fallback: query by team number in Team table
-            entries = ScoutingData.query.join(Team).filter(Team.team_number == team_number).order_by(ScoutingData.timestamp).all()
+        rows = _team_points_rows(team) if team else []
     except Exception:
-        entries = []
+        rows = []
 
     # EPA enrichment: if EPA is enabled, fetch it for potential fallback / display
     from app.utils.analysis import get_current_epa_source, get_epa_metrics_for_team
@@ -209,91 +153,30 @@ def _analyze_team(team_number):
     if _tt_use_epa:
         epa_data = get_epa_metrics_for_team(team_number)
 
-    # Build timeline and compute a simple total points metric using available key metrics
+    # Build timeline of total points per match
     timeline = []
-    x_vals = []
     y_vals = []
 
     if _tt_statbotics_only:
         # In statbotics-only mode, show EPA as a single flat data point
         if epa_data and epa_data.get('total'):
             y_vals.append(epa_data['total'])
-            x_vals.append(0)
     else:
-        for idx, entry in enumerate(entries):
-            try:
-                data = entry.data
-                total_points = _compute_total_points_from_data(data)
-                y_vals.append(total_points)
-                x_vals.append(idx)
-            except Exception:
-                continue
+        y_vals = [row['points'] for row in rows]
 
         # If no scouting data but EPA is available, inject EPA baseline
         if not y_vals and epa_data and epa_data.get('total') and _tt_use_epa:
             y_vals.append(epa_data['total'])
-            x_vals.append(0)
-
-    slope, intercept = _simple_linear_regression(x_vals, y_vals)
-
-    # Predict next value (one step ahead)
-    next_x = len(x_vals)
-    predicted_next = slope * next_x + intercept if x_vals else 0
 
-    # Simple trend classification
-    # Compute recent trend over the last N points
+    stats = compute_trend(y_vals)
+    slope, intercept = stats['slope'], stats['intercept']
+    predicted_next = stats['predicted_next']
     recent_window = min(5, len(y_vals))
-    recent_trend_info = {
-        'recent_slope': 0,
-        'recent_intercept': 0,
-        'recent_pct_change': 0,
-        'recent_consistency': 0
-    }
 
-    if recent_window >= 2:
-        recent_x = list(range(len(y_vals) - recent_window, len(y_vals)))
-        recent_y = y_vals[-recent_window:]
-        rslope, rintercept = _simple_linear_regression(recent_x, recent_y)
-        recent_trend_info['recent_slope'] = rslope
-        recent_trend_info['recent_intercept'] = rintercept
-        # percent change over recent window
-        try:
-            y_first = recent_y[0]
-            y_last = recent_y[-1]
-            recent_trend_info['recent_pct_change'] = (y_last - y_first) / max(1.0, (abs(y_first) + abs(y_last)) / 2.0)
-        except Exception:
-            recent_trend_info['recent_pct_change'] = 0
-        # recent consistency: proportion of positive diffs
-        diffs = [recent_y[i] - recent_y[i-1] for i in range(1, len(recent_y))]
-        if diffs:
-            pos = sum(1 for d in diffs if d > 0)
-            neg = sum(1 for d in diffs if d < 0)
-            recent_trend_info['recent_consistency'] = (pos - neg) / len(diffs)
-            recent_trend_info['recent_consistency_strength'] = max(pos, neg) / len(diffs)
-
-    # Overall consistency and percent change
-    overall_trend_info = {
-        'overall_slope': slope,
-        'overall_intercept': intercept,
-        'overall_pct_change': 0,
-        'overall_consistency': 0
-    }
-    if len(y_vals) >= 2:
-        try:
-            y_first = y_vals[0]
-            y_last = y_vals[-1]
-            overall_trend_info['overall_pct_change'] = (y_last - y_first) / max(1.0, (abs(y_first) + abs(y_last)) / 2.0)
-        except Exception:
-            overall_trend_info['overall_pct_change'] = 0
-
-        diffs_all = [y_vals[i] - y_vals[i-1] for i in range(1, len(y_vals))]
-        if diffs_all:
-            pos = sum(1 for d in diffs_all if d > 0)
-            neg = sum(1 for d in diffs_all if d < 0)
-            # normalized consistency between -1 and 1 (signed)
-            overall_trend_info['overall_consistency'] = (pos - neg) / len(diffs_all)
-            # strength = proportion of steps in the majority direction (0..1)
-            overall_trend_info['overall_consistency_strength'] = max(pos, neg) / len(diffs_all)
+    recent_trend_info = {k: v for k, v in stats.items() if k.startswith('recent_')}
+    overall_trend_info = {k: stats[k] for k in ('overall_slope', 'overall_intercept', 'overall_pct_change',
+                                                'overall_consistency', 'overall_consistency_strength')
+                          if k in stats}
 
     # Qualitative classification rules - produce separate overall and recent classifications
     overall_classification = 'insufficient data'
@@ -363,24 +246,9 @@ def _analyze_team(team_number):
                     else:
                         recent_classification = 'recently stable'
 
-            # Compute closeness metrics (overall)
-            try:
-                mean_all = mean(y_vals) if y_vals else 0
-                # population stddev (sample) fallback
-                diffsq = [(v - mean_all) ** 2 for v in y_vals]
-                stddev_all = math.sqrt(sum(diffsq) / max(1, (len(y_vals) - 1))) if len(y_vals) > 1 else 0
-                cv_all = (stddev_all / mean_all) if mean_all else 0
-                within_1std = sum(1 for v in y_vals if abs(v - mean_all) <= stddev_all) / len(y_vals) if len(y_vals) else 0
-                pct_threshold = 0.05
-                within_pct = sum(1 for v in y_vals if abs(v - mean_all) <= abs(mean_all) * pct_threshold) / len(y_vals) if len(y_vals) else 0
-
-                closeness['overall_mean'] = mean_all
-                closeness['overall_stddev'] = stddev_all
-                closeness['overall_cv'] = cv_all
-                closeness['overall_within_1std'] = within_1std
-                closeness['overall_within_pct_threshold'] = within_pct
-            except Exception:
-                pass
+            for key in ('overall_mean', 'overall_stddev', 'overall_cv',
+                        'overall_within_1std', 'overall_within_pct_threshold'):
+                closeness[key] = stats[key]
 
     context = {
         'team_number': team_number,
@@ -390,7 +258,8 @@ def _analyze_team(team_number):
         'intercept': intercept,
         'predicted_next': predicted_next,
         'trend': overall_classification,
-        'data_points': len(x_vals),
+        'data_points': len(y_vals),
+        'moving_average': stats['moving_average'],
         'epa_data': epa_data,
         'epa_source': _tt_epa_source,
     }
@@ -426,14 +295,9 @@ def _analyze_multiple_teams(team_numbers):
             team = None
 
         try:
-            if team:
-                # Use alliance-aware data retrieval
-                entries, _ = get_scouting_data_for_team(team.id)
-                entries = sorted(entries, key=lambda x: x.timestamp if x.timestamp else x.id)
-            else:
-                entries = ScoutingData.query.join(Team).filter(Team.team_number == tn).order_by(ScoutingData.timestamp).all()
+            rows = _team_points_rows(team) if team else []
         except Exception:
-            entries = []
+            rows = []
 
         # EPA enrichment for multi-team trends
         from app.utils.analysis import get_current_epa_source, get_epa_metrics_for_team
@@ -445,51 +309,30 @@ def _analyze_multiple_teams(team_numbers):
             _mt_epa_data = get_epa_metrics_for_team(tn)
 
         timeline = []
-        x_vals = []
         y_vals = []
 
         if _mt_statbotics_only:
             # In statbotics-only mode, show EPA as a single flat data point
             if _mt_epa_data and _mt_epa_data.get('total'):
                 y_vals.append(_mt_epa_data['total'])
-                x_vals.append(0)
                 timeline.append({'timestamp': None, 'total_points': _mt_epa_data['total']})
         else:
-            for i, entry in enumerate(entries):
-                try:
-                    data = entry.data
-                    tp = _compute_total_points_from_data(data)
-                    timeline.append({'timestamp': entry.timestamp.isoformat(), 'total_points': tp})
-                    x_vals.append(i)
-                    y_vals.append(tp)
-                except Exception:
-                    continue
+            for row in rows:
+                timeline.append({'timestamp': row['timestamp'].isoformat() if row['timestamp'] else None,
+                                 'total_points': row['points']})
+                y_vals.append(row['points'])
 
             # If no scouting data but EPA is available, inject EPA baseline
             if not y_vals and _mt_epa_data and _mt_epa_data.get('total') and _mt_use_epa:
                 y_vals.append(_mt_epa_data['total'])
-                x_vals.append(0)
                 timeline.append({'timestamp': None, 'total_points': _mt_epa_data['total']})
 
-        # Compute simple regression and basic stats for this team's timeline
-        try:
-            slope, intercept = _simple_linear_regression(x_vals, y_vals)
-            next_x = len(x_vals)
-            predicted = slope * next_x + intercept if x_vals else 0
-        except Exception:
-            slope, intercept, predicted = 0, 0, 0
-
-        mean_val = None
-        stddev_val = None
-        cv_val = None
-        try:
-            if y_vals:
-                mean_val = mean(y_vals)
-                diffsq = [(v - mean_val) ** 2 for v in y_vals]
-                stddev_val = math.sqrt(sum(diffsq) / max(1, (len(y_vals) - 1))) if len(y_vals) > 1 else 0
-                cv_val = (stddev_val / mean_val) if mean_val else 0
-        except Exception:
-            pass
+        # Regression and basic stats for this team's timeline
+        stats = compute_trend(y_vals)
+        slope, intercept, predicted = stats['slope'], stats['intercept'], stats['predicted_next']
+        mean_val = stats['overall_mean']
+        stddev_val = stats['overall_stddev']
+        cv_val = stats['overall_cv']
 
         dataset = {
             'team_number': tn,
@@ -501,7 +344,8 @@ def _analyze_multiple_teams(team_numbers):
             'predicted_next': predicted,
             'mean': mean_val,
             'stddev': stddev_val,
-            'cv': cv_val
+            'cv': cv_val,
+            'moving_average': stats['moving_average']
         }
         combined_context['datasets'].append(dataset)
         combined_context['data_points'] = max(combined_context['data_points'], len(timeline))
@@ -1203,7 +1203,7 @@ def view(team_number):
 @analytics_required
 def ranks():
     """Display team rankings for the selected event based on average total points"""
-    from app.utils.alliance_data import get_scouting_data_for_team, get_active_alliance_id
+    from app.utils.alliance_data import get_active_alliance_id
     
     game_config = get_effective_game_config()
     current_event_code = game_config.get('current_event_code')
@@ -1264,29 +1264,25 @@ def ranks():
                 break
     if not total_metric_id:
         total_metric_id = 'tot'
-    # Calculate average total points for each team
+    # Average total points for each team, read from the shared leaderboard
+    from app.utils.team_rankings import current_leaderboard
+    leaderboard = current_leaderboard(event_id=event_id if event_id else None, total_metric_id=total_metric_id)
     team_rankings = []
     for team in teams:
-        # Use alliance data if in alliance mode, otherwise use team isolation helper
-        scouting_data, _ = get_scouting_data_for_team(team.id, event_id=event_id if event_id else None)
-        if scouting_data:
-            # Calculate metric for each scouting entry then filter out matches with 0 points
-            total_points_raw = [data.calculate_metric(total_metric_id) for data in scouting_data]
-            # Keep only entries that have a non-zero numeric value
-            scored_points = [p for p in total_points_raw if p is not None and p != 0]
-            # If we have non-zero scored points, average those
-            if len(scored_points) > 0:
-                avg_points = sum(scored_points) / len(scored_points)
-                num_entries = len(scored_points)
-            else:
-                # There are scouting entries but none have non-zero points.
-                # Treat this as having data (avg 0) rather than 'no data' so teams with entries are shown.
-                avg_points = 0
-                num_entries = len(total_points_raw)
-        else:
+        row = leaderboard.get(team.team_number)
+        if row is None:
             # No scouting entries at all -> truly no data
             avg_points = None
             num_entries = 0
+        elif row['scored_count'] > 0:
+            # Average only the entries with non-zero points
+            avg_points = row['scored_total_avg']
+            num_entries = row['scored_count']
+        else:
+            # There are scouting entries but none have non-zero points.
+            # Treat this as having data (avg 0) rather than 'no data' so teams with entries are shown.
+            avg_points = 0
+            num_entries = row['match_count']
         team_rankings.append({
             'team': team,
             'avg_points': avg_points,
@@ -0,0 +1,63 @@
+// Expand compact Plotly figures produced by app/utils/plotly_compact.py.
+//
+// Numeric trace arrays arrive as {dtype: 'f4'|'i4', bdata: <base64>, shape?}
+// and layout.template as the name of a template registered on
+// window.PLOTLY_TEMPLATES (see /graphs/chart-template.js). The vendored
+// plotly.js does not decode bdata itself, so call expandPlotlyFigure() on
+// the parsed JSON before Plotly.newPlot. Plain figures pass through as-is.
+(function() {
+    function decodeBase64(b64) {
+        const bin = atob(b64);
+        const bytes = new Uint8Array(bin.length);
+        for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+        return bytes.buffer;
+    }
+
+    function decodeTypedArray(spec) {
+        const buffer = decodeBase64(spec.bdata);
+        let values;
+        if (spec.dtype === 'i4') {
+            values = new Int32Array(buffer);
+        } else {
+            // float32 keeps ~7 significant digits; round so hover labels show 12.3, not 12.300000190734863
+            const raw = new Float32Array(buffer);
+            values = new Float64Array(raw.length);
+            for (let i = 0; i < raw.length; i++) values[i] = Number(raw[i].toPrecision(7));
+        }
+        if (spec.shape) {
+            const dims = String(spec.shape).split(',').map(Number);
+            const rows = [];
+            for (let r = 0; r < dims[0]; r++) rows.push(values.subarray(r * dims[1], (r + 1) * dims[1]));
+            return rows;
+        }
+        return values;
+    }
+
+    function expandArrays(obj) {
+        if (Array.isArray(obj)) return obj.map(expandArrays);
+        if (obj && typeof obj === 'object') {
+            if (typeof obj.bdata === 'string' && (obj.dtype === 'f4' || obj.dtype === 'i4')) {
+                return decodeTypedArray(obj);
+            }
+            const out = {};
+            Object.keys(obj).forEach(function(k) { out[k] = expandArrays(obj[k]); });
+            return out;
+        }
+        return obj;
+    }
+
+    window.expandPlotlyFigure = function(fig) {
+        if (!fig || typeof fig !== 'object') return fig;
+        if (Array.isArray(fig.data)) fig.data = fig.data.map(expandArrays);
+        const layout = fig.layout;
+        if (layout && typeof layout.template === 'string') {
+            const templates = window.PLOTLY_TEMPLATES || {};
+            if (templates[layout.template]) {
+                layout.template = JSON.parse(JSON.stringify(templates[layout.template]));
+            } else {
+                delete layout.template;
+            }
+        }
+        return fig;
+    };
+})();
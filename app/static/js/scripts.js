@@ -2779,6 +2779,9 @@ function renderPlotlyGraphs() {
                     throw new Error('Failed to parse graph data');
                 }
             }
+            if (window.expandPlotlyFigure) {
+                parsedData = window.expandPlotlyFigure(parsedData);
+            }
             
             // Check which format we're dealing with
             function applyClientThemeAndPlot(dataObj, layoutObj) {
@@ -6,7 +6,7 @@ alliance tables instead of team-specific tables. This provides a single
 central database view for all alliance members.
 """
 
-from flask import current_app
+from flask import current_app, g
 from flask_login import current_user
 from sqlalchemy import func
 from app import db
@@ -78,6 +78,14 @@ def get_active_alliance_id_for_team(team_number):
     """
     if not team_number:
         return None
+
+    # Mobile token auth resolves this once per request (see mobile_api token cache)
+    try:
+        resolved = g.get('active_alliance_ids')
+        if resolved and team_number in resolved:
+            return resolved[team_number]
+    except RuntimeError:
+        pass  # outside an app context
     
     # Check if the team has alliance mode active
     if not TeamAllianceStatus.is_alliance_mode_active_for_team(team_number):
@@ -92,10 +100,9 @@ def get_active_alliance_id_for_team(team_number):
 
 
 def get_current_scouting_team_number():
-    """Get the current user's scouting team number."""
-    if current_user and hasattr(current_user, 'scouting_team_number'):
-        return current_user.scouting_team_number
-    return None
+    """Get the current scouting team number (``g.scouting_team_number`` first, then current_user)."""
+    from app.utils.team_isolation import get_current_scouting_team_number as _current_team
+    return _current_team()
 
 
 def is_alliance_admin(alliance_id=None):
@@ -214,9 +221,12 @@ def get_scouting_data_query(event_ids=None, team_number=None):
             team_filter_numbers.extend(alliance_team_numbers)
         team_filter_numbers = list(set(team_filter_numbers))
         
+        from app.utils.team_isolation import with_granted_entries
         query = ScoutingData.query
         if team_filter_numbers:
-            query = query.filter(ScoutingData.scouting_team_number.in_(team_filter_numbers))
+            # Alliance data this team kept access to is read in place, not copied
+            query = query.filter(with_granted_entries(
+                ScoutingData.scouting_team_number.in_(team_filter_numbers), ScoutingData, current_team))
         
         # IMPORTANT: When NOT in alliance mode, exclude data copied from alliance
         # (entries with scout_name starting with [Alliance-)
@@ -269,13 +279,14 @@ def get_pit_data_query(team_number=None):
             team_filter_numbers.extend(alliance_team_numbers)
         team_filter_numbers = list(set(team_filter_numbers))
         
+        from app.utils.team_isolation import with_granted_entries
         query = PitScoutingData.query
         if team_filter_numbers:
-            # Only include data with matching scouting_team_number
+            # Only include data with matching scouting_team_number (or kept alliance access)
             # (removed NULL fallback for proper data isolation)
-            query = query.filter(
-                PitScoutingData.scouting_team_number.in_(team_filter_numbers)
-            )
+            query = query.filter(with_granted_entries(
+                PitScoutingData.scouting_team_number.in_(team_filter_numbers), PitScoutingData, current_team
+            ))
         else:
             # If no team filter, show nothing (user must have a team assignment)
             query = query.filter(PitScoutingData.id < 0)  # No results
@@ -1243,104 +1254,73 @@ def get_pit_data_query_for_team(scouting_team_number, team_id=None):
 
 def copy_alliance_data_to_team(alliance_id, target_team_number):
     """
-    Copy all alliance data (not just the team's own data) to the team's local storage.
-    This allows a team to keep a local copy of all alliance data when disabling alliance mode.
+    Keep the team's access to all alliance data (not just its own) after disabling alliance mode.
+    
+    Rather than copying every shared entry into the team's private tables, this
+    records an ``AllianceDataGrant`` so the team's queries read the other
+    members' original entries in place, as they are now: ``alliance_links``
+    copies an entry to the team before its source edits or deletes it.  Only
+    shared entries whose original has since been deleted are copied into the
+    team's local storage right away.
     
     Args:
-        alliance_id: The alliance to copy data from
-        target_team_number: The team number to copy data to
+        alliance_id: The alliance to keep data from
+        target_team_number: The team number that keeps access
     
     Returns:
-        dict: Stats about what was copied
+        dict: Stats; ``*_linked`` entries are readable through the grant,
+        ``*_copied`` ones were copied
     """
-    import uuid
+    from datetime import datetime, timezone
+    from app.models import AllianceDataGrant
+    from app.utils.alliance_links import copy_detached_entries
+    from app.utils.alliance_sync import current_change_seq
     
     stats = {
+        'scouting_linked': 0,
         'scouting_copied': 0,
         'scouting_skipped': 0,
+        'pit_linked': 0,
         'pit_copied': 0,
         'pit_skipped': 0,
         'errors': []
     }
     
     try:
-        # Get all shared scouting data from the alliance
-        shared_scouting_entries = AllianceSharedScoutingData.query.filter_by(
-            alliance_id=alliance_id,
-            is_active=True
-        ).all()
-        
-        for entry in shared_scouting_entries:
-            try:
-                # Check if this data already exists in the team's private ScoutingData
-                existing_private = ScoutingData.query.filter_by(
-                    match_id=entry.match_id,
-                    team_id=entry.team_id,
-                    alliance=entry.alliance,
-                    scouting_team_number=target_team_number
-                ).first()
-                
-                if not existing_private:
-                    # Create a private copy of the data
-                    # Prefix scout_name to indicate it's from alliance
-                    scout_name = entry.scout_name or ''
-                    if entry.source_scouting_team_number != target_team_number:
-                        scout_name = f"[Alliance-{entry.source_scouting_team_number}] {scout_name}"
-                    
-                    private_copy = ScoutingData(
-                        match_id=entry.match_id,
-                        team_id=entry.team_id,
-                        scouting_team_number=target_team_number,
-                        scout_name=scout_name,
-                        scout_id=entry.scout_id,
-                        scouting_station=entry.scouting_station,
-                        alliance=entry.alliance,
-                        data_json=entry.data_json,
-                        timestamp=entry.timestamp
-                    )
-                    db.session.add(private_copy)
-                    stats['scouting_copied'] += 1
-                else:
-                    stats['scouting_skipped'] += 1
-            except Exception as e:
-                stats['errors'].append(f"Scouting entry {entry.id}: {str(e)}")
+        grant = AllianceDataGrant.query.filter_by(team_number=target_team_number, alliance_id=alliance_id).first()
+        if grant is None:
+            grant = AllianceDataGrant(team_number=target_team_number, alliance_id=alliance_id)
+            db.session.add(grant)
+        grant.granted_at = datetime.now(timezone.utc)
+        grant.granted_seq = current_change_seq()
+        try:
+            g.pop('_alliance_data_grants', None)
+        except RuntimeError:
+            pass
         
-        # Get all shared pit data from the alliance
-        shared_pit_entries = AllianceSharedPitData.query.filter_by(
-            alliance_id=alliance_id,
-            is_active=True
-        ).all()
+        # Shared scouting entries from other members whose original still exists
+        stats['scouting_linked'] = AllianceSharedScoutingData.query.join(
+            ScoutingData, ScoutingData.id == AllianceSharedScoutingData.original_scouting_data_id
+        ).filter(
+            AllianceSharedScoutingData.alliance_id == alliance_id,
+            AllianceSharedScoutingData.is_active.is_(True),
+            AllianceSharedScoutingData.source_scouting_team_number != target_team_number
+        ).count()
         
-        for entry in shared_pit_entries:
-            try:
-                # Check if this data already exists in the team's private PitScoutingData
-                existing_private = PitScoutingData.query.filter_by(
-                    team_id=entry.team_id,
-                    scouting_team_number=target_team_number
-                ).first()
-                
-                if not existing_private:
-                    # Create a private copy of the data
-                    scout_name = entry.scout_name or ''
-                    if entry.source_scouting_team_number != target_team_number:
-                        scout_name = f"[Alliance-{entry.source_scouting_team_number}] {scout_name}"
-                    
-                    private_copy = PitScoutingData(
-                        team_id=entry.team_id,
-                        event_id=entry.event_id,
-                        scouting_team_number=target_team_number,
-                        scout_name=scout_name,
-                        scout_id=entry.scout_id,
-                        data_json=entry.data_json,
-                        timestamp=entry.timestamp,
-                        local_id=str(uuid.uuid4())
-                    )
-                    db.session.add(private_copy)
-                    stats['pit_copied'] += 1
-                else:
-                    stats['pit_skipped'] += 1
-            except Exception as e:
-                stats['errors'].append(f"Pit entry {entry.id}: {str(e)}")
+        stats['pit_linked'] = AllianceSharedPitData.query.join(
+            PitScoutingData, PitScoutingData.id == AllianceSharedPitData.original_pit_data_id
+        ).filter(
+            AllianceSharedPitData.alliance_id == alliance_id,
+            AllianceSharedPitData.is_active.is_(True),
+            AllianceSharedPitData.source_scouting_team_number != target_team_number
+        ).count()
+        
+        # Shared entries whose original is gone can only be kept as copies
+        detached = copy_detached_entries(db.session, alliance_id, target_team_number)
+        for kind, key in (('scouting_data', 'scouting'), ('pit_scouting_data', 'pit')):
+            copied, found = detached[kind]
+            stats[f'{key}_copied'] = copied
+            stats[f'{key}_skipped'] = found - copied
         
         db.session.commit()
         
@@ -1351,6 +1331,32 @@ def copy_alliance_data_to_team(alliance_id, target_team_number):
     return stats
 
 
+def remove_team_data_from_alliance(alliance_id, team_number):
+    """
+    Remove a team's shared scouting and pit rows from an alliance.
+    
+    Shared rows link to the team's own entries, so only rows whose original
+    is gone are copied back to the team's private tables first; the shared
+    rows are then deleted with one statement per table.  Nothing is committed.
+    
+    Returns:
+        tuple: (scouting rows removed, pit rows removed, entries copied back)
+    """
+    from app.utils.alliance_links import copy_detached_entries
+    
+    detached = copy_detached_entries(db.session, alliance_id, team_number, source=team_number)
+    restored = sum(copied for copied, _ in detached.values())
+    scouting_removed = AllianceSharedScoutingData.query.filter_by(
+        alliance_id=alliance_id,
+        source_scouting_team_number=team_number
+    ).delete(synchronize_session=False)
+    pit_removed = AllianceSharedPitData.query.filter_by(
+        alliance_id=alliance_id,
+        source_scouting_team_number=team_number
+    ).delete(synchronize_session=False)
+    return scouting_removed, pit_removed, restored
+
+
 def copy_my_team_alliance_data(alliance_id, team_number):
     """
     Copy only the current team's data from the alliance shared tables back to their local storage.
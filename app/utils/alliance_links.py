@@ -0,0 +1,394 @@
+"""
+Alliance shared rows as links to their source entries.
+
+Alliance mode used to copy every shared scouting, pit and qualitative entry
+into the ``AllianceShared*`` tables through ``create_from_*``, payload
+included, and rewrote those copies whenever the original changed.  A
+shared row is now a link: it names the alliance, the source entry and the
+keys the alliance views filter on, and its ``data_json`` reads through to
+the original (``models.AllianceSharedLinkMixin``).
+
+The payload is only stored on the shared row when it has to outlive the
+original.  The session hooks registered here snapshot linked rows just
+before their original is deleted, whether through ``session.delete`` or a
+bulk ``query.delete()``.
+
+The same hooks keep the data a team kept with
+``alliance_data.copy_alliance_data_to_team`` (an ``AllianceDataGrant``)
+fixed as of the grant.  The grant reads the other members' originals in
+place while they are unchanged since ``granted_seq``.  Before such an entry
+is edited or deleted, or the shared row that puts it in the grant is
+deleted, the entry as it was is copied into the grantee's own tables with
+an ``[Alliance-N]`` scout name, the way kept data used to be stored.  The
+copy uses the grantee's own match and team rows when it has them, so it
+survives the source team wiping its data.
+
+Bulk ``query.update()`` statements neither move ``change_seq`` nor take a
+copy; the entries stay in the grant with their new values.
+"""
+import uuid
+
+from sqlalchemy import event, or_, select, text
+from sqlalchemy.orm import Session
+
+_listeners_registered = False
+
+# original table -> (original model, shared model, link column) by name
+_KINDS = {
+    'scouting_data': ('ScoutingData', 'AllianceSharedScoutingData', 'original_scouting_data_id'),
+    'pit_scouting_data': ('PitScoutingData', 'AllianceSharedPitData', 'original_pit_data_id'),
+    'qualitative_scouting_data': ('QualitativeScoutingData', 'AllianceSharedQualitativeData',
+                                  'original_qualitative_data_id'),
+}
+
+# Kinds a grant covers (see team_isolation.granted_entry_ids)
+_GRANTED_KINDS = ('scouting_data', 'pit_scouting_data')
+
+
+def _kind(name):
+    from app import models
+
+    original, shared, column = _KINDS[name]
+    return getattr(models, original), getattr(models, shared), column
+
+
+def _shared_kinds():
+    """``{shared table name: original table name}``."""
+    from app import models
+
+    return {getattr(models, shared).__tablename__: name for name, (_, shared, _) in _KINDS.items()}
+
+
+# ---------------------------------------------------------------------------
+# Snapshots of linked rows
+# ---------------------------------------------------------------------------
+
+def snapshot_links(session, kind, original_ids):
+    """Store the payload on every linked shared row of the given originals.
+
+    *original_ids* is a list of ids or a SELECT of them.  Runs on the
+    session's connection ahead of the delete, so the originals still exist.
+    """
+    original, shared, column = _kind(kind)
+    table, original_table = shared.__table__, original.__table__
+    link_column = table.c[column]
+    connection = session.connection(bind_arguments={'mapper': shared.__mapper__})
+    connection.execute(
+        table.update()
+        .where(table.c.is_link.is_(True), link_column.in_(original_ids))
+        .values(data_json=select(original_table.c.data_json)
+                .where(original_table.c.id == link_column).scalar_subquery(),
+                is_link=False)
+    )
+    # Loaded link rows reload the snapshot instead of reading a deleted original
+    dirty = set(session.dirty)
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, shared) and obj.is_link and obj not in dirty:
+            session.expire(obj, ['_data_json', 'is_link'])
+    # Links created in the same flush are inserted after the UPDATE above
+    if isinstance(original_ids, (list, tuple, set)):
+        ids = set(original_ids)
+        for obj in list(session.new):
+            if isinstance(obj, shared) and obj.is_link and getattr(obj, column) in ids:
+                source = session.get(original, getattr(obj, column))
+                obj.data_json = source.data_json if source is not None else '{}'
+
+
+def relink_identical_copies(engine):
+    """Turn shared copies whose payload still equals the original's into links.
+
+    Used by the schema migration so existing alliances stop storing every
+    payload twice.  Rows an alliance admin edited keep their copy.  Returns
+    the number of rows linked.
+    """
+    linked = 0
+    with engine.begin() as connection:
+        for kind in _KINDS:
+            original, shared, column = _kind(kind)
+            linked += connection.execute(text(
+                f"UPDATE {shared.__tablename__} SET data_json = '', is_link = 1 "
+                f"WHERE (is_link IS NULL OR is_link = 0) AND last_edited_by_team IS NULL "
+                f"AND data_json = (SELECT o.data_json FROM {original.__tablename__} o WHERE o.id = {column})"
+            )).rowcount or 0
+    return linked
+
+
+# ---------------------------------------------------------------------------
+# Kept alliance data (AllianceDataGrant)
+# ---------------------------------------------------------------------------
+
+def _entry_columns(model):
+    """Columns a kept copy is built from, for an original or a shared table."""
+    from app.models import Event, Match, Team
+
+    data_json = model.__table__.c.data_json.label('data_json')
+    if hasattr(model, 'match_id'):
+        columns = (model.id, model.match_id, model.team_id, model.scout_name, model.scout_id,
+                   model.scouting_station, model.timestamp, model.alliance, data_json,
+                   Match.match_type, Match.match_number, Event.code, Team.team_number)
+        joins = ((Match, Match.id == model.match_id), (Event, Event.id == Match.event_id),
+                 (Team, Team.id == model.team_id))
+    else:
+        columns = (model.id, model.team_id, model.event_id, model.scout_name, model.scout_id,
+                   model.timestamp, data_json, Event.code, Team.team_number)
+        joins = ((Event, Event.id == model.event_id), (Team, Team.id == model.team_id))
+    return columns, joins
+
+
+def _granted_entries(session, kind, original_ids=None, shared_ids=None, edited=False):
+    """Rows ``(grantee, source_scouting_team_number, entry columns...)`` grants currently read.
+
+    Column queries read the database, so dirty objects report the values
+    from before the pending edit.
+    """
+    from app.models import AllianceDataGrant
+
+    original, shared, column = _kind(kind)
+    link_column = getattr(shared, column)
+    columns, joins = _entry_columns(original)
+    query = session.query(AllianceDataGrant.team_number.label('grantee'),
+                          shared.source_scouting_team_number.label('source_scouting_team_number'), *columns)
+    query = query.select_from(original).join(shared, link_column == original.id).join(
+        AllianceDataGrant, AllianceDataGrant.alliance_id == shared.alliance_id)
+    for model, condition in joins:
+        query = query.outerjoin(model, condition)
+    query = query.filter(
+        shared.is_active.is_(True),
+        shared.source_scouting_team_number != AllianceDataGrant.team_number,
+        shared.shared_at <= AllianceDataGrant.granted_at,
+        or_(AllianceDataGrant.granted_seq.is_(None), original.change_seq.is_(None),
+            original.change_seq <= AllianceDataGrant.granted_seq),
+    )
+    if edited:
+        # Grants made before granted_seq existed read edits live
+        query = query.filter(AllianceDataGrant.granted_seq.isnot(None))
+    if original_ids is not None:
+        query = query.filter(original.id.in_(original_ids))
+    if shared_ids is not None:
+        query = query.filter(shared.id.in_(shared_ids))
+    return query.distinct().all()
+
+
+def _local_rows(session, grantee, rows):
+    """The grantee's own team, event and match rows for *rows*.
+
+    Missing ones are created from the source team's rows, so the kept copies
+    do not reference rows the source team may delete.
+    """
+    from app.models import Event, Match, Team
+
+    team_numbers = {r.team_number for r in rows if r.team_number is not None}
+    codes = {r.code for r in rows if r.code}
+    teams = {t.team_number: t for t in Team.query.filter(
+        Team.scouting_team_number == grantee, Team.team_number.in_(team_numbers)).all()} if team_numbers else {}
+    events = {e.code: e for e in Event.query.filter(
+        Event.scouting_team_number == grantee, Event.code.in_(codes)).all()} if codes else {}
+    matches = {}
+    if events and hasattr(rows[0], 'match_id'):
+        for match in Match.query.filter(Match.scouting_team_number == grantee,
+                                        Match.event_id.in_([e.id for e in events.values()])).all():
+            matches[(match.event_id, match.match_type, match.match_number)] = match
+
+    def event_for(code, source_id):
+        if code in events:
+            return events[code]
+        source = session.get(Event, source_id) if source_id else None
+        if source is None:
+            return None
+        event = events[code] = Event(
+            name=source.name, code=source.code, location=source.location, timezone=source.timezone,
+            start_date=source.start_date, end_date=source.end_date, year=source.year,
+            scouting_team_number=grantee)
+        session.add(event)
+        return event
+
+    def team_for(row, event=None):
+        team = teams.get(row.team_number)
+        if team is None:
+            source = session.get(Team, row.team_id)
+            team = teams[row.team_number] = Team(
+                team_number=row.team_number, team_name=source.team_name if source else None,
+                location=source.location if source else None, scouting_team_number=grantee)
+            session.add(team)
+            if event is not None:
+                team.events.append(event)
+        return team
+
+    def match_for(row):
+        source = session.get(Match, row.match_id)
+        if source is None:
+            return None, None
+        event = event_for(row.code, source.event_id if source else None)
+        if event is None:
+            return source, None
+        key = (event.id, row.match_type, row.match_number)
+        match = matches.get(key) if event.id is not None else None
+        if match is None:
+            match = Match(
+                match_number=source.match_number, match_type=source.match_type, event=event,
+                red_alliance=source.red_alliance, blue_alliance=source.blue_alliance,
+                red_score=source.red_score, blue_score=source.blue_score, winner=source.winner,
+                scheduled_time=source.scheduled_time, predicted_time=source.predicted_time,
+                actual_time=source.actual_time, display_match_number=source.display_match_number,
+                comp_level=source.comp_level, set_number=source.set_number,
+                scouting_team_number=grantee)
+            session.add(match)
+            matches[key] = match
+        return match, event
+
+    return team_for, event_for, match_for
+
+
+def _copy_for_grantee(session, grantee, kind, rows):
+    from app.models import PitScoutingData, ScoutingData
+    from app.utils.alliance_data import ALLIANCE_DATA_PREFIX
+
+    team_for, event_for, match_for = _local_rows(session, grantee, rows)
+    model = ScoutingData if kind == 'scouting_data' else PitScoutingData
+    kept = model.query.filter(model.scouting_team_number == grantee)
+    if kind == 'scouting_data':
+        existing = set(kept.with_entities(ScoutingData.match_id, ScoutingData.team_id, ScoutingData.alliance).all())
+    else:
+        existing = {(team_id,) for (team_id,) in kept.with_entities(PitScoutingData.team_id).all()}
+
+    copies = []
+    seen = set()
+    for r in rows:
+        scout_name = r.scout_name or ''
+        if r.source_scouting_team_number != grantee:
+            scout_name = f"{ALLIANCE_DATA_PREFIX}{r.source_scouting_team_number}] {scout_name}"
+        if kind == 'scouting_data':
+            match, event = match_for(r)
+            if match is None:
+                continue
+            team = team_for(r, event)
+            key = (match.id, team.id, r.alliance)
+            if key in existing or (id(match), id(team), r.alliance) in seen:
+                continue
+            seen.add((id(match), id(team), r.alliance))
+            copies.append(ScoutingData(
+                match=match, team=team, scouting_team_number=grantee, scout_name=scout_name,
+                scout_id=r.scout_id, scouting_station=r.scouting_station, alliance=r.alliance,
+                data_json=r.data_json or '{}', timestamp=r.timestamp))
+        else:
+            event = event_for(r.code, r.event_id)
+            team = team_for(r, event)
+            if (team.id,) in existing or id(team) in seen:
+                continue
+            seen.add(id(team))
+            copies.append(PitScoutingData(
+                team=team, event=event, scouting_team_number=grantee, scout_name=scout_name,
+                scout_id=r.scout_id, data_json=r.data_json or '{}', timestamp=r.timestamp,
+                local_id=str(uuid.uuid4())))
+    session.add_all(copies)
+    return len(copies)
+
+
+def _has_grants(session):
+    from app.models import AllianceDataGrant
+
+    return session.query(AllianceDataGrant.id).limit(1).first() is not None
+
+
+def preserve_granted_entries(session, kind, original_ids=None, shared_ids=None, edited=False):
+    """Copy the granted entries about to change or leave the grant to their grantees.
+
+    Returns the number of copies added to the session.
+    """
+    if kind not in _GRANTED_KINDS:
+        return 0
+    with session.no_autoflush:
+        if not _has_grants(session):
+            return 0
+        by_grantee = {}
+        for row in _granted_entries(session, kind, original_ids, shared_ids, edited):
+            by_grantee.setdefault(row.grantee, []).append(row)
+        return sum(_copy_for_grantee(session, grantee, kind, rows) for grantee, rows in by_grantee.items())
+
+
+def copy_detached_entries(session, alliance_id, grantee, source=None):
+    """Copy the alliance's shared entries whose original is gone to *grantee*.
+
+    A grant only reads originals, so these snapshots are kept as the
+    grantee's own rows.  *source* limits the copy to one member's entries.
+    Returns ``{kind: (copied, found)}``.
+    """
+    counts = {}
+    for kind in _GRANTED_KINDS:
+        original, shared, column = _kind(kind)
+        columns, joins = _entry_columns(shared)
+        query = session.query(shared.source_scouting_team_number.label('source_scouting_team_number'), *columns)
+        query = query.outerjoin(original, original.id == getattr(shared, column))
+        for model, condition in joins:
+            query = query.outerjoin(model, condition)
+        query = query.filter(shared.alliance_id == alliance_id, shared.is_active.is_(True),
+                             original.id.is_(None))
+        if source is not None:
+            query = query.filter(shared.source_scouting_team_number == source)
+        rows = query.all()
+        copied = _copy_for_grantee(session, grantee, kind, rows) if rows else 0
+        counts[kind] = (copied, len(rows))
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Session hooks
+# ---------------------------------------------------------------------------
+
+def register_alliance_link_listeners():
+    """Snapshot links and preserve granted entries ahead of edits and deletes."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+
+    @event.listens_for(Session, 'before_flush')
+    def _before_flush(session, flush_context, instances):
+        if not (session.deleted or session.dirty):
+            return
+        shared_tables = _shared_kinds()
+        deleted, edited, shared_deleted = {}, {}, {}
+        for obj in session.deleted:
+            name = getattr(type(obj), '__tablename__', None)
+            if name in _KINDS and obj.id is not None:
+                deleted.setdefault(name, []).append(obj.id)
+            elif name in shared_tables and obj.id is not None:
+                shared_deleted.setdefault(shared_tables[name], []).append(obj.id)
+        for obj in session.dirty:
+            name = getattr(type(obj), '__tablename__', None)
+            if name in _KINDS and obj.id is not None and session.is_modified(obj, include_collections=False):
+                edited.setdefault(name, []).append(obj.id)
+        if not (deleted or edited or shared_deleted):
+            return
+        for kind, ids in deleted.items():
+            preserve_granted_entries(session, kind, original_ids=ids)
+            snapshot_links(session, kind, ids)
+        for kind, ids in edited.items():
+            preserve_granted_entries(session, kind, original_ids=ids, edited=True)
+        for kind, ids in shared_deleted.items():
+            preserve_granted_entries(session, kind, shared_ids=ids)
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _before_bulk_delete(orm_execute_state):
+        # Query.delete() bypasses the flush hooks above
+        if not orm_execute_state.is_delete:
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None:
+            return
+        name = mapper.local_table.name
+        shared_tables = _shared_kinds()
+        if name not in _KINDS and name not in shared_tables:
+            return
+        session = orm_execute_state.session
+        model = mapper.class_
+        ids = select(model.id)
+        whereclause = orm_execute_state.statement.whereclause
+        if whereclause is not None:
+            ids = ids.where(whereclause)
+        if name in _KINDS:
+            preserve_granted_entries(session, name, original_ids=ids)
+            snapshot_links(session, name, ids)
+        else:
+            preserve_granted_entries(session, shared_tables[name], shared_ids=ids)
+
+    _listeners_registered = True
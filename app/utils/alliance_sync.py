@@ -0,0 +1,284 @@
+"""
+Incremental alliance data sharing.
+
+The periodic alliance sync used to rescan each active team's scouting, pit
+and qualitative rows from the last five minutes on every cycle.  It checked
+the deletion tombstones one row at a time and looked for existing shared
+copies one row at a time.  Rows that landed outside the window (clock skew,
+a long outage, a slow cycle) were never shared.
+
+Instead, every insert or update of those three tables takes the next value
+of the ``scouting`` change sequence (``change_seq``).  Each (alliance,
+member team) pair keeps a high-water mark (``AllianceSyncCursor``).  A sync
+cycle reads the committed sequence value once.  Members whose cursor has
+caught up cost nothing more.  The others fetch only rows in
+``(cursor, high]``, filter them against all of their tombstones loaded in
+one query, upsert shared copies in bulk and advance the cursor in the same
+transaction.
+
+The sequence is bumped with ``UPDATE change_sequence SET value = value + n``
+from ``before_flush``.  The counter row stays locked until the writer
+commits, so sequence order is commit order and a reader that saw ``high``
+committed can see every row at or below it.  Bulk ``query.update()``
+statements bypass the session hooks and do not take a sequence value.
+"""
+from sqlalchemy import text
+
+SEQUENCE_NAME = 'scouting'
+
+TRACKED_TABLES = ('scouting_data', 'pit_scouting_data', 'qualitative_scouting_data')
+
+# Max bind parameters per IN (...) lookup
+LOOKUP_CHUNK = 500
+
+# Entries received from an alliance carry this scout name prefix and are never re-shared
+ALLIANCE_SCOUT_PREFIX = '[Alliance-'
+
+_listeners_registered = False
+
+
+def _chunks(values, size=LOOKUP_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def allocate_change_seqs(connection, count, name=SEQUENCE_NAME):
+    """Reserve ``count`` sequence values on ``connection``; returns the first one."""
+    updated = connection.execute(
+        text('UPDATE change_sequence SET value = value + :n WHERE name = :name'),
+        {'n': count, 'name': name},
+    )
+    if updated.rowcount == 0:
+        connection.execute(text('INSERT INTO change_sequence (name, value) VALUES (:name, :n)'),
+                           {'name': name, 'n': count})
+        return 1
+    value = connection.execute(text('SELECT value FROM change_sequence WHERE name = :name'),
+                               {'name': name}).scalar()
+    return value - count + 1
+
+
+def current_change_seq(name=SEQUENCE_NAME):
+    """Highest committed sequence value (0 before the first tracked write)."""
+    from app.models import ChangeSequence, db
+
+    value = db.session.query(ChangeSequence.value).filter_by(name=name).scalar()
+    return value or 0
+
+
+def register_change_sequence_listeners():
+    """Stamp inserted and updated scouting, pit and qualitative rows with ``change_seq``."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    @event.listens_for(Session, 'before_flush')
+    def _assign_change_seqs(session, flush_context, instances):
+        changed = []
+        for obj in list(session.new) + list(session.dirty):
+            if getattr(type(obj), '__tablename__', None) not in TRACKED_TABLES:
+                continue
+            if obj in session.new or session.is_modified(obj, include_collections=False):
+                changed.append(obj)
+        if not changed:
+            return
+        from app.models import ChangeSequence
+
+        connection = session.connection(bind_arguments={'mapper': ChangeSequence.__mapper__})
+        first = allocate_change_seqs(connection, len(changed))
+        for offset, obj in enumerate(changed):
+            obj.change_seq = first + offset
+
+    _listeners_registered = True
+
+
+def load_tombstones(alliance_id, source_team):
+    """All of a team's deletion tombstones in an alliance, keyed like ``AllianceDeletedData.is_deleted``."""
+    from app.models import AllianceDeletedData, db
+
+    tombstones = {'scouting': set(), 'pit': set(), 'qualitative': set()}
+    rows = db.session.query(
+        AllianceDeletedData.data_type, AllianceDeletedData.match_id,
+        AllianceDeletedData.team_id, AllianceDeletedData.alliance_color,
+    ).filter_by(alliance_id=alliance_id, source_scouting_team_number=source_team).all()
+    for data_type, match_id, team_id, color in rows:
+        if data_type == 'scouting':
+            tombstones['scouting'].add((match_id, team_id, color))
+        elif data_type == 'pit':
+            tombstones['pit'].add(team_id)
+        elif data_type == 'qualitative':
+            tombstones['qualitative'].add((match_id, color))
+    return tombstones
+
+
+def load_cursors(pairs):
+    """``{(alliance_id, team_number): last_seq}`` for the given pairs, in one query."""
+    from app.models import AllianceSyncCursor, db
+
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+    alliance_ids = {alliance_id for alliance_id, _ in pairs}
+    rows = db.session.query(
+        AllianceSyncCursor.alliance_id, AllianceSyncCursor.team_number, AllianceSyncCursor.last_seq,
+    ).filter(AllianceSyncCursor.alliance_id.in_(alliance_ids)).all()
+    return {(a, t): seq for a, t, seq in rows if (a, t) in pairs}
+
+
+def advance_cursor(alliance_id, team_number, last_seq):
+    """Move a member's high-water mark; committed by the caller with the shared copies."""
+    from app.models import AllianceSyncCursor, db
+
+    cursor = AllianceSyncCursor.query.filter_by(alliance_id=alliance_id, team_number=team_number).first()
+    if cursor is None:
+        cursor = AllianceSyncCursor(alliance_id=alliance_id, team_number=team_number, last_seq=0)
+        db.session.add(cursor)
+    if last_seq > (cursor.last_seq or 0):
+        cursor.last_seq = last_seq
+    return cursor
+
+
+def collect_member_changes(team_number, since_seq, until_seq, event_ids=None):
+    """A team's own shareable rows with ``since_seq < change_seq <= until_seq``.
+
+    ``event_ids=None`` means every event.  Returns ``(scouting, pit, qualitative)``
+    with the relationships used by the sync payload preloaded.
+    """
+    from sqlalchemy.orm import selectinload
+    from app.models import Match, PitScoutingData, QualitativeScoutingData, ScoutingData
+
+    def _window(model):
+        return (model.scouting_team_number == team_number,
+                model.change_seq > since_seq,
+                model.change_seq <= until_seq)
+
+    scouting = ScoutingData.query.filter(
+        *_window(ScoutingData),
+        ~ScoutingData.scout_name.like(f'{ALLIANCE_SCOUT_PREFIX}%'),
+    ).options(selectinload(ScoutingData.team), selectinload(ScoutingData.match).selectinload(Match.event))
+    qualitative = QualitativeScoutingData.query.filter(*_window(QualitativeScoutingData)).options(
+        selectinload(QualitativeScoutingData.match).selectinload(Match.event))
+    if event_ids is not None:
+        scouting = scouting.join(Match, ScoutingData.match_id == Match.id).filter(Match.event_id.in_(event_ids))
+        qualitative = qualitative.join(Match, QualitativeScoutingData.match_id == Match.id).filter(
+            Match.event_id.in_(event_ids))
+    pit = PitScoutingData.query.filter(
+        *_window(PitScoutingData),
+        ~PitScoutingData.scout_name.like(f'{ALLIANCE_SCOUT_PREFIX}%'),
+    ).options(selectinload(PitScoutingData.team))
+
+    return (scouting.order_by(ScoutingData.change_seq).all(),
+            pit.order_by(PitScoutingData.change_seq).all(),
+            qualitative.order_by(QualitativeScoutingData.change_seq).all())
+
+
+def _existing_copies(model, alliance_id, source_team, original_column, original_ids, key_column, key_values):
+    """Existing shared copies matching either the original ids or the natural-key column values."""
+    found = {}
+    for column, values in ((original_column, original_ids), (key_column, key_values)):
+        for chunk in _chunks(set(values)):
+            for copy in model.query.filter(
+                model.alliance_id == alliance_id,
+                model.source_scouting_team_number == source_team,
+                column.in_(chunk),
+            ).all():
+                found[copy.id] = copy
+    return list(found.values())
+
+
+def _upsert(entries, copies, original_attr, natural_key, create, refresh):
+    """Create shared rows for new entries and bring active ones in line with their original.
+
+    Shared rows link to the original's payload, so an edit to the original
+    only touches its shared row when the row holds a snapshot or the
+    entry's metadata changed.
+    """
+    from app.models import db
+
+    by_original = {getattr(c, original_attr): c for c in copies if getattr(c, original_attr) is not None}
+    by_key = {natural_key(c) for c in copies}
+    created, updated = [], 0
+    for entry in entries:
+        copy = by_original.get(entry.id)
+        if copy is not None:
+            if copy.is_active:
+                refresh(copy, entry)
+                if db.session.is_modified(copy):
+                    updated += 1
+            continue
+        key = natural_key(entry)
+        if key in by_key:
+            continue  # shared before under another original id
+        by_key.add(key)
+        created.append(create(entry))
+    if created:
+        db.session.add_all(created)
+    return len(created), updated
+
+
+def _refresh_common(copy, entry):
+    copy.scout_name = entry.scout_name
+    copy.scout_id = entry.scout_id
+    copy.timestamp = entry.timestamp
+    copy.link_to(entry)
+
+
+def _refresh_scouting(copy, entry):
+    _refresh_common(copy, entry)
+    copy.scouting_station = entry.scouting_station
+    copy.alliance = entry.alliance
+
+
+def _refresh_qualitative(copy, entry):
+    _refresh_common(copy, entry)
+    copy.alliance_scouted = entry.alliance_scouted
+
+
+def share_member_changes(alliance_id, team_number, scouting, pit, qualitative):
+    """Filter changed rows against the tombstones and upsert their shared copies.
+
+    Returns ``(scouting, pit, qualitative, created, updated)`` with the
+    tombstoned rows removed.  Nothing is committed.
+    """
+    from app.models import (
+        AllianceSharedPitData, AllianceSharedQualitativeData, AllianceSharedScoutingData,
+    )
+
+    tombstones = load_tombstones(alliance_id, team_number)
+    scouting = [e for e in scouting if (e.match_id, e.team_id, e.alliance) not in tombstones['scouting']]
+    pit = [e for e in pit if e.team_id not in tombstones['pit']]
+    qualitative = [e for e in qualitative if (e.match_id, e.alliance_scouted) not in tombstones['qualitative']]
+
+    created = updated = 0
+    if scouting:
+        copies = _existing_copies(
+            AllianceSharedScoutingData, alliance_id, team_number,
+            AllianceSharedScoutingData.original_scouting_data_id, [e.id for e in scouting],
+            AllianceSharedScoutingData.match_id, [e.match_id for e in scouting])
+        c, u = _upsert(scouting, copies, 'original_scouting_data_id',
+                       lambda r: (r.match_id, r.team_id, r.alliance),
+                       lambda e: AllianceSharedScoutingData.create_from_scouting_data(e, alliance_id, team_number),
+                       _refresh_scouting)
+        created, updated = created + c, updated + u
+    if pit:
+        copies = _existing_copies(
+            AllianceSharedPitData, alliance_id, team_number,
+            AllianceSharedPitData.original_pit_data_id, [e.id for e in pit],
+            AllianceSharedPitData.team_id, [e.team_id for e in pit])
+        c, u = _upsert(pit, copies, 'original_pit_data_id', lambda r: r.team_id,
+                       lambda e: AllianceSharedPitData.create_from_pit_data(e, alliance_id, team_number),
+                       _refresh_common)
+        created, updated = created + c, updated + u
+    if qualitative:
+        copies = _existing_copies(
+            AllianceSharedQualitativeData, alliance_id, team_number,
+            AllianceSharedQualitativeData.original_qualitative_data_id, [e.id for e in qualitative],
+            AllianceSharedQualitativeData.match_id, [e.match_id for e in qualitative])
+        c, u = _upsert(qualitative, copies, 'original_qualitative_data_id',
+                       lambda r: (r.match_id, r.alliance_scouted),
+                       lambda e: AllianceSharedQualitativeData.create_from_qualitative_data(e, alliance_id, team_number),
+                       _refresh_qualitative)
+        created, updated = created + c, updated + u
+    return scouting, pit, qualitative, created, updated
@@ -5,11 +5,6 @@ import random
 import math
 import time as _time
 from datetime import datetime
-try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
-except ImportError:
-    NUMPY_AVAILABLE = False
 from app.utils.config_manager import get_current_game_config, load_game_config
 from app.utils.team_isolation import filter_scouting_data_by_scouting_team, get_current_scouting_team_number, filter_scouting_data_only_by_scouting_team
 
@@ -368,9 +363,9 @@ def refresh_opr_epa_for_event(event_code=None, team_numbers=None):
     team_numbers = sorted({int(tn) for tn in team_numbers if tn is not None})
 
     try:
-        from app.utils.statbotics_api_utils import get_statbotics_team_epa
+        from app.utils.statbotics_api_utils import fetch_statbotics_team_epa, store_statbotics_team_epa
     except Exception:
-        get_statbotics_team_epa = None
+        fetch_statbotics_team_epa = None
 
     try:
         from app.utils.tba_api_utils import get_tba_team_opr, construct_tba_event_key
@@ -385,13 +380,23 @@ def refresh_opr_epa_for_event(event_code=None, team_numbers=None):
         except Exception:
             event_key = None
 
-    for tn in team_numbers:
-        if get_statbotics_team_epa:
+    if fetch_statbotics_team_epa:
+        # EPA is one upstream call per team: fetch on the shared bounded HTTP
+        # pool, then write the DB cache here so SQLite sees one writer.
+        from app.utils.http_client import fan_out
+        fetched = fan_out(fetch_statbotics_team_epa, team_numbers)
+        for tn, outcome in zip(team_numbers, fetched):
+            if isinstance(outcome, Exception):
+                continue
             try:
-                get_statbotics_team_epa(tn, use_cache=False)
+                store_statbotics_team_epa(tn, *outcome)
             except Exception:
                 pass
-        if get_tba_team_opr:
+
+    if get_tba_team_opr:
+        # OPR comes from one event-wide request; the first team fetches and
+        # caches it for the rest.
+        for tn in team_numbers:
             try:
                 if event_key:
                     get_tba_team_opr(tn, event_key=event_key)
@@ -682,46 +687,8 @@ def _calculate_trend_factor(values, weights=None):
     Returns:
         Trend factor: >1 if improving, <1 if declining, ~1 if stable
     """
-    if not values or len(values) < 2:
-        return 1.0
-    
-    if weights is None:
-        weights = [1.0] * len(values)
-    
-    # Use linear regression to detect trend
-    if NUMPY_AVAILABLE and len(values) >= 3:
-        x = np.arange(len(values))
-        # Weighted linear regression
-        try:
-            w = np.array(weights)
-            fit = np.polyfit(x, values, 1, w=w)
-            slope = fit[0]
-            
-            # Normalize slope by mean value to get percentage change per match
-            mean_val = sum(v * w for v, w in zip(values, weights)) / sum(weights)
-            if mean_val > 0:
-                normalized_slope = slope / mean_val
-                # Convert to trend factor: positive slope increases factor
-                # Cap the trend factor between 0.8 and 1.2 to avoid extreme adjustments
-                trend_factor = 1.0 + (normalized_slope * len(values))
-                trend_factor = max(0.85, min(1.15, trend_factor))
-                return trend_factor
-        except:
-            pass
-    
-    # Fallback: simple comparison of first half vs second half
-    mid = len(values) // 2
-    if mid > 0:
-        first_half = values[:mid]
-        second_half = values[mid:]
-        first_avg = sum(first_half) / len(first_half) if first_half else 0
-        second_avg = sum(second_half) / len(second_half) if second_half else 0
-        
-        if first_avg > 0:
-            trend_factor = second_avg / first_avg
-            return max(0.85, min(1.15, trend_factor))
-    
-    return 1.0
+    from app.utils.trend_series import trend_factor
+    return trend_factor(values, weights)
 
 def _calculate_consistency_factor(values, weights=None):
     """Calculate consistency factor - rewards consistent performance.
@@ -7,6 +7,7 @@ from flask import request, jsonify, current_app, g
 from datetime import datetime, timezone
 import time
 import hashlib
+import threading
 
 from app.api_models import (
     get_api_key_by_hash, record_api_usage, check_rate_limit, ApiKey
@@ -34,6 +35,50 @@ def extract_api_key_from_request():
     return None
 
 
+# key_hash -> (ApiKey record detached from its session, cache expiry monotonic ts)
+_api_key_cache = {}
+_api_key_cache_lock = threading.Lock()
+API_KEY_CACHE_TTL = 60  # seconds
+API_KEY_CACHE_MAX = 1024
+
+
+def invalidate_api_key_cache(key_hash=None):
+    """Drop cached key records (all of them when ``key_hash`` is None).
+
+    Called whenever a key is updated, deactivated or deleted so changes take
+    effect immediately instead of after the TTL.
+    """
+    with _api_key_cache_lock:
+        if key_hash is None:
+            _api_key_cache.clear()
+        else:
+            _api_key_cache.pop(key_hash, None)
+
+
+def _lookup_api_key_record(key_hash):
+    now = time.monotonic()
+    with _api_key_cache_lock:
+        cached = _api_key_cache.get(key_hash)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    from app.api_models import api_db
+    session = api_db.get_session()
+    try:
+        record = session.query(ApiKey).filter_by(key_hash=key_hash, is_active=True).first()
+        if record is not None:
+            session.expunge(record)
+    finally:
+        api_db.close_session(session)
+
+    if record is not None:
+        with _api_key_cache_lock:
+            if len(_api_key_cache) >= API_KEY_CACHE_MAX:
+                _api_key_cache.clear()
+            _api_key_cache[key_hash] = (record, now + API_KEY_CACHE_TTL)
+    return record
+
+
 def authenticate_api_key(api_key):
     """Authenticate an API key and return the key record if valid"""
     if not api_key:
@@ -47,25 +92,20 @@ def authenticate_api_key(api_key):
         # Hash the provided key to match against stored hash
         key_hash = ApiKey.hash_key(api_key)
         
-        # Look up the key in the database
-        session = None
-        try:
-            from app.api_models import api_db
-            session = api_db.get_session()
-            api_key_record = session.query(ApiKey).filter_by(key_hash=key_hash, is_active=True).first()
-            
-            if not api_key_record:
-                return None, "Invalid API key"
-            
-            # Check if expired
-            if api_key_record.expires_at and api_key_record.expires_at < datetime.now(timezone.utc):
-                return None, "API key has expired"
-            
-            return api_key_record, None
-            
-        finally:
-            if session:
-                api_db.close_session(session)
+        # Look up the key (cached for API_KEY_CACHE_TTL seconds)
+        api_key_record = _lookup_api_key_record(key_hash)
+        
+        if not api_key_record:
+            return None, "Invalid API key"
+        
+        # Check if expired
+        expires_at = api_key_record.expires_at
+        if expires_at and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at and expires_at < datetime.now(timezone.utc):
+            return None, "API key has expired"
+        
+        return api_key_record, None
                 
     except Exception as e:
         current_app.logger.error(f"Error authenticating API key: {str(e)}")
@@ -191,6 +231,9 @@ def api_key_required(permission=None):
                     status_code = response.status_code
                 if hasattr(response, 'content_length') and response.content_length:
                     response_size = response.content_length
+                elif getattr(response, 'is_streamed', False):
+                    # Reading .data would buffer the whole streamed body
+                    response_size = 0
                 elif hasattr(response, 'data'):
                     response_size = len(response.data) if response.data else 0
                 
@@ -0,0 +1,251 @@
+"""
+Fetch and apply stages for the periodic API data sync worker (``run.py``).
+
+The worker first decides which scouting teams are due for a sync (one
+"job" per team: its scouting team number, event, season and game config).
+This module then:
+
+1. groups due jobs by (season, event code) so teams attending the same
+   event share one upstream fetch,
+2. fetches each distinct event's teams and matches concurrently on the
+   shared bounded HTTP pool (``http_client.fan_out``), skipping the match
+   list when the event's upstream fingerprint is unchanged
+   (``upstream_fingerprint``), and
+3. applies the results to each scouting team's rows with one bulk lookup
+   per table instead of a query per team / match.
+"""
+import logging
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Distinct events fetched at the same time
+_SYNC_FETCH_WORKERS = 4
+
+_MATCH_SYNC_FIELDS = ('red_alliance', 'blue_alliance', 'winner', 'red_score', 'blue_score')
+
+
+def event_group_key(job):
+    """Jobs with the same key can share one upstream fetch."""
+    return (int(job['event_year']), str(job['raw_event_code']).strip().upper())
+
+
+def group_jobs_by_event(jobs):
+    """Return ``{event_group_key: [job, ...]}`` preserving job order."""
+    groups = {}
+    for job in jobs:
+        groups.setdefault(event_group_key(job), []).append(job)
+    return groups
+
+
+def _fetch_with_job(job, fetcher):
+    from app.utils.api_utils import set_season_override, clear_season_override
+    from app.utils.config_manager import set_thread_game_config, clear_thread_game_config
+
+    set_season_override(job['event_year'])
+    set_thread_game_config(job.get('game_config'))
+    try:
+        return fetcher(job['raw_event_code'])
+    finally:
+        clear_season_override()
+        clear_thread_game_config()
+
+
+def matches_unchanged(job, data):
+    """True when the upstream match data for *job* is what was last applied."""
+    from app.utils.upstream_fingerprint import SCOPE_SYNC, event_unchanged
+
+    if job.get('force_refresh'):
+        return False
+    return event_unchanged(SCOPE_SYNC, job['raw_event_code'], job['event_year'],
+                           job['scouting_team_number'], data.get('fingerprint'))
+
+
+def mark_matches_applied(job, data):
+    from app.utils.upstream_fingerprint import SCOPE_SYNC, mark_event_applied
+
+    mark_event_applied(SCOPE_SYNC, job['raw_event_code'], job['event_year'],
+                       job['scouting_team_number'], data.get('fingerprint'))
+
+
+def _fetch_event_group(group_jobs):
+    """Fetch teams and matches for one event.
+
+    The first job's credentials are used; if a fetch fails the next job's
+    credentials are tried, so one team's bad API key does not block others
+    at the same event.  The match list is only fetched (and merged) when
+    the upstream fingerprint differs from what some job last applied.
+    Runs on a fan-out worker, so the probe's rows are returned in
+    ``probe_records`` for :func:`save_probe_records` rather than written.
+    """
+    from app.utils.api_utils import get_teams_dual_api, get_matches_dual_api
+    from app.utils.upstream_fingerprint import fetch_event_probe
+
+    result = {'teams': None, 'matches': None, 'teams_error': None, 'matches_error': None,
+              'fingerprint': None, 'probe_records': []}
+    first = group_jobs[0]
+    try:
+        result['fingerprint'], result['probe_records'] = _fetch_with_job(
+            first, lambda code: fetch_event_probe(code, first['event_year']))
+    except Exception as e:
+        logger.debug("Upstream probe failed for %s: %s", first['raw_event_code'], e)
+
+    fetchers = [('teams', get_teams_dual_api)]
+    if not all(matches_unchanged(job, result) for job in group_jobs):
+        fetchers.append(('matches', get_matches_dual_api))
+
+    for kind, fetcher in fetchers:
+        for job in group_jobs:
+            try:
+                result[kind] = _fetch_with_job(job, fetcher) or []
+                result[f'{kind}_error'] = None
+                break
+            except Exception as e:
+                result[f'{kind}_error'] = str(e)
+    return result
+
+
+def fetch_event_data(jobs):
+    """Fetch every distinct event among *jobs* concurrently.
+
+    Returns ``{event_group_key: {'teams', 'matches', 'teams_error', 'matches_error',
+    'fingerprint', 'probe_records'}}``.  A ``None`` teams/matches value means
+    every attempt failed.  Nothing is written; call :func:`save_probe_records`
+    on the calling thread.
+    """
+    from app.utils.http_client import fan_out
+
+    groups = group_jobs_by_event(jobs)
+    keys = list(groups)
+    results = fan_out(lambda key: _fetch_event_group(groups[key]), keys,
+                      max_workers=_SYNC_FETCH_WORKERS)
+    fetched = {}
+    for key, res in zip(keys, results):
+        if isinstance(res, Exception):
+            res = {'teams': None, 'matches': None, 'teams_error': str(res), 'matches_error': str(res)}
+        fetched[key] = res
+    return fetched
+
+
+def save_probe_records(fetched):
+    """Store the upstream probes gathered by :func:`fetch_event_data`."""
+    from app.utils.upstream_fingerprint import save_event_probe
+
+    for data in fetched.values():
+        try:
+            save_event_probe(data.get('probe_records'))
+        except Exception as e:
+            logger.debug("Could not store upstream probe: %s", e)
+
+
+def _scope_filter(column, scouting_team_number):
+    return column.is_(None) if scouting_team_number is None else column == scouting_team_number
+
+
+def apply_team_data(event, scouting_team_number, team_data_list):
+    """Upsert API team rows for one scouting team and link them to *event*.
+
+    Returns ``(added, updated)``.  Does not commit.
+    """
+    from app.models import Team, team_event
+
+    wanted = {}
+    for team_data in team_data_list or []:
+        if not team_data or not team_data.get('team_number'):
+            continue
+        wanted.setdefault(str(team_data.get('team_number')), team_data)
+    if not wanted:
+        return 0, 0
+
+    existing = {}
+    rows = (Team.query
+            .filter(_scope_filter(Team.scouting_team_number, scouting_team_number))
+            .filter(Team.team_number.in_([td.get('team_number') for td in wanted.values()]))
+            .order_by(Team.id)
+            .all())
+    for team in rows:
+        existing.setdefault(str(team.team_number), team)
+
+    linked_ids = {
+        r[0] for r in db.session.query(team_event.c.team_id)
+        .filter(team_event.c.event_id == event.id).all()
+    }
+
+    added = updated = 0
+    for key, team_data in wanted.items():
+        team = existing.get(key)
+        if team:
+            team.team_name = team_data.get('team_name', team.team_name)
+            team.location = team_data.get('location', team.location)
+            updated += 1
+        else:
+            team = Team(team_number=team_data.get('team_number'),
+                        team_name=team_data.get('team_name'),
+                        location=team_data.get('location'),
+                        scouting_team_number=scouting_team_number)
+            db.session.add(team)
+            added += 1
+
+        if team.id is None or team.id not in linked_ids:
+            try:
+                team.events.append(event)
+                if team.id is not None:
+                    linked_ids.add(team.id)
+            except Exception:
+                pass
+    return added, updated
+
+
+def apply_match_data(event, scouting_team_number, match_data_list):
+    """Upsert API match rows for one scouting team at *event*.
+
+    Only matches whose fields differ are written.  Returns
+    ``(added, updated)``.  Does not commit.
+    """
+    from app.models import Match
+
+    existing = {}
+    rows = (Match.query
+            .filter(Match.event_id == event.id)
+            .filter(_scope_filter(Match.scouting_team_number, scouting_team_number))
+            .order_by(Match.id)
+            .all())
+    for match in rows:
+        existing.setdefault((match.match_type, str(match.match_number)), match)
+
+    added = updated = 0
+    for match_data in match_data_list or []:
+        if not match_data:
+            continue
+        match_number = match_data.get('match_number')
+        match_type = match_data.get('match_type')
+        if not match_number or not match_type:
+            continue
+
+        key = (match_type, str(match_number))
+        match = existing.get(key)
+        if match:
+            # Only touch columns whose value actually changed
+            changed = False
+            for field in _MATCH_SYNC_FIELDS:
+                value = match_data.get(field, getattr(match, field))
+                if getattr(match, field) != value:
+                    setattr(match, field, value)
+                    changed = True
+            if changed:
+                updated += 1
+        else:
+            match = Match(match_number=match_number,
+                          match_type=match_type,
+                          event_id=event.id,
+                          red_alliance=match_data.get('red_alliance'),
+                          blue_alliance=match_data.get('blue_alliance'),
+                          red_score=match_data.get('red_score'),
+                          blue_score=match_data.get('blue_score'),
+                          winner=match_data.get('winner'),
+                          scouting_team_number=scouting_team_number)
+            db.session.add(match)
+            existing[key] = match
+            added += 1
+    return added, updated
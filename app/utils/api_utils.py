@@ -1,4 +1,5 @@
 import requests
+from app.utils.http_client import http_get, fan_out
 import json
 import os
 import base64
@@ -10,7 +11,7 @@ from .tba_api_utils import (
     tba_event_to_db_format, construct_tba_event_key, construct_tba_team_key,
     remap_team_number, get_event_team_remapping
 )
-from app.utils.config_manager import get_current_game_config
+from app.utils.config_manager import get_current_game_config, get_thread_game_config
 
 class ApiError(Exception):
     """Exception for API errors"""
@@ -222,7 +223,7 @@ def get_api_key():
     # As a final fallback, check the loaded game config (GAME_CONFIG).
     # This is where team-specific instance configs store api_settings.auth_token
     try:
-        game_config = current_app.config.get('GAME_CONFIG', {})
+        game_config = get_thread_game_config() or current_app.config.get('GAME_CONFIG', {})
         api_settings = game_config.get('api_settings', {})
         cfg_token = api_settings.get('auth_token')
         if cfg_token and isinstance(cfg_token, str):
@@ -286,7 +287,7 @@ def get_api_headers():
     
     # For FIRST API, auth format is Basic Username:Auth_Token
     # Get username from config
-    api_settings = get_current_game_config().get('api_settings', {})
+    api_settings = (get_thread_game_config() or get_current_game_config()).get('api_settings', {})
     username = api_settings.get('username', '')
     
     if username and auth_token:
@@ -346,7 +347,7 @@ def get_teams(event_code):
             headers = get_api_headers()
             # print(f"Using headers: {list(headers.keys())}")
 
-            response = requests.get(
+            response = http_get(
                 api_url,
                 headers=headers,
                 timeout=15  # Increased timeout for potentially slow API responses
@@ -372,23 +373,23 @@ def get_teams(event_code):
 
                             # Re-request remaining pages using the same endpoint and add page=N.
                             # Only certain endpoints support paging; if paging fails, we fall back
-                            # to returning the first page rather than erroring the whole sync.
-                            for page in range(int(page_current or 1) + 1, int(page_total) + 1):
-                                try:
-                                    joiner = '&' if '?' in api_url else '?'
-                                    page_url = f"{api_url}{joiner}page={page}"
-                                    resp_page = requests.get(page_url, headers=headers, timeout=15)
-                                    if resp_page.status_code != 200:
-                                        break
-                                    page_data = resp_page.json()
-                                    page_teams = None
-                                    if isinstance(page_data, dict):
-                                        page_teams = page_data.get('teams') or page_data.get('Teams')
-                                    if isinstance(page_teams, list) and page_teams:
-                                        all_teams.extend(page_teams)
-                                    else:
-                                        break
-                                except Exception:
+                            # to returning the pages fetched so far rather than erroring the whole sync.
+                            joiner = '&' if '?' in api_url else '?'
+
+                            def _fetch_page(page):
+                                resp_page = http_get(f"{api_url}{joiner}page={page}", headers=headers, timeout=15)
+                                if resp_page.status_code != 200:
+                                    return None
+                                page_data = resp_page.json()
+                                if isinstance(page_data, dict):
+                                    return page_data.get('teams') or page_data.get('Teams')
+                                return None
+
+                            pages = range(int(page_current or 1) + 1, int(page_total) + 1)
+                            for page_teams in fan_out(_fetch_page, pages):
+                                if isinstance(page_teams, list) and page_teams:
+                                    all_teams.extend(page_teams)
+                                else:
                                     break
 
                             return all_teams
@@ -456,7 +457,7 @@ def fetch_from_endpoint(api_url, headers, timeout=15):
     """Helper function to fetch data from a single endpoint"""
     try:
         # print(f"Trying endpoint: {api_url}")
-        response = requests.get(api_url, headers=headers, timeout=timeout)
+        response = http_get(api_url, headers=headers, timeout=timeout)
         # print(f"Response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -856,7 +857,7 @@ def get_event_details(event_code):
     api_url = f"{base_url}/v2.0/{season}/events?eventCode={event_code}"
     
     try:
-        response = requests.get(
+        response = http_get(
             api_url,
             headers=get_api_headers(),
             timeout=10
@@ -291,3 +291,92 @@ def stop_change_tracking_worker():
     global change_tracking_running, change_tracking_worker
     change_tracking_running = False
     # Do not join thread here (daemon) to avoid blocking shutdown
+
+
+# ---------------------------------------------------------------------------
+# Data version counters
+# ---------------------------------------------------------------------------
+# Per-table counters bumped after every committed ORM change.  They are cheap
+# to read, so read endpoints can build an ETag from them and answer 304 Not
+# Modified without running their queries.  Counters live in process memory;
+# writes made outside the ORM (raw SQL, other processes) are not seen, which
+# is why conditional_get also rotates ETags after a maximum age.
+
+_data_versions = {}
+_data_versions_lock = threading.Lock()
+_data_version_listeners_registered = False
+_data_version_observers = []
+
+
+def on_data_version_bump(callback):
+    """Call ``callback(names)`` after every bump; it must be cheap and must not raise."""
+    _data_version_observers.append(callback)
+
+
+def bump_data_version(*names):
+    """Increment the version counter of one or more tables / named resources."""
+    with _data_versions_lock:
+        for name in names:
+            if name:
+                _data_versions[name] = _data_versions.get(name, 0) + 1
+    for callback in _data_version_observers:
+        try:
+            callback(names)
+        except Exception:
+            pass
+
+
+def get_data_versions(names):
+    """Return a tuple of current version counters for ``names`` (in order)."""
+    with _data_versions_lock:
+        return tuple(_data_versions.get(name, 0) for name in names)
+
+
+def _table_name_for(obj):
+    table = getattr(type(obj), '__table__', None)
+    return getattr(table, 'name', None)
+
+
+def register_data_version_listeners():
+    """Hook Session events so every commit bumps the versions of the tables it touched."""
+    global _data_version_listeners_registered
+    if _data_version_listeners_registered:
+        return
+    from sqlalchemy.orm import Session
+
+    def _pending(session):
+        return session.info.setdefault('_data_version_tables', set())
+
+    @event.listens_for(Session, 'after_flush')
+    def _collect_flushed_tables(session, flush_context):
+        try:
+            pending = _pending(session)
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                name = _table_name_for(obj)
+                if name:
+                    pending.add(name)
+        except Exception:
+            pass
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _collect_bulk_tables(orm_execute_state):
+        # Query.update() / Query.delete() bypass flush events
+        try:
+            if orm_execute_state.is_update or orm_execute_state.is_delete:
+                mapper = orm_execute_state.bind_mapper
+                if mapper is not None:
+                    _pending(orm_execute_state.session).add(mapper.local_table.name)
+        except Exception:
+            pass
+
+    @event.listens_for(Session, 'after_commit')
+    def _bump_committed_tables(session):
+        tables = session.info.pop('_data_version_tables', None)
+        if tables:
+            bump_data_version(*tables)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _discard_rolled_back_tables(session):
+        session.info.pop('_data_version_tables', None)
+
+    _data_version_listeners_registered = True
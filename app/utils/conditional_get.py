@@ -0,0 +1,100 @@
+"""
+Conditional GET support (ETag / If-None-Match) for polled read endpoints.
+
+ETags are derived from the data version counters in ``change_tracking``,
+the mtimes of any config/state files the endpoint reads, and the caller's
+scope (user, team, query string).  When the client's ``If-None-Match``
+matches, the view is skipped entirely and a bodiless 304 is returned.
+"""
+import hashlib
+import os
+import secrets
+import time
+from functools import wraps
+
+from flask import request, make_response, current_app
+
+from app.utils.change_tracking import get_data_versions
+
+# Changes with every process start so counters reset by a restart never
+# reproduce an ETag that described different data.
+_PROCESS_NONCE = secrets.token_hex(4)
+
+# Upper bound on how long one ETag stays valid, as a safety net for writes
+# the in-process counters cannot see (raw SQL, other processes).
+DEFAULT_MAX_AGE = 300  # seconds
+
+# Tables that change which rows a team can see (alliance mode on/off, members)
+ALLIANCE_SCOPE_TABLES = ('team_alliance_status', 'scouting_alliance', 'scouting_alliance_member', 'scouting_alliance_event')
+
+
+def file_signature(paths):
+    """(mtime_ns, size) for each existing path; None for missing files."""
+    sig = []
+    for path in paths or ():
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def compute_etag(tables=(), files=(), scope=()):
+    """Build an opaque ETag value from data versions, file signatures and scope."""
+    try:
+        max_age = int(current_app.config.get('CONDITIONAL_GET_MAX_AGE', DEFAULT_MAX_AGE))
+    except Exception:
+        max_age = DEFAULT_MAX_AGE
+    bucket = int(time.time() // max_age) if max_age > 0 else 0
+    parts = (
+        _PROCESS_NONCE,
+        bucket,
+        tuple(tables),
+        get_data_versions(tables),
+        file_signature(files),
+        tuple(scope),
+    )
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def conditional_get(tables=(), files=None, scope=None):
+    """Decorator adding ETag / If-None-Match handling to a GET view.
+
+    ``tables``: table / resource names whose version counters the response depends on.
+    ``files``: optional callable returning file paths whose mtimes the response depends on.
+    ``scope``: optional callable returning values that identify the caller's view of the data.
+
+    Apply it inside the authentication decorator so ``scope`` can read the
+    authenticated user from the request.
+    """
+    tables = tuple(tables)
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+            try:
+                etag = compute_etag(
+                    tables,
+                    files() if files else (),
+                    tuple(scope()) + (request.full_path,) if scope else (request.full_path,),
+                )
+            except Exception as e:
+                current_app.logger.debug(f"conditional_get: could not compute ETag: {e}")
+                return f(*args, **kwargs)
+
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.headers.get('ETag'):
+                response.set_etag(etag)
+                response.headers.setdefault('Cache-Control', 'private, no-cache')
+            return response
+        return decorated_function
+    return decorator
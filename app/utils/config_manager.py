@@ -1,10 +1,12 @@
 import json
 import os
+import threading
 from flask import current_app
 from flask_login import current_user
 import shutil
 import copy
 from app.utils.event_code_utils import normalize_current_event_code_for_config
+from app.utils.change_tracking import bump_data_version
 
 # Map of (config_name, team_number) -> error message for configs that failed to parse
 CONFIG_LOAD_ERRORS = {}
@@ -102,6 +104,22 @@ class ConfigManager:
 def get_config_manager():
     return current_app.config['CONFIG_MANAGER']
 
+# Background workers acting for one scouting team (e.g. the API sync worker)
+# pin that team's game config on the current thread so API key lookups do not
+# race on the process-wide app.config['GAME_CONFIG'].
+_thread_config = threading.local()
+
+def set_thread_game_config(config):
+    """Pin *config* as the game config for API credential lookups on this thread."""
+    _thread_config.game_config = config
+
+def clear_thread_game_config():
+    _thread_config.game_config = None
+
+def get_thread_game_config():
+    """Game config pinned on this thread, or None."""
+    return getattr(_thread_config, 'game_config', None)
+
 def get_current_game_config():
     """Loads the game configuration for the current user's team."""
     team_number = None
@@ -146,6 +164,7 @@ def save_game_config(data, team_number=None):
                     pass
             with open(config_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            bump_data_version('game_config')
             return True
         except Exception:
             return False
@@ -158,6 +177,7 @@ def save_game_config(data, team_number=None):
 
     with open(team_config_path, 'w') as f:
         json.dump(data, f, indent=2)
+    bump_data_version('game_config')
     return True
 
 def get_current_pit_config():
@@ -187,6 +207,7 @@ def save_pit_config(data, team_number=None):
     # Persist with UTF-8 encoding
     with open(team_config_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    bump_data_version('pit_config')
     return True
 
 def load_config(config_name, team_number=None):
@@ -342,7 +363,7 @@ def get_id_to_perm_id_mapping(config=None):
 
 def get_effective_game_config():
     """Get the effective game config, considering alliance mode"""
-    from app.models import TeamAllianceStatus
+    from app.utils.request_scope import get_scope
     from flask_login import current_user
     
     # Get current team number
@@ -353,27 +374,12 @@ def get_effective_game_config():
     if not team_number:
         return get_current_game_config()
     
-    # Check if alliance mode is active for this team
-    active_alliance = TeamAllianceStatus.get_active_alliance_for_team(team_number)
-    
-    if active_alliance and active_alliance.is_config_complete():
-        # Use alliance's shared game config
-        if active_alliance.shared_game_config:
-            try:
-                return json.loads(active_alliance.shared_game_config)
-            except (json.JSONDecodeError, TypeError):
-                pass
-        
-        # Fallback to the alliance's configured team's config
-        if active_alliance.game_config_team:
-            return load_game_config(team_number=active_alliance.game_config_team)
-    
-    # Use team's own config
-    return get_current_game_config()
+    # Alliance shared config, the alliance's config team, or the team's own config
+    return get_scope(team_number).game_config()
 
 def get_effective_pit_config():
     """Get the effective pit config, considering alliance mode"""
-    from app.models import TeamAllianceStatus
+    from app.utils.request_scope import get_scope
     from flask_login import current_user
     
     # Get current team number
@@ -384,30 +390,9 @@ def get_effective_pit_config():
     if not team_number:
         return get_current_pit_config()
     
-    # Check if alliance mode is active for this team
-    active_alliance = TeamAllianceStatus.get_active_alliance_for_team(team_number)
-    
-    if active_alliance and active_alliance.is_config_complete():
-        # Use alliance's shared pit config
-        if active_alliance.shared_pit_config:
-            try:
-                # Merge shared config with default so missing option lists are preserved
-                shared = json.loads(active_alliance.shared_pit_config)
-                default = load_pit_config(team_number=None)
-                return merge_pit_configs(default, shared)
-            except (json.JSONDecodeError, TypeError):
-                pass
-        
-        # Fallback to the alliance's configured team's config
-        if active_alliance.pit_config_team:
-            team_cfg = load_pit_config(team_number=active_alliance.pit_config_team)
-            default = load_pit_config(team_number=None)
-            return merge_pit_configs(default, team_cfg)
-    
-    # Use team's own config
-    default = load_pit_config(team_number=None)
-    team_cfg = get_current_pit_config()
-    return merge_pit_configs(default, team_cfg)
+    # Alliance shared config, the alliance's config team, or the team's own config,
+    # each merged over the default pit config
+    return get_scope(team_number).pit_config()
 
 
 def merge_pit_configs(base_config, override_config):
@@ -495,7 +480,7 @@ def merge_pit_configs(base_config, override_config):
 
 def is_alliance_mode_active():
     """Check if alliance mode is currently active for the current user's team"""
-    from app.models import TeamAllianceStatus
+    from app.utils.request_scope import get_scope
     from flask_login import current_user
     
     team_number = None
@@ -506,11 +491,11 @@ def is_alliance_mode_active():
     if team_number is None:
         return False
     
-    return TeamAllianceStatus.is_alliance_mode_active_for_team(team_number)
+    return get_scope(team_number).alliance_active
 
 def get_active_alliance_info():
     """Get information about the currently active alliance"""
-    from app.models import TeamAllianceStatus
+    from app.utils.request_scope import get_scope
     from flask_login import current_user
     
     team_number = None
@@ -520,17 +505,8 @@ def get_active_alliance_info():
     if not team_number:
         return None
     
-    active_alliance = TeamAllianceStatus.get_active_alliance_for_team(team_number)
-    if active_alliance:
-        return {
-            'alliance_id': active_alliance.id,
-            'alliance_name': active_alliance.alliance_name,
-            'game_config_team': active_alliance.game_config_team,
-            'pit_config_team': active_alliance.pit_config_team,
-            'config_status': active_alliance.config_status
-        }
-    
-    return None
+    info = get_scope(team_number).alliance_info
+    return dict(info) if info else None
 
 def get_available_default_configs():
     """Get list of available default configuration files"""
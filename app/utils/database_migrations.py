@@ -84,7 +84,7 @@ def run_column_alterations(db):
 # MIGRATION DEFINITIONS
 # ==============================================================================
 # Each entry is (table_name, column_name, sql_type_and_default, bind_key)
-# bind_key can be: None (default db), 'users', 'misc', 'pages', 'apis'
+# bind_key can be: None (default db), 'users', 'misc', 'pages', 'apis', 'images'
 # 
 # When adding new columns to models, add the migration here to support
 # automatic upgrade of existing databases.
@@ -111,6 +111,7 @@ MIGRATIONS = [
     ('event', 'offset_updated_at', 'DATETIME', None),
     ('event', 'code', 'VARCHAR(20)', None),
     ('event', 'scouting_team_number', 'INTEGER', None),
+    ('event', 'updated_at', 'DATETIME', None),
     
     # -------------------------------------------------------------------------
     # Match table migrations (default bind)
@@ -120,11 +121,13 @@ MIGRATIONS = [
     ('match', 'actual_time', 'DATETIME', None),
     ('match', 'winner', 'VARCHAR(10)', None),
     ('match', 'scouting_team_number', 'INTEGER', None),
+    ('match', 'updated_at', 'DATETIME', None),
     
     # -------------------------------------------------------------------------
     # Team table migrations (default bind)
     # -------------------------------------------------------------------------
     ('team', 'scouting_team_number', 'INTEGER', None),
+    ('team', 'updated_at', 'DATETIME', None),
     
     # -------------------------------------------------------------------------
     # Match table migrations (default bind)
@@ -138,6 +141,7 @@ MIGRATIONS = [
     # -------------------------------------------------------------------------
     ('scouting_data', 'scouting_team_number', 'INTEGER', None),
     ('scouting_data', 'scout_id', 'INTEGER', None),
+    ('scouting_data', 'change_seq', 'BIGINT', None),
     
     # -------------------------------------------------------------------------
     # PitScoutingData table migrations (default bind)
@@ -148,6 +152,12 @@ MIGRATIONS = [
     ('pit_scouting_data', 'is_uploaded', 'BOOLEAN DEFAULT 0', None),
     ('pit_scouting_data', 'upload_timestamp', 'DATETIME', None),
     ('pit_scouting_data', 'device_id', 'VARCHAR(100)', None),
+    ('pit_scouting_data', 'change_seq', 'BIGINT', None),
+
+    # -------------------------------------------------------------------------
+    # QualitativeScoutingData table migrations (default bind)
+    # -------------------------------------------------------------------------
+    ('qualitative_scouting_data', 'change_seq', 'BIGINT', None),
     
     # -------------------------------------------------------------------------
     # ScoutingTeamSettings table migrations (default bind)
@@ -224,6 +234,7 @@ MIGRATIONS = [
     ('alliance_shared_scouting_data', 'scout_id', 'INTEGER', None),
     ('alliance_shared_scouting_data', 'last_edited_by_team', 'INTEGER', None),
     ('alliance_shared_scouting_data', 'last_edited_at', 'DATETIME', None),
+    ('alliance_shared_scouting_data', 'is_link', 'BOOLEAN DEFAULT 0', None),
     
     # -------------------------------------------------------------------------
     # AllianceSharedPitData table migrations (default bind)
@@ -231,6 +242,13 @@ MIGRATIONS = [
     ('alliance_shared_pit_data', 'scout_id', 'INTEGER', None),
     ('alliance_shared_pit_data', 'last_edited_by_team', 'INTEGER', None),
     ('alliance_shared_pit_data', 'last_edited_at', 'DATETIME', None),
+    ('alliance_shared_pit_data', 'is_link', 'BOOLEAN DEFAULT 0', None),
+    
+    # -------------------------------------------------------------------------
+    # AllianceSharedQualitativeData / AllianceDataGrant migrations (default bind)
+    # -------------------------------------------------------------------------
+    ('alliance_shared_qualitative_data', 'is_link', 'BOOLEAN DEFAULT 0', None),
+    ('alliance_data_grant', 'granted_seq', 'BIGINT', None),
     
     # -------------------------------------------------------------------------
     # TeamAllianceStatus table migrations (default bind)
@@ -323,6 +341,13 @@ MIGRATIONS = [
     ('device_token', 'updated_at', 'DATETIME', 'misc'),
     ('notification_queue', 'updated_at', 'DATETIME', 'misc'),
 
+    # -------------------------------------------------------------------------
+    # PitScoutingImage table migrations (images bind)
+    # -------------------------------------------------------------------------
+    ('pit_scouting_image', 'status', "VARCHAR(20) DEFAULT 'ready'", 'images'),
+    ('pit_scouting_image', 'webp_data', 'BLOB', 'images'),
+    ('pit_scouting_image', 'avif_data', 'BLOB', 'images'),
+
     # -------------------------------------------------------------------------
     # StatboticsCache table migrations (default bind)
     # -------------------------------------------------------------------------
@@ -389,6 +414,8 @@ def add_column(engine, table_name, column_name, column_sql):
         # Boolean default values must use TRUE/FALSE
         col_sql = col_sql.replace('BOOLEAN DEFAULT 0', 'BOOLEAN DEFAULT FALSE')
         col_sql = col_sql.replace('BOOLEAN DEFAULT 1', 'BOOLEAN DEFAULT TRUE')
+        # Binary columns are BYTEA
+        col_sql = col_sql.replace('BLOB', 'BYTEA')
     elif 'sqlite' in dialect:
         # SQLite tolerates the original SQL verbatim
         pass
@@ -502,6 +529,34 @@ def run_all_migrations(db):
             print("  Data migration: copied last_login -> last_used for users")
     except Exception as e:
         print(f"  Warning: could not migrate last_login to last_used: {e}")
+
+    # Stamp rows that predate updated_at with the migration time, so an
+    # incremental export since an earlier time still includes them
+    try:
+        from datetime import datetime, timezone
+        engine = get_engine_for_bind(db, None)
+        stamp = datetime.now(timezone.utc).replace(tzinfo=None)
+        stamped = 0
+        with engine.begin() as conn:
+            for table_name in ('team', 'event', 'match'):
+                if 'updated_at' in (get_table_columns(engine, table_name) or ()):
+                    statement = db.text(
+                        f'UPDATE "{table_name}" SET updated_at = :stamp WHERE updated_at IS NULL'
+                    ).bindparams(db.bindparam('stamp', type_=db.DateTime))
+                    stamped += conn.execute(statement, {'stamp': stamp}).rowcount or 0
+        if stamped:
+            print(f"  Data migration: stamped updated_at on {stamped} team/event/match rows")
+    except Exception as e:
+        print(f"  Warning: could not backfill updated_at: {e}")
+
+    # Turn alliance shared copies that still match their original into links
+    try:
+        from app.utils.alliance_links import relink_identical_copies
+        relinked = relink_identical_copies(get_engine_for_bind(db, None))
+        if relinked:
+            print(f"  Data migration: linked {relinked} alliance shared copies to their originals")
+    except Exception as e:
+        print(f"  Warning: could not link alliance shared copies: {e}")
     
     return total_columns_added
 
@@ -1,5 +1,6 @@
 import os
 import json
+from contextlib import contextmanager
 from flask import current_app
 from flask_mail import Mail, Message
 import smtplib
@@ -165,18 +166,8 @@ def _build_html_email(subject, body, from_addr=None, to_list=None):
         return html
 
 
-def send_email(to, subject, body, html=None, from_addr=None, bypass_user_opt_out=False, reply_to=None):
-    """Send an email using Flask-Mail configured from instance/email_config.json.
-
-    `to` may be a string or list of addresses.
-    `reply_to` may be provided to allow recipients to reply directly to the given address.
-    Returns (success: bool, message: str)
-    """
-    cfg = load_email_config()
-    if not cfg or not cfg.get('host'):
-        return False, 'Email not configured'
-
-    # Map file-backed config into Flask-Mail app.config keys (overwrite to ensure latest values)
+def _apply_mail_config(cfg):
+    """Map file-backed config into Flask-Mail app.config keys (overwrite to ensure latest values)."""
     host = (cfg.get('host') or '').strip()
     port_val = cfg.get('port')
     username_val = (cfg.get('username') or '').strip()
@@ -204,6 +195,40 @@ def send_email(to, subject, body, html=None, from_addr=None, bypass_user_opt_out
     except Exception:
         pass
 
+
+@contextmanager
+def mail_connection():
+    """Open one SMTP session for sending many messages.
+
+    Yields a Flask-Mail connection to pass to ``send_email(connection=...)``,
+    or ``None`` when email is not configured.  Flask-Mail reconnects on its
+    own after ``MAIL_MAX_EMAILS`` messages when that is set.
+    """
+    cfg = load_email_config()
+    if not cfg or not cfg.get('host'):
+        yield None
+        return
+    _apply_mail_config(cfg)
+    with _ensure_mail_extension().connect() as conn:
+        yield conn
+
+
+def send_email(to, subject, body, html=None, from_addr=None, bypass_user_opt_out=False, reply_to=None,
+               connection=None):
+    """Send an email using Flask-Mail configured from instance/email_config.json.
+
+    `to` may be a string or list of addresses.
+    `reply_to` may be provided to allow recipients to reply directly to the given address.
+    `connection` may be an open connection from ``mail_connection()``; otherwise
+    a new SMTP session is opened for this message.
+    Returns (success: bool, message: str)
+    """
+    if connection is None:
+        cfg = load_email_config()
+        if not cfg or not cfg.get('host'):
+            return False, 'Email not configured'
+        _apply_mail_config(cfg)
+
     # Prepare recipients list
     if isinstance(to, str):
         recipients = [to]
@@ -266,7 +291,6 @@ def send_email(to, subject, body, html=None, from_addr=None, bypass_user_opt_out
 
     # Create Mail instance (or reuse) and send message
     try:
-        mail = _ensure_mail_extension()
         msg = Message(subject=subject,
                       recipients=recipients,
                       body=body,
@@ -274,7 +298,10 @@ def send_email(to, subject, body, html=None, from_addr=None, bypass_user_opt_out
                       reply_to=reply_to)
         if html:
             msg.html = html
-        mail.send(msg)
+        if connection is not None:
+            connection.send(msg)
+        else:
+            _ensure_mail_extension().send(msg)
         return True, 'Email sent' 
     except Exception as e:
         # Return exception type and message for clearer diagnostics
@@ -1,7 +1,8 @@
 """
 EPA (Statbotics) Data Refresh Scheduler
-Periodically refreshes cached Statbotics EPA data for all teams so the
-values stay up-to-date without the user ever hitting a slow API call.
+Periodically refreshes cached Statbotics EPA data for teams attending
+current events so the values stay up-to-date without the user ever
+hitting a slow API call.
 
 Follows the same daemon-thread scheduler pattern used by
 ``catchup_scheduler.py``.
@@ -9,7 +10,7 @@ Follows the same daemon-thread scheduler pattern used by
 import threading
 import time
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from app import db
 
@@ -18,6 +19,10 @@ logger = logging.getLogger(__name__)
 # Default interval: refresh every 10 minutes
 _DEFAULT_REFRESH_INTERVAL = 600  # seconds
 
+# Events whose dates overlap [today - BEFORE, today + AHEAD] are "in window"
+_DEFAULT_WINDOW_DAYS_BEFORE = 2
+_DEFAULT_WINDOW_DAYS_AHEAD = 7
+
 
 class EPARefreshScheduler:
     """Background thread that periodically refreshes Statbotics EPA data."""
@@ -80,7 +85,13 @@ class EPARefreshScheduler:
 
     # ------------------------------------------------------------------
     def _refresh(self):
-        """Refresh EPA data for teams attached to events in the active season year."""
+        """Refresh EPA data for teams attending events in the current window.
+
+        Uses the Statbotics listing endpoints (one ``/team_years`` pass per
+        season plus one ``/team_matches`` pass per in-window event) instead
+        of a request per team.  When no event of the active season falls in
+        the window, every team of the season is refreshed instead.
+        """
         if not self.app:
             return
 
@@ -93,35 +104,11 @@ class EPARefreshScheduler:
             except Exception:
                 season_year = datetime.now(timezone.utc).year
 
-            # Gather distinct team numbers from events in the active season.
             try:
-                from app.models import Team, Event, Match, team_event
-                team_numbers = {
-                    int(r[0]) for r in (
-                        db.session.query(Team.team_number)
-                        .join(team_event, Team.id == team_event.c.team_id)
-                        .join(Event, Event.id == team_event.c.event_id)
-                        .filter(Event.year == int(season_year))
-                        .distinct()
-                        .all()
-                    ) if r and r[0] is not None
-                }
-
-                # Supplement from match alliance strings for events where team_event links are incomplete.
-                match_rows = (
-                    db.session.query(Match.red_alliance, Match.blue_alliance)
-                    .join(Event, Event.id == Match.event_id)
-                    .filter(Event.year == int(season_year))
-                    .all()
-                )
-                for red_alliance, blue_alliance in match_rows:
-                    for side in (red_alliance, blue_alliance):
-                        if not side:
-                            continue
-                        for token in str(side).split(','):
-                            token = token.strip()
-                            if token.isdigit():
-                                team_numbers.add(int(token))
+                from app.models import Event
+                season_events = Event.query.filter(Event.year == int(season_year)).all()
+                window_events = self._events_in_window(season_events)
+                team_numbers = _teams_for_events(window_events or season_events)
             except Exception:
                 logger.exception("EPA refresh: failed to query teams from %s events", season_year)
                 return
@@ -130,41 +117,100 @@ class EPARefreshScheduler:
                 logger.info("EPA refresh: no teams found for %s events", season_year)
                 return
 
+            event_keys = sorted({k for k in (_statbotics_event_key(e) for e in window_events) if k})
             logger.info(
-                "EPA refresh: updating %d teams from %s events...",
+                "EPA refresh: updating %d teams (%s) and %d in-window events...",
                 len(team_numbers),
-                season_year,
+                f"{len(window_events)} events in window" if window_events else f"all {season_year} events",
+                len(event_keys),
             )
 
             from app.utils.statbotics_api_utils import (
-                get_statbotics_team_epa,
+                refresh_statbotics_bulk,
                 clear_epa_caches,
+                StatboticsError,
             )
 
-            # Clear in-memory cache so fresh data is fetched from the API
-            # (DB-level cache rows will be overwritten by the fetch loop)
-            clear_epa_caches()
+            try:
+                summary = refresh_statbotics_bulk(team_numbers, season_year, event_keys)
+            except StatboticsError as e:
+                # Leave the existing cache rows alone; the next cycle retries.
+                logger.warning("EPA refresh: Statbotics bulk fetch failed: %s", e)
+                return
 
-            updated = 0
-            failed = 0
-            for tn in sorted(team_numbers):
-                try:
-                    result = get_statbotics_team_epa(tn, use_cache=False)
-                    if result:
-                        updated += 1
-                    else:
-                        failed += 1
-                except Exception:
-                    failed += 1
-                # Small sleep to avoid hammering the Statbotics API
-                time.sleep(0.25)
+            # Drop in-memory entries so the next read picks up the new DB rows
+            clear_epa_caches()
 
             self.last_refresh = datetime.now(timezone.utc)
             logger.info(
-                "EPA refresh complete: %d updated, %d no-data (of %d)",
-                updated, failed, len(team_numbers),
+                "EPA refresh complete: %d updated, %d no-data (of %d); %d events, %d match rows",
+                summary['updated'], summary['missing'], summary['teams'],
+                summary['events'], summary['match_rows'],
             )
 
+    def _events_in_window(self, events):
+        """Events whose dates overlap [today - before, today + ahead]."""
+        before = int(self.app.config.get('EPA_REFRESH_WINDOW_DAYS_BEFORE', _DEFAULT_WINDOW_DAYS_BEFORE))
+        ahead = int(self.app.config.get('EPA_REFRESH_WINDOW_DAYS_AHEAD', _DEFAULT_WINDOW_DAYS_AHEAD))
+        today = datetime.now(timezone.utc).date()
+        window_start = today - timedelta(days=before)
+        window_end = today + timedelta(days=ahead)
+        selected = []
+        for event in events:
+            start = event.start_date or event.end_date
+            end = event.end_date or event.start_date
+            if start is None:
+                continue
+            if start <= window_end and end >= window_start:
+                selected.append(event)
+        return selected
+
+
+def _teams_for_events(events):
+    """Distinct team numbers attending *events* (team links plus match alliances)."""
+    from app.models import Team, Match, team_event
+
+    event_ids = [e.id for e in events]
+    if not event_ids:
+        return set()
+
+    team_numbers = {
+        int(r[0]) for r in (
+            db.session.query(Team.team_number)
+            .join(team_event, Team.id == team_event.c.team_id)
+            .filter(team_event.c.event_id.in_(event_ids))
+            .distinct()
+            .all()
+        ) if r and r[0] is not None
+    }
+
+    # Supplement from match alliance strings for events where team_event links are incomplete.
+    match_rows = (
+        db.session.query(Match.red_alliance, Match.blue_alliance)
+        .filter(Match.event_id.in_(event_ids))
+        .all()
+    )
+    for red_alliance, blue_alliance in match_rows:
+        for side in (red_alliance, blue_alliance):
+            if not side:
+                continue
+            for token in str(side).split(','):
+                token = token.strip()
+                if token.isdigit():
+                    team_numbers.add(int(token))
+    return team_numbers
+
+
+def _statbotics_event_key(event):
+    """Full Statbotics event key (e.g. ``2024cabl``) for a local Event row."""
+    code = str(event.code or '').strip().lower()
+    if not code:
+        return None
+    year_str = str(event.year or '')
+    if year_str and code.startswith(year_str):
+        return code
+    return f"{year_str}{code}"
+
 
 # ------------------------------------------------------------------
 # Module-level singleton
@@ -0,0 +1,381 @@
+"""
+Rolling per-event, per-day match aggregates for end-of-day summaries.
+
+``create_end_of_day_summary`` and ``schedule_end_of_day_summaries`` used to
+re-read every match of an event, resolve each one's time (with an Event
+lookup per match) and recompute winners, margins, close matches, offsets
+and win counts on every call, for every subscribing team.
+
+``EventAggregate`` keeps one ``DayAggregate`` per local date of an event.
+Each day holds a record per match plus the running aggregates, updated
+as single matches are added, changed or removed.  The aggregates are built
+once per event from the database and then kept current by session hooks:
+
+- a committed insert/update of a match (e.g. a score arriving through the
+  API sync) replaces just that match's record
+- deleted matches are removed
+- a changed event timezone, or a bulk ``Query.update``/``delete`` on
+  matches, drops the cached aggregates so they are rebuilt
+
+Readers get a plain snapshot (``DayAggregate.snapshot``) to format.
+"""
+import bisect
+import math
+import threading
+from datetime import timezone
+from types import SimpleNamespace
+
+from app.utils.score_utils import norm_db_score
+from app.utils.tiered_cache import TieredCache
+
+# Matches decided by at most this many points count as close
+CLOSE_MARGIN = 10
+
+MATCH_TABLE = 'match'
+EVENT_TABLE = 'event'
+
+_AGGREGATES = TieredCache('event_day_summaries', maxsize=256, ttl=3600)
+_listeners_registered = False
+
+
+def _remove_sorted(values, item):
+    pos = bisect.bisect_left(values, item)
+    if pos < len(values) and values[pos] == item:
+        del values[pos]
+
+
+def match_time_utc(scheduled_time, predicted_time, event_tz):
+    """Best known match time as aware UTC, mirroring ``get_match_time``.
+
+    Naive stored times are treated as event-local when the event has a
+    timezone, otherwise as UTC.
+    """
+    from app.utils.timezone_utils import convert_local_to_utc
+
+    match_time = predicted_time or scheduled_time
+    if match_time is None:
+        return None
+    if match_time.tzinfo is None:
+        if event_tz:
+            try:
+                return convert_local_to_utc(match_time, event_tz)
+            except Exception:
+                pass
+        return match_time.replace(tzinfo=timezone.utc)
+    return match_time
+
+
+def match_record(match, event_tz):
+    """Aggregate record for one match, or None when it has no known time."""
+    match_time = match_time_utc(match.scheduled_time, match.predicted_time, event_tz)
+    if match_time is None:
+        return None
+    red = norm_db_score(match.red_score)
+    blue = norm_db_score(match.blue_score)
+    completed = red is not None and blue is not None
+    offset = None
+    try:
+        if match.scheduled_time and match.predicted_time:
+            offset = (match.predicted_time - match.scheduled_time).total_seconds() / 60.0
+    except Exception:
+        offset = None
+    winners = []
+    if completed and match.winner in ('red', 'blue'):
+        winners = match.red_teams if match.winner == 'red' else match.blue_teams
+    return {
+        'id': match.id,
+        'match_type': match.match_type,
+        'match_number': match.match_number,
+        'time': match_time,
+        'red': red,
+        'blue': blue,
+        'winner': match.winner,
+        'completed': completed,
+        'total': (red + blue) if completed else None,
+        'margin': abs(red - blue) if completed else None,
+        'teams': match.red_teams + match.blue_teams,
+        'winners': winners,
+        'offset': offset,
+    }
+
+
+def _match_fields(match):
+    """Detached copy of the columns ``match_record`` reads.
+
+    Taken at flush time: the instance is expired once the commit finishes.
+    """
+    return SimpleNamespace(
+        id=match.id,
+        event_id=match.event_id,
+        match_type=match.match_type,
+        match_number=match.match_number,
+        scheduled_time=match.scheduled_time,
+        predicted_time=match.predicted_time,
+        red_score=match.red_score,
+        blue_score=match.blue_score,
+        winner=match.winner,
+        red_teams=match.red_teams,
+        blue_teams=match.blue_teams,
+    )
+
+
+class DayAggregate:
+    """Match records and running aggregates for one event on one local date."""
+
+    def __init__(self):
+        self.records = {}
+        self._order = []       # (time, id), chronological
+        self._scored = []      # (-total, time, id): highest scoring first
+        self._totals = []      # sorted completed totals
+        self._close = []       # (margin, time, id) for close matches
+        self._missing = []     # (time, id) for matches without scores
+        self._offsets = []     # sorted schedule offsets (minutes)
+        self.total_sum = 0
+        self.total_sq = 0
+        self.win_counts = {}
+        self.team_counts = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record):
+        self.discard(record['id'])
+        self.records[record['id']] = record
+        order_key = (record['time'], record['id'])
+        bisect.insort(self._order, order_key)
+        if record['completed']:
+            total = record['total']
+            bisect.insort(self._scored, (-total, record['time'], record['id']))
+            bisect.insort(self._totals, total)
+            self.total_sum += total
+            self.total_sq += total * total
+            if record['margin'] <= CLOSE_MARGIN:
+                bisect.insort(self._close, (record['margin'], record['time'], record['id']))
+        else:
+            bisect.insort(self._missing, order_key)
+        if record['offset'] is not None:
+            bisect.insort(self._offsets, record['offset'])
+        for team in record['winners']:
+            self.win_counts[team] = self.win_counts.get(team, 0) + 1
+        for team in record['teams']:
+            self.team_counts[team] = self.team_counts.get(team, 0) + 1
+
+    def discard(self, match_id):
+        record = self.records.pop(match_id, None)
+        if record is None:
+            return
+        order_key = (record['time'], record['id'])
+        _remove_sorted(self._order, order_key)
+        if record['completed']:
+            total = record['total']
+            _remove_sorted(self._scored, (-total, record['time'], record['id']))
+            _remove_sorted(self._totals, total)
+            self.total_sum -= total
+            self.total_sq -= total * total
+            if record['margin'] <= CLOSE_MARGIN:
+                _remove_sorted(self._close, (record['margin'], record['time'], record['id']))
+        else:
+            _remove_sorted(self._missing, order_key)
+        if record['offset'] is not None:
+            _remove_sorted(self._offsets, record['offset'])
+        for counts, teams in ((self.win_counts, record['winners']), (self.team_counts, record['teams'])):
+            for team in teams:
+                counts[team] -= 1
+                if counts[team] <= 0:
+                    del counts[team]
+
+    def last_match(self):
+        """Record of the day's latest match, or None."""
+        return self.records[self._order[-1][1]] if self._order else None
+
+    def snapshot(self, close_limit=5, missing_limit=8, wins_limit=10):
+        """Plain dict of the day's aggregates, ready to format."""
+        completed = len(self._totals)
+        out = {
+            'matches': [self.records[mid] for _, mid in self._order],
+            'match_count': len(self.records),
+            'completed': completed,
+            'highest': self.records[self._scored[0][2]] if self._scored else None,
+            'avg_total': None,
+            'median_total': None,
+            'stdev_total': None,
+            'close_count': len(self._close),
+            'close': [self.records[mid] for _, _, mid in self._close[:close_limit]],
+            'missing_count': len(self._missing),
+            'missing': [self.records[mid] for _, mid in self._missing[:missing_limit]],
+            'teams': sorted(self.team_counts),
+            'top_wins': sorted(self.win_counts.items(), key=lambda x: (-x[1], x[0]))[:wins_limit],
+            'offsets': None,
+        }
+        if completed:
+            mean = self.total_sum / completed
+            mid = completed // 2
+            if completed % 2:
+                median = self._totals[mid]
+            else:
+                median = (self._totals[mid - 1] + self._totals[mid]) / 2
+            out['avg_total'] = mean
+            out['median_total'] = median
+            out['stdev_total'] = math.sqrt(max(0.0, self.total_sq / completed - mean * mean)) if completed > 1 else 0
+        if self._offsets:
+            out['offsets'] = {
+                'avg': sum(self._offsets) / len(self._offsets),
+                'min': self._offsets[0],
+                'max': self._offsets[-1],
+            }
+        return out
+
+
+class EventAggregate:
+    """Day aggregates for every local date of one event."""
+
+    def __init__(self, event_id, event_tz):
+        self.event_id = event_id
+        self.event_tz = event_tz
+        self.days = {}
+        self._day_of = {}  # match id -> local date
+        self.lock = threading.Lock()
+
+    def local_date(self, when):
+        from app.utils.timezone_utils import convert_utc_to_local
+        return convert_utc_to_local(when, self.event_tz).date()
+
+    def apply(self, match_id, record):
+        """Replace (or with ``record=None`` remove) one match's record."""
+        with self.lock:
+            day = self._day_of.pop(match_id, None)
+            if day is not None and day in self.days:
+                self.days[day].discard(match_id)
+                if not self.days[day]:
+                    del self.days[day]
+            if record is None:
+                return
+            try:
+                day = self.local_date(record['time'])
+            except Exception:
+                return
+            self.days.setdefault(day, DayAggregate()).add(record)
+            self._day_of[match_id] = day
+
+    def day_of(self, match_id):
+        return self._day_of.get(match_id)
+
+    def snapshot(self, day):
+        with self.lock:
+            aggregate = self.days.get(day)
+            return aggregate.snapshot() if aggregate is not None else None
+
+    def last_match(self, day):
+        with self.lock:
+            aggregate = self.days.get(day)
+            return aggregate.last_match() if aggregate is not None else None
+
+
+def _build(event):
+    from app.models import Match
+
+    aggregate = EventAggregate(event.id, event.timezone)
+    for match in Match.query.filter_by(event_id=event.id).all():
+        try:
+            aggregate.apply(match.id, match_record(match, event.timezone))
+        except Exception as e:
+            print(f"  Skipping match {match.id} in day summary for event {event.id}: {e}")
+    return aggregate
+
+
+def get_event_aggregate(event):
+    """Cached ``EventAggregate`` for ``event``, built on first use."""
+    return _AGGREGATES.get_or_load(event.id, lambda: _build(event))
+
+
+def get_day_snapshot(event, match):
+    """Aggregates for the local day containing ``match``, or None."""
+    aggregate = get_event_aggregate(event)
+    day = aggregate.day_of(match.id)
+    return aggregate.snapshot(day) if day is not None else None
+
+
+def invalidate_event(event_id=None):
+    """Drop the cached aggregates for ``event_id`` (all events when ``None``)."""
+    if event_id is None:
+        _AGGREGATES.clear()
+    else:
+        _AGGREGATES.delete(event_id)
+
+
+def register_event_day_listeners():
+    """Hook Session events so committed match changes update the aggregates."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from sqlalchemy import event, inspect
+    from sqlalchemy.orm import Session
+
+    def _changes(session):
+        return session.info.setdefault('_event_day_changes', {'matches': {}, 'events': set(), 'all': False})
+
+    @event.listens_for(Session, 'after_flush')
+    def _collect_match_changes(session, flush_context):
+        try:
+            changes = None
+            for obj in list(session.new) + list(session.dirty):
+                table = getattr(type(obj), '__tablename__', None)
+                if table == MATCH_TABLE:
+                    changes = changes or _changes(session)
+                    changes['matches'][obj.id] = (obj.event_id, _match_fields(obj))
+                elif table == EVENT_TABLE and obj in session.dirty:
+                    if inspect(obj).attrs.timezone.history.has_changes():
+                        changes = changes or _changes(session)
+                        changes['events'].add(obj.id)
+            for obj in session.deleted:
+                table = getattr(type(obj), '__tablename__', None)
+                if table == MATCH_TABLE:
+                    changes = changes or _changes(session)
+                    changes['matches'][obj.id] = (obj.event_id, None)
+                elif table == EVENT_TABLE:
+                    changes = changes or _changes(session)
+                    changes['events'].add(obj.id)
+        except Exception:
+            pass
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _collect_bulk_match_changes(orm_execute_state):
+        try:
+            if orm_execute_state.is_update or orm_execute_state.is_delete:
+                mapper = orm_execute_state.bind_mapper
+                if mapper is not None and mapper.local_table.name in (MATCH_TABLE, EVENT_TABLE):
+                    _changes(orm_execute_state.session)['all'] = True
+        except Exception:
+            pass
+
+    @event.listens_for(Session, 'after_commit')
+    def _apply_match_changes(session):
+        changes = session.info.pop('_event_day_changes', None)
+        if not changes:
+            return
+        if changes['all']:
+            invalidate_event()
+            return
+        for event_id in changes['events']:
+            invalidate_event(event_id)
+        if not changes['matches']:
+            return
+        cached = {key: _AGGREGATES.get(key, None) for key in _AGGREGATES.keys()}
+        for match_id, (event_id, match) in changes['matches'].items():
+            for key, aggregate in cached.items():
+                if aggregate is None:
+                    continue
+                if key == event_id and match is not None:
+                    try:
+                        aggregate.apply(match_id, match_record(match, aggregate.event_tz))
+                    except Exception:
+                        invalidate_event(key)
+                elif aggregate.day_of(match_id) is not None:
+                    # Deleted, or moved to another event
+                    aggregate.apply(match_id, None)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _discard_match_changes(session):
+        session.info.pop('_event_day_changes', None)
+
+    _listeners_registered = True
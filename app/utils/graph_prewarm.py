@@ -0,0 +1,222 @@
+"""
+Graph cache prewarm scheduler.
+
+The /graphs metrics and EPA caches (``app.routes.graphs``) have a 10 minute
+TTL.  When alliance selection starts the whole drive team opens the graphs
+pages at once; if the current event's entries have just lapsed every one
+of those requests waits on a cold computation.  This worker periodically
+recomputes entries that belong to a scouting team's current event shortly
+before they expire, so those keys stay hot.  Metrics keys carry the
+scouting team, alliance and config they were computed for; each is
+recomputed under that scouting team's scope, and keys the worker cannot
+reproduce are left to expire.  Recomputes go through the cache's
+single-flight loader, so a viewer asking for the same key at the same
+moment shares the result instead of computing it again.
+
+Follows the same daemon-thread scheduler pattern used by
+``epa_scheduler.py``.
+"""
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_INTERVAL = 60  # seconds between passes
+# Refresh entries that would expire within this many seconds
+_DEFAULT_LEAD_SECONDS = 150
+
+
+class GraphCachePrewarmer:
+    """Background thread that keeps current-event graph cache entries warm."""
+
+    def __init__(self, app=None):
+        self.app = app
+        self.running = False
+        self.thread = None
+        self.interval = _DEFAULT_INTERVAL
+        self.lead_seconds = _DEFAULT_LEAD_SECONDS
+        self.last_run = None
+
+        if app:
+            self.init_app(app)
+
+    # ------------------------------------------------------------------
+    def init_app(self, app):
+        """Bind to a Flask app and start the prewarm loop."""
+        self.app = app
+        self.start()
+
+    # ------------------------------------------------------------------
+    def start(self):
+        if self.running:
+            logger.debug("Graph cache prewarmer already running")
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        logger.info("Graph cache prewarmer started (interval %ds)", self.interval)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=5)
+        logger.info("Graph cache prewarmer stopped")
+
+    # ------------------------------------------------------------------
+    def _loop(self):
+        while self.running:
+            # Sleep in small increments so stop() doesn't hang
+            for _ in range(int(self.interval)):
+                if not self.running:
+                    return
+                time.sleep(1)
+            try:
+                self.prewarm()
+            except Exception:
+                logger.exception("Graph cache prewarm cycle failed")
+
+    # ------------------------------------------------------------------
+    def prewarm(self):
+        """Recompute current-event graph cache entries that are about to expire.
+
+        Returns ``{'metrics': n, 'epa': n}`` refreshed key counts.
+        """
+        if not self.app:
+            return {'metrics': 0, 'epa': 0}
+
+        with self.app.app_context():
+            from app.routes.graphs import (
+                _GRAPH_METRICS_CACHE, _GRAPH_EPA_CACHE, _get_epa_metrics_cached,
+                _team_metrics_cache_key, _config_digest,
+            )
+            from app.utils.analysis import calculate_team_metrics, get_current_epa_source
+            from app.utils.team_isolation import scouting_team_scope
+
+            metrics_keys = _GRAPH_METRICS_CACHE.expiring_keys(self.lead_seconds)
+            epa_keys = _GRAPH_EPA_CACHE.expiring_keys(self.lead_seconds)
+            if not metrics_keys and not epa_keys:
+                return {'metrics': 0, 'epa': 0}
+
+            current = current_event_teams()
+            try:
+                epa_source = get_current_epa_source() or 'scouted_only'
+            except Exception:
+                epa_source = 'scouted_only'
+
+            refreshed_metrics = 0
+            for key in metrics_keys:
+                team_id, event_id, _source, scouting_team_number, _alliance_id, (_versions, digest) = key
+                if team_id not in current['team_ids']:
+                    continue
+                if event_id and event_id not in current['event_ids']:
+                    continue
+                if scouting_team_number not in current['scouting_teams']:
+                    continue
+                # The entry was computed with either the scope's effective config
+                # (no digest) or the scouting team's own, passed explicitly
+                team_config = current['scouting_teams'][scouting_team_number]
+                if digest is None:
+                    game_config = None
+                elif digest == _config_digest(team_config):
+                    game_config = team_config
+                else:
+                    continue
+                try:
+                    with scouting_team_scope(scouting_team_number):
+                        # Only refresh keys this scope reproduces (same alliance,
+                        # EPA source and config versions as when cached)
+                        if _team_metrics_cache_key(team_id, event_id or None, game_config) != key:
+                            continue
+                        _GRAPH_METRICS_CACHE.get_or_load(
+                            key,
+                            lambda t=team_id, e=event_id, c=game_config: calculate_team_metrics(
+                                t, event_id=e or None, game_config=c),
+                            force=True)
+                    refreshed_metrics += 1
+                except Exception as e:
+                    logger.debug("Graph prewarm failed for metrics key %r: %s", key, e)
+
+            refreshed_epa = 0
+            for team_number, source in epa_keys:
+                if team_number not in current['team_numbers'] or source != epa_source:
+                    continue
+                try:
+                    _get_epa_metrics_cached(team_number, source, force_refresh=True)
+                    refreshed_epa += 1
+                except Exception as e:
+                    logger.debug("Graph prewarm failed for EPA team %s: %s", team_number, e)
+
+            self.last_run = time.time()
+            if refreshed_metrics or refreshed_epa:
+                logger.info("Graph prewarm refreshed %d metrics and %d EPA keys",
+                            refreshed_metrics, refreshed_epa)
+            return {'metrics': refreshed_metrics, 'epa': refreshed_epa}
+
+
+def current_event_teams():
+    """Teams at each scouting team's configured current event.
+
+    Returns ``{'event_ids': set, 'team_numbers': set, 'team_ids': {team_id:
+    {'game_config': cfg}}, 'scouting_teams': {scouting_team_number: cfg}}``
+    where ``cfg`` is the owning scouting team's game config.
+    """
+    from app import db
+    from app.models import Event, Team, User, team_event
+    from app.utils.config_manager import load_game_config
+    from app.utils.event_code_utils import build_year_prefixed_event_code
+
+    out = {'event_ids': set(), 'team_numbers': set(), 'team_ids': {}, 'scouting_teams': {}}
+    try:
+        scouting_teams = [r[0] for r in User.query.with_entities(User.scouting_team_number)
+                          .filter(User.scouting_team_number.isnot(None)).distinct().all()]
+    except Exception:
+        return out
+
+    for scouting_team_number in scouting_teams:
+        try:
+            game_config = load_game_config(team_number=scouting_team_number) or {}
+            event_code = build_year_prefixed_event_code(game_config.get('current_event_code'),
+                                                        season=game_config.get('season'))
+            if not event_code:
+                continue
+            event = Event.query.filter_by(code=event_code,
+                                          scouting_team_number=scouting_team_number).first()
+            if event is None:
+                continue
+            out['event_ids'].add(event.id)
+            out['scouting_teams'][scouting_team_number] = game_config
+            rows = (db.session.query(Team.id, Team.team_number)
+                    .join(team_event, team_event.c.team_id == Team.id)
+                    .filter(team_event.c.event_id == event.id)
+                    .all())
+            for team_id, team_number in rows:
+                out['team_ids'][team_id] = {'game_config': game_config}
+                out['team_numbers'].add(int(team_number))
+        except Exception as e:
+            logger.debug("Graph prewarm: skipping scouting team %s: %s", scouting_team_number, e)
+    return out
+
+
+# ------------------------------------------------------------------
+# Module-level singleton
+# ------------------------------------------------------------------
+graph_prewarmer = GraphCachePrewarmer()
+
+
+def start_graph_prewarmer(app):
+    """Initialize and start the graph cache prewarmer."""
+    try:
+        graph_prewarmer.init_app(app)
+    except Exception as e:
+        logger.error("Failed to start graph cache prewarmer: %s", e)
+
+
+def stop_graph_prewarmer():
+    """Stop the graph cache prewarmer."""
+    try:
+        graph_prewarmer.stop()
+    except Exception as e:
+        logger.error("Failed to stop graph cache prewarmer: %s", e)
@@ -0,0 +1,345 @@
+"""
+Shared HTTP client for upstream APIs (FIRST, The Blue Alliance, Statbotics).
+
+* One pooled ``requests.Session`` per host, so repeated calls reuse the
+  TCP/TLS connection instead of handshaking every time, with at most
+  ``_HOST_CONCURRENCY`` requests in flight per host.
+* urllib3 retry with exponential backoff for connection errors, 429 and
+  5xx responses (honours ``Retry-After``).
+* A small conditional-request cache: responses carrying ``ETag`` or
+  ``Last-Modified`` are remembered and revalidated with ``If-None-Match`` /
+  ``If-Modified-Since``.  A 304 is returned to the caller as the cached 200
+  response, so call sites do not need to know about it.
+* Per-host latency counters (see :func:`get_host_latency_stats`) and a log
+  line for slow upstream calls.
+* :func:`fan_out`, a bounded thread pool for per-page / per-team fan-out
+  calls that also carries the Flask request/app context into the workers.
+
+:func:`http_get` takes the same arguments as ``requests.get`` so it can be
+swapped in at existing call sites.
+"""
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+_POOL_MAXSIZE = 16
+_RETRY_TOTAL = 2
+_RETRY_BACKOFF = 0.5
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Conditional-request cache limits
+_CACHE_MAX_ENTRIES = 512
+_CACHE_MAX_BODY = 4 * 1024 * 1024  # bytes
+
+# Calls slower than this are logged at INFO
+_SLOW_REQUEST_SECONDS = 3.0
+
+_FAN_OUT_WORKERS = 8
+# Concurrent in-flight requests allowed per upstream host
+_HOST_CONCURRENCY = 4
+
+# Headers that change who is asking; part of the cache key so responses
+# fetched with one team's credentials are never revalidated with another's.
+_AUTH_HEADERS = ('Authorization', 'X-TBA-Auth-Key')
+
+_sessions = {}
+_host_slots = {}
+_sessions_lock = threading.Lock()
+
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+_host_stats = {}
+_stats_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+_fan_out_local = threading.local()
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+def _build_session():
+    retry = Retry(
+        total=_RETRY_TOTAL,
+        connect=_RETRY_TOTAL,
+        read=_RETRY_TOTAL,
+        status=_RETRY_TOTAL,
+        backoff_factor=_RETRY_BACKOFF,
+        status_forcelist=_RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(url):
+    """Return the pooled session for the host of *url*."""
+    host = urlsplit(url).netloc.lower()
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _build_session()
+                _sessions[host] = session
+    return session
+
+
+def _host_slot(host):
+    slot = _host_slots.get(host)
+    if slot is None:
+        with _sessions_lock:
+            slot = _host_slots.setdefault(host, threading.BoundedSemaphore(_HOST_CONCURRENCY))
+    return slot
+
+
+def close_sessions():
+    """Close every pooled session; the next call opens a fresh pool."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            try:
+                session.close()
+            except Exception:
+                pass
+        _sessions.clear()
+
+
+# ---------------------------------------------------------------------------
+# Conditional-request cache
+# ---------------------------------------------------------------------------
+
+def _cache_key(url, params, headers):
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        param_part = tuple(sorted((str(k), str(v)) for k, v in items))
+    else:
+        param_part = ()
+    auth_part = tuple((headers or {}).get(h) for h in _AUTH_HEADERS)
+    return (url, param_part, auth_part)
+
+
+def _cache_lookup(key):
+    with _cache_lock:
+        entry = _response_cache.get(key)
+        if entry is not None:
+            _response_cache.move_to_end(key)
+        return entry
+
+
+def _cache_store(key, response):
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return
+    content = response.content
+    if content is None or len(content) > _CACHE_MAX_BODY:
+        return
+    entry = {
+        'etag': etag,
+        'last_modified': last_modified,
+        'content': content,
+        'headers': dict(response.headers),
+        'encoding': response.encoding,
+        'url': response.url,
+    }
+    with _cache_lock:
+        _response_cache[key] = entry
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > _CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+
+
+def _response_from_cache(entry, elapsed):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = entry['content']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.encoding = entry['encoding']
+    response.url = entry['url']
+    response.reason = 'OK'
+    response.from_cache = True
+    response.elapsed = elapsed
+    return response
+
+
+def clear_http_cache():
+    """Forget every remembered ETag / Last-Modified response."""
+    with _cache_lock:
+        _response_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Latency accounting
+# ---------------------------------------------------------------------------
+
+def _record_latency(host, seconds, status, error=False):
+    with _stats_lock:
+        stats = _host_stats.setdefault(host, {
+            'count': 0, 'errors': 0, 'not_modified': 0,
+            'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0,
+        })
+        ms = seconds * 1000.0
+        stats['count'] += 1
+        stats['total_ms'] += ms
+        stats['last_ms'] = ms
+        stats['max_ms'] = max(stats['max_ms'], ms)
+        if error:
+            stats['errors'] += 1
+        if status == 304:
+            stats['not_modified'] += 1
+
+    if seconds >= _SLOW_REQUEST_SECONDS:
+        logger.info("Slow upstream call: %s took %.0f ms (status %s)", host, seconds * 1000.0, status)
+    else:
+        logger.debug("Upstream call: %s %.0f ms (status %s)", host, seconds * 1000.0, status)
+
+
+def get_host_latency_stats():
+    """Return ``{host: {count, errors, not_modified, avg_ms, max_ms, last_ms}}``."""
+    with _stats_lock:
+        out = {}
+        for host, stats in _host_stats.items():
+            count = stats['count'] or 1
+            out[host] = {
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'not_modified': stats['not_modified'],
+                'avg_ms': round(stats['total_ms'] / count, 1),
+                'max_ms': round(stats['max_ms'], 1),
+                'last_ms': round(stats['last_ms'], 1),
+            }
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Requests
+# ---------------------------------------------------------------------------
+
+def http_get(url, params=None, headers=None, timeout=15, use_cache=True, **kwargs):
+    """``requests.get`` replacement using the pooled session for the host.
+
+    Raises the same ``requests.RequestException`` subclasses as
+    ``requests.get``.  With *use_cache* (the default) a 304 from the
+    upstream is returned as the previously cached 200 response.
+    """
+    session = get_session(url)
+    host = urlsplit(url).netloc.lower()
+    request_headers = dict(headers or {})
+
+    key = _cache_key(url, params, request_headers) if use_cache else None
+    cached = _cache_lookup(key) if key else None
+    if cached:
+        if cached['etag']:
+            request_headers.setdefault('If-None-Match', cached['etag'])
+        if cached['last_modified']:
+            request_headers.setdefault('If-Modified-Since', cached['last_modified'])
+
+    with _host_slot(host):
+        started = time.perf_counter()
+        try:
+            response = session.get(url, params=params, headers=request_headers, timeout=timeout, **kwargs)
+        except requests.RequestException:
+            _record_latency(host, time.perf_counter() - started, None, error=True)
+            raise
+    _record_latency(host, time.perf_counter() - started, response.status_code,
+                    error=response.status_code >= 500)
+
+    if response.status_code == 304 and cached:
+        return _response_from_cache(cached, response.elapsed)
+    if key and response.status_code == 200:
+        _cache_store(key, response)
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Fan-out
+# ---------------------------------------------------------------------------
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_FAN_OUT_WORKERS,
+                                               thread_name_prefix='http-fanout')
+    return _executor
+
+
+def fan_out(func, items, max_workers=None):
+    """Call ``func(item)`` for each item on the shared bounded pool.
+
+    Returns results in input order; an exception raised by ``func`` is
+    returned in place of that item's result rather than propagated, so one
+    failing team or page does not discard the rest.  Each call runs in a
+    copy of the caller's Flask request (or app) context when there is one.
+    Calls made from inside a fan-out worker run inline to avoid exhausting
+    the pool.  ``func`` should only fetch; persist the results on the
+    calling thread so SQLite sees a single writer.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    try:
+        from flask import current_app, has_app_context, has_request_context
+        from flask.globals import request_ctx
+        app = current_app._get_current_object() if has_app_context() else None
+        req_ctx = request_ctx._get_current_object() if has_request_context() else None
+    except Exception:
+        app = None
+        req_ctx = None
+
+    def _run(item):
+        _fan_out_local.active = True
+        try:
+            # Per-team helpers read the caller's team config through
+            # current_user, so carry the request over when there is one.
+            if req_ctx is not None:
+                with req_ctx.copy():
+                    return func(item)
+            if app is not None:
+                with app.app_context():
+                    return func(item)
+            return func(item)
+        except Exception as exc:
+            return exc
+        finally:
+            _fan_out_local.active = False
+
+    if len(items) == 1 or getattr(_fan_out_local, 'active', False):
+        results = []
+        for item in items:
+            try:
+                results.append(func(item))
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    executor = _get_executor()
+    limit = max(1, min(max_workers or _FAN_OUT_WORKERS, _FAN_OUT_WORKERS))
+    results = [None] * len(items)
+    # Submit in windows of ``limit`` so a single caller cannot monopolise the pool
+    for start in range(0, len(items), limit):
+        window = items[start:start + limit]
+        futures = [executor.submit(_run, item) for item in window]
+        for offset, future in enumerate(futures):
+            results[start + offset] = future.result()
+    return results
@@ -0,0 +1,253 @@
+"""
+Pit Robot Image Worker
+Compresses uploaded pit scouting robot photos on a background thread so the
+upload request can return as soon as the raw bytes are stored.
+
+Uploads are written to ``PitScoutingImage`` with ``status='processing'`` and
+the original bytes in ``image_data``.  The worker decodes them (using Pillow's
+JPEG ``draft()`` mode so large phone photos are downscaled during decode),
+writes the optimized JPEG back to ``image_data`` and adds WebP/AVIF variants
+when the local Pillow build supports them.
+
+Follows the same daemon-thread pattern used by ``epa_scheduler.py``.
+"""
+import io
+import queue
+import threading
+import logging
+
+from PIL import Image, ImageOps, features
+from PIL import UnidentifiedImageError
+from PIL.Image import DecompressionBombError
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Longest edge of the stored image, in pixels
+MAX_IMAGE_EDGE = 1600
+# Constrain oversized/decompression-bomb images before decode.
+MAX_IMAGE_PIXELS = 40_000_000
+
+_DEFAULT_QUEUE_SIZE = 32
+_DEFAULT_WORKERS = 2
+
+JPEG_QUALITY = 72
+WEBP_QUALITY = 70
+AVIF_QUALITY = 60
+
+
+def _supports(fmt):
+    try:
+        return bool(features.check(fmt))
+    except Exception:
+        return False
+
+
+def compress_robot_image(raw_bytes):
+    """Decode, orient and downscale an uploaded image.
+
+    Returns a dict with ``jpeg`` bytes plus ``webp``/``avif`` bytes (or None
+    when the codec is unavailable). Raises ValueError for invalid images.
+    """
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        image = Image.open(io.BytesIO(raw_bytes))
+        image.verify()
+        image = Image.open(io.BytesIO(raw_bytes))
+        if image.format == 'JPEG':
+            # Let libjpeg decode at a reduced DCT scale; this is far cheaper
+            # than decoding a 12MP photo and resizing it afterwards.
+            image.draft('RGB', (MAX_IMAGE_EDGE, MAX_IMAGE_EDGE))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+        image.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, DecompressionBombError) as exc:
+        raise ValueError(f'Invalid or unsafe image upload: {exc}')
+    except Exception as exc:
+        raise ValueError(f'Could not process uploaded image: {exc}')
+
+    jpeg_io = io.BytesIO()
+    image.save(jpeg_io, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    jpeg_bytes = jpeg_io.getvalue()
+    if not jpeg_bytes:
+        raise ValueError('Image compression failed.')
+
+    variants = {'jpeg': jpeg_bytes, 'webp': None, 'avif': None}
+    if _supports('webp'):
+        try:
+            webp_io = io.BytesIO()
+            image.save(webp_io, format='WEBP', quality=WEBP_QUALITY, method=4)
+            variants['webp'] = webp_io.getvalue() or None
+        except Exception as exc:
+            logger.debug("WebP encode failed: %s", exc)
+    if _supports('avif'):
+        try:
+            avif_io = io.BytesIO()
+            image.save(avif_io, format='AVIF', quality=AVIF_QUALITY)
+            variants['avif'] = avif_io.getvalue() or None
+        except Exception as exc:
+            logger.debug("AVIF encode failed: %s", exc)
+    return variants
+
+
+def apply_compressed_variants(image_row, variants):
+    """Store the output of :func:`compress_robot_image` on an image row."""
+    image_row.mime_type = 'image/jpeg'
+    image_row.image_data = variants['jpeg']
+    image_row.webp_data = variants.get('webp')
+    image_row.avif_data = variants.get('avif')
+    image_row.compressed_size = len(variants['jpeg'])
+    image_row.status = 'ready'
+
+
+class PitImageWorker:
+    """Bounded queue of pit image ids processed by a small thread pool."""
+
+    def __init__(self, app=None, maxsize=_DEFAULT_QUEUE_SIZE, workers=_DEFAULT_WORKERS):
+        self.app = app
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.num_workers = workers
+        self.threads = []
+        self.running = False
+        self._lock = threading.Lock()
+
+        if app:
+            self.init_app(app)
+
+    # ------------------------------------------------------------------
+    def init_app(self, app):
+        """Bind to a Flask app, start the workers and resume pending uploads."""
+        self.app = app
+        self.num_workers = int(app.config.get('PIT_IMAGE_WORKERS', self.num_workers))
+        self.start()
+        self._requeue_pending()
+
+    # ------------------------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            for i in range(max(1, self.num_workers)):
+                t = threading.Thread(target=self._loop, name=f'pit-image-worker-{i}', daemon=True)
+                t.start()
+                self.threads.append(t)
+        logger.info("Pit image worker started (%d threads)", len(self.threads))
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        for _ in self.threads:
+            try:
+                self.queue.put_nowait(None)
+            except queue.Full:
+                pass
+        for t in self.threads:
+            t.join(timeout=5)
+        self.threads = []
+        logger.info("Pit image worker stopped")
+
+    # ------------------------------------------------------------------
+    def submit(self, image_id):
+        """Queue an image for compression.
+
+        Returns False when the worker is not running or the queue is full so
+        the caller can fall back to processing inline.
+        """
+        if not self.running or image_id is None:
+            return False
+        try:
+            self.queue.put_nowait(int(image_id))
+            return True
+        except queue.Full:
+            logger.warning("Pit image queue full; processing image %s inline", image_id)
+            return False
+
+    def pending(self):
+        return self.queue.qsize()
+
+    # ------------------------------------------------------------------
+    def _loop(self):
+        while self.running:
+            try:
+                image_id = self.queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            if image_id is None:
+                break
+            try:
+                with self.app.app_context():
+                    process_pending_image(image_id)
+            except Exception:
+                logger.exception("Pit image worker failed for image %s", image_id)
+            finally:
+                self.queue.task_done()
+
+    def _requeue_pending(self):
+        """Re-submit uploads left in 'processing' by a previous run."""
+        try:
+            with self.app.app_context():
+                from app.models import PitScoutingImage
+                ids = [r[0] for r in db.session.query(PitScoutingImage.id)
+                       .filter(PitScoutingImage.status == 'processing').all()]
+            for image_id in ids:
+                self.submit(image_id)
+            if ids:
+                logger.info("Pit image worker resumed %d pending images", len(ids))
+        except Exception as e:
+            logger.debug("Pit image worker could not resume pending images: %s", e)
+
+
+def process_pending_image(image_id):
+    """Compress a stored 'processing' image in place. Requires an app context."""
+    from app.models import PitScoutingImage
+
+    row = PitScoutingImage.query.get(image_id)
+    if not row or row.status != 'processing':
+        return False
+    raw_bytes = row.image_data or b''
+    # Release the read transaction while we do the CPU-bound work
+    db.session.rollback()
+
+    try:
+        variants = compress_robot_image(raw_bytes)
+    except ValueError as e:
+        logger.warning("Pit image %s could not be processed: %s", image_id, e)
+        row = PitScoutingImage.query.get(image_id)
+        if row and row.status == 'processing':
+            row.status = 'failed'
+            db.session.commit()
+        return False
+
+    row = PitScoutingImage.query.get(image_id)
+    # A newer upload may have replaced the bytes while we were working
+    if not row or row.status != 'processing' or row.image_data != raw_bytes:
+        db.session.rollback()
+        return False
+    apply_compressed_variants(row, variants)
+    db.session.commit()
+    return True
+
+
+# ------------------------------------------------------------------
+# Module-level singleton
+# ------------------------------------------------------------------
+pit_image_worker = PitImageWorker()
+
+
+def start_pit_image_worker(app):
+    """Initialize and start the pit image worker."""
+    try:
+        pit_image_worker.init_app(app)
+    except Exception as e:
+        logger.error("Failed to start pit image worker: %s", e)
+
+
+def stop_pit_image_worker():
+    """Stop the pit image worker."""
+    try:
+        pit_image_worker.stop()
+    except Exception as e:
+        logger.error("Failed to stop pit image worker: %s", e)
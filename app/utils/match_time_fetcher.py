@@ -3,7 +3,7 @@ Match Time Fetcher
 Updates match scheduled times from FIRST and TBA APIs
 Properly handles timezone conversions to ensure notifications are sent at the correct local time
 """
-import requests
+from app.utils.http_client import http_get
 from datetime import datetime, timezone
 from flask import current_app
 from app import db
@@ -11,7 +11,7 @@ from app.models import Match, Event
 from app.utils.api_utils import get_api_headers, get_preferred_api_source
 from app.utils.config_manager import get_current_game_config
 from app.utils.timezone_utils import parse_iso_with_timezone, convert_utc_to_local
-from app.utils.event_code_utils import build_year_prefixed_event_code, normalize_event_code
+from app.utils.event_code_utils import build_year_prefixed_event_code, normalize_event_code, split_event_code
 
 
 def fetch_match_times_from_first(event_code, event_timezone=None):
@@ -42,7 +42,7 @@ def fetch_match_times_from_first(event_code, event_timezone=None):
     for endpoint, match_type in endpoints:
         try:
             api_url = f"{base_url}{endpoint}"
-            response = requests.get(api_url, headers=headers, timeout=15)
+            response = http_get(api_url, headers=headers, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -115,7 +115,7 @@ def fetch_match_times_from_tba(event_code, event_timezone=None):
     
     try:
         api_url = f"{base_url}/event/{event_key}/matches"
-        response = requests.get(api_url, headers=get_tba_api_headers(), timeout=15)
+        response = http_get(api_url, headers=get_tba_api_headers(), timeout=15)
         
         if response.status_code == 200:
             matches = response.json()
@@ -421,6 +421,21 @@ def normalize_event_match_times(event_code, dry_run=True):
     return {'event_code': event_code, 'checked': checked, 'would_fix': would_fix, 'fixed': fixed}
 
 
+def _match_times_applied(event_code, scouting_team_number, updated):
+    """Whether a refresh reached the event's matches, so it can be skipped until upstream changes.
+
+    A pre-event schedule does not change upstream, so an event whose Match
+    rows the sync has not created yet must be refreshed again later.
+    """
+    event = Event.query.filter_by(code=event_code, scouting_team_number=scouting_team_number).first()
+    if not event:
+        return False
+    matches = Match.query.filter_by(event_id=event.id)
+    if matches.first() is None:
+        return False
+    return updated > 0 or matches.filter(Match.scheduled_time.is_(None)).first() is None
+
+
 def update_all_active_event_times():
     """
     Update match times for all active events across all scouting teams
@@ -447,6 +462,9 @@ def update_all_active_event_times():
     # For each scouting team, check their configured event
     from app.utils.team_utils import team_sort_key
     from app.utils.api_utils import set_season_override, clear_season_override
+    from app.utils.upstream_fingerprint import (
+        SCOPE_TIMES, probe_event_for_config, event_unchanged, mark_event_applied,
+    )
     for team_number in sorted(team_numbers, key=team_sort_key):
         try:
             game_config = load_game_config(team_number=team_number)
@@ -466,9 +484,18 @@ def update_all_active_event_times():
                 # and fetch_match_times_from_tba use the correct season for API calls
                 set_season_override(season)
                 try:
+                    # Nothing upstream moved since the last refresh: skip it
+                    raw_code = split_event_code(event_code_db)[1]
+                    fingerprint = probe_event_for_config(raw_code, season, game_config)
+                    if event_unchanged(SCOPE_TIMES, raw_code, season, team_number, fingerprint):
+                        print(f" Match times for {event_code_db} unchanged upstream; skipping team {team_number}")
+                        continue
+
                     print(f"\n Processing team {team_number}, event {event_code_db}")
                     updated = update_match_times(event_code_db, team_number)
                     total_updated += updated
+                    if _match_times_applied(event_code_db, team_number, updated):
+                        mark_event_applied(SCOPE_TIMES, raw_code, season, team_number, fingerprint)
                 finally:
                     clear_season_override()
         except Exception as e:
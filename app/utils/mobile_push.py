@@ -0,0 +1,332 @@
+"""
+Live updates for mobile clients over Socket.IO.
+
+Mobile clients used to learn about new matches, scores, scouting entries
+and chat messages only by polling ``/api/mobile/matches/current``,
+``/sync/status`` and ``/chat/state``.  Instead they can connect to the
+``/mobile`` Socket.IO namespace with their JWT and receive typed deltas:
+
+- ``match.schedule``: a match was added, removed, or its time or
+  alliances changed
+- ``match.score``: a match's scores or winner changed
+- ``scouting.entry``: a scouting entry was created, updated or deleted
+- ``chat.message``: a chat message was sent
+
+Every delta carries a sequence number within its scouting team's log and
+a ``resume_token``.  A client that reconnects with the last token it
+processed gets the deltas it missed replayed.  If that position has
+already left the in-memory window, or the server restarted since, it gets
+``mobile_resync`` and should refetch over REST.
+
+Client protocol (namespace ``/mobile``):
+
+- connect with ``auth={'token': <jwt>, 'resume_token': <optional>}``;
+  ``?token=`` or an ``Authorization: Bearer`` header also work
+- ``mobile_ready`` -> ``{'team_number', 'resume_token'}``
+- ``mobile_deltas`` -> ``{'deltas': [...], 'resume_token'}``
+- ``mobile_resync`` -> ``{'reason', 'resume_token'}``
+- emit ``mobile_resume`` with ``{'resume_token'}`` to replay on demand
+
+Match and scouting deltas come from session hooks on committed rows.  Chat
+deltas are published by the chat handlers (``publish_chat_message`` /
+``publish_group_message``).
+"""
+import secrets
+import threading
+import time
+from collections import deque
+
+MOBILE_NAMESPACE = '/mobile'
+
+DELTA_TYPES = ('match.schedule', 'match.score', 'scouting.entry', 'chat.message')
+
+# Deltas kept per scouting team for resuming clients
+LOG_SIZE = 1000
+
+MATCH_TABLE = 'match'
+SCOUTING_TABLE = 'scouting_data'
+
+_SCORE_FIELDS = ('red_score', 'blue_score', 'winner')
+_SCHEDULE_FIELDS = ('match_number', 'match_type', 'event_id', 'red_alliance', 'blue_alliance',
+                    'scheduled_time', 'predicted_time', 'actual_time')
+
+# Resume tokens from another process lifetime cannot be honoured
+_EPOCH = secrets.token_hex(4)
+
+_listeners_registered = False
+_handlers_registered = False
+
+
+def make_resume_token(seq):
+    return f'{_EPOCH}.{seq}'
+
+
+def parse_resume_token(token):
+    """Sequence number in ``token``, or None when it is invalid or stale."""
+    try:
+        epoch, seq = str(token).split('.', 1)
+        return int(seq) if epoch == _EPOCH else None
+    except Exception:
+        return None
+
+
+def team_room(team_number):
+    return f'mobile_team_{team_number}'
+
+
+def _user_key(username):
+    from app import normalize_username
+    return normalize_username(username)
+
+
+def user_room(username):
+    return f'mobile_user_{_user_key(username)}'
+
+
+class DeltaLog:
+    """Bounded, sequence-numbered log of one scouting team's deltas."""
+
+    def __init__(self, size=LOG_SIZE):
+        self._deltas = deque(maxlen=size)
+        self._seq = 0
+        self.lock = threading.Lock()
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def append(self, delta_type, data, audience=None):
+        """Record a delta; ``audience`` limits it to those usernames."""
+        self._seq += 1
+        delta = {
+            'seq': self._seq,
+            'type': delta_type,
+            'data': data,
+            'ts': time.time(),
+            'resume_token': make_resume_token(self._seq),
+        }
+        self._deltas.append((delta, frozenset(audience) if audience else None))
+        return delta
+
+    def since(self, seq, username=None):
+        """Deltas after ``seq`` visible to ``username``; None if ``seq`` is out of the window."""
+        if seq > self._seq:
+            return None
+        oldest = self._deltas[0][0]['seq'] if self._deltas else self._seq + 1
+        if seq + 1 < oldest:
+            return None
+        return [delta for delta, audience in self._deltas
+                if delta['seq'] > seq and (audience is None or username in audience)]
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_log(team_number):
+    with _logs_lock:
+        log = _logs.get(team_number)
+        if log is None:
+            log = _logs[team_number] = DeltaLog()
+        return log
+
+
+def publish(team_number, deltas):
+    """Append ``(type, data, audience)`` deltas to a team's log and push them.
+
+    Team-wide deltas go to the team's room in one ``mobile_deltas`` batch;
+    deltas with an audience (direct messages) go to each user's room.
+    """
+    if team_number is None or not deltas:
+        return []
+    from app import socketio
+
+    deltas = [(t, data, {_user_key(u) for u in audience} if audience else None)
+              for t, data, audience in deltas]
+    log = get_log(team_number)
+    with log.lock:
+        # Emitting under the lock keeps every client's deltas in sequence order
+        recorded = [(log.append(t, data, audience), audience) for t, data, audience in deltas]
+        team_wide = [d for d, audience in recorded if not audience]
+        per_user = {}
+        for delta, audience in recorded:
+            for username in audience or ():
+                per_user.setdefault(username, []).append(delta)
+        try:
+            if team_wide:
+                socketio.emit('mobile_deltas', {'deltas': team_wide, 'resume_token': team_wide[-1]['resume_token']},
+                              room=team_room(team_number), namespace=MOBILE_NAMESPACE)
+            for username, user_deltas in per_user.items():
+                socketio.emit('mobile_deltas', {'deltas': user_deltas, 'resume_token': user_deltas[-1]['resume_token']},
+                              room=user_room(username), namespace=MOBILE_NAMESPACE)
+        except Exception as e:
+            print(f"Mobile push emit failed for team {team_number}: {e}")
+    return [d for d, _ in recorded]
+
+
+def publish_chat_message(team_number, message, usernames=None):
+    """Push a saved chat message; ``usernames`` restricts a direct message to its participants."""
+    return publish(team_number, [('chat.message', message, usernames)])
+
+
+def publish_group_message(team_number, group, message):
+    """Push a saved group chat message; groups with a members list reach only their members."""
+    from app import load_group_members
+
+    try:
+        members = load_group_members(team_number, group) or []
+    except Exception:
+        members = []
+    return publish_chat_message(team_number, message, members or None)
+
+
+def _match_delta(match):
+    from app.utils.timezone_utils import iso_utc
+
+    return {
+        'id': match.id,
+        'event_id': match.event_id,
+        'match_number': match.match_number,
+        'match_type': match.match_type,
+        'red_alliance': match.red_alliance,
+        'blue_alliance': match.blue_alliance,
+        'red_score': match.red_score,
+        'blue_score': match.blue_score,
+        'winner': match.winner,
+        'scheduled_time': iso_utc(match.scheduled_time),
+        'predicted_time': iso_utc(match.predicted_time),
+        'actual_time': iso_utc(getattr(match, 'actual_time', None)),
+    }
+
+
+def _scouting_delta(entry, action):
+    from app.utils.timezone_utils import iso_utc
+
+    return {
+        'action': action,
+        'id': entry.id,
+        'match_id': entry.match_id,
+        'team_id': entry.team_id,
+        'scout_name': entry.scout_name,
+        'alliance': entry.alliance,
+        'timestamp': iso_utc(entry.timestamp),
+    }
+
+
+def _changed(obj, fields):
+    from sqlalchemy import inspect
+
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in fields)
+
+
+def register_mobile_push_listeners():
+    """Hook Session events so committed matches and scouting entries become deltas."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    @event.listens_for(Session, 'after_flush')
+    def _collect_mobile_deltas(session, flush_context):
+        try:
+            pending = None
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                table = getattr(type(obj), '__tablename__', None)
+                if table not in (MATCH_TABLE, SCOUTING_TABLE):
+                    continue
+                team_number = obj.scouting_team_number
+                if team_number is None:
+                    continue
+                deltas = []
+                if table == MATCH_TABLE:
+                    if obj in session.deleted:
+                        deltas.append(('match.schedule', {'id': obj.id, 'removed': True}, None))
+                    elif obj in session.new:
+                        deltas.append(('match.schedule', _match_delta(obj), None))
+                    else:
+                        if _changed(obj, _SCHEDULE_FIELDS):
+                            deltas.append(('match.schedule', _match_delta(obj), None))
+                        if _changed(obj, _SCORE_FIELDS):
+                            deltas.append(('match.score', _match_delta(obj), None))
+                else:
+                    action = 'deleted' if obj in session.deleted else 'created' if obj in session.new else 'updated'
+                    deltas.append(('scouting.entry', _scouting_delta(obj, action), None))
+                if deltas:
+                    pending = pending if pending is not None else session.info.setdefault('_mobile_deltas', {})
+                    pending.setdefault(team_number, []).extend(deltas)
+        except Exception:
+            pass
+
+    @event.listens_for(Session, 'after_commit')
+    def _publish_mobile_deltas(session):
+        pending = session.info.pop('_mobile_deltas', None)
+        for team_number, deltas in (pending or {}).items():
+            publish(team_number, deltas)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _discard_mobile_deltas(session):
+        session.info.pop('_mobile_deltas', None)
+
+    _listeners_registered = True
+
+
+def _replay(resume_token, team_number, username):
+    from flask_socketio import emit
+
+    log = get_log(team_number)
+    with log.lock:
+        current = make_resume_token(log.seq)
+        seq = parse_resume_token(resume_token)
+        missed = log.since(seq, _user_key(username)) if seq is not None else None
+    if missed is None:
+        emit('mobile_resync', {'reason': 'resume_token_expired', 'resume_token': current})
+    elif missed:
+        emit('mobile_deltas', {'deltas': missed, 'resume_token': missed[-1]['resume_token']})
+
+
+def register_mobile_socket_handlers(socketio):
+    """Register the ``/mobile`` namespace's connect/resume handlers."""
+    global _handlers_registered
+    if _handlers_registered:
+        return
+    from flask import request
+    from flask_socketio import ConnectionRefusedError, emit, join_room
+
+    clients = {}
+
+    @socketio.on('connect', namespace=MOBILE_NAMESPACE)
+    def _mobile_connect(auth=None):
+        from app.routes.mobile_api import _authenticate_mobile_token
+
+        auth = auth if isinstance(auth, dict) else {}
+        token = auth.get('token') or request.args.get('token')
+        header = request.headers.get('Authorization') or ''
+        if not token and header.startswith('Bearer '):
+            token = header.split(' ', 1)[1]
+        if not token:
+            raise ConnectionRefusedError('Authentication token is missing')
+        user, team_number, error_response = _authenticate_mobile_token(token)
+        if error_response is not None or team_number is None:
+            raise ConnectionRefusedError('Invalid or expired token')
+
+        clients[request.sid] = (team_number, user.username)
+        join_room(team_room(team_number))
+        join_room(user_room(user.username))
+        log = get_log(team_number)
+        emit('mobile_ready', {'team_number': team_number, 'resume_token': make_resume_token(log.seq)})
+        if auth.get('resume_token'):
+            _replay(auth['resume_token'], team_number, user.username)
+
+    @socketio.on('mobile_resume', namespace=MOBILE_NAMESPACE)
+    def _mobile_resume(data):
+        client = clients.get(request.sid)
+        if client and isinstance(data, dict) and data.get('resume_token'):
+            _replay(data['resume_token'], *client)
+
+    @socketio.on('disconnect', namespace=MOBILE_NAMESPACE)
+    def _mobile_disconnect(*args):
+        clients.pop(request.sid, None)
+
+    _handlers_registered = True
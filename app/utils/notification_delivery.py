@@ -0,0 +1,326 @@
+"""
+Batch delivery for notification push and email.
+
+``process_pending_notifications`` used to send due queue entries one at a
+time: each Web Push request waited for the previous one, and every email
+opened its own SMTP session.  ``deliver_notifications`` takes the whole
+batch instead:
+
+- subscriptions that render the same payload for a match share one
+  rendering, and a user subscribed twice to the same payload is sent it once
+- every Web Push request in the batch is handed to a bounded thread pool;
+  only the HTTP call runs there, device bookkeeping stays on the caller's
+  thread and session
+- emails go out in order over a single SMTP connection while the pushes
+  are in flight
+
+Per-channel send latency is kept in memory; see ``get_delivery_stats``.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Upper bound on concurrent Web Push HTTP requests
+PUSH_WORKERS = 8
+
+# Number of recent sends per channel kept for latency percentiles
+LATENCY_WINDOW = 500
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _push_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=PUSH_WORKERS, thread_name_prefix='webpush')
+        return _pool
+
+
+class _ChannelStats:
+    """Counters and a window of recent latencies for one delivery channel."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds, ok):
+        with self._lock:
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self.latencies.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            values = sorted(self.latencies)
+            sent, failed = self.sent, self.failed
+        if not values:
+            return {'sent': sent, 'failed': failed, 'avg_ms': None, 'p95_ms': None, 'max_ms': None}
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        return {
+            'sent': sent,
+            'failed': failed,
+            'avg_ms': round(sum(values) / len(values) * 1000, 1),
+            'p95_ms': round(p95 * 1000, 1),
+            'max_ms': round(values[-1] * 1000, 1),
+        }
+
+
+_STATS = {'push': _ChannelStats(), 'email': _ChannelStats()}
+
+
+def get_delivery_stats():
+    """Send counts and latency (ms) over the recent window, per channel."""
+    return {channel: stats.snapshot() for channel, stats in _STATS.items()}
+
+
+def _timed_push(webpush_kwargs):
+    from app.utils.push_notifications import _deliver_push
+    started = time.monotonic()
+    error = _deliver_push(webpush_kwargs)
+    return error, time.monotonic() - started
+
+
+def _submit_pushes(jobs, vapid_keys=None):
+    """Hand ``(device, title, message, data)`` jobs to the pool.
+
+    Returns, per job, either a future or the validation error string.
+    """
+    from app.utils.push_notifications import _prepare_push, get_vapid_keys
+
+    vapid_keys = vapid_keys if vapid_keys is not None else get_vapid_keys()
+    handles = []
+    for device, title, message, data in jobs:
+        webpush_kwargs, error = _prepare_push(device, title, message, data, vapid_keys=vapid_keys)
+        handles.append(error if error else _push_pool().submit(_timed_push, webpush_kwargs))
+    return handles
+
+
+def _collect_pushes(jobs, handles):
+    """Wait for submitted pushes and record each outcome on its device."""
+    from app.utils.push_notifications import _finish_push
+
+    results = []
+    for (device, _, _, _), handle in zip(jobs, handles):
+        if isinstance(handle, str):
+            results.append((False, handle))
+            continue
+        try:
+            error, elapsed = handle.result()
+            success, message = _finish_push(device, error)
+        except Exception as e:
+            elapsed, success, message = 0.0, False, f"{type(e).__name__}: {e}"
+        _STATS['push'].record(elapsed, success)
+        results.append((success, message))
+    return results
+
+
+def push_in_parallel(jobs):
+    """Send ``(device, title, message, data)`` pushes concurrently.
+
+    Returns a ``(success, error_message)`` pair per job, in order.
+    """
+    return _collect_pushes(jobs, _submit_pushes(jobs))
+
+
+class _Delivery:
+    """One subscription's notification within a batch."""
+
+    def __init__(self, subscription, match, user, payload, log):
+        self.subscription = subscription
+        self.match = match
+        self.user = user
+        self.payload = payload
+        self.log = log
+        self.duplicate_of = None
+        self.push_results = []
+
+
+def _plan(items):
+    """Render payloads and create log rows; returns one _Delivery or None per item."""
+    from app.models import User
+    from app.models_misc import NotificationLog
+    from app.utils.notification_service import notification_payload_key, render_notification
+
+    payloads = {}
+    first_for_user = {}
+    plans = []
+    for subscription, match in items:
+        try:
+            user = User.query.get(subscription.user_id)
+            if not user:
+                print(f"User {subscription.user_id} not found for subscription {subscription.id}")
+                plans.append(None)
+                continue
+
+            key = notification_payload_key(subscription, match)
+            if key not in payloads:
+                title, message = render_notification(subscription, match)
+                payloads[key] = {'title': title, 'message': message}
+            payload = payloads[key]
+
+            log = NotificationLog(
+                user_id=user.id,
+                subscription_id=subscription.id,
+                notification_type=subscription.notification_type,
+                title=payload['title'],
+                message=payload['message'],
+                match_id=match.id,
+                team_number=subscription.target_team_number,
+                event_code=subscription.event_code,
+                sent_at=datetime.now(timezone.utc)
+            )
+            plan = _Delivery(subscription, match, user, payload, log)
+            channels = (bool(subscription.email_enabled and user.email), bool(subscription.push_enabled))
+            user_key = (user.id, key, channels)
+            if user_key in first_for_user:
+                plan.duplicate_of = first_for_user[user_key]
+            else:
+                first_for_user[user_key] = plan
+            plans.append(plan)
+        except Exception as e:
+            import traceback
+            print(f" Error preparing notification for subscription {subscription.id}: {e}")
+            traceback.print_exc()
+            plans.append(None)
+    return plans
+
+
+def _start_pushes(plans):
+    """Submit every push in the batch to the pool; returns (owners, jobs, handles)."""
+    from app.models_misc import DeviceToken
+    from app.utils.notification_service import render_notification_push
+
+    owners, jobs = [], []
+    for plan in plans:
+        if plan is None or plan.duplicate_of or not plan.subscription.push_enabled:
+            continue
+        try:
+            devices = DeviceToken.query.filter_by(user_id=plan.user.id, is_active=True).all()
+            if not devices:
+                plan.log.push_error = "No active devices registered"
+                print(f"No active devices for user {plan.user.username}")
+                continue
+            target = plan.subscription.target_team_number
+            if ('push', target) not in plan.payload:
+                plan.payload[('push', target)] = render_notification_push(plan.match, target, plan.payload['message'])
+            push_message, push_data = plan.payload[('push', target)]
+            for device in devices:
+                owners.append(plan)
+                jobs.append((device, plan.payload['title'], push_message, push_data))
+        except Exception as e:
+            import traceback
+            plan.log.push_error = f"Push setup error: {type(e).__name__}: {str(e)}"[:1000]
+            print(f" Push exception for user {plan.user.username}: {e}")
+            traceback.print_exc()
+    try:
+        handles = _submit_pushes(jobs) if jobs else []
+    except Exception as e:
+        # e.g. VAPID keys could not be loaded; fail every device in the batch
+        handles = [f"{type(e).__name__}: {e}"] * len(jobs)
+    return owners, jobs, handles
+
+
+def _send_emails(plans):
+    from app.utils.emailer import mail_connection, send_email
+    from app.utils.notification_service import record_email_result, render_notification_email
+
+    outgoing = [p for p in plans
+                if p is not None and not p.duplicate_of
+                and p.subscription.email_enabled and p.user.email]
+    if not outgoing:
+        return
+
+    done = set()
+    try:
+        with mail_connection() as connection:
+            for plan in outgoing:
+                started = time.monotonic()
+                try:
+                    target = plan.subscription.target_team_number
+                    if ('email', target) not in plan.payload:
+                        plan.payload[('email', target)] = render_notification_email(
+                            plan.match, target, plan.payload['title'], plan.payload['message'])
+                    email_body, html_full = plan.payload[('email', target)]
+                    success, error = send_email(to=plan.user.email, subject=plan.payload['title'],
+                                                body=email_body, html=html_full, connection=connection)
+                    _STATS['email'].record(time.monotonic() - started, success)
+                    record_email_result(plan.log, plan.user, success, error)
+                except Exception as e:
+                    import traceback
+                    plan.log.email_error = str(e)
+                    print(f" Email exception for {plan.user.email}: {e}")
+                    traceback.print_exc()
+                done.add(id(plan))
+    except Exception as e:
+        # Could not open (or cleanly close) the SMTP session
+        print(f" SMTP session error: {e}")
+        for plan in outgoing:
+            if id(plan) not in done:
+                plan.log.email_error = f'{type(e).__name__}: {e}'
+
+
+def _finish_pushes(owners, jobs, handles):
+    for plan, job, result in zip(owners, jobs, _collect_pushes(jobs, handles)):
+        plan.push_results.append((job[0],) + result)
+
+
+def _record_pushes(plans):
+    from app.utils.notification_service import record_push_result
+
+    for plan in plans:
+        if plan is None or plan.duplicate_of or not plan.push_results:
+            continue
+        errors = [f"{device.device_name or 'Unknown'}: {message}"
+                  for device, ok, message in plan.push_results if not ok]
+        success_count = sum(1 for _, ok, _ in plan.push_results if ok)
+        record_push_result(plan.log, plan.user, success_count, len(errors), errors)
+
+
+def deliver_notifications(items):
+    """
+    Send a batch of notifications (email and/or push).
+
+    Args:
+        items: iterable of (subscription, match) pairs
+
+    Returns:
+        List aligned with ``items`` of NotificationLog instances (None where
+        the notification could not be built)
+    """
+    from app import db
+
+    plans = _plan(list(items))
+    pushes = _start_pushes(plans)
+    _send_emails(plans)
+    _finish_pushes(*pushes)
+    _record_pushes(plans)
+
+    for plan in plans:
+        if plan is not None and plan.duplicate_of:
+            first = plan.duplicate_of.log
+            plan.log.email_sent = bool(first.email_sent)
+            plan.log.email_error = first.email_error
+            plan.log.push_sent_count = first.push_sent_count or 0
+            plan.log.push_failed_count = first.push_failed_count or 0
+            plan.log.push_error = first.push_error
+
+    try:
+        for plan in plans:
+            if plan is not None:
+                db.session.add(plan.log)
+        db.session.commit()
+    except Exception as e:
+        import traceback
+        print(f" Error saving notification logs: {e}")
+        traceback.print_exc()
+        db.session.rollback()
+        return [None] * len(plans)
+    return [plan.log if plan is not None else None for plan in plans]
@@ -6,14 +6,13 @@ Properly handles event timezones to ensure notifications are sent at correct loc
 from datetime import datetime, timezone, timedelta
 from flask import current_app
 from app import db
-from app.models import Match, Team, Event, User
-from app.models_misc import NotificationSubscription, NotificationLog, NotificationQueue, DeviceToken
-from app.utils.emailer import send_email, _build_html_email
-from app.utils.push_notifications import send_push_to_user
+from app.models import Match, Team, Event
+from app.models_misc import NotificationSubscription, NotificationLog, NotificationQueue
+from app.utils.emailer import _build_html_email
 from app.utils.timezone_utils import convert_utc_to_local, convert_local_to_utc, format_time_with_timezone
 import traceback
-import statistics
-from app.utils.score_utils import norm_db_score
+from app.utils.tiered_cache import TieredCache
+from app.utils.event_day_summary import CLOSE_MARGIN
 
 
 def get_match_time(match):
@@ -161,11 +160,27 @@ def get_team_performance_stats(team_id, scouting_team_number):
     return None
 
 
-def get_team_epa_aware_stats(team_number, scouting_team_number):
+def _stats_from_leaderboard(leaderboard, team_number):
+    """Scouted stats for one team in ``get_team_performance_stats`` form."""
+    row = leaderboard.get(team_number)
+    if not row:
+        return None
+    return {
+        'auto_avg': row['auto_points'],
+        'teleop_avg': row['teleop_points'],
+        'endgame_avg': row['endgame_points'],
+        'total_avg': row['auto_points'] + row['teleop_points'] + row['endgame_points'],
+        'match_count': row['match_count'],
+    }
+
+
+def get_team_epa_aware_stats(team_number, scouting_team_number, leaderboard=None):
     """
     Get team performance stats with EPA/OPR enrichment based on admin EPA source setting.
 
-    Falls back gracefully through scouted → external → None.
+    Falls back gracefully through scouted → external → None.  When a
+    ``leaderboard`` from ``app.utils.team_rankings`` is passed, scouted stats
+    are read from it instead of querying this team's entries.
 
     Returns a dict::
 
@@ -196,7 +211,9 @@ def get_team_epa_aware_stats(team_number, scouting_team_number):
 
     # Scouted stats (may be None if no scouting data yet)
     scouted = None
-    if team_obj:
+    if leaderboard is not None:
+        scouted = _stats_from_leaderboard(leaderboard, team_number)
+    elif team_obj:
         try:
             scouted = get_team_performance_stats(team_obj.id, scouting_team_number)
         except Exception:
@@ -273,6 +290,25 @@ def get_team_qualitative_trends(team_number, scouting_team_number, event_id=None
         }
     or None if no data found.
     """
+    entries = _qualitative_entries(scouting_team_number, event_id)
+    if entries is None:
+        return None
+    return _qualitative_trends_from_entries(entries, team_number)
+
+
+def get_teams_qualitative_trends(team_numbers, scouting_team_number, event_id=None):
+    """``get_team_qualitative_trends`` for several teams from one query.
+
+    Returns ``{team_number: trends or None}``.
+    """
+    entries = _qualitative_entries(scouting_team_number, event_id)
+    if entries is None:
+        return {tn: None for tn in team_numbers}
+    return {tn: _qualitative_trends_from_entries(entries, tn) for tn in team_numbers}
+
+
+def _qualitative_entries(scouting_team_number, event_id=None):
+    """Decoded qualitative entry data for a scouting team, newest first (None on error)."""
     from app.models import QualitativeScoutingData
 
     try:
@@ -289,6 +325,18 @@ def get_team_qualitative_trends(team_number, scouting_team_number, event_id=None
     except Exception:
         return None
 
+    # Decode each entry's JSON once for every team looked up in it
+    decoded = []
+    for entry in entries:
+        try:
+            decoded.append(entry.data or {})
+        except Exception:
+            continue
+    return decoded
+
+
+def _qualitative_trends_from_entries(entries, team_number):
+    """Trends for one team from ``_qualitative_entries`` output."""
     team_key = f'team_{team_number}'
     ROLE_FIELDS = ['cycling', 'scoring', 'feeding', 'defending', 'stealing', 'did_not_contribute']
     RATING_FIELDS = ['driver_skill', 'defense_effectiveness', 'shot_accuracy']
@@ -298,12 +346,7 @@ def get_team_qualitative_trends(team_number, scouting_team_number, event_id=None
     rating_sums = {f: [] for f in RATING_FIELDS}
     rankings = []
 
-    for entry in entries:
-        try:
-            data = entry.data or {}
-        except Exception:
-            continue
-
+    for data in entries:
         # Search all alliance/individual buckets for this team
         for bucket_key in ('red', 'blue', 'individual', 'both'):
             bucket = data.get(bucket_key)
@@ -335,10 +378,10 @@ def get_team_qualitative_trends(team_number, scouting_team_number, event_id=None
                     role_counts[role] = role_counts.get(role, 0) + 1
 
     total_entries = len([
-        e for e in entries
+        data for data in entries
         if any(
-            isinstance((e.data or {}).get(b, None), dict) and
-            (e.data or {}).get(b, {}).get(team_key) is not None
+            isinstance(data.get(b, None), dict) and
+            data.get(b, {}).get(team_key) is not None
             for b in ('red', 'blue', 'individual', 'both')
         )
     ])
@@ -421,6 +464,109 @@ def _source_tag_label(source_tag):
     }.get(source_tag or '', 'data')
 
 
+# Tables whose writes change a match briefing's numbers
+BRIEFING_TABLES = ('scouting_data', 'qualitative_scouting_data', 'team', 'match', 'event')
+
+# External EPA/OPR values are not version-tracked; the TTL bounds their staleness
+_BRIEFING_CACHE = TieredCache('notification_briefings', maxsize=512, ttl=300)
+
+_EPA_SOURCE_LABELS = {
+    'scouted_only': 'scouted data',
+    'scouted_with_statbotics': 'scouted + Statbotics EPA',
+    'statbotics_only': 'Statbotics EPA',
+    'tba_opr_only': 'TBA OPR',
+    'scouted_with_tba_opr': 'scouted + TBA OPR',
+}
+
+
+def _team_stats_block(team_num, stats, qual, indent='  '):
+    """Return a text block with performance + qualitative info for one team."""
+    lines = []
+    if stats:
+        src = _source_tag_label(stats.get('source_tag'))
+        auto = stats.get('auto_avg')
+        teleop = stats.get('teleop_avg')
+        cnt = stats.get('match_count', 0)
+        perf_parts = [f"~{stats['total_avg']:.1f} pts/match ({src})"]
+        if auto is not None and teleop is not None:
+            perf_parts.append(f"Auto: {auto:.1f}, Teleop: {teleop:.1f}")
+        if cnt > 0:
+            perf_parts.append(f"{cnt} match{'es' if cnt != 1 else ''}")
+        lines.append(f"{indent}Team {team_num}: {', '.join(perf_parts)}")
+    else:
+        lines.append(f"{indent}Team {team_num}: No performance data available")
+
+    # Qualitative trends
+    qual_block = _format_qualitative_section(qual, indent=indent + '  ')
+    if qual_block:
+        lines.append(f"{indent}  [Qualitative - {qual['entry_count']} observation(s)]")
+        lines.append(qual_block)
+
+    return '\n'.join(lines)
+
+
+def get_match_briefing(match):
+    """
+    Per-match analytics shared by every notification about ``match``.
+
+    Computed once per (match, scouting team, EPA source, data version) and
+    cached, so each recipient only pays for personalizing the text.
+
+    Returns a dict::
+
+        {
+            'epa_source': str,
+            'event_id': int | None,
+            'event_tz': str | None,
+            'match_time': datetime | None,
+            'stats': {team_number: get_team_epa_aware_stats(...) or None},
+            'quals': {team_number: get_team_qualitative_trends(...) or None},
+            'blocks': {team_number: str},   # formatted stats block
+        }
+    """
+    from app.utils.change_tracking import get_data_versions
+
+    try:
+        from app.utils.analysis import get_current_epa_source
+        epa_source = get_current_epa_source()
+    except Exception:
+        epa_source = 'scouted_only'
+
+    key = (match.id, match.scouting_team_number, epa_source, get_data_versions(BRIEFING_TABLES))
+
+    def _load():
+        stn = match.scouting_team_number
+        event = Event.query.get(match.event_id) if match.event_id else None
+        event_id = event.id if event else None
+        team_numbers = list(dict.fromkeys((match.red_teams or []) + (match.blue_teams or [])))
+
+        leaderboard = None
+        try:
+            from app.utils.team_rankings import get_leaderboard
+            leaderboard = get_leaderboard(scouting_team_numbers=[stn], include_unassigned=True)
+        except Exception as e:
+            print(f"  Leaderboard unavailable for match briefing: {e}")
+
+        stats = {}
+        for tn in team_numbers:
+            try:
+                stats[tn] = get_team_epa_aware_stats(tn, stn, leaderboard=leaderboard)
+            except Exception:
+                stats[tn] = None
+        quals = get_teams_qualitative_trends(team_numbers, stn, event_id=event_id)
+        return {
+            'epa_source': epa_source,
+            'event_id': event_id,
+            'event_tz': event.timezone if event else None,
+            'match_time': get_match_time(match),
+            'stats': stats,
+            'quals': quals,
+            'blocks': {tn: _team_stats_block(tn, stats[tn], quals.get(tn)) for tn in team_numbers},
+        }
+
+    return _BRIEFING_CACHE.get_or_load(key, _load)
+
+
 def create_match_prediction_html(match, target_team_number, message):
     """
     Generate styled HTML content for match strategy email
@@ -610,89 +756,35 @@ def create_strategy_notification_message(match, target_team_number):
         opponent_color = 'Blue' if alliance_color == 'Red' else 'Red'
         message += f"{opponent_color} Alliance: {', '.join([str(t) for t in opponent_teams])}\n"
 
-    match_time = get_match_time(match)
-    event = Event.query.get(match.event_id) if match.event_id else None
-    event_tz = event.timezone if event else None
+    briefing = get_match_briefing(match)
+    match_time = briefing['match_time']
 
     if match_time:
-        formatted_time = format_time_with_timezone(match_time, event_tz, '%I:%M %p')
+        formatted_time = format_time_with_timezone(match_time, briefing['event_tz'], '%I:%M %p')
         message += f"\nScheduled: {formatted_time}\n"
 
-    # ---- Get EPA/OPR source label for this context ----------------------
-    try:
-        from app.utils.analysis import get_current_epa_source
-        epa_source = get_current_epa_source()
-    except Exception:
-        epa_source = 'scouted_only'
-
-    source_labels = {
-        'scouted_only': 'scouted data',
-        'scouted_with_statbotics': 'scouted + Statbotics EPA',
-        'statbotics_only': 'Statbotics EPA',
-        'tba_opr_only': 'TBA OPR',
-        'scouted_with_tba_opr': 'scouted + TBA OPR',
-    }
-    source_label = source_labels.get(epa_source, 'scouted data')
+    source_label = _EPA_SOURCE_LABELS.get(briefing['epa_source'], 'scouted data')
     message += f"\n--- MATCH ANALYSIS (via {source_label}) ---\n"
 
-    event_id = event.id if event else None
-
-    def _team_stats_block(team_num, scouting_team_number, indent='  '):
-        """Return a text block with performance + qualitative info for one team."""
-        lines = []
-        stats = get_team_epa_aware_stats(team_num, scouting_team_number)
-        if stats:
-            src = _source_tag_label(stats.get('source_tag'))
-            auto = stats.get('auto_avg')
-            teleop = stats.get('teleop_avg')
-            cnt = stats.get('match_count', 0)
-            perf_parts = [f"~{stats['total_avg']:.1f} pts/match ({src})"]
-            if auto is not None and teleop is not None:
-                perf_parts.append(f"Auto: {auto:.1f}, Teleop: {teleop:.1f}")
-            if cnt > 0:
-                perf_parts.append(f"{cnt} match{'es' if cnt != 1 else ''}")
-            lines.append(f"{indent}Team {team_num}: {', '.join(perf_parts)}")
-        else:
-            lines.append(f"{indent}Team {team_num}: No performance data available")
-
-        # Qualitative trends
-        qual = get_team_qualitative_trends(team_num, scouting_team_number, event_id=event_id)
-        qual_block = _format_qualitative_section(qual, indent=indent + '  ')
-        if qual_block:
-            lines.append(f"{indent}  [Qualitative - {qual['entry_count']} observation(s)]")
-            lines.append(qual_block)
-
-        return '\n'.join(lines)
-
     # Alliance analysis
     if alliance_teams:
         message += f"\n{alliance_color} Alliance Analysis:\n"
         for team_num in alliance_teams:
-            message += _team_stats_block(team_num, match.scouting_team_number) + '\n'
+            message += briefing['blocks'][team_num] + '\n'
 
     if opponent_teams:
         opponent_color = 'Blue' if alliance_color == 'Red' else 'Red'
         message += f"\n{opponent_color} Alliance Analysis:\n"
         for team_num in opponent_teams:
-            message += _team_stats_block(team_num, match.scouting_team_number) + '\n'
+            message += briefing['blocks'][team_num] + '\n'
 
     # ---- Predicted outcome -----------------------------------------------
-    alliance_avg = 0
-    opponent_avg = 0
-    alliance_count = 0
-    opponent_count = 0
-
-    for team_num in alliance_teams:
-        stats = get_team_epa_aware_stats(team_num, match.scouting_team_number)
-        if stats:
-            alliance_avg += stats['total_avg']
-            alliance_count += 1
-
-    for team_num in opponent_teams:
-        stats = get_team_epa_aware_stats(team_num, match.scouting_team_number)
-        if stats:
-            opponent_avg += stats['total_avg']
-            opponent_count += 1
+    alliance_stats = [briefing['stats'][t] for t in alliance_teams if briefing['stats'][t]]
+    opponent_stats = [briefing['stats'][t] for t in opponent_teams if briefing['stats'][t]]
+    alliance_avg = sum(stats['total_avg'] for stats in alliance_stats)
+    opponent_avg = sum(stats['total_avg'] for stats in opponent_stats)
+    alliance_count = len(alliance_stats)
+    opponent_count = len(opponent_stats)
 
     if alliance_count > 0 and opponent_count > 0:
         opponent_color = 'Blue' if alliance_color == 'Red' else 'Red'
@@ -716,154 +808,73 @@ def create_end_of_day_summary(last_match):
     """
     Create an end-of-day summary message for the event/day containing last_match.
 
+    Match results, scoring stats, close matches and win counts are read from
+    the rolling per-day aggregates in ``event_day_summary``, which are kept
+    current as match results are committed.
+
     Args:
         last_match: Match model instance (the final match of the day used as anchor)
 
     Returns:
         (title, message) tuple
     """
+    from app.utils.event_day_summary import get_day_snapshot
+
     # Determine event and timezone
     event = Event.query.get(last_match.event_id) if last_match and last_match.event_id else None
     event_tz = event.timezone if event else None
 
     title = f"End of Day Summary: {event.name if event else 'Event'}"
 
-    # Find all matches for this event that occurred on the same local date as last_match
-    matches = []
+    # Aggregates for the matches on the same local date as last_match
+    day = None
     if event:
-        all_matches = Match.query.filter_by(event_id=event.id).all()
-        for m in all_matches:
-            mt = get_match_time(m)
-            if not mt:
-                continue
-            try:
-                local_dt = convert_utc_to_local(mt, event_tz)
-                last_local = convert_utc_to_local(get_match_time(last_match), event_tz)
-                if local_dt.date() == last_local.date():
-                    matches.append((m, mt))
-            except Exception:
-                continue
+        try:
+            day = get_day_snapshot(event, last_match)
+        except Exception as e:
+            print(f"  Day aggregates unavailable for event {event.id}: {e}")
 
     message_lines = []
     message_lines.append(f"End of day summary for {event.name if event else 'the event'}:\n")
 
-    if not matches:
+    if not day or not day['matches']:
         message_lines.append("No matches with recorded times found for today.")
         return title, "\n".join(message_lines)
 
-    # Sort matches chronologically
-    matches.sort(key=lambda x: x[1])
-
-    # Simple aggregates
-    win_counts = {}
-    match_count = 0
-    completed_matches = 0
-    highest_scoring = None  # tuple (total_score, match)
-    totals_list = []
-    margins = []
-    missing_scores = []
-
-    # For schedule offset analysis (predicted vs scheduled)
-    offsets_minutes = []
-
-    for m, mt in matches:
-        match_count += 1
-        # Normalize DB scores so negative sentinel values are considered missing
-        red_db = norm_db_score(m.red_score)
-        blue_db = norm_db_score(m.blue_score)
-
-        # Consider completed only if both normalized scores are present
-        if red_db is not None and blue_db is not None:
-            completed_matches += 1
-            total = (red_db or 0) + (blue_db or 0)
-            totals_list.append(total)
-            margin = abs((red_db or 0) - (blue_db or 0))
-            margins.append(margin)
-
-            if highest_scoring is None or total > highest_scoring[0]:
-                highest_scoring = (total, m)
-
-            if m.winner in ('red', 'blue'):
-                winners = m.red_teams if m.winner == 'red' else m.blue_teams
-                for t in winners:
-                    win_counts[t] = win_counts.get(t, 0) + 1
-        else:
-            missing_scores.append(m)
-
-        # Compute schedule offset if both scheduled_time and predicted_time exist
-        try:
-            if getattr(m, 'scheduled_time', None) and getattr(m, 'predicted_time', None):
-                off = (m.predicted_time - m.scheduled_time).total_seconds() / 60.0
-                offsets_minutes.append(off)
-        except Exception:
-            pass
-
     # Match results (brief)
     message_lines.append('MATCH RESULTS:')
-    for m, mt in matches:
-        local_time_str = format_time_with_timezone(mt, event_tz, '%I:%M %p')
-        red_db = norm_db_score(m.red_score)
-        blue_db = norm_db_score(m.blue_score)
-        if red_db is not None and blue_db is not None:
-            result = f"{m.match_type} {m.match_number}: Red {red_db} - Blue {blue_db} ({m.winner or 'unknown'})"
+    for rec in day['matches']:
+        local_time_str = format_time_with_timezone(rec['time'], event_tz, '%I:%M %p')
+        if rec['completed']:
+            result = f"{rec['match_type']} {rec['match_number']}: Red {rec['red']} - Blue {rec['blue']} ({rec['winner'] or 'unknown'})"
         else:
-            result = f"{m.match_type} {m.match_number}: Result pending"
+            result = f"{rec['match_type']} {rec['match_number']}: Result pending"
         message_lines.append(f" - {local_time_str}: {result}")
 
     # Highest scoring match
-    if highest_scoring:
-        total, hmatch = highest_scoring
+    highest = day['highest']
+    if highest:
         message_lines.append('\nHIGHEST SCORING MATCH:')
-        htime = get_match_time(hmatch)
-        h_red = norm_db_score(hmatch.red_score)
-        h_blue = norm_db_score(hmatch.blue_score)
-        message_lines.append(f" - {hmatch.match_type} {hmatch.match_number} at {format_time_with_timezone(htime, event_tz)}: Total {total} (Red {h_red} - Blue {h_blue})")
+        message_lines.append(f" - {highest['match_type']} {highest['match_number']} at {format_time_with_timezone(highest['time'], event_tz)}: Total {highest['total']} (Red {highest['red']} - Blue {highest['blue']})")
 
     # Overall match scoring statistics
-    if totals_list:
-        try:
-            avg_total = statistics.mean(totals_list)
-            med_total = statistics.median(totals_list)
-            stdev_total = statistics.pstdev(totals_list) if len(totals_list) > 1 else 0
-        except Exception:
-            avg_total = med_total = stdev_total = 0
-
+    if day['completed']:
         message_lines.append('\nMATCH SCORING STATS:')
-        message_lines.append(f" - Average total points per completed match: {avg_total:.1f}")
-        message_lines.append(f" - Median total: {med_total}")
-        message_lines.append(f" - Std dev (population): {stdev_total:.1f}")
-
-        # Close matches (small margin)
-        close_threshold = 10
-        close_matches = []
-        for m, mt in matches:
-            red_db = norm_db_score(m.red_score)
-            blue_db = norm_db_score(m.blue_score)
-            if red_db is not None and blue_db is not None:
-                if abs((red_db or 0) - (blue_db or 0)) <= close_threshold:
-                    close_matches.append((m, mt, abs((red_db or 0) - (blue_db or 0))))
-
-        if close_matches:
-            message_lines.append(f" - Close matches (margin ≤ {close_threshold} points): {len(close_matches)}")
-            # show up to 5 of the closest
-            close_matches.sort(key=lambda x: x[2])
-            for m, mt, margin in close_matches[:5]:
-                rdb = norm_db_score(m.red_score)
-                bdb = norm_db_score(m.blue_score)
-                message_lines.append(f"   • {m.match_type} {m.match_number}: Red {rdb} - Blue {bdb} (margin {margin}) at {format_time_with_timezone(get_match_time(m), event_tz)}")
+        message_lines.append(f" - Average total points per completed match: {day['avg_total']:.1f}")
+        message_lines.append(f" - Median total: {day['median_total']}")
+        message_lines.append(f" - Std dev (population): {day['stdev_total']:.1f}")
 
-    # Missing scores summary
-    if missing_scores:
-        message_lines.append(f"\nMATCHES WITH MISSING SCORES: {len(missing_scores)}")
-        for m in missing_scores[:8]:
-            mt = get_match_time(m)
-            message_lines.append(f" - {m.match_type} {m.match_number} at {format_time_with_timezone(mt, event_tz)}")
+        # Close matches (small margin), up to 5 of the closest
+        if day['close_count']:
+            message_lines.append(f" - Close matches (margin ≤ {CLOSE_MARGIN} points): {day['close_count']}")
+            for rec in day['close']:
+                message_lines.append(f"   • {rec['match_type']} {rec['match_number']}: Red {rec['red']} - Blue {rec['blue']} (margin {rec['margin']}) at {format_time_with_timezone(rec['time'], event_tz)}")
 
-    # Team performance averages (uses admin EPA/OPR source setting)
-    team_set = set()
-    for m, _ in matches:
-        for t in m.red_teams + m.blue_teams:
-            team_set.add(t)
+    # Missing scores summary
+    if day['missing_count']:
+        message_lines.append(f"\nMATCHES WITH MISSING SCORES: {day['missing_count']}")
+        for rec in day['missing']:
+            message_lines.append(f" - {rec['match_type']} {rec['match_number']} at {format_time_with_timezone(rec['time'], event_tz)}")
 
     # Get EPA source label once
     try:
@@ -880,35 +891,45 @@ def create_end_of_day_summary(last_match):
     }
     _eod_source_label = _eod_source_labels.get(_eod_epa_source, 'data')
 
+    # One aggregated pass over the scouting team's entries instead of a query per team
+    leaderboard = None
+    try:
+        from app.utils.team_rankings import get_leaderboard
+        leaderboard = get_leaderboard(scouting_team_numbers=[last_match.scouting_team_number],
+                                      include_unassigned=True)
+    except Exception as e:
+        print(f"  Leaderboard unavailable for end-of-day summary: {e}")
+
+    # Team performance averages (uses admin EPA/OPR source setting)
     team_stats = []
     _team_source_tags = {}
-    for team_num in sorted(team_set):
+    for team_num in day['teams']:
         try:
-            stats = get_team_epa_aware_stats(team_num, last_match.scouting_team_number)
+            stats = get_team_epa_aware_stats(team_num, last_match.scouting_team_number, leaderboard=leaderboard)
             if stats:
                 team_stats.append((team_num, stats['total_avg'], stats['match_count']))
                 _team_source_tags[team_num] = stats.get('source_tag', 'unknown')
         except Exception:
             continue
 
+    # Sort by average points desc
+    team_stats.sort(key=lambda x: x[1], reverse=True)
     if team_stats:
         message_lines.append(f'\nTEAM AVERAGES (via {_eod_source_label}):')
-        # Sort by average points desc
-        team_stats.sort(key=lambda x: x[1], reverse=True)
         for tn, avg, cnt in team_stats[:10]:
             src = _team_source_tags.get(tn, '')
             src_str = f' [{_source_tag_label(src)}]' if src and src != 'scouted' else ''
             message_lines.append(f" - Team {tn}: ~{avg:.1f} pts/match ({cnt} match{'es' if cnt != 1 else ''}){src_str}")
 
-    # Qualitative scouting trends for top teams (up to 10, those with data)
+    # Qualitative scouting trends for top teams (up to 8, those with data), from one query
+    top_teams = [ts[0] for ts in team_stats[:15]]
     qual_teams_with_data = []
-    for team_num in [ts[0] for ts in sorted(team_stats, key=lambda x: x[1], reverse=True)[:15]]:
+    if top_teams:
         try:
-            qual = get_team_qualitative_trends(team_num, last_match.scouting_team_number, event_id=event.id if event else None)
-            if qual:
-                qual_teams_with_data.append((team_num, qual))
+            quals = get_teams_qualitative_trends(top_teams, last_match.scouting_team_number, event_id=event.id)
+            qual_teams_with_data = [(tn, quals[tn]) for tn in top_teams if quals.get(tn)]
         except Exception:
-            continue
+            qual_teams_with_data = []
 
     if qual_teams_with_data:
         message_lines.append('\nQUALITATIVE SCOUTING TRENDS:')
@@ -919,22 +940,16 @@ def create_end_of_day_summary(last_match):
                 message_lines.append(qual_block)
 
     # Schedule offset analysis (predicted vs scheduled)
-    if offsets_minutes:
-        try:
-            avg_off = statistics.mean(offsets_minutes)
-            max_off = max(offsets_minutes)
-            min_off = min(offsets_minutes)
-        except Exception:
-            avg_off = max_off = min_off = 0
+    offsets = day['offsets']
+    if offsets:
         message_lines.append('\nSCHEDULE OFFSET SUMMARY (predicted - scheduled, minutes):')
-        message_lines.append(f" - Average offset: {avg_off:.1f} min")
-        message_lines.append(f" - Min offset: {min_off:.1f} min, Max offset: {max_off:.1f} min")
+        message_lines.append(f" - Average offset: {offsets['avg']:.1f} min")
+        message_lines.append(f" - Min offset: {offsets['min']:.1f} min, Max offset: {offsets['max']:.1f} min")
 
     # Top teams by wins
-    if win_counts:
+    if day['top_wins']:
         message_lines.append('\nTOP TEAMS (by wins):')
-        sorted_wins = sorted(win_counts.items(), key=lambda x: x[1], reverse=True)
-        for team_num, wins in sorted_wins[:10]:
+        for team_num, wins in day['top_wins']:
             message_lines.append(f" - Team {team_num}: {wins} win(s)")
 
     # Event-level info
@@ -942,135 +957,110 @@ def create_end_of_day_summary(last_match):
         offset = event.schedule_offset
         message_lines.append(f"\nSCHEDULE OFFSET: {offset} minutes ({'behind' if offset>0 else 'ahead' if offset<0 else 'on time'})")
 
-    message_lines.append(f"\nTotal matches today: {match_count} (completed: {completed_matches})")
+    message_lines.append(f"\nTotal matches today: {day['match_count']} (completed: {day['completed']})")
 
     return title, "\n".join(message_lines)
 
 
-def send_notification_for_subscription(subscription, match):
+def notification_payload_key(subscription, match):
+    """Key under which subscriptions render an identical title and message."""
+    ntype = subscription.notification_type
+    target = subscription.target_team_number if ntype != 'end_of_day_summary' else None
+    minutes = subscription.minutes_before if ntype not in ('match_strategy', 'end_of_day_summary') else None
+    return (ntype, match.id, target, minutes)
+
+
+def _reminder_team_lines(team_num, briefing):
+    """Compact per-team lines used by generic match reminders."""
+    stats = briefing['stats'].get(team_num)
+    if not stats:
+        return f"  Team {team_num}: No data\n"
+    src = _source_tag_label(stats.get('source_tag'))
+    auto = stats.get('auto_avg')
+    teleop = stats.get('teleop_avg')
+    parts = [f"~{stats['total_avg']:.1f} pts ({src})"]
+    if auto is not None and teleop is not None:
+        parts.append(f"A:{auto:.0f} T:{teleop:.0f}")
+    lines = f"  Team {team_num}: {', '.join(parts)}\n"
+    qual = briefing['quals'].get(team_num)
+    if qual and qual.get('summary'):
+        lines += f"    Qual: {qual['summary']}\n"
+    return lines
+
+
+def render_notification(subscription, match):
     """
-    Send notification (email and/or push) for a specific subscription and match
-    
-    Returns:
-        NotificationLog instance
+    Build the (title, message) pair for a subscription and match.
     """
-    try:
-        # Get user
-        user = User.query.get(subscription.user_id)
-        if not user:
-            print(f"User {subscription.user_id} not found for subscription {subscription.id}")
-            return None
-        
-        # Create notification message based on type
-        if subscription.notification_type == 'match_strategy':
-            title, message = create_strategy_notification_message(match, subscription.target_team_number)
-        elif subscription.notification_type == 'end_of_day_summary':
-            # Use the provided match as the anchor for the day's summary
-            title, message = create_end_of_day_summary(match)
-        else:
-            # Generic match reminder — include EPA/OPR-aware team stats and qualitative notes
-            title = "Match Reminder"
-            target_team = subscription.target_team_number
-            mins = subscription.minutes_before or ''
-            mins_str = f" in {mins} minutes" if mins else ""
-            message = f"Match starting{mins_str}!\n\n{format_match_description(match)}\n"
-
-            # Determine target team's alliance
-            if target_team:
-                if target_team in (match.red_teams or []):
-                    t_alliance = 'Red'
-                    my_teams = match.red_teams or []
-                    opp_teams = match.blue_teams or []
-                elif target_team in (match.blue_teams or []):
-                    t_alliance = 'Blue'
-                    my_teams = match.blue_teams or []
-                    opp_teams = match.red_teams or []
-                else:
-                    t_alliance = None
-                    my_teams = (match.red_teams or []) + (match.blue_teams or [])
-                    opp_teams = []
+    # Create notification message based on type
+    if subscription.notification_type == 'match_strategy':
+        title, message = create_strategy_notification_message(match, subscription.target_team_number)
+    elif subscription.notification_type == 'end_of_day_summary':
+        # Use the provided match as the anchor for the day's summary
+        title, message = create_end_of_day_summary(match)
+    else:
+        # Generic match reminder — include EPA/OPR-aware team stats and qualitative notes
+        title = "Match Reminder"
+        target_team = subscription.target_team_number
+        mins = subscription.minutes_before or ''
+        mins_str = f" in {mins} minutes" if mins else ""
+        message = f"Match starting{mins_str}!\n\n{format_match_description(match)}\n"
+
+        # Determine target team's alliance
+        if target_team:
+            if target_team in (match.red_teams or []):
+                t_alliance = 'Red'
+                my_teams = match.red_teams or []
+                opp_teams = match.blue_teams or []
+            elif target_team in (match.blue_teams or []):
+                t_alliance = 'Blue'
+                my_teams = match.blue_teams or []
+                opp_teams = match.red_teams or []
+            else:
+                t_alliance = None
+                my_teams = (match.red_teams or []) + (match.blue_teams or [])
+                opp_teams = []
+
+            if t_alliance:
+                message += f"\nTeam {target_team} is on {t_alliance} Alliance\n"
+
+            # Team stats are shared with every other notification for this match
+            briefing = get_match_briefing(match)
+            _rm_epa_src = briefing['epa_source']
+            _rm_src_labels = {
+                'scouted_only': 'scouted data',
+                'scouted_with_statbotics': 'scouted + EPA',
+                'statbotics_only': 'Statbotics EPA',
+                'tba_opr_only': 'TBA OPR',
+                'scouted_with_tba_opr': 'scouted + TBA OPR',
+            }
+            _rm_src_label = _rm_src_labels.get(_rm_epa_src, 'data')
+
+            # Alliance team stats
+            if my_teams:
+                message += f"\n--- ALLIANCE ANALYSIS (via {_rm_src_label}) ---\n"
+                for tn in my_teams:
+                    message += _reminder_team_lines(tn, briefing)
+
+            if opp_teams:
+                opp_color = 'Blue' if t_alliance == 'Red' else 'Red'
+                message += f"\n--- {opp_color} ALLIANCE (via {_rm_src_label}) ---\n"
+                for tn in opp_teams:
+                    message += _reminder_team_lines(tn, briefing)
 
-                if t_alliance:
-                    message += f"\nTeam {target_team} is on {t_alliance} Alliance\n"
+    return title, message
 
-                # Get EPA source label
-                try:
-                    from app.utils.analysis import get_current_epa_source
-                    _rm_epa_src = get_current_epa_source()
-                except Exception:
-                    _rm_epa_src = 'scouted_only'
-                _rm_src_labels = {
-                    'scouted_only': 'scouted data',
-                    'scouted_with_statbotics': 'scouted + EPA',
-                    'statbotics_only': 'Statbotics EPA',
-                    'tba_opr_only': 'TBA OPR',
-                    'scouted_with_tba_opr': 'scouted + TBA OPR',
-                }
-                _rm_src_label = _rm_src_labels.get(_rm_epa_src, 'data')
-
-                event = Event.query.get(match.event_id) if match.event_id else None
-                event_id = event.id if event else None
-
-                # Alliance team stats
-                if my_teams:
-                    message += f"\n--- ALLIANCE ANALYSIS (via {_rm_src_label}) ---\n"
-                    for tn in my_teams:
-                        stats = get_team_epa_aware_stats(tn, match.scouting_team_number)
-                        if stats:
-                            src = _source_tag_label(stats.get('source_tag'))
-                            auto = stats.get('auto_avg')
-                            teleop = stats.get('teleop_avg')
-                            parts = [f"~{stats['total_avg']:.1f} pts ({src})"]
-                            if auto is not None and teleop is not None:
-                                parts.append(f"A:{auto:.0f} T:{teleop:.0f}")
-                            message += f"  Team {tn}: {', '.join(parts)}\n"
-                            qual = get_team_qualitative_trends(tn, match.scouting_team_number, event_id=event_id)
-                            if qual and qual.get('summary'):
-                                message += f"    Qual: {qual['summary']}\n"
-                        else:
-                            message += f"  Team {tn}: No data\n"
-
-                if opp_teams:
-                    opp_color = 'Blue' if t_alliance == 'Red' else 'Red'
-                    message += f"\n--- {opp_color} ALLIANCE (via {_rm_src_label}) ---\n"
-                    for tn in opp_teams:
-                        stats = get_team_epa_aware_stats(tn, match.scouting_team_number)
-                        if stats:
-                            src = _source_tag_label(stats.get('source_tag'))
-                            parts = [f"~{stats['total_avg']:.1f} pts ({src})"]
-                            auto = stats.get('auto_avg')
-                            teleop = stats.get('teleop_avg')
-                            if auto is not None and teleop is not None:
-                                parts.append(f"A:{auto:.0f} T:{teleop:.0f}")
-                            message += f"  Team {tn}: {', '.join(parts)}\n"
-                            qual = get_team_qualitative_trends(tn, match.scouting_team_number, event_id=event_id)
-                            if qual and qual.get('summary'):
-                                message += f"    Qual: {qual['summary']}\n"
-                        else:
-                            message += f"  Team {tn}: No data\n"
-        
-        # Create log entry
-        log = NotificationLog(
-            user_id=user.id,
-            subscription_id=subscription.id,
-            notification_type=subscription.notification_type,
-            title=title,
-            message=message,
-            match_id=match.id,
-            team_number=subscription.target_team_number,
-            event_code=subscription.event_code,
-            sent_at=datetime.now(timezone.utc)
-        )
-        
-        # Send email if enabled
-        if subscription.email_enabled and user.email:
-            try:
-                # Generate styled HTML email content
-                html_content_inner = create_match_prediction_html(match, subscription.target_team_number, message)
-                
-                # Wrap in the email template
-                brand = current_app.config.get('APP_NAME') or 'ObsidianScout'
-                html_full = f"""
+
+def render_notification_email(match, target_team_number, title, message):
+    """
+    Build the (plain text body, HTML document) pair for a notification email.
+    """
+    # Generate styled HTML email content
+    html_content_inner = create_match_prediction_html(match, target_team_number, message)
+
+    # Wrap in the email template
+    brand = current_app.config.get('APP_NAME') or 'ObsidianScout'
+    html_full = f"""
 <!doctype html>
 <html>
     <head>
@@ -1095,111 +1085,77 @@ def send_notification_for_subscription(subscription, match):
     </body>
 </html>
 """
-                
-                # Also create plain text version (keep message as is for plain text fallback)
-                event = Event.query.get(match.event_id) if match.event_id else None
-                email_body = message
-                if event:
-                    email_body += f"\n\nEvent: {event.name} ({event.code})"
-                
-                # Send with HTML version
-                success, error = send_email(
-                    to=user.email,
-                    subject=title,
-                    body=email_body,
-                    html=html_full
-                )
-                
-                if success:
-                    log.email_sent = True
-                    print(f" Email sent to {user.email} for match {match.id}")
-                else:
-                    if error and ('No recipients' in str(error) or 'opted out' in str(error)):
-                        # Recipient opted out - not a send failure
-                        log.email_sent = False
-                        log.email_error = 'Not sent: recipient opted out'
-                        print(f" Email skipped for {user.email}: recipient opted out")
-                    else:
-                        log.email_error = error
-                        print(f" Email failed for {user.email}: {error}")
-            except Exception as e:
-                import traceback
-                log.email_error = str(e)
-                print(f" Email exception for {user.email}: {e}")
-                traceback.print_exc()
-        
-        # Send push notification if enabled
-        if subscription.push_enabled:
-            try:
-                # Check if user has any active devices
-                device_count = DeviceToken.query.filter_by(
-                    user_id=user.id,
-                    is_active=True
-                ).count()
-                
-                if device_count > 0:
-                    # Prepare push data
-                    push_data = {
-                        'type': 'match_notification',
-                        'match_id': match.id,
-                        'team_number': subscription.target_team_number,
-                        'url': f'/matches/{match.id}'
-                    }
-                    
-                    # Truncate message if too long for push notification (max 4096 bytes for payload)
-                    push_message = message
-                    if len(message) > 500:  # Conservative limit for push message
-                        push_message = message[:497] + "..."
-                    
-                    try:
-                        success_count, failed_count, errors = send_push_to_user(
-                            user_id=user.id,
-                            title=title,
-                            message=push_message,
-                            data=push_data
-                        )
-                        
-                        log.push_sent_count = success_count
-                        log.push_failed_count = failed_count
-                        if errors:
-                            # Truncate error messages to prevent database overflow
-                            error_text = '\n'.join(errors)
-                            if len(error_text) > 1000:
-                                error_text = error_text[:997] + "..."
-                            log.push_error = error_text
-                        
-                        print(f" Push sent to {success_count} devices for user {user.username}")
-                        if failed_count > 0:
-                            print(f" Push failed for {failed_count} devices")
-                            for err in errors:
-                                print(f"   - {err}")
-                    except Exception as push_ex:
-                        import traceback
-                        error_msg = f"Push send error: {type(push_ex).__name__}: {str(push_ex)}"
-                        log.push_error = error_msg[:1000]  # Truncate for database
-                        log.push_failed_count = device_count
-                        print(f" Push exception for user {user.username}: {push_ex}")
-                        traceback.print_exc()
-                else:
-                    log.push_error = "No active devices registered"
-                    print(f"No active devices for user {user.username}")
-            except Exception as e:
-                import traceback
-                log.push_error = f"Push setup error: {type(e).__name__}: {str(e)}"[:1000]
-                print(f" Push exception for user {user.username}: {e}")
-                traceback.print_exc()
-        
-        # Save log
-        db.session.add(log)
-        db.session.commit()
-        
-        return log
-        
-    except Exception as e:
-        print(f" Error sending notification for subscription {subscription.id}: {e}")
-        traceback.print_exc()
-        db.session.rollback()
-        return None
+
+    # Also create plain text version (keep message as is for plain text fallback)
+    event = Event.query.get(match.event_id) if match.event_id else None
+    email_body = message
+    if event:
+        email_body += f"\n\nEvent: {event.name} ({event.code})"
+
+    return email_body, html_full
+
+
+def render_notification_push(match, target_team_number, message):
+    """
+    Build the (message, data) pair for a notification push.
+    """
+    # Prepare push data
+    push_data = {
+        'type': 'match_notification',
+        'match_id': match.id,
+        'team_number': target_team_number,
+        'url': f'/matches/{match.id}'
+    }
+
+    # Truncate message if too long for push notification (max 4096 bytes for payload)
+    push_message = message
+    if len(message) > 500:  # Conservative limit for push message
+        push_message = message[:497] + "..."
+    return push_message, push_data
+
+
+def record_email_result(log, user, success, error):
+    """Store a send_email outcome on a NotificationLog."""
+    if success:
+        log.email_sent = True
+        print(f" Email sent to {user.email} for match {log.match_id}")
+    elif error and ('No recipients' in str(error) or 'opted out' in str(error)):
+        # Recipient opted out - not a send failure
+        log.email_sent = False
+        log.email_error = 'Not sent: recipient opted out'
+        print(f" Email skipped for {user.email}: recipient opted out")
+    else:
+        log.email_error = error
+        print(f" Email failed for {user.email}: {error}")
+
+
+def record_push_result(log, user, success_count, failed_count, errors):
+    """Store per-device push outcomes on a NotificationLog."""
+    log.push_sent_count = success_count
+    log.push_failed_count = failed_count
+    if errors:
+        # Truncate error messages to prevent database overflow
+        error_text = '\n'.join(errors)
+        if len(error_text) > 1000:
+            error_text = error_text[:997] + "..."
+        log.push_error = error_text
+
+    print(f" Push sent to {success_count} devices for user {user.username}")
+    if failed_count > 0:
+        print(f" Push failed for {failed_count} devices")
+        for err in errors:
+            print(f"   - {err}")
+
+
+def send_notification_for_subscription(subscription, match):
+    """
+    Send notification (email and/or push) for a specific subscription and match
+    
+    Returns:
+        NotificationLog instance
+    """
+    from app.utils.notification_delivery import deliver_notifications
+    return deliver_notifications([(subscription, match)])[0]
 
 
 def schedule_notifications_for_match(match):
@@ -1333,9 +1289,13 @@ def schedule_notifications_for_match(match):
     return scheduled_count
 
 
-def process_pending_notifications():
+def process_pending_notifications(queue_ids=None):
     """
     Process all pending notifications that are due to be sent
+
+    Args:
+        queue_ids: optional ids to limit processing to (as handed out by the
+            notification timer); rows no longer pending or due are skipped
     
     Returns:
         (sent_count, failed_count)
@@ -1345,15 +1305,31 @@ def process_pending_notifications():
     now_utc_naive = now.replace(tzinfo=None)
     
     # Get all pending notifications that are due
-    pending = NotificationQueue.query.filter(
+    query = NotificationQueue.query.filter(
         NotificationQueue.status == 'pending',
         NotificationQueue.scheduled_for <= now_utc_naive,
         NotificationQueue.attempts < 3  # Max 3 attempts
-    ).all()
+    )
+    if queue_ids is not None:
+        if not queue_ids:
+            return 0, 0
+        query = query.filter(NotificationQueue.id.in_(list(queue_ids)))
+    pending = query.all()
     
     sent_count = 0
     failed_count = 0
-    
+
+    def _record_failure(queue_entry, error_message):
+        nonlocal failed_count
+        queue_entry.attempts += 1
+        queue_entry.last_attempt = now
+        queue_entry.error_message = error_message
+        if queue_entry.attempts >= 3:
+            queue_entry.status = 'failed'
+            failed_count += 1
+
+    # Validate entries first, then hand every deliverable one to the batch sender
+    deliverable = []
     for queue_entry in pending:
         try:
             # Get subscription and match
@@ -1371,45 +1347,35 @@ def process_pending_notifications():
                 queue_entry.status = 'cancelled'
                 queue_entry.error_message = 'Subscription no longer active'
                 continue
-            
-            # Send notification
-            log = send_notification_for_subscription(subscription, match)
-            
+
+            deliverable.append((queue_entry, subscription, match))
+        except Exception as e:
+            print(f" Error processing notification queue {queue_entry.id}: {e}")
+            traceback.print_exc()
+            _record_failure(queue_entry, str(e))
+
+    if deliverable:
+        from app.utils.notification_delivery import deliver_notifications
+        try:
+            logs = deliver_notifications([(sub, match) for _, sub, match in deliverable])
+        except Exception as e:
+            print(f" Error delivering notification batch: {e}")
+            traceback.print_exc()
+            logs = [None] * len(deliverable)
+
+        for (queue_entry, _, _), log in zip(deliverable, logs):
             if log:
                 # Check if at least one delivery method succeeded
-                if log.email_sent or log.push_sent_count > 0:
+                if log.email_sent or (log.push_sent_count or 0) > 0:
                     queue_entry.status = 'sent'
                     queue_entry.last_attempt = now
                     sent_count += 1
                 else:
                     # Both failed, increment attempts
-                    queue_entry.attempts += 1
-                    queue_entry.last_attempt = now
-                    queue_entry.error_message = f"Email: {log.email_error or 'N/A'}, Push: {log.push_error or 'N/A'}"
-                    
-                    if queue_entry.attempts >= 3:
-                        queue_entry.status = 'failed'
-                        failed_count += 1
+                    _record_failure(queue_entry, f"Email: {log.email_error or 'N/A'}, Push: {log.push_error or 'N/A'}")
             else:
                 # Notification send completely failed
-                queue_entry.attempts += 1
-                queue_entry.last_attempt = now
-                queue_entry.error_message = 'Failed to create notification'
-                
-                if queue_entry.attempts >= 3:
-                    queue_entry.status = 'failed'
-                    failed_count += 1
-                    
-        except Exception as e:
-            print(f" Error processing notification queue {queue_entry.id}: {e}")
-            traceback.print_exc()
-            queue_entry.attempts += 1
-            queue_entry.last_attempt = now
-            queue_entry.error_message = str(e)
-            
-            if queue_entry.attempts >= 3:
-                queue_entry.status = 'failed'
-                failed_count += 1
+                _record_failure(queue_entry, 'Failed to create notification')
     
     db.session.commit()
     return sent_count, failed_count
@@ -1434,10 +1400,10 @@ def schedule_end_of_day_summaries():
     last match of the day for events that have active subscriptions.
 
     Behavior:
-      - For each event that has matches today (in the event's local timezone),
-        find the last match (by match time) and schedule a notification for
-        subscriptions with notification_type == 'end_of_day_summary' and
-        matching event_code.
+      - For each event with active subscriptions of notification_type ==
+        'end_of_day_summary' for its event_code (and scouting team), find the
+        last match of today (in the event's local timezone) from the rolling
+        day aggregates and schedule a notification for those subscriptions.
       - The notification is scheduled 5 minutes after the last match time to
         allow results/stats to settle.
       - Avoids duplicating pending queue entries.
@@ -1445,71 +1411,66 @@ def schedule_end_of_day_summaries():
     Returns:
       Number of summary notifications scheduled
     """
-    from app.models import Event, Match
-    from app.utils.timezone_utils import convert_utc_to_local
+    from app.models import Event
+    from app.utils.event_day_summary import get_event_aggregate
 
     now_utc = datetime.now(timezone.utc)
     scheduled_count = 0
 
-    # Find events that have matches and active subscriptions for end-of-day
-    events = Event.query.all()
+    # Only events someone subscribed to need their day looked at
+    subscriptions_by_code = {}
+    for subscription in NotificationSubscription.query.filter(
+        NotificationSubscription.is_active == True,
+        NotificationSubscription.notification_type == 'end_of_day_summary'
+    ).all():
+        subscriptions_by_code.setdefault(subscription.event_code, []).append(subscription)
+    if not subscriptions_by_code:
+        return 0
+
+    events = Event.query.filter(Event.code.in_([c for c in subscriptions_by_code if c])).all()
     for event in events:
         try:
-            # Gather matches with a valid time
-            matches = Match.query.filter(
-                Match.event_id == event.id
-            ).all()
-
-            candidate_matches = []
-            for m in matches:
-                m_time = get_match_time(m)
-                if not m_time:
-                    continue
-
-                # Convert to event local time and compare date
-                local_dt = convert_utc_to_local(m_time, event.timezone)
-                # If the match happens on the same local date as now in that timezone
-                local_now = convert_utc_to_local(now_utc, event.timezone)
-                if local_dt.date() == local_now.date():
-                    candidate_matches.append((m, m_time))
-
-            if not candidate_matches:
+            subscriptions = [s for s in subscriptions_by_code.get(event.code, [])
+                             if event.scouting_team_number is None
+                             or s.scouting_team_number == event.scouting_team_number]
+            if not subscriptions:
                 continue
 
-            # Find the last match (by UTC match time)
-            last_match, last_match_time = max(candidate_matches, key=lambda x: x[1])
+            aggregate = get_event_aggregate(event)
+            last = aggregate.last_match(aggregate.local_date(now_utc))
+            if not last:
+                continue
 
             # Schedule send time a few minutes after the match ends (default +5 minutes)
-            send_time = last_match_time + timedelta(minutes=5)
+            send_time = last['time'] + timedelta(minutes=5)
             if send_time <= now_utc:
                 # Already past - skip scheduling
                 continue
-
-            # Find subscriptions for end-of-day summaries for this event
-            subscriptions = NotificationSubscription.query.filter(
-                NotificationSubscription.is_active == True,
-                NotificationSubscription.notification_type == 'end_of_day_summary',
-                NotificationSubscription.event_code == event.code
-            ).all()
+            # Naive UTC for database storage, as for match notifications
+            send_time_naive = send_time.astimezone(timezone.utc).replace(tzinfo=None)
+
+            # Avoid duplicates
+            pending = {
+                entry.subscription_id: entry
+                for entry in NotificationQueue.query.filter(
+                    NotificationQueue.match_id == last['id'],
+                    NotificationQueue.status == 'pending',
+                    NotificationQueue.subscription_id.in_([s.id for s in subscriptions])
+                ).all()
+            }
 
             for subscription in subscriptions:
-                # Avoid duplicates
-                existing = NotificationQueue.query.filter_by(
-                    subscription_id=subscription.id,
-                    match_id=last_match.id,
-                    status='pending'
-                ).first()
-
+                existing = pending.get(subscription.id)
                 if existing:
                     # Update scheduled time if changed
-                    if existing.scheduled_for != send_time:
-                        existing.scheduled_for = send_time
-                        existing.updated_at = datetime.now(timezone.utc)
+                    if existing.scheduled_for != send_time_naive:
+                        existing.scheduled_for = send_time_naive
+                        existing.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
                 else:
                     queue_entry = NotificationQueue(
                         subscription_id=subscription.id,
-                        match_id=last_match.id,
-                        scheduled_for=send_time,
+                        match_id=last['id'],
+                        scheduled_for=send_time_naive,
                         status='pending'
                     )
                     db.session.add(queue_entry)
@@ -1520,8 +1481,7 @@ def schedule_end_of_day_summaries():
             import traceback
             traceback.print_exc()
 
-    if scheduled_count > 0:
-        db.session.commit()
+    db.session.commit()
 
     return scheduled_count
 
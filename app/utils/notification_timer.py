@@ -0,0 +1,190 @@
+"""
+In-memory timer for pending notification queue entries.
+
+The notification worker used to wake every 60 seconds and poll
+``NotificationQueue`` for due rows.  ``NotificationTimer`` keeps the due
+time of every pending row in a heap so the worker can sleep until exactly
+the next one, and is woken early when a commit adds an earlier one.
+
+The queue table stays the source of truth:
+
+- ``load_pending`` fills the heap from the table (on start and on a slow
+  resync, which also picks up rows written by other processes)
+- Session listeners push committed inserts/updates of queue rows into the
+  heap; deletions and status changes are dropped lazily, since
+  ``process_pending_notifications`` re-checks every row it is handed
+- a failed attempt is retried ``RETRY_DELAY`` after ``last_attempt``
+"""
+import heapq
+import threading
+from datetime import datetime, timedelta, timezone
+
+# Delay before retrying a queue entry whose last attempt failed
+RETRY_DELAY = timedelta(seconds=60)
+
+QUEUE_TABLE = 'notification_queue'
+
+
+def _as_utc(value):
+    """Queue timestamps are stored as naive UTC; normalise to aware UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def due_time(scheduled_for, last_attempt=None):
+    """When a pending queue entry should next be processed."""
+    due = _as_utc(scheduled_for)
+    retry = _as_utc(last_attempt)
+    if retry is not None:
+        retry = retry + RETRY_DELAY
+        if due is None or retry > due:
+            due = retry
+    return due
+
+
+class NotificationTimer:
+    """Min-heap of (due time, queue id) with a condition to wait on."""
+
+    def __init__(self):
+        self._heap = []
+        self._due = {}
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._due)
+
+    def schedule(self, queue_id, due):
+        """Add or move a queue entry; wakes waiters when it is the new earliest."""
+        if queue_id is None or due is None:
+            return
+        with self._cond:
+            if self._due.get(queue_id) == due:
+                return
+            self._due[queue_id] = due
+            heapq.heappush(self._heap, (due, queue_id))
+            self._drop_stale()
+            if self._heap[0] == (due, queue_id):
+                self._cond.notify_all()
+
+    def cancel(self, queue_id):
+        with self._cond:
+            self._due.pop(queue_id, None)
+
+    def clear(self):
+        with self._cond:
+            self._heap.clear()
+            self._due.clear()
+
+    def _drop_stale(self):
+        # Heap entries whose id was cancelled or moved are skipped lazily
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """Earliest due time, or None when nothing is pending."""
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """Remove and return the ids of every entry due at or before ``now``."""
+        now = now or datetime.now(timezone.utc)
+        due_ids = []
+        with self._cond:
+            self._drop_stale()
+            while self._heap and self._heap[0][0] <= now:
+                _, queue_id = heapq.heappop(self._heap)
+                self._due.pop(queue_id, None)
+                due_ids.append(queue_id)
+                self._drop_stale()
+        return due_ids
+
+    def wait(self, deadline):
+        """Sleep until the next entry is due, ``deadline`` passes, or ``wake()``."""
+        with self._cond:
+            self._drop_stale()
+            wake_at = deadline
+            if self._heap and (wake_at is None or self._heap[0][0] < wake_at):
+                wake_at = self._heap[0][0]
+            timeout = None
+            if wake_at is not None:
+                timeout = (wake_at - datetime.now(timezone.utc)).total_seconds()
+                if timeout <= 0:
+                    return
+            self._cond.wait(timeout)
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def load_pending(self):
+        """Rebuild the heap from pending queue rows. Returns the number loaded."""
+        from app.models_misc import NotificationQueue
+
+        rows = NotificationQueue.query.with_entities(
+            NotificationQueue.id, NotificationQueue.scheduled_for, NotificationQueue.last_attempt
+        ).filter(
+            NotificationQueue.status == 'pending',
+            NotificationQueue.attempts < 3
+        ).all()
+        with self._cond:
+            self._heap = [(due_time(scheduled_for, last_attempt), queue_id)
+                          for queue_id, scheduled_for, last_attempt in rows
+                          if scheduled_for is not None]
+            heapq.heapify(self._heap)
+            self._due = {queue_id: due for due, queue_id in self._heap}
+            self._cond.notify_all()
+        return len(self._heap)
+
+
+notification_timer = NotificationTimer()
+
+_listeners_registered = False
+
+
+def register_notification_timer_listeners():
+    """Hook Session events so committed queue rows reach the timer immediately."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    @event.listens_for(Session, 'after_flush')
+    def _collect_queue_changes(session, flush_context):
+        try:
+            changes = None
+            for obj in list(session.new) + list(session.dirty):
+                if getattr(type(obj), '__tablename__', None) == QUEUE_TABLE:
+                    changes = changes if changes is not None else session.info.setdefault('_notification_timer', {})
+                    if obj.status == 'pending' and (obj.attempts or 0) < 3:
+                        changes[obj.id] = due_time(obj.scheduled_for, obj.last_attempt)
+                    else:
+                        changes[obj.id] = None
+            for obj in session.deleted:
+                if getattr(type(obj), '__tablename__', None) == QUEUE_TABLE:
+                    changes = changes if changes is not None else session.info.setdefault('_notification_timer', {})
+                    changes[obj.id] = None
+        except Exception:
+            pass
+
+    @event.listens_for(Session, 'after_commit')
+    def _apply_queue_changes(session):
+        changes = session.info.pop('_notification_timer', None)
+        if not changes:
+            return
+        for queue_id, due in changes.items():
+            if due is None:
+                notification_timer.cancel(queue_id)
+            else:
+                notification_timer.schedule(queue_id, due)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _discard_queue_changes(session):
+        session.info.pop('_notification_timer', None)
+
+    _listeners_registered = True
@@ -19,6 +19,9 @@ last_schedule_check_time = None
 # Cache of last-known event schedule_offset values so we only reschedule notifications
 # when the offset changes meaningfully. Keyed by event.id -> int(offset_minutes)
 last_event_offsets = {}
+# match.id -> (match time, subscription data version) when the match was last
+# scheduled; a match is rescheduled only when either changes
+scheduled_match_times = {}
 
 # Leader lock file ensures only one process on this host runs the scheduler.
 # We use an atomic create (O_EXCL) strategy and write JSON containing pid/timestamp
@@ -116,14 +119,36 @@ def acquire_leader_lock(app, stale_seconds=600):
 
         return False
 
+# Housekeeping cadences (seconds)
+MATCH_TIME_UPDATE_INTERVAL = 600
+SCHEDULE_ADJUST_INTERVAL = 900
+SCHEDULE_CHECK_INTERVAL = 300
+CLEANUP_INTERVAL = 3600
+# Reload the timer from the queue table to pick up rows other processes wrote
+TIMER_RESYNC_INTERVAL = 300
+
+# Cadence of the API-backed refreshes while nothing is upcoming.  Match times
+# only reach the database through these refreshes, so they keep running at
+# this slower rate to pick up events whose matches are untimed or stale.
+IDLE_REFRESH_INTERVAL = 1800
+
+# Whether the last schedule check found matches in the upcoming window; the
+# API-backed match time and schedule adjustment refreshes run at their full
+# cadence only while there is something to notify about.
+upcoming_activity = False
+
+
 def notification_worker(app):
     """
     Background worker that:
-    1. Updates match times from APIs every 10 minutes
-    2. Schedules notifications for upcoming matches
-    3. Processes pending notifications every minute
+    1. Sends each pending notification when it falls due (see notification_timer)
+    2. Schedules notifications for upcoming matches every 5 minutes
+    3. Updates match times from APIs every 10 minutes while matches are upcoming
+       (every 30 minutes otherwise)
     4. Cleans up old data periodically
     """
+    from app.utils.notification_timer import notification_timer
+
     print(" Notification worker thread started")
 
     # Use timezone-aware datetime.min to avoid mixing naive and aware datetimes
@@ -133,14 +158,28 @@ def notification_worker(app):
     last_schedule_check_time = datetime.min.replace(tzinfo=timezone.utc)
     last_schedule_adjustment = datetime.min.replace(tzinfo=timezone.utc)
     last_cleanup = datetime.min.replace(tzinfo=timezone.utc)
+    last_timer_resync = datetime.min.replace(tzinfo=timezone.utc)
 
     while True:
+        next_housekeeping = None
         try:
             with app.app_context():
                 now = datetime.now(timezone.utc)
 
-                # Update match times every 10 minutes
-                if (now - last_match_time_update).total_seconds() >= 600:
+                # Rebuild the in-memory timer from the queue table
+                if (now - last_timer_resync).total_seconds() >= TIMER_RESYNC_INTERVAL:
+                    try:
+                        notification_timer.load_pending()
+                        last_timer_resync = now
+                    except Exception as e:
+                        print(f" Error loading pending notifications: {e}")
+
+                active = upcoming_activity or len(notification_timer) > 0
+                match_time_interval = MATCH_TIME_UPDATE_INTERVAL if active else IDLE_REFRESH_INTERVAL
+                schedule_adjust_interval = SCHEDULE_ADJUST_INTERVAL if active else IDLE_REFRESH_INTERVAL
+
+                # Update match times every 10 minutes (30 while idle)
+                if (now - last_match_time_update).total_seconds() >= match_time_interval:
                     try:
                         print("\n Updating match times from APIs...")
                         # This import is assumed to work in the Flask context
@@ -152,8 +191,8 @@ def notification_worker(app):
                     except Exception as e:
                         print(f" Error updating match times: {e}")
 
-                # Check for schedule adjustments every 15 minutes
-                if (now - last_schedule_adjustment).total_seconds() >= 900:
+                # Check for schedule adjustments every 15 minutes (30 while idle)
+                if (now - last_schedule_adjustment).total_seconds() >= schedule_adjust_interval:
                     try:
                         print("\n⏱️  Checking for schedule delays/advances...")
                         # This import is assumed to work in the Flask context
@@ -174,7 +213,7 @@ def notification_worker(app):
 
                 # Schedule notifications for upcoming matches every 5 minutes
                 # Update module-level last_schedule_check_time so other code can inspect it
-                if (now - last_schedule_check_time).total_seconds() >= 300:
+                if (now - last_schedule_check_time).total_seconds() >= SCHEDULE_CHECK_INTERVAL:
                     try:
                         print("\n Checking for matches to schedule notifications...")
                         schedule_upcoming_match_notifications(app)
@@ -183,18 +222,20 @@ def notification_worker(app):
                     except Exception as e:
                         print(f" Error scheduling notifications: {e}")
 
-                # Process pending notifications every minute
-                try:
-                    # This import is assumed to work in the Flask context
-                    from app.utils.notification_service import process_pending_notifications
-                    sent, failed = process_pending_notifications()
-                    if sent > 0 or failed > 0:
-                        print(f" Notifications sent: {sent}, failed: {failed}")
-                except Exception as e:
-                    print(f" Error processing notifications: {e}")
+                # Send whatever has fallen due
+                due_ids = notification_timer.pop_due()
+                if due_ids:
+                    try:
+                        # This import is assumed to work in the Flask context
+                        from app.utils.notification_service import process_pending_notifications
+                        sent, failed = process_pending_notifications(due_ids)
+                        if sent > 0 or failed > 0:
+                            print(f" Notifications sent: {sent}, failed: {failed}")
+                    except Exception as e:
+                        print(f" Error processing notifications: {e}")
 
                 # Cleanup old data every hour
-                if (now - last_cleanup).total_seconds() >= 3600:
+                if (now - last_cleanup).total_seconds() >= CLEANUP_INTERVAL:
                     try:
                         print("\n Cleaning up old notification data...")
                         # These imports are assumed to work in the Flask context
@@ -211,8 +252,24 @@ def notification_worker(app):
                     except Exception as e:
                         print(f" Error during cleanup: {e}")
 
-            # Sleep for 60 seconds before next cycle
-            time.sleep(60)
+                cadences = [
+                    (last_timer_resync, TIMER_RESYNC_INTERVAL),
+                    (last_schedule_check_time, SCHEDULE_CHECK_INTERVAL),
+                    (last_cleanup, CLEANUP_INTERVAL),
+                ]
+                if upcoming_activity or len(notification_timer) > 0:
+                    cadences += [(last_match_time_update, MATCH_TIME_UPDATE_INTERVAL),
+                                 (last_schedule_adjustment, SCHEDULE_ADJUST_INTERVAL)]
+                else:
+                    cadences += [(last_match_time_update, IDLE_REFRESH_INTERVAL),
+                                 (last_schedule_adjustment, IDLE_REFRESH_INTERVAL)]
+                next_housekeeping = min(last + timedelta(seconds=interval) for last, interval in cadences)
+                # A task that failed keeps its old timestamp; don't spin on it
+                next_housekeeping = max(next_housekeeping, now + timedelta(seconds=5))
+
+            # Sleep until the next notification is due or housekeeping is needed;
+            # commits that queue an earlier notification wake us immediately
+            notification_timer.wait(next_housekeeping)
 
         except Exception as e:
             print(f" Error in notification worker: {e}")
@@ -261,12 +318,19 @@ def schedule_upcoming_match_notifications(app):
     # Combine and deduplicate candidate matches
     all_matches = list({m.id: m for m in (candidates + predicted_candidates)}.values())
 
+    global upcoming_activity
     if not all_matches:
+        upcoming_activity = False
         return
 
     print(f" Found {len(all_matches)} upcoming matches to check for notifications")
 
+    # Matches only need (re)scheduling when their time or the subscriptions changed
+    from app.utils.change_tracking import get_data_versions
+    subscriptions_version = get_data_versions(('notification_subscription',))
+
     scheduled_total = 0
+    in_window = 0
     for match in all_matches:
         # Use get_match_time to interpret naive DB values properly and get UTC-aware time
         match_time = get_match_time(match)
@@ -278,12 +342,23 @@ def schedule_upcoming_match_notifications(app):
             # Skip matches outside the real UTC window
             continue
 
+        in_window += 1
+        stamp = (match_time, subscriptions_version)
+        if scheduled_match_times.get(match.id) == stamp:
+            continue
+
         try:
             count = schedule_notifications_for_match(match)
             scheduled_total += count
+            scheduled_match_times[match.id] = stamp
         except Exception as e:
             print(f" Error scheduling notifications for match {match.id}: {e}")
 
+    upcoming_activity = in_window > 0
+    # Forget matches that have left the window
+    for match_id in [mid for mid, (t, _) in scheduled_match_times.items() if t < now]:
+        scheduled_match_times.pop(match_id, None)
+
     if scheduled_total > 0:
         print(f" Scheduled {scheduled_total} notifications")
 
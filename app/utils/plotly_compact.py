@@ -0,0 +1,230 @@
+"""
+Compact serialization for Plotly figures built by the graphs blueprint.
+
+``pio.to_json(fig)`` writes every data point as a JSON number and embeds
+the full default Plotly template (~6KB) plus the theme colours in each
+figure's layout.  ``/graphs`` and custom pages render dozens of figures per
+response, so most of the payload is the same template repeated.
+
+``compact_figure_json`` instead:
+
+* encodes numeric trace arrays as typed arrays -- ``{"dtype": "f4" | "i4",
+  "bdata": <base64>}`` (plus ``"shape"`` for 2-D arrays such as heatmap
+  ``z``), the same shape Plotly uses for its own binary arrays;
+* drops ``layout.template`` and the layout keys that only repeat
+  ``_chart_theme()`` values, replacing them with a reference to one shared
+  template name (``CHART_TEMPLATE``);
+* serializes with ``orjson`` when it is installed, falling back to the
+  standard library encoder.
+
+The vendored plotly.js predates native ``bdata`` decoding, so browsers
+expand figures with ``expandPlotlyFigure`` (``static/js/plotly_compact.js``)
+before ``Plotly.newPlot``.  Server-side consumers (image export) use
+``expand_figure``.
+"""
+import base64
+import json
+import math
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+CHART_TEMPLATE = 'chart'
+
+# Arrays shorter than this stay plain JSON; the typed form is not smaller.
+MIN_TYPED_LENGTH = 8
+
+# Layout keys whose value comes from _chart_theme(): (path, theme key)
+_THEME_LAYOUT_KEYS = (
+    (('plot_bgcolor',), 'plot_bg'),
+    (('paper_bgcolor',), 'paper_bg'),
+    (('font', 'color'), 'text_main'),
+)
+
+# Label-like attributes stay plain JSON even when every entry is numeric
+_PLAIN_KEYS = frozenset(('text', 'hovertext', 'ids', 'labels', 'parents', 'names'))
+
+_INT32_MIN = -2 ** 31
+_INT32_MAX = 2 ** 31 - 1
+
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _typed_array(values):
+    """Return the typed-array dict for a flat list of numbers, or ``None``."""
+    import numpy as np
+
+    if len(values) < MIN_TYPED_LENGTH:
+        return None
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        if min(values) < _INT32_MIN or max(values) > _INT32_MAX:
+            return None
+        dtype, arr = 'i4', np.asarray(values, dtype='<i4')
+    elif all(v is None or _is_number(v) for v in values):
+        dtype, arr = 'f4', np.asarray([math.nan if v is None else v for v in values], dtype='<f4')
+    else:
+        return None
+    bdata = base64.b64encode(arr.tobytes()).decode('ascii')
+    # Short integers and round numbers ("3," / "12.5,") are already smaller
+    # as JSON text than 5.3 base64 characters per value.
+    if len(bdata) >= len(dumps(values)):
+        return None
+    return {'dtype': dtype, 'bdata': bdata}
+
+
+def _encode_array(value):
+    if not value or not isinstance(value, list):
+        return None
+    if all(isinstance(row, list) for row in value):
+        width = len(value[0])
+        if width == 0 or any(len(row) != width for row in value):
+            return None
+        flat = [v for row in value for v in row]
+        if len(flat) < MIN_TYPED_LENGTH or not all(v is None or _is_number(v) for v in flat):
+            return None
+        encoded = _typed_array(flat)
+        if encoded is not None:
+            encoded['shape'] = f"{len(value)},{width}"
+        return encoded
+    return _typed_array(value)
+
+
+def _compact_arrays(obj):
+    """Recursively replace numeric lists inside a trace dict with typed arrays."""
+    if isinstance(obj, dict):
+        out = {}
+        for key, value in obj.items():
+            if hasattr(value, 'tolist'):
+                # numpy arrays / pandas series; scalars come back unchanged
+                value = value.tolist()
+            elif isinstance(value, tuple):
+                value = list(value)
+            encoded = None
+            if isinstance(value, list) and key not in _PLAIN_KEYS:
+                encoded = _encode_array(value)
+            out[key] = encoded if encoded is not None else _compact_arrays(value)
+        return out
+    if isinstance(obj, (list, tuple)):
+        return [_compact_arrays(v) for v in obj]
+    return obj
+
+
+def _strip_theme(layout, theme):
+    if not theme:
+        return
+    for path, theme_key in _THEME_LAYOUT_KEYS:
+        parent = layout
+        for part in path[:-1]:
+            parent = parent.get(part)
+            if not isinstance(parent, dict):
+                break
+        else:
+            if parent.get(path[-1]) == theme.get(theme_key):
+                del parent[path[-1]]
+                # Drop containers left empty (e.g. ``font: {}``)
+                if len(path) > 1 and not parent:
+                    layout.pop(path[0], None)
+
+
+def compact_figure(fig, theme=None):
+    """Return the compact dict form of a ``go.Figure`` (or figure dict)."""
+    if hasattr(fig, 'to_plotly_json'):
+        fig = fig.to_plotly_json()  # already a deep copy
+
+    layout = dict(fig.get('layout') or {})
+    layout.pop('template', None)
+    _strip_theme(layout, theme)
+    layout['template'] = CHART_TEMPLATE
+
+    out = {'data': [_compact_arrays(trace) for trace in fig.get('data') or []], 'layout': layout}
+    if fig.get('frames'):
+        out['frames'] = fig['frames']
+    return out
+
+
+def _encoder():
+    from plotly.utils import PlotlyJSONEncoder
+    return PlotlyJSONEncoder
+
+
+def dumps(obj):
+    """Serialize *obj* to a JSON string using the fastest available encoder.
+
+    Values neither encoder handles natively (numpy scalars, Decimals, ...)
+    go through Plotly's own ``PlotlyJSONEncoder.default``.
+    """
+    encoder = _encoder()
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=encoder().default,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, cls=encoder, separators=(',', ':'))
+
+
+def compact_figure_json(fig, theme=None):
+    """Compact JSON text for a figure; drop-in for ``pio.to_json(fig)``."""
+    return dumps(compact_figure(fig, theme=theme))
+
+
+def chart_template(theme=None):
+    """The shared template compact figures refer to by ``CHART_TEMPLATE``."""
+    import plotly.io as pio
+
+    template = pio.templates[pio.templates.default].to_plotly_json()
+    if theme:
+        layout = template.setdefault('layout', {})
+        layout['plot_bgcolor'] = theme.get('plot_bg')
+        layout['paper_bgcolor'] = theme.get('paper_bg')
+        layout.setdefault('font', {})['color'] = theme.get('text_main')
+    return template
+
+
+def _decode_array(value):
+    import numpy as np
+
+    arr = np.frombuffer(base64.b64decode(value['bdata']), dtype='<' + value['dtype'])
+    if value['dtype'] == 'f4':
+        # float32 carries ~7 significant digits; round so 12.3 stays 12.3
+        values = [None if math.isnan(v) else float(f"{v:.7g}") for v in arr.tolist()]
+    else:
+        values = arr.tolist()
+    shape = value.get('shape')
+    if shape:
+        rows, cols = (int(n) for n in str(shape).split(','))
+        values = [values[r * cols:(r + 1) * cols] for r in range(rows)]
+    return values
+
+
+def _expand_arrays(obj):
+    if isinstance(obj, dict):
+        if 'bdata' in obj and obj.get('dtype') in ('f4', 'i4'):
+            return _decode_array(obj)
+        return {k: _expand_arrays(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_expand_arrays(v) for v in obj]
+    return obj
+
+
+def expand_figure(fig, theme=None):
+    """Inverse of ``compact_figure``: plain Plotly figure dict from compact JSON or dict.
+
+    Plain (non-compact) figures pass through unchanged apart from parsing.
+    """
+    if isinstance(fig, (str, bytes)):
+        fig = json.loads(fig)
+    layout = dict(fig.get('layout') or {})
+    if layout.get('template') == CHART_TEMPLATE:
+        layout['template'] = chart_template(theme)
+        if theme:
+            layout.setdefault('plot_bgcolor', theme.get('plot_bg'))
+            layout.setdefault('paper_bgcolor', theme.get('paper_bg'))
+            font = dict(layout.get('font') or {})
+            font.setdefault('color', theme.get('text_main'))
+            layout['font'] = font
+    return dict(fig, data=_expand_arrays(fig.get('data') or []), layout=layout)
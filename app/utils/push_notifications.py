@@ -165,122 +165,95 @@ def get_vapid_keys(force_generate=False):
         return {'public_key': '', 'private_key': ''}
 
 
-def send_push_notification(device_token, title, message, data=None):
-    """
-    Send push notification to a single device
-    
-    Args:
-        device_token: DeviceToken model instance
-        title: Notification title
-        message: Notification message body
-        data: Optional dict of additional data to send
-        
-    Returns:
-        (success: bool, error_message: str or None)
+def _prepare_push(device_token, title, message, data=None, vapid_keys=None):
+    """Validate the device and build the webpush arguments.
+
+    Returns ``(webpush_kwargs, None)`` or ``(None, error_message)``.
     """
+    vapid_keys = vapid_keys if vapid_keys is not None else get_vapid_keys()
+
+    if not vapid_keys.get('private_key'):
+        return None, "VAPID keys not configured"
+
+    # Validate device token data
+    if not device_token.endpoint:
+        return None, "Device endpoint is missing"
+    if not device_token.p256dh_key:
+        return None, "Device p256dh key is missing"
+    if not device_token.auth_key:
+        return None, "Device auth key is missing"
+
+    # Build notification payload
+    payload = {
+        'title': str(title)[:100],  # Limit title length
+        'body': str(message)[:500],  # Limit message length
+        'icon': '/static/img/icon-192.png',
+        'badge': '/static/img/badge-72.png',
+        'data': data or {},
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    }
+
+    # Ensure payload is JSON serializable
     try:
-        vapid_keys = get_vapid_keys()
-        
-        if not vapid_keys.get('private_key'):
-            return False, "VAPID keys not configured"
-        
-        # Validate device token data
-        if not device_token.endpoint:
-            return False, "Device endpoint is missing"
-        if not device_token.p256dh_key:
-            return False, "Device p256dh key is missing"
-        if not device_token.auth_key:
-            return False, "Device auth key is missing"
-        
-        # Build notification payload
-        payload = {
-            'title': str(title)[:100],  # Limit title length
-            'body': str(message)[:500],  # Limit message length
-            'icon': '/static/img/icon-192.png',
-            'badge': '/static/img/badge-72.png',
-            'data': data or {},
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Ensure payload is JSON serializable
-        try:
-            payload_json = json.dumps(payload)
-        except (TypeError, ValueError) as json_err:
-            return False, f"Payload not JSON serializable: {json_err}"
-        
-        # Prepare subscription info
-        subscription_info = {
+        payload_json = json.dumps(payload)
+    except (TypeError, ValueError) as json_err:
+        return None, f"Payload not JSON serializable: {json_err}"
+
+    # pywebpush expects the private key in DER format as bytes or base64url string
+    return {
+        'subscription_info': {
             'endpoint': device_token.endpoint,
             'keys': {
                 'p256dh': device_token.p256dh_key,
                 'auth': device_token.auth_key
             }
+        },
+        'data': payload_json,
+        'vapid_private_key': vapid_keys['private_key'],
+        'vapid_claims': {
+            'sub': 'mailto:noreply@obsidianscout.app'
         }
-        
-        # Send push notification
-        # pywebpush expects the private key in DER format as bytes or base64url string
-        try:
-            webpush(
-                subscription_info=subscription_info,
-                data=payload_json,
-                vapid_private_key=vapid_keys['private_key'],
-                vapid_claims={
-                    'sub': 'mailto:noreply@obsidianscout.app'
-                }
-            )
-        except Exception as webpush_error:
-            # If the key format is wrong, try to regenerate
-            print(f"Webpush call failed: {webpush_error}")
-            if 'deserialize' in str(webpush_error).lower() or 'invalid' in str(webpush_error).lower():
-                print("VAPID key format issue detected. Deleting keys to force regeneration.")
-                import os
-                vapid_file = os.path.join(current_app.instance_path, 'vapid_keys.json')
-                if os.path.exists(vapid_file):
-                    os.remove(vapid_file)
-                return False, "VAPID key error - keys regenerated, please try again"
-            raise
-        
+    }, None
+
+
+def _deliver_push(webpush_kwargs):
+    """Perform the Web Push HTTP request. Returns the exception raised, or None.
+
+    Touches neither the database nor the app context, so it is safe to run
+    on a worker thread.
+    """
+    try:
+        webpush(**webpush_kwargs)
+        return None
+    except Exception as e:
+        return e
+
+
+def _finish_push(device_token, error):
+    """Record a delivery outcome on the device row.
+
+    Returns (success: bool, error_message: str or None)
+    """
+    if error is None:
         # Update device token success timestamp
         device_token.last_success = datetime.now(timezone.utc)
         device_token.failure_count = 0
         db.session.commit()
-        
         return True, None
-        
-    except WebPushException as e:
-        error_msg = str(e)
-        print(f"WebPushException for device {device_token.device_name}: {error_msg}")
-        
-        # Handle specific errors
-        if '404' in error_msg or '410' in error_msg:
-            # Device endpoint no longer valid - mark as inactive
-            device_token.is_active = False
-            device_token.failure_count += 1
-            try:
-                db.session.commit()
-            except Exception as commit_ex:
-                print(f"Error committing device deactivation: {commit_ex}")
-                db.session.rollback()
-            return False, "Device endpoint expired (410/404)"
-        else:
-            # Other error - increment failure count
-            device_token.failure_count += 1
-            if device_token.failure_count >= 5:
-                device_token.is_active = False
-                print(f"Device {device_token.device_name} deactivated after 5 failures")
-            try:
-                db.session.commit()
-            except Exception as commit_ex:
-                print(f"Error committing failure count: {commit_ex}")
-                db.session.rollback()
-            return False, f"WebPushException: {error_msg}"
-            
-    except Exception as e:
-        import traceback
-        error_msg = f"{type(e).__name__}: {str(e)}"
+
+    if not isinstance(error, WebPushException):
+        # If the key format is wrong, try to regenerate
+        print(f"Webpush call failed: {error}")
+        if 'deserialize' in str(error).lower() or 'invalid' in str(error).lower():
+            print("VAPID key format issue detected. Deleting keys to force regeneration.")
+            import os
+            vapid_file = os.path.join(current_app.instance_path, 'vapid_keys.json')
+            if os.path.exists(vapid_file):
+                os.remove(vapid_file)
+            return False, "VAPID key error - keys regenerated, please try again"
+
+        error_msg = f"{type(error).__name__}: {str(error)}"
         print(f"Push notification error for device {device_token.device_name}: {error_msg}")
-        traceback.print_exc()
-        
         device_token.failure_count += 1
         if device_token.failure_count >= 5:
             device_token.is_active = False
@@ -292,6 +265,59 @@ def send_push_notification(device_token, title, message, data=None):
             db.session.rollback()
         return False, error_msg
 
+    error_msg = str(error)
+    print(f"WebPushException for device {device_token.device_name}: {error_msg}")
+
+    # Handle specific errors
+    if '404' in error_msg or '410' in error_msg:
+        # Device endpoint no longer valid - mark as inactive
+        device_token.is_active = False
+        device_token.failure_count += 1
+        try:
+            db.session.commit()
+        except Exception as commit_ex:
+            print(f"Error committing device deactivation: {commit_ex}")
+            db.session.rollback()
+        return False, "Device endpoint expired (410/404)"
+
+    # Other error - increment failure count
+    device_token.failure_count += 1
+    if device_token.failure_count >= 5:
+        device_token.is_active = False
+        print(f"Device {device_token.device_name} deactivated after 5 failures")
+    try:
+        db.session.commit()
+    except Exception as commit_ex:
+        print(f"Error committing failure count: {commit_ex}")
+        db.session.rollback()
+    return False, f"WebPushException: {error_msg}"
+
+
+def send_push_notification(device_token, title, message, data=None):
+    """
+    Send push notification to a single device
+    
+    Args:
+        device_token: DeviceToken model instance
+        title: Notification title
+        message: Notification message body
+        data: Optional dict of additional data to send
+        
+    Returns:
+        (success: bool, error_message: str or None)
+    """
+    try:
+        webpush_kwargs, error = _prepare_push(device_token, title, message, data)
+        if error:
+            return False, error
+        return _finish_push(device_token, _deliver_push(webpush_kwargs))
+    except Exception as e:
+        import traceback
+        error_msg = f"{type(e).__name__}: {str(e)}"
+        print(f"Push notification error for device {device_token.device_name}: {error_msg}")
+        traceback.print_exc()
+        return False, error_msg
+
 
 def send_push_to_user(user_id, title, message, data=None):
     """
@@ -322,10 +348,13 @@ def send_push_to_user(user_id, title, message, data=None):
         success_count = 0
         failed_count = 0
         errors = []
-        
-        for device in devices:
+
+        # Devices are sent to in parallel; results are recorded here in device order
+        from app.utils.notification_delivery import push_in_parallel
+        results = push_in_parallel([(device, title, message, data) for device in devices])
+
+        for device, (success, error) in zip(devices, results):
             try:
-                success, error = send_push_notification(device, title, message, data)
                 if success:
                     success_count += 1
                     print(f"   Sent to device: {device.device_name}")
@@ -0,0 +1,278 @@
+"""
+On-disk cache for rendered charts (Plotly JSON, PNG/SVG images).
+
+Shared graphs, public custom pages and the assistant visualizer rebuild
+their figures from the database on every view, so one share link posted
+to a team channel costs a full render per viewer.  Entries here are keyed
+by the widget/graph spec plus the data version counters of the tables the
+chart reads and the signatures of the files it reads, so any write to
+those tables produces a new key and a stale chart is never served.
+
+The version counters live in process memory and start from zero again
+after a restart, so keys that depend on tables also carry a render epoch
+persisted next to the files.  The first write this process makes to a
+rendered table advances the epoch (and removes the files of older
+epochs); a restart without writes in between keeps serving the cached
+renders.  Every table-backed key also carries the versions of all
+``EPOCH_TABLES``: once a process has advanced the epoch, at least one of
+them is non-zero in each key it builds, so a restarted process (all zero
+until it writes) cannot rebuild a key whose data was written after
+rendering.  Writes this process cannot see (raw SQL, other processes) are
+not detected, unlike the time-bucketed ETags of ``conditional_get``.
+
+Files live under ``<instance>/render_cache``; the least recently used files
+are removed once the directory grows past ``RENDER_CACHE_MAX_BYTES``.  The
+key doubles as the ETag of the cached response.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, make_response, request
+
+from app.utils.change_tracking import get_data_versions, on_data_version_bump
+
+logger = logging.getLogger(__name__)
+
+# Tables a rendered chart's data comes from
+RENDER_TABLES = ('team', 'event', 'match', 'scouting_data', 'team_event')
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+EPOCH_FILE = 'EPOCH'
+
+# Tables whose first write in this process starts a new render epoch
+EPOCH_TABLES = RENDER_TABLES + ('custom_page',)
+
+MIMETYPES = {
+    'json': 'application/json',
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+class DiskRenderCache:
+    """Size-bounded LRU of rendered blobs stored as ``<key>.<ext>`` files."""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index = None  # (key, ext) -> size, least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._epoch_advanced = False
+
+    def _dir(self):
+        if self.directory is None:
+            self.directory = os.path.join(current_app.instance_path, 'render_cache')
+        return self.directory
+
+    def _limit(self):
+        if self.max_bytes is not None:
+            return self.max_bytes
+        try:
+            return int(current_app.config.get('RENDER_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        except Exception:
+            return DEFAULT_MAX_BYTES
+
+    def _load_index(self):
+        # Caller holds self._lock
+        if self._index is not None:
+            return
+        directory = self._dir()
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            key, _, ext = name.rpartition('.')
+            if not key or ext not in MIMETYPES:
+                continue
+            try:
+                st = os.stat(os.path.join(directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, key, ext, st.st_size))
+        entries.sort()
+        self._index = OrderedDict(((key, ext), size) for _, key, ext, size in entries)
+        self._total = sum(self._index.values())
+
+    def _path(self, key, ext):
+        return os.path.join(self._dir(), f"{key}.{ext}")
+
+    def get(self, key, ext):
+        """Return the cached bytes or ``None``."""
+        with self._lock:
+            self._load_index()
+            if (key, ext) not in self._index:
+                return None
+            self._index.move_to_end((key, ext))
+        try:
+            with open(self._path(key, ext), 'rb') as f:
+                return f.read()
+        except OSError:
+            with self._lock:
+                size = self._index.pop((key, ext), 0)
+                self._total -= size
+            return None
+
+    def put(self, key, ext, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        path = self._path(key, ext)
+        with self._lock:
+            self._load_index()
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.debug("Render cache write failed for %s: %s", path, e)
+                return
+            self._total -= self._index.pop((key, ext), 0)
+            self._index[(key, ext)] = len(data)
+            self._total += len(data)
+            self._evict()
+
+    def _evict(self):
+        # Caller holds self._lock
+        limit = self._limit()
+        while self._total > limit and len(self._index) > 1:
+            (key, ext), size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(key, ext))
+            except OSError:
+                pass
+
+    def epoch(self):
+        """Current render epoch, read from disk once per process."""
+        with self._lock:
+            if self._epoch is None:
+                try:
+                    with open(os.path.join(self._dir(), EPOCH_FILE), 'r', encoding='utf-8') as f:
+                        self._epoch = int(f.read().strip() or 0)
+                except (OSError, ValueError):
+                    self._epoch = 0
+            return self._epoch
+
+    def advance_epoch(self):
+        """Start a new epoch (once per process) and drop the files of older ones."""
+        if self._epoch_advanced:
+            return
+        current = self.epoch()
+        with self._lock:
+            if self._epoch_advanced:
+                return
+            self._load_index()
+            try:
+                with open(os.path.join(self._dir(), EPOCH_FILE), 'r', encoding='utf-8') as f:
+                    current = max(current, int(f.read().strip() or 0))
+            except (OSError, ValueError):
+                pass
+            self._epoch = current + 1
+            path = os.path.join(self._dir(), EPOCH_FILE)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.write(str(self._epoch))
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.debug("Render cache epoch write failed for %s: %s", path, e)
+            self._epoch_advanced = True
+            prefix = f"v{self._epoch}-"
+            for key, ext in list(self._index):
+                if key.startswith('v') and not key.startswith(prefix):
+                    self._total -= self._index.pop((key, ext))
+                    try:
+                        os.remove(self._path(key, ext))
+                    except OSError:
+                        pass
+
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key, ext in list(self._index):
+                try:
+                    os.remove(self._path(key, ext))
+                except OSError:
+                    pass
+            self._index.clear()
+            self._total = 0
+
+
+render_cache = DiskRenderCache()
+
+# EPOCH_TABLES plus any other tables render_key is given
+_epoch_tables = set(EPOCH_TABLES)
+_epoch_pending = False
+
+
+def _on_data_version_bump(names):
+    global _epoch_pending
+    if render_cache._epoch_advanced or not _epoch_tables.intersection(names):
+        return
+    try:
+        render_cache.advance_epoch()
+    except RuntimeError:
+        _epoch_pending = True  # no app context to locate the cache; advance on the next key
+
+
+on_data_version_bump(_on_data_version_bump)
+
+
+def render_key(spec, tables=RENDER_TABLES, files=()):
+    """Cache key / ETag for a chart described by *spec* (any JSON-able value).
+
+    Built from the spec, the data versions of *tables* and the signatures
+    of *files* only, so it stays valid across restarts.
+    """
+    from app.utils.conditional_get import file_signature
+
+    global _epoch_pending
+    tables = tuple(tables)
+    spec_text = json.dumps(spec, sort_keys=True, default=str)
+    parts = (
+        hashlib.sha1(spec_text.encode('utf-8')).hexdigest(),
+        tables,
+        get_data_versions(tables),
+        file_signature(files),
+    )
+    if tables:
+        # Writes to any epoch table since the epoch started make the key unrepeatable
+        parts += (get_data_versions(EPOCH_TABLES),)
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    if not tables:
+        return digest
+    _epoch_tables.update(tables)
+    if _epoch_pending:
+        _epoch_pending = False
+        render_cache.advance_epoch()
+    return f"v{render_cache.epoch()}-{digest}"
+
+
+def get_or_render(key, ext, builder):
+    """Return cached bytes for *key*, or call ``builder()`` and cache its output."""
+    data = render_cache.get(key, ext)
+    if data is not None:
+        return data
+    data = builder()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    render_cache.put(key, ext, data)
+    return data
+
+
+def cached_render_response(key, ext, builder):
+    """Serve a rendered blob with an ETag, answering ``If-None-Match`` with 304."""
+    if request.if_none_match.contains(key):
+        response = make_response('', 304)
+    else:
+        response = make_response(get_or_render(key, ext, builder))
+        response.mimetype = MIMETYPES[ext]
+    response.set_etag(key)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
@@ -0,0 +1,152 @@
+"""
+Per-request team-isolation scope.
+
+The team isolation filters and the alliance-aware config helpers each
+looked up the current team's alliance status on their own, so one page
+render issued the same ``team_alliance_status`` / ``scouting_alliance``
+queries, re-read member game configs for the shared event codes and
+re-parsed the effective game and pit configs many times over.
+
+``Scope`` resolves these once for a scouting team: the active alliance,
+its member team numbers and config status, and (lazily, on first use) the
+shared event codes and the effective game / pit configs.  ``get_scope``
+keeps one per team number in ``flask.g`` for the rest of the request and
+drops it when a commit in this process touches the alliance tables or a
+config file is saved (see ``change_tracking.get_data_versions``).  Outside
+a request nothing is cached.
+"""
+import copy
+import json
+from functools import cached_property
+
+from flask import g, has_request_context
+
+# Resources whose writes change a team's scope
+SCOPE_TABLES = (
+    'team_alliance_status',
+    'scouting_alliance',
+    'scouting_alliance_member',
+    'scouting_alliance_event',
+    'game_config',
+    'pit_config',
+)
+
+_CURRENT = object()
+
+
+class Scope:
+    """What a scouting team can see: its active alliance and effective configs."""
+
+    def __init__(self, team_number, versions=None):
+        self.team_number = team_number
+        self.versions = versions
+        self.alliance_active = False
+        self.alliance = None
+        if team_number is not None:
+            self.alliance_active, self.alliance = _load_alliance_status(team_number)
+
+        alliance = self.alliance
+        self.alliance_id = alliance.id if alliance else None
+        self.config_complete = bool(alliance and alliance.is_config_complete())
+        if alliance:
+            members = set(alliance.get_member_team_numbers())
+            if alliance.game_config_team:
+                members.add(alliance.game_config_team)
+            # Keep the current team even if its membership row is stale
+            members.add(team_number)
+            self.member_numbers = list(members)
+            self.alliance_info = {
+                'alliance_id': alliance.id,
+                'alliance_name': alliance.alliance_name,
+                'game_config_team': alliance.game_config_team,
+                'pit_config_team': alliance.pit_config_team,
+                'config_status': alliance.config_status,
+            }
+        else:
+            self.member_numbers = []
+            self.alliance_info = None
+
+    @cached_property
+    def shared_event_codes(self):
+        """Upper-cased event codes the active alliance collaborates on."""
+        if not self.alliance:
+            return []
+        return [str(c).strip().upper() for c in (self.alliance.get_shared_events() or []) if c]
+
+    @cached_property
+    def effective_game_config(self):
+        from app.utils.config_manager import load_game_config
+
+        alliance = self.alliance if self.config_complete else None
+        if alliance:
+            if alliance.shared_game_config:
+                try:
+                    return json.loads(alliance.shared_game_config)
+                except (json.JSONDecodeError, TypeError):
+                    pass
+            if alliance.game_config_team:
+                return load_game_config(team_number=alliance.game_config_team)
+        return load_game_config(team_number=self.team_number)
+
+    @cached_property
+    def effective_pit_config(self):
+        from app.utils.config_manager import load_pit_config, merge_pit_configs
+
+        alliance = self.alliance if self.config_complete else None
+        default = load_pit_config(team_number=None)
+        if alliance:
+            if alliance.shared_pit_config:
+                try:
+                    # Merge with the default so missing option lists are preserved
+                    return merge_pit_configs(default, json.loads(alliance.shared_pit_config))
+                except (json.JSONDecodeError, TypeError):
+                    pass
+            if alliance.pit_config_team:
+                return merge_pit_configs(default, load_pit_config(team_number=alliance.pit_config_team))
+        return merge_pit_configs(default, load_pit_config(team_number=self.team_number))
+
+    def game_config(self):
+        """A copy of the effective game config the caller may modify."""
+        return copy.deepcopy(self.effective_game_config)
+
+    def pit_config(self):
+        """A copy of the effective pit config the caller may modify."""
+        return copy.deepcopy(self.effective_pit_config)
+
+
+def _load_alliance_status(team_number):
+    """``(alliance_mode_active, active_alliance)`` from the team's status row, in one query."""
+    from app.models import TeamAllianceStatus, db
+
+    try:
+        # Recover automatically if an earlier DB error left this session aborted.
+        if not db.session.is_active:
+            db.session.rollback()
+        status = TeamAllianceStatus.query.filter_by(team_number=team_number).first()
+        if not status or not status.is_alliance_mode_active:
+            return False, None
+        return True, status.active_alliance
+    except Exception:
+        from flask import current_app
+        current_app.logger.exception("DB error loading alliance status for the request scope")
+        db.session.rollback()
+        return False, None
+
+
+def get_scope(team_number=_CURRENT):
+    """The request's ``Scope`` for ``team_number`` (default: the current scouting team)."""
+    from app.utils.change_tracking import get_data_versions
+
+    if team_number is _CURRENT:
+        from app.utils.team_isolation import get_current_scouting_team_number
+        team_number = get_current_scouting_team_number()
+
+    versions = get_data_versions(SCOPE_TABLES)
+    if not has_request_context():
+        return Scope(team_number, versions)
+    scopes = g.setdefault('_isolation_scopes', {})
+    scope = scopes.get(team_number)
+    if scope is None or scope.versions != versions:
+        scope = scopes[team_number] = Scope(team_number, versions)
+    return scope
+
@@ -10,8 +10,8 @@ from app.models import Match, Event
 from app.utils.timezone_utils import convert_utc_to_local, format_time_with_timezone
 from app.utils.api_utils import get_api_headers, get_preferred_api_source
 from app.utils.config_manager import get_current_game_config
-from app.utils.event_code_utils import build_year_prefixed_event_code, normalize_event_code
-import requests
+from app.utils.event_code_utils import build_year_prefixed_event_code, normalize_event_code, split_event_code
+from app.utils.http_client import http_get
 
 
 def fetch_actual_times_from_first(event_code, event_timezone=None):
@@ -42,7 +42,7 @@ def fetch_actual_times_from_first(event_code, event_timezone=None):
     for endpoint, match_type in endpoints:
         try:
             api_url = f"{base_url}{endpoint}"
-            response = requests.get(api_url, headers=headers, timeout=15)
+            response = http_get(api_url, headers=headers, timeout=15)
             
             print(f"   {match_type}: {response.status_code} from {api_url}")
             
@@ -110,7 +110,7 @@ def fetch_actual_times_from_tba(event_code, event_timezone=None):
     
     try:
         api_url = f"{base_url}/event/{event_key}/matches"
-        response = requests.get(api_url, headers=get_tba_api_headers(), timeout=15)
+        response = http_get(api_url, headers=get_tba_api_headers(), timeout=15)
         
         if response.status_code != 200:
             print(f"️  TBA API returned {response.status_code} for {api_url}")
@@ -627,6 +627,9 @@ def update_all_active_events_schedule():
     # For each scouting team, check their configured event
     from app.utils.team_utils import team_sort_key
     from app.utils.api_utils import set_season_override, clear_season_override
+    from app.utils.upstream_fingerprint import (
+        SCOPE_SCHEDULE, probe_event_for_config, event_unchanged, mark_event_applied,
+    )
     for team_number in sorted(team_numbers, key=team_sort_key):
         try:
             game_config = load_game_config(team_number=team_number)
@@ -646,12 +649,22 @@ def update_all_active_events_schedule():
                 # and TBA helpers use the correct season for API calls
                 set_season_override(season)
                 try:
+                    # Nothing upstream moved since the last adjustment: skip it
+                    raw_code = split_event_code(event_code_db)[1]
+                    fingerprint = probe_event_for_config(raw_code, season, game_config)
+                    if event_unchanged(SCOPE_SCHEDULE, raw_code, season, team_number, fingerprint):
+                        print(f" Schedule for {event_code_db} unchanged upstream; skipping team {team_number}")
+                        results.append({'success': True, 'skipped': True, 'event_code': event_code_db})
+                        continue
+
                     print(f"\n{'='*60}")
                     print(f" Processing team {team_number}, event {event_code_db}")
                     print(f"{'='*60}")
                     
                     result = update_event_schedule(event_code_db, team_number)
                     results.append(result)
+                    if result.get('success'):
+                        mark_event_applied(SCOPE_SCHEDULE, raw_code, season, team_number, fingerprint)
                 finally:
                     clear_season_override()
         except Exception as e:
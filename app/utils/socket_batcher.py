@@ -0,0 +1,176 @@
+"""
+Coalescing Socket.IO emitter for bursty room updates.
+
+Alliance syncs and pick list edits used to emit one Socket.IO event per
+change: ``alliance_data_sync_auto`` per member team and alliance room on
+every sync cycle, ``lists_updated``/``recommendations_updated`` on every
+list edit.  During bulk imports clients received storms of these and
+refetched for each one.
+
+``CoalescingEmitter`` buffers payloads per (namespace, room, event).  Once
+a room has been quiet for ``window`` seconds, or ``max_wait`` seconds after
+its first buffered payload, it sends one message built by the event's
+merge function.  Events without a merge function send the latest payload.
+
+Merged message shapes:
+
+- ``alliance_data_sync_auto``: the usual sync payload with the entry lists
+  combined and de-duplicated, plus ``sync_ids``, ``from_teams`` and
+  ``batched`` (number of syncs folded in)
+- ``lists_updated``: ``{'event_id', 'changes': [...]}`` with only the last
+  change per list entry
+- ``recommendations_updated``: a single ``{'event_id'}`` signal
+"""
+import json
+import threading
+import time
+
+# Quiet period before a room's buffered payloads are sent
+DEFAULT_WINDOW = 0.5
+
+# Upper bound on how long a busy room's payloads are held back
+DEFAULT_MAX_WAIT = 2.0
+
+SYNC_ENTRY_FIELDS = ('scouting_data', 'pit_data', 'qualitative_data')
+
+
+def _unique(items, key):
+    seen = set()
+    result = []
+    for item in items:
+        marker = key(item)
+        if marker not in seen:
+            seen.add(marker)
+            result.append(item)
+    return result
+
+
+def _entry_key(entry):
+    return json.dumps(entry, sort_keys=True, default=str)
+
+
+def merge_alliance_sync(payloads):
+    """Fold several ``alliance_data_sync_auto`` payloads into one."""
+    merged = dict(payloads[-1])
+    for field in SYNC_ENTRY_FIELDS:
+        entries = [entry for payload in payloads for entry in payload.get(field) or []]
+        merged[field] = _unique(entries, _entry_key)
+    merged['sync_ids'] = _unique((p['sync_id'] for p in payloads if p.get('sync_id') is not None), lambda v: v)
+    merged['from_teams'] = _unique((p.get('from_team') for p in payloads), lambda v: v)
+    merged['batched'] = sum(p.get('batched', 1) for p in payloads)
+    return merged
+
+
+def merge_list_changes(payloads):
+    """Keep the last change per (list, team); a reorder supersedes earlier reorders."""
+    latest = {}
+    for payload in payloads:
+        for change in payload.get('changes') or [payload]:
+            key = (change.get('list_type'), change.get('team_id') if change.get('team_id') is not None
+                   else change.get('action'))
+            latest.pop(key, None)
+            latest[key] = change
+    return {'event_id': payloads[-1].get('event_id'), 'changes': list(latest.values())}
+
+
+def merge_latest(payloads):
+    return payloads[-1]
+
+
+class _Pending:
+    __slots__ = ('first', 'last', 'payloads')
+
+    def __init__(self, now):
+        self.first = self.last = now
+        self.payloads = []
+
+
+class CoalescingEmitter:
+    """Buffers Socket.IO emits per room and sends one merged message per burst."""
+
+    def __init__(self, window=DEFAULT_WINDOW, max_wait=DEFAULT_MAX_WAIT):
+        self.window = window
+        self.max_wait = max_wait
+        self._merges = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def register(self, event, merge):
+        """Use ``merge(payloads) -> payload`` to combine buffered ``event`` payloads."""
+        self._merges[event] = merge
+
+    def emit(self, event, payload, room, namespace=None):
+        """Buffer ``payload`` for ``room``; the merged message goes out after the window."""
+        key = (namespace, room, event)
+        if self.window <= 0:
+            self._send(key, [payload])
+            return
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pending.get(key)
+            start = entry is None
+            if start:
+                entry = self._pending[key] = _Pending(now)
+            entry.last = now
+            entry.payloads.append(payload)
+        if start:
+            from app import socketio
+            socketio.start_background_task(self._drain, key)
+
+    def pending(self):
+        with self._lock:
+            return {key: len(entry.payloads) for key, entry in self._pending.items()}
+
+    def flush(self):
+        """Send everything buffered right away."""
+        with self._lock:
+            ready = [(key, entry.payloads) for key, entry in self._pending.items()]
+            self._pending.clear()
+        for key, payloads in ready:
+            self._send(key, payloads)
+
+    def _drain(self, key):
+        from app import socketio
+
+        while True:
+            with self._lock:
+                entry = self._pending.get(key)
+                if entry is None:
+                    return  # already flushed
+                now = time.monotonic()
+                due = min(entry.last + self.window, entry.first + self.max_wait)
+                if now >= due:
+                    payloads = self._pending.pop(key).payloads
+                    break
+            socketio.sleep(due - now)
+        self._send(key, payloads)
+
+    def _send(self, key, payloads):
+        from app import socketio
+
+        namespace, room, event = key
+        try:
+            message = self._merges.get(event, merge_latest)(payloads)
+            socketio.emit(event, message, room=room, namespace=namespace)
+        except Exception as e:
+            print(f"Coalesced emit of {event} to {room} failed: {e}")
+
+
+_emitter = None
+_emitter_lock = threading.Lock()
+
+
+def get_emitter():
+    """Process-wide emitter with the alliance merge functions registered."""
+    global _emitter
+    with _emitter_lock:
+        if _emitter is None:
+            _emitter = CoalescingEmitter()
+            _emitter.register('alliance_data_sync_auto', merge_alliance_sync)
+            _emitter.register('lists_updated', merge_list_changes)
+            _emitter.register('recommendations_updated', merge_latest)
+        return _emitter
+
+
+def emit_coalesced(event, payload, room, namespace=None):
+    get_emitter().emit(event, payload, room, namespace=namespace)
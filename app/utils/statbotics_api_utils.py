@@ -20,10 +20,12 @@ from __future__ import annotations
 import re
 from html import unescape
 from typing import Optional, Dict, Any
-import time as _time
 
 import requests
 
+from app.utils.http_client import http_get
+from app.utils.tiered_cache import TieredCache
+
 # Try optional official client (preferred) — fail quietly if not installed.
 try:
     import statbotics as _sb_client  # type: ignore
@@ -35,92 +37,20 @@ STATBOTICS_API_BASE = "https://api.statbotics.io/v3"
 _DEFAULT_TIMEOUT = 8
 _USER_AGENT = "FRC-Scouting-Platform/1.0"
 
-# In-memory EPA cache: key -> (value, last_access_time)
-# value is a dict | _CACHE_MISS sentinel
-_team_epa_cache: Dict[str, tuple] = {}
 _CACHE_MISS = object()  # sentinel: distinguishes "tried and failed" from "never tried"
-_EPA_IDLE_SECONDS = 1800          # evict entries unused for 30 min
-_EPA_CLEANUP_EVERY = 200          # run eviction sweep every N accesses
-_epa_access_counter = 0
-
-# In-memory TeamMatch cache for historical per-match EPA rows.
-# key -> (value, last_access_time) where value is list[dict] | _CACHE_MISS
-_team_matches_cache: Dict[str, tuple] = {}
-_MATCHES_IDLE_SECONDS = 1800       # evict entries unused for 30 min
-_MATCHES_CLEANUP_EVERY = 200       # run eviction sweep every N accesses
-_matches_access_counter = 0
-
 
-def _epa_cache_get(key: str):
-    """Read from L1 EPA cache, refreshing last-access time.
-    Returns (value, found).
-    """
-    global _epa_access_counter
-    entry = _team_epa_cache.get(key)
-    if entry is None:
-        return None, False
-    value, _ = entry
-    _team_epa_cache[key] = (value, _time.time())
-    _epa_access_counter += 1
-    if _epa_access_counter >= _EPA_CLEANUP_EVERY:
-        _epa_cache_evict()
-    return value, True
+# In-memory L1 caches; values are dict / list[dict] or the _CACHE_MISS sentinel.
+# The DB tables (StatboticsCache / StatboticsMatchCache) remain the L2.
+# Lookups go through get_or_load so concurrent requests for one team share a
+# single DB read / API call, and an expired entry is served for another
+# stale_ttl seconds while it is refreshed in the background.
+_team_epa_cache = TieredCache('statbotics_epa', maxsize=4000, ttl=1800, stale_ttl=1800)
+_team_matches_cache = TieredCache('statbotics_team_matches', maxsize=2000, ttl=1800, stale_ttl=1800)
 
 
 def _epa_cache_set(key: str, value) -> None:
-    """Write to L1 EPA cache, recording current time as last-access."""
-    global _epa_access_counter
-    _team_epa_cache[key] = (value, _time.time())
-    _epa_access_counter += 1
-    if _epa_access_counter >= _EPA_CLEANUP_EVERY:
-        _epa_cache_evict()
-
-
-def _epa_cache_evict() -> None:
-    """Remove entries idle for >30 min."""
-    global _epa_access_counter
-    _epa_access_counter = 0
-    now = _time.time()
-    stale = [k for k, (_, ts) in list(_team_epa_cache.items())
-             if now - ts > _EPA_IDLE_SECONDS]
-    for k in stale:
-        del _team_epa_cache[k]
-
-
-def _matches_cache_get(key: str):
-    """Read from L1 TeamMatch cache, refreshing last-access time.
-    Returns (value, found).
-    """
-    global _matches_access_counter
-    entry = _team_matches_cache.get(key)
-    if entry is None:
-        return None, False
-    value, _ = entry
-    _team_matches_cache[key] = (value, _time.time())
-    _matches_access_counter += 1
-    if _matches_access_counter >= _MATCHES_CLEANUP_EVERY:
-        _matches_cache_evict()
-    return value, True
-
-
-def _matches_cache_set(key: str, value) -> None:
-    """Write to L1 TeamMatch cache, recording current time as last-access."""
-    global _matches_access_counter
-    _team_matches_cache[key] = (value, _time.time())
-    _matches_access_counter += 1
-    if _matches_access_counter >= _MATCHES_CLEANUP_EVERY:
-        _matches_cache_evict()
-
-
-def _matches_cache_evict() -> None:
-    """Remove TeamMatch cache entries idle for >30 min."""
-    global _matches_access_counter
-    _matches_access_counter = 0
-    now = _time.time()
-    stale = [k for k, (_, ts) in list(_team_matches_cache.items())
-             if now - ts > _MATCHES_IDLE_SECONDS]
-    for k in stale:
-        del _team_matches_cache[k]
+    """Write to L1 EPA cache."""
+    _team_epa_cache.set(key, value)
 
 # Lazily-created Statbotics client instance (reused across calls)
 _sb_instance = None
@@ -265,7 +195,7 @@ def _rest_api_get_team_epa(team_number: int | str) -> Optional[Dict[str, Optiona
     for year in (current_year, current_year - 1):
         try:
             url = f"{STATBOTICS_API_BASE}/team_year/{team_number}/{year}"
-            resp = requests.get(
+            resp = http_get(
                 url,
                 headers={"Accept": "application/json", "User-Agent": _USER_AGENT},
                 timeout=_DEFAULT_TIMEOUT,
@@ -304,7 +234,7 @@ def fetch_team_page(team_number: int | str, timeout: int = _DEFAULT_TIMEOUT) ->
     """
     url = f"{STATBOTICS_BASE}/team/{team_number}"
     try:
-        resp = requests.get(url, headers=_headers(), timeout=timeout)
+        resp = http_get(url, headers=_headers(), timeout=timeout)
     except requests.RequestException as e:
         raise StatboticsError(f"Request failed: {e}") from e
 
@@ -442,7 +372,7 @@ def get_statbotics_team_epa(team_number: int | str, use_cache: bool = True) -> O
     """Public helper: fetch + parse EPA for a team.
 
     Cache hierarchy:
-      L1 — in-memory dict (instant, per-process lifetime)
+      L1 — in-memory LRU (instant, 30 min TTL, then refreshed in the background)
       L2 — DB ``statbotics_cache`` table (persists across restarts, 24 h TTL)
       L3 — Statbotics API (official client → REST → HTML scraping)
 
@@ -451,41 +381,52 @@ def get_statbotics_team_epa(team_number: int | str, use_cache: bool = True) -> O
     """
     key = str(team_number)
 
-    # --- L1: in-memory cache (30-min idle TTL) ---
-    if use_cache:
-        cached, found = _epa_cache_get(key)
-        if found:
-            return None if cached is _CACHE_MISS else cached
-
-    # --- L2: DB cache ---
-    if use_cache:
-        db_result = _db_cache_get(team_number)
-        if db_result is _CACHE_MISS:
-            _epa_cache_set(key, _CACHE_MISS)
+    if not use_cache:
+        # Scheduler path: always ask Statbotics, then refresh both tiers
+        result, transient_failure = fetch_statbotics_team_epa(team_number)
+        store_statbotics_team_epa(team_number, result, transient_failure)
+        if transient_failure:
             return None
-        if db_result is not None:
-            _epa_cache_set(key, db_result)
-            return db_result
+        _epa_cache_set(key, result if result is not None else _CACHE_MISS)
+        return result
 
-        # --- L2b: stale DB fallback (return old data instantly) ---
+    def _load():
+        # --- L2: DB cache, then stale DB rows ---
         # Rather than blocking 30 s on the Statbotics API, serve stale
         # data for user-facing requests and let the background scheduler
         # refresh later.
-        stale = _db_cache_get(team_number, stale_ok=True)
-        if stale is _CACHE_MISS:
-            _epa_cache_set(key, _CACHE_MISS)
-            return None
-        if stale is not None:
-            _epa_cache_set(key, stale)
-            return stale
+        db_result = _db_cache_get(team_number)
+        if db_result is None:
+            db_result = _db_cache_get(team_number, stale_ok=True)
+        if db_result is not None:
+            return db_result
+
+        # --- L3: Statbotics API ---
+        # Only reached when there is *no* DB data at all (first run).
+        result, transient_failure = fetch_statbotics_team_epa(team_number)
+        if transient_failure:
+            # Raising keeps the miss out of both tiers
+            raise StatboticsTransientError(f"Statbotics unavailable for team {team_number}")
+        store_statbotics_team_epa(team_number, result)
+        return result if result is not None else _CACHE_MISS
 
+    # --- L1: in-memory cache (30-min TTL) ---
+    try:
+        cached = _team_epa_cache.get_or_load(key, _load)
+    except StatboticsTransientError:
+        return None
+    return None if cached is _CACHE_MISS else cached
+
+
+def fetch_statbotics_team_epa(team_number: int | str):
+    """Fetch EPA from Statbotics without touching any cache.
+
+    Returns ``(result, transient_failure)``.  Safe to call from worker
+    threads; persist the result with :func:`store_statbotics_team_epa`.
+    """
     result: Optional[Dict] = None
     transient_failure = False
 
-    # --- L3: Statbotics API ---
-    # Only reached when there is *no* DB data at all (first run) or
-    # when use_cache=False (background scheduler refresh).
-
     # 1. Official Python client (fastest — uses REST under the hood)
     try:
         result = _client_get_team_epa(team_number)
@@ -508,27 +449,15 @@ def get_statbotics_team_epa(team_number: int | str, use_cache: bool = True) -> O
         except StatboticsTransientError:
             transient_failure = True
 
-    # Store in caches: for transient failures do not cache misses.
-    if use_cache:
-        if result is not None:
-            _epa_cache_set(key, result)
-            _db_cache_put(team_number, result)
-        elif transient_failure:
-            # Keep existing cache entries if any; don't write miss.
-            return None
-        else:
-            _epa_cache_set(key, _CACHE_MISS)
-            _db_cache_put(team_number, None)
-    else:
-        # Scheduler path (use_cache=False)
-        if result is not None:
-            _db_cache_put(team_number, result)
-        elif transient_failure:
-            return None
-        else:
-            _db_cache_put(team_number, None)
+    return result, transient_failure
 
-    return result
+
+def store_statbotics_team_epa(team_number: int | str, result, transient_failure: bool = False) -> None:
+    """Persist a fetched EPA (or a definitive miss) in the DB cache; transient failures keep the old row."""
+    if result is not None:
+        _db_cache_put(team_number, result)
+    elif not transient_failure:
+        _db_cache_put(team_number, None)
 
 
 def get_statbotics_team_total_epa(team_number: int | str) -> Optional[float]:
@@ -591,7 +520,7 @@ def get_statbotics_team_matches(team_number: int | str,
     EPA estimate (``epa.total_points``) instead of the current team EPA.
 
     Cache hierarchy:
-      L1 — in-memory dict (instant, per-process lifetime)
+      L1 — in-memory LRU (instant, 30 min TTL, then refreshed in the background)
       L2 — DB ``statbotics_match_cache`` table (persists across restarts, 30 min TTL)
       L3 — Statbotics ``/team_matches`` API
     """
@@ -600,32 +529,44 @@ def get_statbotics_team_matches(team_number: int | str,
     normalized_year = int(year) if year not in (None, '') else 0
     cache_key = f"{int(team_number)}:{normalized_event}:{normalized_year}"
 
-    # --- L1: in-memory cache ---
-    if use_cache:
-        cached, found = _matches_cache_get(cache_key)
-        if found:
-            if cached is _CACHE_MISS:
-                return []
-            return list(cached)[:req_limit]
-
-    # --- L2: DB cache (fresh first, stale fallback) ---
-    if use_cache:
+    if not use_cache:
+        rows = _fetch_team_matches(team_number, normalized_event, normalized_year, req_limit)
+        return (rows or [])[:req_limit]
+
+    def _load():
+        # --- L2: DB cache (fresh first, stale fallback) ---
         db_rows = _db_match_cache_get(team_number, normalized_event, normalized_year, ttl_minutes=30)
-        if db_rows is _CACHE_MISS:
-            _matches_cache_set(cache_key, _CACHE_MISS)
-            return []
-        if isinstance(db_rows, list):
-            _matches_cache_set(cache_key, db_rows)
-            return db_rows[:req_limit]
-
-        stale_rows = _db_match_cache_get(team_number, normalized_event, normalized_year, ttl_minutes=30, stale_ok=True)
-        if stale_rows is _CACHE_MISS:
-            _matches_cache_set(cache_key, _CACHE_MISS)
-            return []
-        if isinstance(stale_rows, list):
-            _matches_cache_set(cache_key, stale_rows)
-            return stale_rows[:req_limit]
+        if db_rows is None:
+            db_rows = _db_match_cache_get(team_number, normalized_event, normalized_year,
+                                          ttl_minutes=30, stale_ok=True)
+        if db_rows is _CACHE_MISS or isinstance(db_rows, list):
+            return db_rows
+
+        # --- L3: Statbotics API ---
+        rows = _fetch_team_matches(team_number, normalized_event, normalized_year, req_limit)
+        if rows is None:
+            # Raising keeps the transient failure out of both tiers
+            raise StatboticsTransientError(f"Statbotics team matches unavailable for team {team_number}")
+        _db_match_cache_put(team_number, normalized_event, normalized_year, rows or None)
+        return rows or _CACHE_MISS
+
+    # --- L1: in-memory cache ---
+    try:
+        cached = _team_matches_cache.get_or_load(cache_key, _load)
+    except StatboticsTransientError:
+        return []
+    if cached is _CACHE_MISS:
+        return []
+    return list(cached)[:req_limit]
+
+
+def _fetch_team_matches(team_number, normalized_event: str, normalized_year: int,
+                        req_limit: int) -> Optional[list[Dict[str, Any]]]:
+    """Call the Statbotics ``/team_matches`` endpoint.
 
+    Returns the rows (``[]`` for a definitive empty answer) or ``None`` for
+    a transient failure that should not be cached.
+    """
     # Fetch a fuller page once, then slice for caller-specific limits.
     fetch_limit = max(req_limit, 300)
     params: Dict[str, Any] = {
@@ -637,64 +578,158 @@ def get_statbotics_team_matches(team_number: int | str,
     if normalized_year:
         params["year"] = normalized_year
 
-    last_response = None
-    for _attempt in range(3):
+    # http_get already retries connection errors, 429 and 5xx with backoff
+    try:
+        resp = http_get(
+            f"{STATBOTICS_API_BASE}/team_matches",
+            params=params,
+            headers={"Accept": "application/json", "User-Agent": _USER_AGENT},
+            timeout=_DEFAULT_TIMEOUT,
+        )
+    except requests.RequestException:
+        return None
+
+    if resp.status_code == 429 or resp.status_code >= 500:
+        # Still failing after the transport retries; don't record a definitive miss.
+        return None
+
+    payload = None
+    if resp.status_code == 200:
         try:
-            resp = requests.get(
-                f"{STATBOTICS_API_BASE}/team_matches",
-                params=params,
+            payload = resp.json()
+        except ValueError:
+            # Invalid JSON is usually transient CDN/edge behavior.
+            return None
+
+    return [row for row in payload if isinstance(row, dict)] if isinstance(payload, list) else []
+
+
+# ---------------------------------------------------------------------------
+# Bulk (event / year level) fetches used by the background EPA scheduler
+# ---------------------------------------------------------------------------
+_BULK_PAGE_SIZE = 1000
+_BULK_MAX_PAGES = 20
+
+
+def _fetch_paginated(path: str, params: Dict[str, Any]) -> list[Dict[str, Any]]:
+    """GET a Statbotics v3 listing endpoint, following limit/offset pages.
+
+    Returns every dict row across pages (an empty list on 404).  Raises
+    StatboticsTransientError when a page keeps failing with a network
+    error, 429 or 5xx so callers do not record misses for an outage.
+    """
+    rows: list[Dict[str, Any]] = []
+    offset = 0
+    for _page in range(_BULK_MAX_PAGES):
+        page_params = dict(params, limit=_BULK_PAGE_SIZE, offset=offset)
+        # http_get already retries connection errors, 429 and 5xx with backoff
+        try:
+            resp = http_get(
+                f"{STATBOTICS_API_BASE}/{path}",
+                params=page_params,
                 headers={"Accept": "application/json", "User-Agent": _USER_AGENT},
-                timeout=_DEFAULT_TIMEOUT,
+                timeout=_DEFAULT_TIMEOUT * 2,
             )
-            last_response = resp
+        except requests.RequestException:
+            resp = None
 
-            if resp.status_code == 404:
-                if use_cache:
-                    _matches_cache_set(cache_key, _CACHE_MISS)
-                    _db_match_cache_put(team_number, normalized_event, normalized_year, None)
-                return []
+        if resp is None or resp.status_code == 429 or resp.status_code >= 500:
+            status = resp.status_code if resp is not None else 'no response'
+            raise StatboticsTransientError(f"Statbotics /{path} page failed ({status})")
+        if resp.status_code == 404:
+            break
+        if resp.status_code != 200:
+            raise StatboticsError(f"Statbotics /{path} returned HTTP {resp.status_code}")
+        try:
+            payload = resp.json()
+        except ValueError as exc:
+            raise StatboticsTransientError(f"Statbotics /{path} returned invalid JSON") from exc
+        if not isinstance(payload, list):
+            break
 
-            if resp.status_code == 429 or resp.status_code >= 500:
-                # Transient server/rate-limit response; retry before giving up.
-                continue
+        rows.extend(row for row in payload if isinstance(row, dict))
+        if len(payload) < _BULK_PAGE_SIZE:
+            break
+        offset += _BULK_PAGE_SIZE
+    return rows
 
-            if resp.status_code != 200:
-                if use_cache:
-                    _matches_cache_set(cache_key, _CACHE_MISS)
-                    _db_match_cache_put(team_number, normalized_event, normalized_year, None)
-                return []
 
-            payload = resp.json()
-            if not isinstance(payload, list):
-                if use_cache:
-                    _matches_cache_set(cache_key, _CACHE_MISS)
-                    _db_match_cache_put(team_number, normalized_event, normalized_year, None)
-                return []
-
-            rows = [row for row in payload if isinstance(row, dict)]
-            if use_cache:
-                if rows:
-                    _matches_cache_set(cache_key, rows)
-                    _db_match_cache_put(team_number, normalized_event, normalized_year, rows)
-                else:
-                    _matches_cache_set(cache_key, _CACHE_MISS)
-                    _db_match_cache_put(team_number, normalized_event, normalized_year, None)
-            return rows[:req_limit]
+def fetch_statbotics_team_years(year: int, team_numbers=None) -> Dict[int, Dict[str, Optional[float]]]:
+    """Return ``{team_number: epa_dict}`` for every team in a season.
 
-        except requests.RequestException:
+    Uses the ``/team_years`` listing endpoint (a few pages per season)
+    instead of one ``/team_year`` call per team.  When *team_numbers* is
+    given the result is restricted to those teams.
+    """
+    wanted = {int(t) for t in team_numbers} if team_numbers is not None else None
+    result: Dict[int, Dict[str, Optional[float]]] = {}
+    for row in _fetch_paginated("team_years", {"year": int(year)}):
+        try:
+            tn = int(row.get("team"))
+        except (TypeError, ValueError):
             continue
-        except ValueError:
-            # Invalid JSON is usually transient CDN/edge behavior.
+        if wanted is not None and tn not in wanted:
             continue
-        except Exception:
-            break
+        parsed = _extract_epa_from_dict(row)
+        if parsed is not None:
+            result[tn] = parsed
+    return result
+
+
+def fetch_statbotics_event_team_matches(event_key: str) -> Dict[int, list[Dict[str, Any]]]:
+    """Return ``{team_number: [TeamMatch rows]}`` for one event in a single listing."""
+    grouped: Dict[int, list[Dict[str, Any]]] = {}
+    normalized_event = str(event_key or '').strip().lower()
+    if not normalized_event:
+        return grouped
+    for row in _fetch_paginated("team_matches", {"event": normalized_event}):
+        try:
+            tn = int(row.get("team"))
+        except (TypeError, ValueError):
+            continue
+        grouped.setdefault(tn, []).append(row)
+    return grouped
+
+
+def refresh_statbotics_bulk(team_numbers, year: int, event_keys=()) -> Dict[str, int]:
+    """Refresh the L2 Statbotics caches for many teams with a handful of requests.
+
+    EPA for *team_numbers* comes from the season's ``/team_years`` listing
+    (falling back to the previous season for teams without current data,
+    mirroring :func:`get_statbotics_team_epa`).  Per-match rows are pulled
+    once per event in *event_keys*.  Rows are written with one transaction
+    per listing.  Requires an app context.
+    """
+    from app.models import StatboticsCache, StatboticsMatchCache
+
+    wanted = {int(t) for t in team_numbers}
+    year = int(year)
+    summary = {"teams": len(wanted), "updated": 0, "missing": 0, "events": 0, "match_rows": 0}
+
+    if wanted:
+        epa_by_team: Dict[int, Optional[Dict]] = dict(fetch_statbotics_team_years(year, wanted))
+        missing = wanted - set(epa_by_team)
+        if missing:
+            epa_by_team.update(fetch_statbotics_team_years(year - 1, missing))
+        missing = wanted - set(epa_by_team)
+        summary["updated"] = len(epa_by_team)
+        summary["missing"] = len(missing)
+        for tn in missing:
+            epa_by_team[tn] = None
+        StatboticsCache.bulk_upsert(year, epa_by_team)
+
+    for event_key in event_keys or ():
+        try:
+            grouped = fetch_statbotics_event_team_matches(event_key)
+        except StatboticsError:
+            continue
+        if not grouped:
+            continue
+        StatboticsMatchCache.bulk_upsert(event_key, grouped)
+        summary["events"] += 1
+        summary["match_rows"] += sum(len(rows) for rows in grouped.values())
 
-    # If we only saw transient failures, avoid writing a definitive miss.
-    if last_response is not None and last_response.status_code not in (429,) and last_response.status_code < 500:
-        if use_cache:
-            _matches_cache_set(cache_key, _CACHE_MISS)
-            _db_match_cache_put(team_number, normalized_event, normalized_year, None)
-    return []
+    return summary
 
 
 def clear_epa_caches() -> None:
@@ -704,8 +739,5 @@ def clear_epa_caches() -> None:
     never served.  The DB cache (StatboticsCache) is intentionally kept
     — it stores raw API data which is source-agnostic.
     """
-    global _epa_access_counter, _matches_access_counter
     _team_epa_cache.clear()
     _team_matches_cache.clear()
-    _epa_access_counter = 0
-    _matches_access_counter = 0
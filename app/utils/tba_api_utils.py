@@ -4,11 +4,13 @@ Provides integration with The Blue Alliance API v3.
 """
 
 import requests
+from app.utils.http_client import http_get
+from app.utils.tiered_cache import TieredCache, MISSING
 import json
 import os
 from flask import current_app
 from datetime import datetime, timezone
-from app.utils.config_manager import get_current_game_config, load_game_config
+from app.utils.config_manager import get_current_game_config, load_game_config, get_thread_game_config
 from flask_login import current_user
 
 class TBAApiError(Exception):
@@ -19,64 +21,50 @@ class TBAApiError(Exception):
 _event_remap_cache = {}
 
 # ---------------------------------------------------------------------------
-# In-memory OPR caches (mirrors the Statbotics EPA in-memory cache pattern)
+# OPR caches (mirrors the Statbotics EPA cache pattern)
 # ---------------------------------------------------------------------------
 _OPR_CACHE_MISS = object()            # sentinel for "API returned nothing"
-# L1: team_number:event_key -> (value, last_access_time)
-# value is a dict | _OPR_CACHE_MISS
-_team_opr_cache: dict = {}
-_event_opr_cache: dict = {}            # event_key -> {full TBA response} (short-lived)
-_event_opr_cache_ts: dict = {}         # event_key -> float (time.time of last fetch)
-_EVENT_OPR_TTL_SECONDS = 120           # re-use event blob for 2 min in-memory
-_TEAM_OPR_IDLE_SECONDS = 1800          # evict per-team entries unused for 30 min
-_opr_access_counter = 0               # incremented on every L1 read/write
-_OPR_CLEANUP_EVERY = 200              # run eviction sweep every N accesses
+
+
+class _TbaOprDbStore:
+    """L2 for the per-team OPR cache: the ``tba_opr_cache`` table (15 min TTL)."""
+
+    @staticmethod
+    def _split(mem_key):
+        team_number, event_key = mem_key.split(':', 1)
+        return int(team_number), event_key
+
+    def load(self, mem_key):
+        from app.models import TbaOprCache
+        team_number, event_key = self._split(mem_key)
+        row = TbaOprCache.get_cached(team_number, event_key)
+        if row is None:
+            return MISSING
+        return _OPR_CACHE_MISS if row.is_miss else row.to_opr_dict()
+
+    def store(self, mem_key, value):
+        from app.models import TbaOprCache
+        team_number, event_key = self._split(mem_key)
+        TbaOprCache.upsert(team_number, event_key, None if value is _OPR_CACHE_MISS else value)
+
+
+# team_number:event_key -> dict | _OPR_CACHE_MISS
+_team_opr_cache = TieredCache('tba_team_opr', maxsize=4000, ttl=1800, l2=_TbaOprDbStore())
+# event_key -> full TBA /oprs response (or None after a failed fetch)
+_event_opr_cache = TieredCache('tba_event_oprs', maxsize=128, ttl=120)
 
 
 def _opr_cache_get(mem_key: str):
-    """Read from L1 team OPR cache, updating last-access time.
+    """Read from L1 team OPR cache.
     Returns (value, found) where value is dict | _OPR_CACHE_MISS.
     """
-    import time as _time
-    global _opr_access_counter
-    entry = _team_opr_cache.get(mem_key)
-    if entry is None:
-        return None, False
-    value, _ = entry
-    _team_opr_cache[mem_key] = (value, _time.time())  # refresh access time
-    _opr_access_counter += 1
-    if _opr_access_counter >= _OPR_CLEANUP_EVERY:
-        _opr_cache_evict()
-    return value, True
+    value = _team_opr_cache.get(mem_key)
+    return (None, False) if value is MISSING else (value, True)
 
 
 def _opr_cache_set(mem_key: str, value) -> None:
-    """Write to L1 team OPR cache, recording current time as last-access."""
-    import time as _time
-    global _opr_access_counter
-    _team_opr_cache[mem_key] = (value, _time.time())
-    _opr_access_counter += 1
-    if _opr_access_counter >= _OPR_CLEANUP_EVERY:
-        _opr_cache_evict()
-
-
-def _opr_cache_evict() -> None:
-    """Remove per-team entries idle for >30 min and stale event blobs."""
-    import time as _time
-    global _opr_access_counter
-    _opr_access_counter = 0
-    now = _time.time()
-    # Evict idle team entries
-    stale_keys = [k for k, (_, ts) in list(_team_opr_cache.items())
-                  if now - ts > _TEAM_OPR_IDLE_SECONDS]
-    for k in stale_keys:
-        del _team_opr_cache[k]
-    # Evict stale event blobs (older than TTL * 10, i.e. 20 min)
-    stale_events = [ek for ek, ts in list(_event_opr_cache_ts.items())
-                    if now - ts > _EVENT_OPR_TTL_SECONDS * 10]
-    for ek in stale_events:
-        _event_opr_cache.pop(ek, None)
-        _event_opr_cache_ts.pop(ek, None)
+    """Write to L1 team OPR cache."""
+    _team_opr_cache.set(mem_key, value)
 
 def get_tba_api_key():
     """Get TBA API key from config"""
@@ -111,7 +99,7 @@ def get_tba_api_key():
     # As a final fallback, check the loaded game config (useful when running
     # outside a user session or when keys are stored in the game config files)
     try:
-        game_config = current_app.config.get('GAME_CONFIG', {})
+        game_config = get_thread_game_config() or current_app.config.get('GAME_CONFIG', {})
         tba_settings = game_config.get('tba_api_settings', {})
         cfg_key = tba_settings.get('auth_key')
         if cfg_key and isinstance(cfg_key, str):
@@ -190,7 +178,7 @@ def get_tba_teams_at_event(event_key):
         headers = get_tba_api_headers()
         # print(f"Using headers: {list(headers.keys())} for TBA teams request")
 
-        response = requests.get(
+        response = http_get(
             api_url,
             headers=headers,
             timeout=15
@@ -248,7 +236,7 @@ def get_tba_event_matches(event_key):
         headers = get_tba_api_headers()
         # print(f"Using headers: {list(headers.keys())} for TBA matches request")
 
-        response = requests.get(
+        response = http_get(
             api_url,
             headers=headers,
             timeout=15
@@ -305,7 +293,7 @@ def get_tba_event_details(event_key):
         headers = get_tba_api_headers()
         # print(f"Using headers: {list(headers.keys())} for TBA event details request")
 
-        response = requests.get(
+        response = http_get(
             api_url,
             headers=headers,
             timeout=10
@@ -438,7 +426,7 @@ def get_tba_events_by_year(year):
     try:
         # print(f"Fetching events from TBA for year {year}: {api_url}")
         
-        response = requests.get(
+        response = http_get(
             api_url,
             headers=get_tba_api_headers(),
             timeout=15
@@ -638,7 +626,7 @@ def get_tba_team_events(team_key, year=None):
     try:
         # print(f"Fetching team events from TBA: {api_url}")
         
-        response = requests.get(
+        response = http_get(
             api_url,
             headers=get_tba_api_headers(),
             timeout=15
@@ -677,7 +665,7 @@ def get_tba_team_matches_at_event(team_key, event_key):
     try:
         # print(f"Fetching team matches from TBA: {api_url}")
         
-        response = requests.get(
+        response = http_get(
             api_url,
             headers=get_tba_api_headers(),
             timeout=15
@@ -808,35 +796,23 @@ def get_tba_event_oprs(event_key: str):
     Returns a dict with keys ``'oprs'``, ``'dprs'``, ``'ccwms'`` (each a dict
     mapping ``'frcXXXX'`` -> float), or ``None`` on failure.
 
-    Results are cached **in-memory** for 2 minutes so that loading a page
-    with 40 teams doesn't trigger 40 identical HTTP requests.
+    Results are cached **in-memory** for 2 minutes and concurrent callers
+    share one request, so loading a page with 40 teams (or 20 viewers
+    loading it at once) doesn't trigger 40 identical HTTP requests.
     """
-    import time as _time
-
-    # --- In-memory event-level cache ---
-    cached_ts = _event_opr_cache_ts.get(event_key, 0)
-    if _time.time() - cached_ts < _EVENT_OPR_TTL_SECONDS and event_key in _event_opr_cache:
-        return _event_opr_cache[event_key]
-
-    base_url = 'https://www.thebluealliance.com/api/v3'
-    url = f"{base_url}/event/{event_key}/oprs"
-    try:
-        headers = get_tba_api_headers()
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            # Store in in-memory event cache
-            _event_opr_cache[event_key] = data
-            _event_opr_cache_ts[event_key] = _time.time()
-            return data
-        print(f"TBA OPR fetch returned HTTP {resp.status_code} for {event_key}")
-    except Exception as e:
-        print(f"Failed to fetch TBA OPRs for {event_key}: {e}")
+    def _fetch():
+        url = f"https://www.thebluealliance.com/api/v3/event/{event_key}/oprs"
+        try:
+            resp = http_get(url, headers=get_tba_api_headers(), timeout=10)
+            if resp.status_code == 200:
+                return resp.json()
+            print(f"TBA OPR fetch returned HTTP {resp.status_code} for {event_key}")
+        except Exception as e:
+            print(f"Failed to fetch TBA OPRs for {event_key}: {e}")
+        # Cache the failure too so we don't retry every call for 2 min
+        return None
 
-    # Cache the failure too so we don't retry every call for 2 min
-    _event_opr_cache[event_key] = None
-    _event_opr_cache_ts[event_key] = _time.time()
-    return None
+    return _event_opr_cache.get_or_load(event_key, _fetch)
 
 
 def _bulk_cache_event_oprs(event_key: str, opr_data: dict) -> None:
@@ -883,7 +859,7 @@ def get_tba_team_opr(team_number, event_key=None):
     or ``None`` when no data is available.
 
     Cache hierarchy (mirrors Statbotics EPA pattern):
-      L1 — in-memory dict  (instant, per-process lifetime)
+      L1 — in-memory LRU  (instant, 30 min TTL)
       L2 — DB ``tba_opr_cache`` table  (persists across restarts, 15 min TTL)
       L3 — TBA API ``/event/{key}/oprs``  (bulk fetch, then fan-out to L1+L2)
     """
@@ -903,57 +879,33 @@ def get_tba_team_opr(team_number, event_key=None):
 
     mem_key = f"{team_number}:{event_key}"
 
-    # --- L1: in-memory cache (instant, 30-min idle TTL) ---
-    cached, found = _opr_cache_get(mem_key)
-    if found:
-        return None if cached is _OPR_CACHE_MISS else cached
-
-    # --- L2: DB cache (15-min TTL) ---
-    try:
-        from app.models import TbaOprCache
-        cached_row = TbaOprCache.get_cached(team_number, event_key)
-        if cached_row:
-            if cached_row.is_miss:
-                _opr_cache_set(mem_key, _OPR_CACHE_MISS)
-                return None
-            result = cached_row.to_opr_dict()
-            _opr_cache_set(mem_key, result)
-            return result
-    except Exception as e:
-        print(f"DB cache lookup failed for OPR team {team_number} event {event_key}: {e}")
-
-    # --- L3: TBA API (bulk fetch for whole event) ---
-    opr_data = get_tba_event_oprs(event_key)
-
-    if opr_data:
-        # Bulk-populate L1 + L2 for ALL teams at this event so subsequent
-        # calls in the same rankings loop are instant.
-        _bulk_cache_event_oprs(event_key, opr_data)
-
-        # Return this team's data from the freshly populated L1
-        val, found = _opr_cache_get(mem_key)
-        if found:
-            return None if val is _OPR_CACHE_MISS else val
+    def _fetch():
+        # --- L3: TBA API (bulk fetch for whole event) ---
+        opr_data = get_tba_event_oprs(event_key)
+        if opr_data:
+            # Bulk-populate L1 + L2 for ALL teams at this event so subsequent
+            # calls in the same rankings loop are instant.
+            _bulk_cache_event_oprs(event_key, opr_data)
+            val, found = _opr_cache_get(mem_key)
+            if found:
+                return val
+        # Team not in the event OPR data — record as miss
+        return _OPR_CACHE_MISS
 
-    # Team not in the event OPR data — record as miss
-    _opr_cache_set(mem_key, _OPR_CACHE_MISS)
     try:
-        from app.models import TbaOprCache
-        TbaOprCache.upsert(team_number, event_key, None)  # miss
+        # L1 in-memory -> L2 DB (tba_opr_cache) -> L3 API, one fetch per key at a time
+        value = _team_opr_cache.get_or_load(mem_key, _fetch)
     except Exception as e:
-        print(f"Failed to cache OPR miss for team {team_number} event {event_key}: {e}")
-
-    return None
+        print(f"OPR lookup failed for team {team_number} event {event_key}: {e}")
+        return None
+    return None if value is _OPR_CACHE_MISS else value
 
 
 def clear_opr_cache() -> None:
     """Clear ALL OPR caches (call when EPA source changes)."""
-    global _opr_access_counter
     # L1: in-memory caches
     _team_opr_cache.clear()
     _event_opr_cache.clear()
-    _event_opr_cache_ts.clear()
-    _opr_access_counter = 0
     # L2: DB cache
     try:
         from app.models import TbaOprCache
@@ -3,6 +3,7 @@ Team isolation utilities for multi-tenant scouting platform.
 Provides helper functions to filter database queries by scouting team.
 """
 
+from contextlib import contextmanager
 from flask_login import current_user
 from app.models import Team, Event, Match, ScoutingData, AllianceSelection, DoNotPickEntry, AvoidEntry, PitScoutingData, User, DeclinedEntry
 from sqlalchemy import or_, func
@@ -12,6 +13,7 @@ from app.utils.event_code_utils import (
     build_year_prefixed_event_code,
     event_code_variants,
 )
+from app.utils.request_scope import get_scope
 
 
 def get_alliance_team_numbers():
@@ -19,29 +21,9 @@ def get_alliance_team_numbers():
     Returns empty list if alliance mode is not active.
     """
     try:
-        from app.models import TeamAllianceStatus
-        
-        current_team = get_current_scouting_team_number()
-        if current_team is None:
+        if get_current_scouting_team_number() is None:
             return []
-        
-        # Check if alliance mode is active for this team
-        active_alliance = TeamAllianceStatus.get_active_alliance_for_team(current_team)
-        
-        if active_alliance:
-            # Return all member team numbers
-            team_numbers = set(active_alliance.get_member_team_numbers())
-            
-            # Also include the game_config_team if set (data may be synced under this team)
-            if active_alliance.game_config_team:
-                team_numbers.add(active_alliance.game_config_team)
-
-            # Ensure current team remains included even if membership rows are stale.
-            team_numbers.add(current_team)
-            
-            return list(team_numbers)
-        
-        return []
+        return list(get_scope().member_numbers)
     except Exception:
         return []
 
@@ -49,14 +31,10 @@ def get_alliance_team_numbers():
 def is_alliance_mode_active_for_current_user():
     """Check if alliance mode is currently active for the current user's team."""
     try:
-        from app.models import TeamAllianceStatus
-        
-        current_team = get_current_scouting_team_number()
         # 0 counts as a valid team number
-        if current_team is None:
+        if get_current_scouting_team_number() is None:
             return False
-        
-        return TeamAllianceStatus.is_alliance_mode_active_for_team(current_team)
+        return get_scope().alliance_active
     except Exception:
         return False
 
@@ -66,20 +44,9 @@ def get_alliance_shared_event_codes():
     Returns empty list if alliance mode is not active.
     """
     try:
-        from app.models import TeamAllianceStatus
-        
-        current_team = get_current_scouting_team_number()
-        if current_team is None:
+        if get_current_scouting_team_number() is None:
             return []
-        
-        # Check if alliance mode is active for this team
-        active_alliance = TeamAllianceStatus.get_active_alliance_for_team(current_team)
-        
-        if active_alliance:
-            # Return all shared event codes
-            return [str(c).strip().upper() for c in (active_alliance.get_shared_events() or []) if c]
-        
-        return []
+        return list(get_scope().shared_event_codes)
     except Exception:
         return []
 
@@ -107,6 +74,79 @@ def get_current_scouting_team():
     return get_current_scouting_team_number()
 
 
+@contextmanager
+def scouting_team_scope(scouting_team_number):
+    """Run the block as *scouting_team_number*, whoever is logged in.
+
+    Sets ``g.scouting_team_number`` (which takes precedence over current_user)
+    and restores the previous value on exit.  Used to build content whose
+    scope is fixed by its owner, such as public shared graphs.
+    """
+    from flask import g
+
+    missing = object()
+    previous = g.get('scouting_team_number', missing)
+    g.scouting_team_number = scouting_team_number
+    try:
+        yield
+    finally:
+        if previous is missing:
+            g.pop('scouting_team_number', None)
+        else:
+            g.scouting_team_number = previous
+
+
+def has_alliance_data_grants(scouting_team_number):
+    """Whether the team kept access to any alliance's data (cached per request)."""
+    from flask import g
+    from app.models import AllianceDataGrant
+
+    try:
+        cache = g.setdefault('_alliance_data_grants', {})
+    except RuntimeError:
+        cache = {}  # outside an app context
+    if scouting_team_number not in cache:
+        cache[scouting_team_number] = AllianceDataGrant.query.filter_by(
+            team_number=scouting_team_number).first() is not None
+    return cache[scouting_team_number]
+
+
+def granted_entry_ids(model, scouting_team_number):
+    """SELECT of ``model`` ids the team can read through its ``AllianceDataGrant`` rows.
+
+    These are the other members' original entries behind the alliance's
+    active shared rows, as of when the grant was made.  Entries changed
+    since then have been copied to the team (see ``alliance_links``).
+    """
+    from sqlalchemy import select
+    from sqlalchemy.orm import aliased
+    from app.models import AllianceDataGrant, AllianceSharedPitData, AllianceSharedScoutingData
+
+    if model is ScoutingData:
+        shared, original = AllianceSharedScoutingData, AllianceSharedScoutingData.original_scouting_data_id
+    else:
+        shared, original = AllianceSharedPitData, AllianceSharedPitData.original_pit_data_id
+    # Aliased so the subquery is not correlated with the caller's query on model
+    entry = aliased(model)
+    return select(original).join(
+        AllianceDataGrant, AllianceDataGrant.alliance_id == shared.alliance_id
+    ).join(entry, entry.id == original).where(
+        AllianceDataGrant.team_number == scouting_team_number,
+        shared.is_active.is_(True),
+        shared.source_scouting_team_number != scouting_team_number,
+        shared.shared_at <= AllianceDataGrant.granted_at,
+        or_(AllianceDataGrant.granted_seq.is_(None), entry.change_seq.is_(None),
+            entry.change_seq <= AllianceDataGrant.granted_seq),
+    )
+
+
+def with_granted_entries(condition, model, scouting_team_number):
+    """Widen a team filter on ``model`` to the alliance entries the team kept access to."""
+    if scouting_team_number is None or not has_alliance_data_grants(scouting_team_number):
+        return condition
+    return or_(condition, model.id.in_(granted_entry_ids(model, scouting_team_number)))
+
+
 def filter_teams_by_scouting_team(query=None):
     """Filter teams by current user's scouting team number.
     If alliance mode is active, shows teams from all alliance members (not filtered by scouting_team_number).
@@ -363,7 +403,7 @@ def dedupe_events_for_display(events, current_team=None):
             current_team = get_current_scouting_team_number()
 
         from datetime import datetime, timezone as _timezone
-        from app.models import TeamAllianceStatus, ScoutingAlliance, ScoutingAllianceMember, ScoutingAllianceEvent
+        from app.models import ScoutingAlliance, ScoutingAllianceMember, ScoutingAllianceEvent
 
         def _normalize_code(value):
             return normalize_event_code(value)
@@ -460,7 +500,7 @@ def dedupe_events_for_display(events, current_team=None):
 
         active_alliance = None
         if current_team is not None:
-            active_alliance = TeamAllianceStatus.get_active_alliance_for_team(current_team)
+            active_alliance = get_scope(current_team).alliance
 
         alliance_memberships = []
         if current_team is not None:
@@ -743,9 +783,11 @@ def filter_scouting_data_by_scouting_team(query=None):
             return query.filter(or_(ScoutingData.scouting_team_number == scouting_team_number,
                                     ScoutingData.scouting_team_number.is_(None)))
         else:
-            # Show only current team's data
-            return query.filter(or_(ScoutingData.scouting_team_number == scouting_team_number,
-                                    ScoutingData.scouting_team_number.is_(None)))
+            # Show only current team's data (plus alliance data it kept access to)
+            return query.filter(with_granted_entries(
+                or_(ScoutingData.scouting_team_number == scouting_team_number,
+                    ScoutingData.scouting_team_number.is_(None)),
+                ScoutingData, scouting_team_number))
 
     # If the current user has no scouting team, only show unassigned data
     return query.filter(ScoutingData.scouting_team_number.is_(None))  # Show unassigned data if no team set
@@ -795,8 +837,9 @@ def filter_scouting_data_only_by_scouting_team(query=None):
             # No matches found in shared events - fall back to current team's data
             return query.filter(ScoutingData.scouting_team_number == scouting_team_number)
         else:
-            # Show only current team's data
-            return query.filter(ScoutingData.scouting_team_number == scouting_team_number)
+            # Show only current team's data (plus alliance data it kept access to)
+            return query.filter(with_granted_entries(
+                ScoutingData.scouting_team_number == scouting_team_number, ScoutingData, scouting_team_number))
 
     # If no scouting team configured, only return unassigned entries (legacy behavior)
     return query.filter(ScoutingData.scouting_team_number.is_(None))
@@ -873,8 +916,9 @@ def filter_pit_scouting_data_by_scouting_team(query=None):
             # Show pit data from all alliance members
             return query.filter(PitScoutingData.scouting_team_number.in_(alliance_team_numbers))
         else:
-            # Show only current team's pit data
-            return query.filter(PitScoutingData.scouting_team_number == scouting_team_number)
+            # Show only current team's pit data (plus alliance data it kept access to)
+            return query.filter(with_granted_entries(
+                PitScoutingData.scouting_team_number == scouting_team_number, PitScoutingData, scouting_team_number))
     return query.filter(PitScoutingData.scouting_team_number.is_(None))
 
 
@@ -1044,8 +1088,8 @@ def get_event_by_code(event_code):
         event = None
 
     try:
-        from app.models import TeamAllianceStatus, ScoutingAllianceEvent
-        active_alliance = TeamAllianceStatus.get_active_alliance_for_team(current_team) if current_team else None
+        from app.models import ScoutingAllianceEvent
+        active_alliance = get_scope(current_team).alliance if current_team else None
     except Exception:
         active_alliance = None
 
@@ -1170,9 +1214,9 @@ def get_combined_dropdown_events():
     alliance_entries = []
     try:
         current_team = get_current_scouting_team_number()
-        from app.models import TeamAllianceStatus, ScoutingAllianceEvent
+        from app.models import ScoutingAllianceEvent
         if current_team:
-            active_alliance = TeamAllianceStatus.get_active_alliance_for_team(current_team)
+            active_alliance = get_scope(current_team).alliance
             if active_alliance:
                 codes = [c.event_code for c in ScoutingAllianceEvent.query.filter_by(alliance_id=active_alliance.id, is_active=True).all()]
                 # For each code, construct a synthetic event-like object
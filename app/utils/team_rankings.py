@@ -0,0 +1,260 @@
+"""
+Team leaderboards shared by the rankings page, alliance recommendations,
+the assistant's top-N answers and the end-of-day notification summary.
+
+Each of those used to compute per-team averages its own way, usually by
+calling ``calculate_team_metrics`` once per team the scouting team knows
+about.  ``get_leaderboard`` instead loads every scouting entry in scope with
+one query, scores each entry once, and aggregates all teams at once with
+NumPy (``bincount`` over team indices).  The result is cached under the
+data version counters of the tables it reads, so any committed write
+produces a fresh leaderboard and repeated views are a dictionary lookup.
+``Leaderboard.top`` uses a partial sort (``argpartition``) for top-N.
+
+``team_metrics_map`` covers consumers that need the full weighted
+``calculate_team_metrics`` output (alliance recommendations): results are
+cached per team under the same data versions.
+"""
+import logging
+
+import numpy as np
+
+from app.utils.tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+# Tables a leaderboard's numbers come from
+RANKING_TABLES = ('scouting_data', 'alliance_shared_scouting_data', 'team', 'match', 'event')
+
+# Per-entry values aggregated for every team; 'total_points' falls back to
+# the sum of the period values when the total metric is not defined.
+METRICS = ('auto_points', 'teleop_points', 'endgame_points', 'total_points')
+_METRIC_IDS = {'auto_points': 'apt', 'teleop_points': 'tpt', 'endgame_points': 'ept'}
+
+_LEADERBOARD_CACHE = TieredCache('team_leaderboards', maxsize=256, ttl=600)
+_TEAM_METRICS_CACHE = TieredCache('team_metrics_by_version', maxsize=4096, ttl=600)
+
+
+class Leaderboard:
+    """Per-team averages for one scope, stored as parallel NumPy arrays.
+
+    ``team_numbers[i]`` has ``counts[i]`` entries; ``averages[m][i]`` is the
+    mean of metric ``m`` over them.  ``scored_averages`` / ``scored_counts``
+    repeat the total average over entries with a non-zero total only.
+    """
+
+    def __init__(self, team_numbers, counts, averages, scored_averages, scored_counts):
+        self.team_numbers = team_numbers
+        self.counts = counts
+        self.averages = averages
+        self.scored_averages = scored_averages
+        self.scored_counts = scored_counts
+        self._index = {int(tn): i for i, tn in enumerate(team_numbers.tolist())}
+
+    def __len__(self):
+        return len(self.team_numbers)
+
+    def __contains__(self, team_number):
+        return team_number in self._index
+
+    def get(self, team_number):
+        """Averages for one team, or ``None`` when it has no entries."""
+        i = self._index.get(team_number)
+        if i is None:
+            return None
+        row = {m: float(self.averages[m][i]) for m in METRICS}
+        row.update({
+            'team_number': int(self.team_numbers[i]),
+            'match_count': int(self.counts[i]),
+            'scored_total_avg': float(self.scored_averages[i]),
+            'scored_count': int(self.scored_counts[i]),
+        })
+        return row
+
+    def top(self, metric='total_points', n=None, positive_only=False):
+        """Rows for the ``n`` best teams by ``metric`` (all teams when ``n`` is None)."""
+        values = self.averages[metric]
+        idx = np.arange(len(values))
+        if positive_only:
+            idx = idx[values[idx] > 0]
+        if n is not None and n < len(idx):
+            # Partial sort: only the top n are ordered
+            part = np.argpartition(-values[idx], n - 1)[:n]
+            idx = idx[part]
+        order = idx[np.lexsort((self.team_numbers[idx], -values[idx]))]
+        return [self.get(int(self.team_numbers[i])) for i in order]
+
+
+def _empty():
+    empty_f = np.zeros(0, dtype=float)
+    return Leaderboard(np.zeros(0, dtype=int), np.zeros(0, dtype=int),
+                       {m: empty_f for m in METRICS}, empty_f, np.zeros(0, dtype=int))
+
+
+def _metric_value(entry, metric_id):
+    try:
+        value = entry.calculate_metric(metric_id)
+        return float(value) if value is not None else 0.0
+    except Exception:
+        return 0.0
+
+
+def build_leaderboard(rows, total_metric_id='tot'):
+    """Aggregate ``(team_number, entry)`` pairs into a ``Leaderboard``."""
+    team_numbers = []
+    values = {m: [] for m in METRICS}
+    for team_number, entry in rows:
+        if team_number is None:
+            continue
+        auto = _metric_value(entry, _METRIC_IDS['auto_points'])
+        teleop = _metric_value(entry, _METRIC_IDS['teleop_points'])
+        endgame = _metric_value(entry, _METRIC_IDS['endgame_points'])
+        total = _metric_value(entry, total_metric_id) or (auto + teleop + endgame)
+        team_numbers.append(int(team_number))
+        values['auto_points'].append(auto)
+        values['teleop_points'].append(teleop)
+        values['endgame_points'].append(endgame)
+        values['total_points'].append(total)
+
+    if not team_numbers:
+        return _empty()
+
+    unique, team_idx = np.unique(np.asarray(team_numbers), return_inverse=True)
+    counts = np.bincount(team_idx, minlength=len(unique))
+    averages = {}
+    for metric in METRICS:
+        sums = np.bincount(team_idx, weights=np.asarray(values[metric], dtype=float), minlength=len(unique))
+        averages[metric] = sums / counts
+    totals = np.asarray(values['total_points'], dtype=float)
+    scored = totals != 0
+    scored_counts = np.bincount(team_idx[scored], minlength=len(unique))
+    scored_sums = np.bincount(team_idx[scored], weights=totals[scored], minlength=len(unique))
+    scored_averages = np.divide(scored_sums, scored_counts, out=np.zeros(len(unique)), where=scored_counts > 0)
+    return Leaderboard(unique, counts, averages, scored_averages, scored_counts)
+
+
+def _scouting_rows(scouting_team_numbers, event_ids, include_unassigned):
+    from sqlalchemy import or_
+    from app import db
+    from app.models import Match, ScoutingData, Team
+
+    query = db.session.query(Team.team_number, ScoutingData).join(Team, ScoutingData.team_id == Team.id)
+    numbers = [n for n in scouting_team_numbers if n is not None]
+    conditions = []
+    if numbers:
+        conditions.append(ScoutingData.scouting_team_number.in_(numbers))
+    if include_unassigned:
+        conditions.append(ScoutingData.scouting_team_number.is_(None))
+    if conditions:
+        query = query.filter(or_(*conditions))
+    if event_ids:
+        query = query.join(Match, ScoutingData.match_id == Match.id).filter(Match.event_id.in_(list(event_ids)))
+    return query.all()
+
+
+def _alliance_rows(alliance_id, event_code):
+    from sqlalchemy import func
+    from app import db
+    from app.models import AllianceSharedScoutingData, Event, Match, Team
+
+    query = (db.session.query(Team.team_number, AllianceSharedScoutingData)
+             .join(Team, AllianceSharedScoutingData.team_id == Team.id)
+             .filter(AllianceSharedScoutingData.alliance_id == alliance_id,
+                     AllianceSharedScoutingData.is_active == True))  # noqa: E712
+    if event_code:
+        query = (query.join(Match, AllianceSharedScoutingData.match_id == Match.id)
+                 .join(Event, Match.event_id == Event.id)
+                 .filter(func.upper(Event.code) == event_code.upper()))
+    return query.all()
+
+
+def get_leaderboard(scouting_team_numbers=(), event_ids=None, alliance_id=None, event_code=None,
+                    include_unassigned=False, total_metric_id='tot'):
+    """Leaderboard for a scope, cached until one of ``RANKING_TABLES`` changes.
+
+    Normal mode: entries recorded by ``scouting_team_numbers`` (plus rows
+    with no scouting team when ``include_unassigned``), optionally limited
+    to ``event_ids``.  Alliance mode (``alliance_id``): the alliance's
+    active shared entries, optionally limited to ``event_code``.
+    """
+    from app.utils.change_tracking import get_data_versions
+
+    key = (
+        tuple(sorted(n for n in set(scouting_team_numbers or ()) if n is not None)),
+        tuple(sorted(set(event_ids))) if event_ids else None,
+        alliance_id,
+        (event_code or '').upper() if alliance_id else None,
+        bool(include_unassigned),
+        total_metric_id,
+        get_data_versions(RANKING_TABLES),
+    )
+
+    def _load():
+        if alliance_id:
+            rows = _alliance_rows(alliance_id, event_code)
+        else:
+            rows = _scouting_rows(scouting_team_numbers or (), event_ids, include_unassigned)
+        return build_leaderboard(rows, total_metric_id=total_metric_id)
+
+    return _LEADERBOARD_CACHE.get_or_load(key, _load)
+
+
+def current_leaderboard(event_id=None, total_metric_id='tot'):
+    """Leaderboard in the current user's scope (alliance-aware)."""
+    from app.utils.alliance_data import get_active_alliance_id
+    from app.utils.team_isolation import get_alliance_team_numbers, get_current_scouting_team_number
+
+    alliance_id = get_active_alliance_id()
+    if alliance_id:
+        event_code = None
+        if event_id:
+            from app import db
+            from app.models import Event
+            event = db.session.get(Event, event_id)
+            if event is None:
+                return _empty()
+            event_code = event.code
+        return get_leaderboard(alliance_id=alliance_id, event_code=event_code, total_metric_id=total_metric_id)
+
+    numbers = [get_current_scouting_team_number()] + list(get_alliance_team_numbers() or [])
+    return get_leaderboard(scouting_team_numbers=numbers, event_ids=[event_id] if event_id else None,
+                           total_metric_id=total_metric_id)
+
+
+def team_metrics_map(team_ids, event_id=None):
+    """``{team_id: calculate_team_metrics(team_id)}``, cached per data version.
+
+    Teams whose computation raises are omitted from the result.
+
+    The key also carries the EPA source and alliance id, which change what
+    ``calculate_team_metrics`` returns for the same data.
+    """
+    from app.utils.analysis import calculate_team_metrics, get_current_epa_source
+    from app.utils.alliance_data import get_active_alliance_id
+    from app.utils.change_tracking import get_data_versions
+
+    try:
+        epa_source = get_current_epa_source() or 'scouted_only'
+    except Exception:
+        epa_source = 'scouted_only'
+    try:
+        alliance_id = get_active_alliance_id()
+    except Exception:
+        alliance_id = None
+    versions = get_data_versions(RANKING_TABLES)
+
+    out = {}
+    for team_id in team_ids:
+        key = (team_id, event_id or 0, epa_source, alliance_id, versions)
+        try:
+            out[team_id] = _TEAM_METRICS_CACHE.get_or_load(
+                key, lambda t=team_id: calculate_team_metrics(t, event_id=event_id))
+        except Exception as e:
+            # Left out so the caller can handle the failure for this team
+            logger.debug("Team metrics failed for team_id %s: %s", team_id, e)
+    return out
+
+
+def clear_ranking_caches():
+    _LEADERBOARD_CACHE.clear()
+    _TEAM_METRICS_CACHE.clear()
@@ -0,0 +1,265 @@
+"""
+Two-tier cache for external API data and expensive derived payloads.
+
+:class:`TieredCache` replaces the hand-rolled ``{key: (value, ts)}`` dicts
+(with their every-N-accesses eviction sweeps) that Statbotics, TBA and the
+graphs routes used to keep:
+
+* L1 is a size-bounded LRU (``OrderedDict``) with a per-entry TTL; the
+  least recently used entry is dropped in O(1) when the cache is full and
+  expired entries are dropped when touched, so no full scans are needed.
+* Optional stale-while-revalidate: for ``stale_ttl`` seconds after an
+  entry expires :meth:`TieredCache.get_or_load` still returns it and
+  refreshes it on a small background pool.
+* Single-flight loading: concurrent :meth:`TieredCache.get_or_load` calls
+  for the same key share one loader call; the others wait for its result.
+* A pluggable L2 store (any object with ``load(key)`` returning a value or
+  :data:`MISSING` and ``store(key, value)``), e.g. one of the DB cache
+  tables.
+* Hit / miss / load / eviction counters per cache (see
+  :func:`get_cache_stats`).
+
+Values can be anything, including sentinels used to remember "upstream
+had nothing"; a loader that raises is not cached and the exception is
+re-raised in every waiting caller.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+# Background stale-while-revalidate refreshes
+_REFRESH_WORKERS = 2
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+_refresh_executor = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor():
+    global _refresh_executor
+    if _refresh_executor is None:
+        with _refresh_executor_lock:
+            if _refresh_executor is None:
+                _refresh_executor = ThreadPoolExecutor(max_workers=_REFRESH_WORKERS,
+                                                       thread_name_prefix='cache-refresh')
+    return _refresh_executor
+
+
+class _Flight:
+    """One in-progress load that other callers can wait on."""
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = MISSING
+        self.error = None
+
+
+class TieredCache:
+    """Size-bounded LRU + TTL cache with single-flight loads and optional L2."""
+
+    def __init__(self, name, maxsize=1024, ttl=600, stale_ttl=0, l2=None):
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.l2 = l2
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._flights = {}
+        self._lock = threading.RLock()
+        self._stats = dict.fromkeys(
+            ('hits', 'stale_hits', 'misses', 'l2_hits', 'loads', 'load_errors',
+             'coalesced', 'refreshes', 'evictions'), 0)
+        with _registry_lock:
+            _registry[name] = self
+
+    # -- L1 -----------------------------------------------------------------
+
+    def _lookup(self, key, now):
+        """Return ``(value, state)`` with state ``'fresh'``, ``'stale'`` or ``None``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING, None
+        value, expires_at = entry
+        if now <= expires_at:
+            self._entries.move_to_end(key)
+            return value, 'fresh'
+        if now <= expires_at + (self.stale_ttl or 0):
+            return value, 'stale'
+        del self._entries[key]
+        return MISSING, None
+
+    def get(self, key, default=MISSING):
+        """Return the fresh L1 value for *key*, or *default*."""
+        with self._lock:
+            value, state = self._lookup(key, time.monotonic())
+            if state == 'fresh':
+                self._stats['hits'] += 1
+                return value
+            self._stats['misses'] += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Store *value* in L1 (not L2) for *ttl* seconds (default: the cache TTL)."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, predicate):
+        """Drop every L1 entry whose key satisfies *predicate*; returns the count."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def expiring_keys(self, within):
+        """Keys whose entry expires in the next *within* seconds (or is already stale)."""
+        deadline = time.monotonic() + within
+        with self._lock:
+            return [key for key, (_, expires_at) in self._entries.items() if expires_at <= deadline]
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key, time.monotonic())[1] == 'fresh'
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -- Loading ------------------------------------------------------------
+
+    def get_or_load(self, key, loader, ttl=None, force=False):
+        """Return the value for *key*, calling ``loader()`` at most once concurrently.
+
+        Order: fresh L1 entry, stale L1 entry (refreshed in the background),
+        L2 store, then *loader*.  ``force=True`` skips the cached tiers but
+        still joins an in-flight load for the key.
+        """
+        if not force:
+            with self._lock:
+                value, state = self._lookup(key, time.monotonic())
+                if state == 'fresh':
+                    self._stats['hits'] += 1
+                    return value
+                if state == 'stale':
+                    self._stats['stale_hits'] += 1
+                    self._refresh_in_background(key, loader, ttl)
+                    return value
+                self._stats['misses'] += 1
+
+            if self.l2 is not None:
+                try:
+                    value = self.l2.load(key)
+                except Exception as e:
+                    logger.debug("L2 load failed for %s[%r]: %s", self.name, key, e)
+                    value = MISSING
+                if value is not MISSING:
+                    with self._lock:
+                        self._stats['l2_hits'] += 1
+                    self.set(key, value, ttl)
+                    return value
+
+        return self._load(key, loader, ttl)
+
+    def _load(self, key, loader, ttl):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats['load_errors'] += 1
+            raise
+        else:
+            flight.value = value
+            self.set(key, value, ttl)
+            with self._lock:
+                self._stats['loads'] += 1
+            if self.l2 is not None:
+                try:
+                    self.l2.store(key, value)
+                except Exception as e:
+                    logger.debug("L2 store failed for %s[%r]: %s", self.name, key, e)
+            return value
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh_in_background(self, key, loader, ttl):
+        # Caller holds self._lock
+        if key in self._flights:
+            return
+        self._stats['refreshes'] += 1
+        try:
+            from flask import current_app, has_app_context
+            app = current_app._get_current_object() if has_app_context() else None
+        except Exception:
+            app = None
+
+        def _run():
+            try:
+                if app is not None:
+                    with app.app_context():
+                        self._load(key, loader, ttl)
+                else:
+                    self._load(key, loader, ttl)
+            except Exception as e:
+                logger.debug("Background refresh failed for %s[%r]: %s", self.name, key, e)
+
+        _get_refresh_executor().submit(_run)
+
+    # -- Metrics ------------------------------------------------------------
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out['size'] = len(self._entries)
+            out['maxsize'] = self.maxsize
+        lookups = out['hits'] + out['stale_hits'] + out['misses']
+        out['hit_rate'] = round((out['hits'] + out['stale_hits']) / lookups, 3) if lookups else None
+        return out
+
+
+def get_cache_stats():
+    """Return ``{cache name: stats}`` for every :class:`TieredCache` created."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
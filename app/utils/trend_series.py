@@ -0,0 +1,443 @@
+"""
+Per-team scouting points series and trend statistics.
+
+The team trends pages, the assistant's trend answers and
+``analysis._calculate_trend_factor`` all turn a team's scouting entries
+into an ordered list of per-match points and fit a line through it.  Each
+of them used to re-read every entry (and the game config once per entry)
+and regress in pure Python on every request.
+
+``team_series`` keeps one ordered series of point rows per
+``(team_id, scouting_team_number)`` and game config version.  A series is
+built once from the database, then kept current by session hooks:
+committed inserts are queued and merged into the series on its next read
+(only the new rows are queried), while updates and deletes drop the team's
+series so it is rebuilt.  Points depend on the game config, so saving a
+config (or changing an alliance's shared config) starts new series.
+``compute_trend`` / ``linear_fit`` / ``trend_factor`` do the statistics with
+NumPy.
+"""
+import bisect
+import logging
+import threading
+
+import numpy as np
+
+from app.utils.tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+# Series key component meaning "entries from every scouting team"
+ALL_SCOUTING_TEAMS = '*'
+
+# Resources the per-entry points are computed from
+CONFIG_TABLES = ('game_config', 'scouting_alliance')
+
+_SERIES_CACHE = TieredCache('team_trend_series', maxsize=2048, ttl=1800)
+_pending = {}  # series key -> set of ScoutingData ids inserted since it was built
+_pending_lock = threading.Lock()
+_listeners_registered = False
+
+
+# ----------------------------------------------------------------------
+# Points per entry
+# ----------------------------------------------------------------------
+def points_from_data(data, game_config):
+    """Numeric 'total points' for one entry's scouting ``data`` dict.
+
+    Prefers explicit total fields, then the game config's scoring elements
+    (points per unit), and finally the sum of numeric fields.  Always
+    returns a non-negative float.
+    """
+    total_points = None
+    if isinstance(data, dict):
+        total_points = data.get('total_points') or data.get('tot') or data.get('points')
+
+    if total_points is None:
+        game_config = game_config or {}
+        total_points = 0
+        for period_name in ('auto_period', 'teleop_period', 'endgame_period'):
+            for el in game_config.get(period_name, {}).get('scoring_elements', []):
+                perm_id = el.get('perm_id') or el.get('id')
+                if not isinstance(data, dict) or perm_id not in data:
+                    continue
+                val = data.get(perm_id)
+                try:
+                    val_num = float(val) if val is not None and val != '' else 0
+                except Exception:
+                    val_num = 0
+                points_per = el.get('points') or el.get('point_value') or 0
+                if isinstance(points_per, dict):
+                    # Option-dependent points: count the raw value
+                    total_points += val_num
+                else:
+                    try:
+                        total_points += val_num * float(points_per)
+                    except Exception:
+                        total_points += val_num
+
+        if not total_points:
+            numeric_values = [v for v in (data.values() if isinstance(data, dict) else []) if isinstance(v, (int, float))]
+            total_points = sum(numeric_values) if numeric_values else 0
+
+    try:
+        total_points = float(total_points)
+    except Exception:
+        total_points = 0.0
+    return max(0.0, total_points)
+
+
+def _metric(entry, metric_id):
+    try:
+        return float(entry.calculate_metric(metric_id) or 0)
+    except Exception:
+        return 0.0
+
+
+def _sort_key(row):
+    ts = row['timestamp']
+    return (ts.timestamp() if ts is not None else 0.0, row['id'])
+
+
+def entry_row(entry, game_config):
+    """Point row for one ``ScoutingData`` (or alliance shared) entry."""
+    try:
+        data = entry.data
+    except Exception:
+        data = {}
+    match = getattr(entry, 'match', None)
+    auto = _metric(entry, 'apt')
+    teleop = _metric(entry, 'tpt')
+    endgame = _metric(entry, 'ept')
+    return {
+        'id': entry.id,
+        'timestamp': entry.timestamp,
+        'match_id': entry.match_id,
+        'match_number': match.match_number if match is not None else None,
+        'scouting_team_number': getattr(entry, 'scouting_team_number', None),
+        'scout_name': entry.scout_name,
+        'points': points_from_data(data, game_config),
+        'auto': auto,
+        'teleop': teleop,
+        'endgame': endgame,
+        'total': _metric(entry, 'tot') or (auto + teleop + endgame),
+    }
+
+
+def rows_from_entries(entries, game_config=None):
+    """Ordered point rows for ad-hoc entry lists (e.g. alliance shared data).
+
+    ``game_config`` is resolved once for the whole list rather than once
+    per entry.
+    """
+    if game_config is None:
+        from app.utils.config_manager import get_effective_game_config
+        game_config = get_effective_game_config() or {}
+    rows = []
+    for entry in entries:
+        try:
+            rows.append(entry_row(entry, game_config))
+        except Exception as e:
+            logger.debug("Trend series: skipping entry %s: %s", getattr(entry, 'id', None), e)
+    rows.sort(key=_sort_key)
+    return rows
+
+
+# ----------------------------------------------------------------------
+# Incrementally maintained series
+# ----------------------------------------------------------------------
+def _configs_for(entries):
+    from app.utils.config_manager import get_effective_game_config, load_game_config
+
+    configs = {}
+    for entry in entries:
+        stn = getattr(entry, 'scouting_team_number', None)
+        if stn not in configs:
+            try:
+                configs[stn] = (load_game_config(team_number=stn) if stn else None) or get_effective_game_config() or {}
+            except Exception:
+                configs[stn] = {}
+    return configs
+
+
+def _query_rows(team_id, scouting_team_number, ids=None):
+    from app.models import ScoutingData
+
+    query = ScoutingData.query.filter(ScoutingData.team_id == team_id)
+    if scouting_team_number != ALL_SCOUTING_TEAMS:
+        query = query.filter(ScoutingData.scouting_team_number == scouting_team_number)
+    if ids is not None:
+        query = query.filter(ScoutingData.id.in_(list(ids)))
+    entries = query.all()
+    configs = _configs_for(entries)
+    return [entry_row(e, configs.get(e.scouting_team_number, {})) for e in entries]
+
+
+def team_series(team_id, scouting_team_number=ALL_SCOUTING_TEAMS):
+    """Ordered point rows for ``team_id``'s entries from one scouting team.
+
+    Rows are sorted by (timestamp, id).  Pass ``ALL_SCOUTING_TEAMS`` for
+    entries from every scouting team.
+    """
+    from app.utils.change_tracking import get_data_versions
+
+    key = (team_id, scouting_team_number, get_data_versions(CONFIG_TABLES))
+    with _pending_lock:
+        new_ids = _pending.pop(key, None)
+
+    series = _SERIES_CACHE.get(key, None)
+    if series is None:
+        rows = sorted(_query_rows(team_id, scouting_team_number), key=_sort_key)
+        series = {'rows': rows, 'keys': [_sort_key(r) for r in rows], 'ids': {r['id'] for r in rows}}
+        _SERIES_CACHE.set(key, series)
+        return list(rows)
+
+    new_ids = (new_ids or set()) - series['ids']
+    if new_ids:
+        rows = list(series['rows'])
+        keys = list(series['keys'])
+        for row in _query_rows(team_id, scouting_team_number, ids=new_ids):
+            sk = _sort_key(row)
+            pos = bisect.bisect_right(keys, sk)
+            keys.insert(pos, sk)
+            rows.insert(pos, row)
+        series = {'rows': rows, 'keys': keys, 'ids': series['ids'] | {r['id'] for r in rows}}
+        _SERIES_CACHE.set(key, series)
+    return list(series['rows'])
+
+
+def teams_series(team_id, scouting_team_numbers):
+    """Merge the series of several scouting teams (``None``/empty means all)."""
+    numbers = [n for n in (scouting_team_numbers or []) if n is not None]
+    if not numbers:
+        return team_series(team_id)
+    if len(numbers) == 1:
+        return team_series(team_id, numbers[0])
+    rows = []
+    for number in sorted(set(numbers)):
+        rows.extend(team_series(team_id, number))
+    rows.sort(key=_sort_key)
+    return rows
+
+
+def note_inserted(team_id, scouting_team_number, entry_id):
+    """Queue a committed insert for every cached series it belongs to."""
+    with _pending_lock:
+        for key in _SERIES_CACHE.keys():
+            if key[0] == team_id and key[1] in (scouting_team_number, ALL_SCOUTING_TEAMS):
+                _pending.setdefault(key, set()).add(entry_id)
+
+
+def invalidate_team(team_id=None):
+    """Drop cached series for ``team_id`` (all teams when ``None``)."""
+    if team_id is None:
+        predicate = lambda key: True  # noqa: E731
+    else:
+        predicate = lambda key: key[0] == team_id  # noqa: E731
+    _SERIES_CACHE.invalidate(predicate)
+    with _pending_lock:
+        for key in [k for k in _pending if predicate(k)]:
+            _pending.pop(key, None)
+
+
+def register_trend_series_listeners():
+    """Hook Session events so committed scouting data keeps the series current."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    def _changes(session):
+        return session.info.setdefault('_trend_series_changes', {'inserted': [], 'changed': set(), 'all': False})
+
+    @event.listens_for(Session, 'after_flush')
+    def _collect_scouting_changes(session, flush_context):
+        try:
+            changes = None
+            for obj in session.new:
+                if getattr(type(obj), '__tablename__', None) == 'scouting_data':
+                    changes = changes or _changes(session)
+                    changes['inserted'].append((obj.team_id, obj.scouting_team_number, obj.id))
+            for obj in list(session.dirty) + list(session.deleted):
+                if getattr(type(obj), '__tablename__', None) == 'scouting_data':
+                    changes = changes or _changes(session)
+                    changes['changed'].add(obj.team_id)
+        except Exception:
+            pass
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _collect_bulk_scouting_changes(orm_execute_state):
+        try:
+            if orm_execute_state.is_update or orm_execute_state.is_delete:
+                mapper = orm_execute_state.bind_mapper
+                if mapper is not None and mapper.local_table.name == 'scouting_data':
+                    _changes(orm_execute_state.session)['all'] = True
+        except Exception:
+            pass
+
+    @event.listens_for(Session, 'after_commit')
+    def _apply_scouting_changes(session):
+        changes = session.info.pop('_trend_series_changes', None)
+        if not changes:
+            return
+        if changes['all']:
+            invalidate_team()
+            return
+        for team_id in changes['changed']:
+            invalidate_team(team_id)
+        for team_id, scouting_team_number, entry_id in changes['inserted']:
+            if team_id not in changes['changed']:
+                note_inserted(team_id, scouting_team_number, entry_id)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _discard_scouting_changes(session):
+        session.info.pop('_trend_series_changes', None)
+
+    _listeners_registered = True
+
+
+# ----------------------------------------------------------------------
+# Statistics
+# ----------------------------------------------------------------------
+def linear_fit(x_vals, y_vals, weights=None):
+    """Least-squares ``(slope, intercept)``; ``(0, mean)`` when x is constant."""
+    if x_vals is None or y_vals is None or len(x_vals) == 0 or len(x_vals) != len(y_vals):
+        return 0, 0
+    x = np.asarray(x_vals, dtype=float)
+    y = np.asarray(y_vals, dtype=float)
+    if weights is not None:
+        w = np.asarray(weights, dtype=float)
+        if len(x) >= 2 and np.ptp(x) > 0 and w.sum() > 0:
+            slope, intercept = np.polyfit(x, y, 1, w=w)
+            return float(slope), float(intercept)
+    x_mean = x.mean()
+    y_mean = float(y.mean())
+    den = float(((x - x_mean) ** 2).sum())
+    if den == 0:
+        return 0, y_mean
+    slope = float(((x - x_mean) * (y - y_mean)).sum()) / den
+    return slope, y_mean - slope * float(x_mean)
+
+
+def moving_average(values, window=3):
+    """Trailing moving average; the first points average what is available."""
+    y = np.asarray(values, dtype=float)
+    if y.size == 0:
+        return []
+    csum = np.cumsum(np.insert(y, 0, 0.0))
+    idx = np.arange(1, y.size + 1)
+    start = np.maximum(idx - window, 0)
+    return ((csum[idx] - csum[start]) / (idx - start)).tolist()
+
+
+def _direction_stats(y):
+    diffs = np.diff(y)
+    if diffs.size == 0:
+        return None
+    pos = int((diffs > 0).sum())
+    neg = int((diffs < 0).sum())
+    return (pos - neg) / diffs.size, max(pos, neg) / diffs.size
+
+
+def _pct_change(first, last):
+    return (last - first) / max(1.0, (abs(first) + abs(last)) / 2.0)
+
+
+def compute_trend(values, recent_window=5, ma_window=3, pct_threshold=0.05):
+    """Regression, moving average and consistency stats for an ordered series.
+
+    Keys match the team trends template context: ``overall_*`` / ``recent_*``
+    slope, intercept, pct_change, consistency (signed, -1..1) and
+    consistency_strength (majority-direction share), plus ``overall_mean``,
+    ``overall_stddev`` (sample), ``overall_cv``, ``overall_within_1std``,
+    ``overall_within_pct_threshold``, ``predicted_next`` and
+    ``moving_average``.
+    """
+    y = np.asarray(values, dtype=float)
+    n = int(y.size)
+    x = np.arange(n, dtype=float)
+    slope, intercept = linear_fit(x, y)
+    out = {
+        'data_points': n,
+        'slope': slope,
+        'intercept': intercept,
+        'predicted_next': slope * n + intercept if n else 0,
+        'moving_average': moving_average(y, ma_window),
+        'overall_slope': slope,
+        'overall_intercept': intercept,
+        'overall_pct_change': 0,
+        'overall_consistency': 0,
+        'recent_slope': 0,
+        'recent_intercept': 0,
+        'recent_pct_change': 0,
+        'recent_consistency': 0,
+        'overall_mean': float(y.mean()) if n else None,
+        'overall_stddev': float(y.std(ddof=1)) if n > 1 else (0.0 if n else None),
+        'overall_cv': None,
+        'overall_within_1std': None,
+        'overall_within_pct_threshold': None,
+    }
+    if out['overall_mean'] is not None:
+        out['overall_cv'] = (out['overall_stddev'] / out['overall_mean']) if out['overall_mean'] else 0
+
+    if n >= 2:
+        out['overall_pct_change'] = _pct_change(y[0], y[-1])
+        consistency = _direction_stats(y)
+        if consistency:
+            out['overall_consistency'], out['overall_consistency_strength'] = consistency
+        mean_all, std_all = out['overall_mean'], out['overall_stddev']
+        out['overall_within_1std'] = float((np.abs(y - mean_all) <= std_all).mean())
+        out['overall_within_pct_threshold'] = float((np.abs(y - mean_all) <= abs(mean_all) * pct_threshold).mean())
+
+    window = min(recent_window, n)
+    if window >= 2:
+        recent_y = y[-window:]
+        rslope, rintercept = linear_fit(x[-window:], recent_y)
+        out['recent_slope'] = rslope
+        out['recent_intercept'] = rintercept
+        out['recent_pct_change'] = _pct_change(recent_y[0], recent_y[-1])
+        consistency = _direction_stats(recent_y)
+        if consistency:
+            out['recent_consistency'], out['recent_consistency_strength'] = consistency
+
+    for k, v in out.items():
+        if isinstance(v, np.floating):
+            out[k] = float(v)
+    return out
+
+
+def trend_factor(values, weights=None):
+    """Performance trend multiplier: >1 improving, <1 declining, clamped to 0.85-1.15."""
+    if not values or len(values) < 2:
+        return 1.0
+    if weights is None:
+        weights = [1.0] * len(values)
+
+    if len(values) >= 3:
+        try:
+            slope, _ = linear_fit(np.arange(len(values)), values, weights=weights)
+            w = np.asarray(weights, dtype=float)
+            mean_val = float(np.dot(values, w) / w.sum())
+            if mean_val > 0:
+                factor = 1.0 + (slope / mean_val) * len(values)
+                return max(0.85, min(1.15, factor))
+        except Exception:
+            pass
+
+    # Fallback: second-half average over first-half average
+    mid = len(values) // 2
+    if mid > 0:
+        first_avg = float(np.mean(values[:mid]))
+        second_avg = float(np.mean(values[mid:]))
+        if first_avg > 0:
+            return max(0.85, min(1.15, second_avg / first_avg))
+    return 1.0
+
+
+def half_averages(values):
+    """(first half mean, second half mean) of an ordered series."""
+    mid = len(values) // 2
+    if mid == 0:
+        return 0.0, 0.0
+    return float(np.mean(values[:mid])), float(np.mean(values[mid:]))
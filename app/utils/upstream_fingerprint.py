@@ -0,0 +1,229 @@
+"""
+Per-event upstream change detection for match refresh jobs.
+
+Every match-related refresh (the periodic API sync, the schedule adjuster
+and the match time fetcher) reads the same handful of upstream resources
+for an event: FIRST ``/matches`` and ``/schedule/{qual,playoff,practice}``
+and TBA ``/event/{key}/matches``.  :func:`probe_event_upstream` revalidates
+those URLs with the ``ETag`` / ``Last-Modified`` values stored in
+``UpstreamFingerprint`` (so an unchanged TBA resource answers with a
+bodiless 304) and hashes any body that does come back.  The combined hash
+is the event fingerprint.
+
+The probe is shared: its result is stored once per event (``scope='event_probe'``)
+and every consumer, scouting team and process reuses it for
+``PROBE_SHARE_SECONDS``, the cadence of the most frequent consumer.  An
+event therefore costs one probe per window however many jobs ask about it.
+
+A job compares it with the fingerprint it last applied for the scouting
+team (:func:`event_unchanged`) and skips the parse, merge and DB write when
+they match; after a successful refresh it stores the new value with
+:func:`mark_event_applied`.
+
+:func:`fetch_event_probe` only reads: it returns the fingerprint with the
+validator and hash rows to store, so callers fetching on
+``http_client.fan_out`` workers persist them on their own thread with
+:func:`save_event_probe`.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+from flask import current_app
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+TBA_API_BASE = 'https://www.thebluealliance.com/api/v3'
+
+SCOPE_URL = 'url'
+SCOPE_PROBE = 'event_probe'
+SCOPE_SYNC = 'event_matches'
+SCOPE_SCHEDULE = 'event_schedule'
+SCOPE_TIMES = 'event_times'
+
+# Every consumer reuses an event's probe for this long; matches the
+# periodic API sync, the most frequent consumer
+PROBE_SHARE_SECONDS = 180
+
+_probe_cache = {}
+_probe_lock = threading.Lock()
+
+
+def content_hash(data):
+    """SHA-256 hex digest of raw bytes or of a JSON-serialisable value."""
+    if not isinstance(data, (bytes, bytearray)):
+        data = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def event_resource_key(raw_event_code, season):
+    return f"{int(season)}:{str(raw_event_code).strip().upper()}"
+
+
+def _event_upstream_urls(raw_event_code, season):
+    """(url, headers) pairs for every upstream resource the match jobs read."""
+    from app.utils.api_utils import get_api_headers
+    from app.utils.tba_api_utils import get_tba_api_headers, construct_tba_event_key
+
+    base_url = current_app.config.get('API_BASE_URL', 'https://frc-api.firstinspires.org')
+    first_headers = get_api_headers()
+    urls = [(f"{base_url}/v2.0/{season}/matches/{raw_event_code}", first_headers)]
+    for level in ('qual', 'playoff', 'practice'):
+        urls.append((f"{base_url}/v2.0/{season}/schedule/{raw_event_code}/{level}", first_headers))
+    tba_key = construct_tba_event_key(raw_event_code, season)
+    urls.append((f"{TBA_API_BASE}/event/{tba_key}/matches", get_tba_api_headers()))
+    return urls
+
+
+def _url_key(url):
+    return url if len(url) <= 255 else content_hash(url.encode('utf-8'))
+
+
+def _probe_url(url, headers, records):
+    """Return a hash describing the current state of *url*.
+
+    Unchanged resources answer 304 to the stored validators and reuse the
+    stored body hash.  Errors hash to a stable marker so a resource that
+    keeps failing is not mistaken for a change on every probe.  Rows to
+    store are appended to *records*.
+    """
+    from app.models import UpstreamFingerprint
+    from app.utils.http_client import http_get
+
+    key = _url_key(url)
+    row = UpstreamFingerprint.lookup(SCOPE_URL, key)
+    request_headers = dict(headers or {})
+    if row is not None and row.content_hash:
+        if row.etag:
+            request_headers['If-None-Match'] = row.etag
+        if row.last_modified:
+            request_headers['If-Modified-Since'] = row.last_modified
+
+    try:
+        response = http_get(url, headers=request_headers, timeout=15)
+    except requests.RequestException as e:
+        return f"error:{type(e).__name__}"
+
+    if response.status_code == 304 and row is not None:
+        records.append({'scope': SCOPE_URL, 'resource_key': key, 'content_hash': row.content_hash,
+                        'etag': row.etag, 'last_modified': row.last_modified})
+        return row.content_hash
+    if response.status_code != 200:
+        return f"http:{response.status_code}"
+
+    digest = content_hash(response.content or b'')
+    records.append({'scope': SCOPE_URL, 'resource_key': key, 'content_hash': digest,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')})
+    return digest
+
+
+def _shared_probe(cache_key):
+    """``(fingerprint, age_seconds)`` of the stored probe for the event, or ``None`` if stale."""
+    from app.models import UpstreamFingerprint
+
+    row = UpstreamFingerprint.lookup(SCOPE_PROBE, cache_key)
+    if row is None or not row.content_hash or row.checked_at is None:
+        return None
+    checked_at = row.checked_at
+    if checked_at.tzinfo is None:
+        checked_at = checked_at.replace(tzinfo=timezone.utc)
+    age = (datetime.now(timezone.utc) - checked_at).total_seconds()
+    if age >= PROBE_SHARE_SECONDS:
+        return None
+    return row.content_hash, max(age, 0.0)
+
+
+def fetch_event_probe(raw_event_code, season):
+    """Return ``(fingerprint, records)`` for one event without writing to the database.
+
+    A probe made by any consumer in the last ``PROBE_SHARE_SECONDS`` is
+    reused and *records* is empty.  Otherwise the upstream URLs are
+    revalidated with the caller's season override / API credentials and
+    *records* holds the rows :func:`save_event_probe` should store.
+    """
+    cache_key = event_resource_key(raw_event_code, season)
+    now = time.monotonic()
+    with _probe_lock:
+        cached = _probe_cache.get(cache_key)
+        if cached and now < cached[0]:
+            return cached[1], []
+
+    records = []
+    shared = _shared_probe(cache_key)
+    if shared is not None:
+        fingerprint, age = shared
+    else:
+        parts = [(url, _probe_url(url, headers, records))
+                 for url, headers in _event_upstream_urls(raw_event_code, season)]
+        fingerprint, age = content_hash(parts), 0.0
+        records.append({'scope': SCOPE_PROBE, 'resource_key': cache_key, 'content_hash': fingerprint})
+
+    with _probe_lock:
+        _probe_cache[cache_key] = (now + PROBE_SHARE_SECONDS - age, fingerprint)
+    return fingerprint, records
+
+
+def save_event_probe(records):
+    """Store the rows returned by :func:`fetch_event_probe` and commit."""
+    if not records:
+        return
+    from app.models import UpstreamFingerprint
+
+    for record in records:
+        UpstreamFingerprint.record(commit=False, **record)
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
+def probe_event_upstream(raw_event_code, season):
+    """Return the combined upstream fingerprint for one event, storing the probe."""
+    fingerprint, records = fetch_event_probe(raw_event_code, season)
+    save_event_probe(records)
+    return fingerprint
+
+
+def probe_event_for_config(raw_event_code, season, game_config):
+    """Probe with *game_config*'s API credentials; ``None`` if the probe fails."""
+    from app.utils.config_manager import set_thread_game_config, clear_thread_game_config
+
+    set_thread_game_config(game_config)
+    try:
+        return probe_event_upstream(raw_event_code, season)
+    except Exception as e:
+        logger.debug("Upstream probe failed for %s: %s", raw_event_code, e)
+        return None
+    finally:
+        clear_thread_game_config()
+
+
+def clear_probe_cache():
+    with _probe_lock:
+        _probe_cache.clear()
+
+
+def event_unchanged(scope, raw_event_code, season, scouting_team_number, fingerprint):
+    """True when *fingerprint* is what this job last applied for the team."""
+    if not fingerprint:
+        return False
+    from app.models import UpstreamFingerprint
+    row = UpstreamFingerprint.lookup(scope, event_resource_key(raw_event_code, season),
+                                     scouting_team_number)
+    return row is not None and row.content_hash == fingerprint
+
+
+def mark_event_applied(scope, raw_event_code, season, scouting_team_number, fingerprint):
+    """Remember that the refresh for *fingerprint* was applied for the team."""
+    if not fingerprint:
+        return
+    from app.models import UpstreamFingerprint
+    UpstreamFingerprint.record(scope, event_resource_key(raw_event_code, season), fingerprint,
+                               scouting_team_number=scouting_team_number)
@@ -1,5 +1,21 @@
 import os
 import sys
+
+# ---------------------------------------------------------------------------
+# Socket.IO async mode.  'threading' runs one OS thread per connected client
+# (long-poll or WebSocket), which does not scale to a district event's worth
+# of tablets.  'eventlet' serves every client from a green thread with full
+# WebSocket support.  It has to monkey-patch the standard library before
+# anything else is imported, so the choice is made here: change the default
+# below or set the environment variable SOCKETIO_ASYNC_MODE.
+# ---------------------------------------------------------------------------
+SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading').strip().lower()
+if __name__ == '__main__' and SOCKETIO_ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+    # app/__init__.py reads this when creating the SocketIO instance
+    os.environ['SOCKETIO_ASYNC_MODE'] = 'eventlet'
+
 import json
 import threading
 import time
@@ -527,6 +543,82 @@ if __name__ == '__main__':
 
     # Multi-server sync functionality removed - keeping only normal user features
 
+    def _run_api_sync_jobs(sync_jobs):
+        """Stages 2 and 3 of the API sync: fetch each distinct event once, concurrently,
+        then apply the results to every due scouting team with bulk lookups."""
+        from app.models import Event, db
+        from app.utils.sync_status import update_last_sync
+        from app.utils.api_sync_pipeline import (
+            fetch_event_data, event_group_key, apply_team_data, apply_match_data,
+            matches_unchanged, mark_matches_applied, save_probe_records,
+        )
+
+        fetched = fetch_event_data(sync_jobs)
+        # The fetch workers only read; store their upstream probes here
+        save_probe_records(fetched)
+        print(f"  Fetched {len(fetched)} distinct event(s) for {len(sync_jobs)} scouting team(s)")
+
+        for job in sync_jobs:
+            scouting_team_number = job['scouting_team_number']
+            data = fetched.get(event_group_key(job)) or {}
+            try:
+                event = db.session.get(Event, job['event_id'])
+                if event is None:
+                    continue
+
+                if data.get('teams') is not None:
+                    try:
+                        teams_added, teams_updated = apply_team_data(event, scouting_team_number, data['teams'])
+                        print(f"  Teams sync for {scouting_team_number}: {teams_added} added, {teams_updated} updated")
+                    except Exception as e:
+                        print(f"  Error syncing teams for {scouting_team_number}: {str(e)}")
+                else:
+                    print(f"  Error syncing teams for {scouting_team_number}: {data.get('teams_error')}")
+
+                matches_applied = False
+                if data.get('matches') is None and matches_unchanged(job, data):
+                    print(f"  Matches unchanged upstream for {scouting_team_number}; skipping merge")
+                elif data.get('matches') is not None:
+                    try:
+                        matches_added, matches_updated = apply_match_data(event, scouting_team_number, data['matches'])
+                        print(f"  Matches sync for {scouting_team_number}: {matches_added} added, {matches_updated} updated")
+                        matches_applied = True
+                    except Exception as e:
+                        print(f"  Error syncing matches for {scouting_team_number}: {str(e)}")
+                else:
+                    print(f"  Error syncing matches for {scouting_team_number}: {data.get('matches_error')}")
+
+                # Commit changes for this team scope
+                try:
+                    db.session.commit()
+                    if matches_applied:
+                        try:
+                            mark_matches_applied(job, data)
+                        except Exception as fp_err:
+                            print(f"  Warning: Could not record upstream fingerprint: {fp_err}")
+                    # Merge any duplicate events that may have been created
+                    try:
+                        from app.routes.data import merge_duplicate_events, merge_duplicate_matches
+                        merge_duplicate_events(scouting_team_number)
+                        # Also ensure duplicate matches (from prior runs) are merged
+                        try:
+                            merge_duplicate_matches(scouting_team_number=scouting_team_number)
+                        except Exception as mm_err:
+                            print(f"  Warning: Could not merge duplicate matches: {mm_err}")
+                    except Exception as merge_err:
+                        print(f"  Warning: Could not merge duplicate events: {merge_err}")
+                    # Update last sync timestamp on success (shared)
+                    try:
+                        update_last_sync(scouting_team_number)
+                    except Exception:
+                        pass
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"  Failed to commit changes for team {scouting_team_number}: {e}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"  Error applying API sync for scouting team {scouting_team_number}: {e}")
+
     # Start periodic API data sync thread
     def api_data_sync_worker():
         """Background thread for periodic API data synchronization with per-team throttling.
@@ -536,6 +628,8 @@ if __name__ == '__main__':
         - If event start date is > 1.5 weeks away -> autosync daily
         - If event start date is within 1.5 weeks -> autosync at the existing (recent) interval
         - This applies only to the automated periodic sync worker. Manual syncs are unaffected.
+        - Due teams are synced together: each distinct event is fetched once (concurrently)
+          and the results are applied to every scouting team at that event.
         """
         # Intervals (seconds)
         RECENT_INTERVAL = 180           # keep existing frequent autosync (3 minutes)
@@ -546,7 +640,6 @@ if __name__ == '__main__':
 
         # Use shared sync status storage so routes can report sync times
         from app.utils.sync_status import (
-            update_last_sync,
             get_last_sync,
             set_event_cache,
             get_event_cache,
@@ -560,7 +653,6 @@ if __name__ == '__main__':
 
                 # Import here to avoid circular imports
                 from app.utils.config_manager import load_game_config
-                from app.utils.api_utils import get_teams_dual_api, get_matches_dual_api
                 from app.models import Team, Match, Event, User, ScoutingTeamSettings, db
 
                 with app.app_context():
@@ -596,8 +688,9 @@ if __name__ == '__main__':
                         if not team_numbers:
                             team_numbers.add(None)
 
-                        # Iterate each scouting team and run sync scoped to that team
+                        # Stage 1: iterate each scouting team and decide which are due for a sync
                         from app.utils.team_utils import team_sort_key
+                        sync_jobs = []
                         for scouting_team_number in sorted(team_numbers, key=team_sort_key):
                             try:
                                 # Skip system accounts (scouting_team=0) — they don't have
@@ -834,6 +927,7 @@ if __name__ == '__main__':
 
                                 # If the event currently has no teams or no matches for this scouting team,
                                 # force an immediate API sync so we populate missing data promptly.
+                                force_refresh = False
                                 try:
                                     if scouting_team_number is None:
                                         teams_count = Team.query.filter(Team.events.any(id=event.id), Team.scouting_team_number.is_(None)).count()
@@ -846,6 +940,7 @@ if __name__ == '__main__':
                                         print(f"  Event {event_code} has no teams or matches for team {scouting_team_number} (teams={teams_count}, matches={matches_count}) -> forcing immediate API sync")
                                         # Reset last sync so we won't skip due to interval checks
                                         last = None
+                                        force_refresh = True
                                 except Exception as e:
                                     print(f"  Warning checking event team/match counts for immediate sync: {e}")
 
@@ -858,107 +953,16 @@ if __name__ == '__main__':
                                         print(f"  Skipping autosync for team {scouting_team_number} (next in {next_in}s)")
                                         continue
 
-                                # --- Perform the actual sync for this team ---
-                                try:
-                                    # Use raw_event_code for API calls (external APIs don't use year-prefixed codes)
-                                    team_data_list = get_teams_dual_api(raw_event_code)
-                                    teams_added = 0
-                                    teams_updated = 0
-
-                                    for team_data in team_data_list:
-                                        if not team_data or not team_data.get('team_number'):
-                                            continue
-
-                                        team_number = team_data.get('team_number')
-                                        team = Team.query.filter_by(team_number=team_number, scouting_team_number=scouting_team_number).first()
-
-                                        if team:
-                                            team.team_name = team_data.get('team_name', team.team_name)
-                                            team.location = team_data.get('location', team.location)
-                                            teams_updated += 1
-                                        else:
-                                            team = Team(team_number=team_number,
-                                                        team_name=team_data.get('team_name'),
-                                                        location=team_data.get('location'),
-                                                        scouting_team_number=scouting_team_number)
-                                            db.session.add(team)
-                                            teams_added += 1
-
-                                        if event not in team.events:
-                                            try:
-                                                team.events.append(event)
-                                            except Exception:
-                                                pass
-
-                                    print(f"  Teams sync for {scouting_team_number}: {teams_added} added, {teams_updated} updated")
-                                except Exception as e:
-                                    print(f"  Error syncing teams for {scouting_team_number}: {str(e)}")
-
-                                try:
-                                    # Use raw_event_code for API calls (external APIs don't use year-prefixed codes)
-                                    match_data_list = get_matches_dual_api(raw_event_code)
-                                    matches_added = 0
-                                    matches_updated = 0
-
-                                    for match_data in match_data_list:
-                                        if not match_data:
-                                            continue
-
-                                        match_data['event_id'] = event.id
-                                        match_number = match_data.get('match_number')
-                                        match_type = match_data.get('match_type')
-
-                                        if not match_number or not match_type:
-                                            continue
-
-                                        match = Match.query.filter_by(event_id=event.id, match_number=match_number, match_type=match_type, scouting_team_number=scouting_team_number).first()
-
-                                        if match:
-                                            match.red_alliance = match_data.get('red_alliance', match.red_alliance)
-                                            match.blue_alliance = match_data.get('blue_alliance', match.blue_alliance)
-                                            match.winner = match_data.get('winner', match.winner)
-                                            match.red_score = match_data.get('red_score', match.red_score)
-                                            match.blue_score = match_data.get('blue_score', match.blue_score)
-                                            matches_updated += 1
-                                        else:
-                                            match = Match(match_number=match_number,
-                                                          match_type=match_type,
-                                                          event_id=event.id,
-                                                          red_alliance=match_data.get('red_alliance'),
-                                                          blue_alliance=match_data.get('blue_alliance'),
-                                                          red_score=match_data.get('red_score'),
-                                                          blue_score=match_data.get('blue_score'),
-                                                          winner=match_data.get('winner'),
-                                                          scouting_team_number=scouting_team_number)
-                                            db.session.add(match)
-                                            matches_added += 1
-
-                                    print(f"  Matches sync for {scouting_team_number}: {matches_added} added, {matches_updated} updated")
-                                except Exception as e:
-                                    print(f"  Error syncing matches for {scouting_team_number}: {str(e)}")
-
-                                # Commit changes for this team scope
-                                try:
-                                    db.session.commit()
-                                    # Merge any duplicate events that may have been created
-                                    try:
-                                        from app.routes.data import merge_duplicate_events, merge_duplicate_matches
-                                        merge_duplicate_events(scouting_team_number)
-                                        # Also ensure duplicate matches (from prior runs) are merged
-                                        try:
-                                            merge_duplicate_matches(scouting_team_number=scouting_team_number)
-                                        except Exception as mm_err:
-                                            print(f"  Warning: Could not merge duplicate matches: {mm_err}")
-                                    except Exception as merge_err:
-                                        print(f"  Warning: Could not merge duplicate events: {merge_err}")
-                                    # Update last sync timestamp on success (shared)
-                                    try:
-                                        update_last_sync(scouting_team_number)
-                                    except Exception:
-                                        pass
-                                except Exception as e:
-                                    db.session.rollback()
-                                    print(f"  Failed to commit changes for team {scouting_team_number}: {e}")
+                                # Due for a sync: queue it so teams sharing an event share one fetch
+                                sync_jobs.append({
+                                    'scouting_team_number': scouting_team_number,
+                                    'raw_event_code': raw_event_code,
+                                    'event_code': event_code,
+                                    'event_year': event_year,
+                                    'event_id': event.id,
+                                    'game_config': game_config,
+                                    'force_refresh': force_refresh,
+                                })
 
                             except Exception as e:
                                 print(f"  Error processing scouting team {scouting_team_number}: {e}")
@@ -970,6 +974,9 @@ if __name__ == '__main__':
                                 except Exception:
                                     pass
 
+                        if sync_jobs:
+                            _run_api_sync_jobs(sync_jobs)
+
                         print("API data sync evaluation completed for all teams")
 
                     except Exception as e:
@@ -1042,7 +1049,12 @@ if __name__ == '__main__':
     # Real-time file synchronization removed - keeping only normal user features
     
     # Configure SocketIO based on server choice
-    if USE_WAITRESS:
+    if SOCKETIO_ASYNC_MODE == 'eventlet':
+        # Green-threaded server: WebSockets without a thread per client
+        socketio.init_app(app,
+                         cors_allowed_origins="*",
+                         transports=['websocket', 'polling'])
+    elif USE_WAITRESS:
         # Configure SocketIO for Waitress compatibility
         socketio.init_app(app, 
                          cors_allowed_origins="*",
@@ -1058,7 +1070,27 @@ if __name__ == '__main__':
                          transports=['websocket', 'polling'])
 
     try:
-        if USE_WAITRESS:
+        if SOCKETIO_ASYNC_MODE == 'eventlet':
+            print(f"Starting server with eventlet on port {port}...")
+            print("   Full SocketIO WebSocket support (green thread per client)")
+            cert_file = os.path.join(os.path.dirname(__file__), 'ssl', 'cert.pem')
+            key_file = os.path.join(os.path.dirname(__file__), 'ssl', 'key.pem')
+            ssl_kwargs = {}
+            if not IS_PRODUCTION and os.path.exists(cert_file) and os.path.exists(key_file):
+                ssl_kwargs = {'certfile': cert_file, 'keyfile': key_file}
+                print(f"   Server URL: https://localhost:{port}")
+            else:
+                print(f"   Server URL: http://localhost:{port}")
+            socketio.run(
+                app,
+                host='0.0.0.0',
+                port=port,
+                debug=False,
+                use_reloader=False,
+                log_output=not IS_PRODUCTION,
+                **ssl_kwargs
+            )
+        elif USE_WAITRESS:
             print(f"Starting server with Waitress WSGI server on port {port}...")
             print("   Production-ready server")
             print("   SocketIO polling mode for compatibility")
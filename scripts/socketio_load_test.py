@@ -0,0 +1,208 @@
+"""Socket.IO load test: many concurrent mobile clients in one team's chat room.
+
+Opens N concurrent Socket.IO clients on the ``/mobile`` namespace, all
+authenticated as one scouting team (so they share its team room), then
+sends chat messages through ``/api/mobile/chat/send``.  Every message is
+fanned out to every connected client as a ``chat.message`` delta.  The
+script reports:
+
+- connect success/failure and connect time percentiles
+- delivery ratio (messages received / messages x clients)
+- emit latency: client receive time minus the delta's server timestamp
+  (run the script on the server host, or with synced clocks)
+- end-to-end latency: client receive time minus the time the message was
+  POSTed
+
+Usage:
+    python scripts/socketio_load_test.py --url http://localhost:8080 \\
+        --username scout --password secret --team 5454 \\
+        [--clients 500] [--messages 20] [--interval 0.5] \\
+        [--conversation group|alliance] [--group loadtest] \\
+        [--transport websocket|polling] [--json]
+
+Start the server with ``SOCKETIO_ASYNC_MODE=eventlet python run.py`` to
+measure the green-threaded mode, or without it for the threading mode.
+
+Dependencies:
+    pip install "python-socketio[asyncio_client]" aiohttp
+"""
+import argparse
+import asyncio
+import json
+import ssl
+import time
+import uuid
+
+import aiohttp
+import socketio
+
+NAMESPACE = '/mobile'
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values_s):
+    values = [v * 1000.0 for v in values_s]
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50), 1),
+        'p95_ms': round(percentile(values, 95), 1),
+        'p99_ms': round(percentile(values, 99), 1),
+        'max_ms': round(max(values), 1),
+    }
+
+
+async def login(http, args):
+    async with http.post(f'{args.url}/api/mobile/auth/login', json={
+        'username': args.username, 'password': args.password, 'team_number': args.team,
+    }) as resp:
+        body = await resp.json(content_type=None)
+    if not body or not body.get('token'):
+        raise SystemExit(f'Login failed: {body}')
+    return body['token']
+
+
+class LoadClient:
+    """One Socket.IO client recording when each test message reaches it."""
+
+    def __init__(self, run_id, ssl_verify):
+        self.run_id = run_id
+        self.sio = socketio.AsyncClient(reconnection=False, ssl_verify=ssl_verify)
+        self.received = {}   # offline_id -> (receive time, server ts)
+        self.sio.on('mobile_deltas', self._on_deltas, namespace=NAMESPACE)
+
+    async def _on_deltas(self, payload):
+        now = time.time()
+        for delta in (payload or {}).get('deltas', []):
+            data = delta.get('data') or {}
+            offline_id = data.get('offline_id') or ''
+            if delta.get('type') == 'chat.message' and offline_id.startswith(self.run_id):
+                self.received.setdefault(offline_id, (now, delta.get('ts')))
+
+    async def connect(self, url, token, transport):
+        started = time.monotonic()
+        await self.sio.connect(url, namespaces=[NAMESPACE], auth={'token': token},
+                               transports=[transport], wait_timeout=30)
+        return time.monotonic() - started
+
+
+async def run(args):
+    run_id = f'lt-{uuid.uuid4().hex[:8]}-'
+    ssl_ctx = None if args.verify_ssl else ssl.create_default_context()
+    if ssl_ctx is not None:
+        ssl_ctx.check_hostname = False
+        ssl_ctx.verify_mode = ssl.CERT_NONE
+    connector = aiohttp.TCPConnector(ssl=ssl_ctx if args.url.startswith('https') else None)
+
+    async with aiohttp.ClientSession(connector=connector) as http:
+        token = await login(http, args)
+
+        clients = [LoadClient(run_id, args.verify_ssl) for _ in range(args.clients)]
+        gate = asyncio.Semaphore(args.connect_concurrency)
+        connect_times, connect_errors = [], []
+
+        async def _connect(client):
+            async with gate:
+                try:
+                    connect_times.append(await client.connect(args.url, token, args.transport))
+                except Exception as e:
+                    connect_errors.append(f'{type(e).__name__}: {e}')
+
+        started = time.monotonic()
+        await asyncio.gather(*(_connect(c) for c in clients))
+        connect_wall = time.monotonic() - started
+        connected = [c for c in clients if c.sio.connected]
+        print(f'Connected {len(connected)}/{args.clients} clients in {connect_wall:.1f}s')
+
+        sent_at = {}
+        payload = {'body': 'load test'}
+        if args.conversation == 'alliance':
+            payload['conversation_type'] = 'alliance'
+        else:
+            payload['group'] = args.group
+        headers = {'Authorization': f'Bearer {token}'}
+        for i in range(args.messages):
+            offline_id = f'{run_id}{i}'
+            sent_at[offline_id] = time.time()
+            async with http.post(f'{args.url}/api/mobile/chat/send', headers=headers,
+                                 json=dict(payload, offline_id=offline_id, body=f'load test {i}')) as resp:
+                if resp.status != 201:
+                    print(f'Send {i} failed: HTTP {resp.status} {await resp.text()}')
+            await asyncio.sleep(args.interval)
+
+        # Give the last fan-out time to arrive
+        deadline = time.monotonic() + args.drain
+        expected = len(sent_at) * len(connected)
+        while time.monotonic() < deadline:
+            if sum(len(c.received) for c in connected) >= expected:
+                break
+            await asyncio.sleep(0.1)
+
+        emit_latency, e2e_latency = [], []
+        for client in connected:
+            for offline_id, (received, server_ts) in client.received.items():
+                if server_ts:
+                    emit_latency.append(max(0.0, received - server_ts))
+                e2e_latency.append(max(0.0, received - sent_at[offline_id]))
+
+        await asyncio.gather(*(c.sio.disconnect() for c in connected), return_exceptions=True)
+
+    delivered = sum(len(c.received) for c in connected)
+    return {
+        'clients': args.clients,
+        'connected': len(connected),
+        'connect_errors': len(connect_errors),
+        'connect_error_samples': connect_errors[:5],
+        'connect': summarize(connect_times),
+        'messages': len(sent_at),
+        'delivered': delivered,
+        'delivery_ratio': round(delivered / expected, 4) if expected else None,
+        'emit_latency': summarize(emit_latency),
+        'end_to_end_latency': summarize(e2e_latency),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://localhost:8080')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--team', type=int, required=True, help='scouting team number')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--messages', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between messages')
+    parser.add_argument('--conversation', choices=('group', 'alliance'), default='group')
+    parser.add_argument('--group', default='loadtest', help='group chat name for --conversation group')
+    parser.add_argument('--transport', choices=('websocket', 'polling'), default='websocket')
+    parser.add_argument('--connect-concurrency', type=int, default=50)
+    parser.add_argument('--drain', type=float, default=10.0, help='seconds to wait for the last deliveries')
+    parser.add_argument('--verify-ssl', action='store_true')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+    args.url = args.url.rstrip('/')
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"Clients: {report['connected']}/{report['clients']} connected ({report['connect_errors']} errors)")
+    for sample in report['connect_error_samples']:
+        print(f'  {sample}')
+    print(f"Connect time: {report['connect']}")
+    print(f"Messages: {report['messages']}, delivered {report['delivered']} "
+          f"(ratio {report['delivery_ratio']})")
+    print(f"Emit latency (server emit -> client): {report['emit_latency']}")
+    print(f"End-to-end latency (POST -> client): {report['end_to_end_latency']}")
+
+
+if __name__ == '__main__':
+    main()
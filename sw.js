@@ -1,7 +1,7 @@
 // Service Worker for ObsidianScout - Simplified version without offline analytics
 
 // Increment the CACHE_VERSION to force clients to update caches when you change assets
-const CACHE_VERSION = 16;
+const CACHE_VERSION = 17;
 const CACHE_NAME = `scout-app-cache-v${CACHE_VERSION}`;
 const ROBOT_IMAGE_PATHS = ['/pit_scouting/image/', '/pit-scouting/image/'];
 
@@ -12,6 +12,7 @@ const STATIC_ASSETS = [
   '/static/css/theme-management.css',
   '/static/css/theme-overrides.css',
   '/static/js/scripts.js',
+  '/static/js/plotly_compact.js',
   '/static/js/modern-ui.js',
   '/static/js/qrcode.min.js',
   '/static/js/game-config.js',
@@ -0,0 +1,65 @@
+import json
+import random
+
+from flask_login import login_user
+
+from app import create_app, db
+from app.models import (
+    AllianceDataGrant, AllianceSharedScoutingData, Event, Match, ScoutingAlliance, ScoutingData, Team, User,
+    team_event,
+)
+from app.utils.alliance_data import copy_alliance_data_to_team, get_scouting_data_query
+from app.utils.team_isolation import filter_scouting_data_by_scouting_team
+
+
+def test_kept_alliance_data_is_read_in_place_instead_of_copied():
+    app = create_app(test_config={'TESTING': True})
+    with app.test_request_context():
+        source, keeper = random.sample(range(80000, 89999), 2)
+        alliance = ScoutingAlliance(alliance_name=f'Keep {keeper}')
+        event = Event(name='Keep', code=f'KP{keeper}', year=2026, scouting_team_number=source)
+        team = Team(team_number=keeper * 10, scouting_team_number=source)
+        user = User(username=f'keeper_{keeper}', scouting_team_number=keeper)
+        db.session.add_all([alliance, event, team, user])
+        db.session.flush()
+        match = Match(match_number=1, match_type='Qualification', event_id=event.id, scouting_team_number=source)
+        db.session.add(match)
+        db.session.flush()
+        kept, deleted = [ScoutingData(match_id=match.id, team_id=team.id, scouting_team_number=source,
+                                      scout_name='scout', alliance=color, data_json=json.dumps({'auto': 1}))
+                         for color in ('red', 'blue')]
+        db.session.add_all([kept, deleted])
+        db.session.flush()
+        copies = [AllianceSharedScoutingData.create_from_scouting_data(e, alliance.id, source) for e in (kept, deleted)]
+        db.session.add_all(copies)
+        db.session.delete(deleted)
+        db.session.commit()
+        login_user(user)
+
+        try:
+            assert kept not in filter_scouting_data_by_scouting_team().all()
+            before = ScoutingData.query.count()
+
+            stats = copy_alliance_data_to_team(alliance.id, keeper)
+            assert (stats['scouting_linked'], stats['scouting_copied'], stats['errors']) == (1, 1, [])
+            # Only the entry whose original was deleted was copied
+            assert ScoutingData.query.count() == before + 1
+
+            visible = filter_scouting_data_by_scouting_team().all()
+            assert kept in visible
+            assert any(e.scout_name == f'[Alliance-{source}] scout' and e.alliance == 'blue'
+                       and e.data == {'auto': 1} for e in visible)
+            query, is_alliance_mode, _ = get_scouting_data_query()
+            assert not is_alliance_mode and kept in query.all()
+        finally:
+            ScoutingData.query.filter_by(scouting_team_number=keeper).delete()
+            # The copy is stored against the keeper's own match and team rows
+            Match.query.filter_by(scouting_team_number=keeper).delete()
+            keeper_teams = [t.id for t in Team.query.filter_by(scouting_team_number=keeper)]
+            db.session.execute(team_event.delete().where(team_event.c.team_id.in_(keeper_teams)))
+            Team.query.filter_by(scouting_team_number=keeper).delete()
+            Event.query.filter_by(scouting_team_number=keeper).delete()
+            AllianceDataGrant.query.filter_by(alliance_id=alliance.id).delete()
+            for obj in copies + [kept, match, event, team, user, alliance]:
+                db.session.delete(obj)
+            db.session.commit()
@@ -0,0 +1,134 @@
+import json
+import random
+import uuid
+
+from app import create_app, db
+from app.models import (
+    AllianceDataGrant, AllianceSharedPitData, AllianceSharedScoutingData, Event, Match, PitScoutingData,
+    ScoutingAlliance, ScoutingData, Team, team_event,
+)
+from app.utils.alliance_data import copy_alliance_data_to_team, remove_team_data_from_alliance
+from app.utils.team_isolation import granted_entry_ids
+
+
+def _source_rows(source):
+    event = Event(name='Links', code=f'LK{source}', year=2026, scouting_team_number=source)
+    team = Team(team_number=source * 10, team_name='Linked', scouting_team_number=source)
+    db.session.add_all([event, team])
+    db.session.flush()
+    team.events.append(event)
+    match = Match(match_number=1, match_type='Qualification', event_id=event.id, scouting_team_number=source)
+    db.session.add(match)
+    db.session.flush()
+    return event, team, match
+
+
+def _entry(match, team, source, color, auto=1):
+    return ScoutingData(match_id=match.id, team_id=team.id, scouting_team_number=source, scout_name='scout',
+                        alliance=color, data_json=json.dumps({'auto': auto}))
+
+
+def _cleanup(teams, alliance):
+    AllianceSharedScoutingData.query.filter_by(alliance_id=alliance.id).delete()
+    AllianceSharedPitData.query.filter_by(alliance_id=alliance.id).delete()
+    AllianceDataGrant.query.filter_by(alliance_id=alliance.id).delete()
+    for number in teams:
+        ScoutingData.query.filter_by(scouting_team_number=number).delete()
+        PitScoutingData.query.filter_by(scouting_team_number=number).delete()
+        Match.query.filter_by(scouting_team_number=number).delete()
+        team_ids = [t.id for t in Team.query.filter_by(scouting_team_number=number)]
+        db.session.execute(team_event.delete().where(team_event.c.team_id.in_(team_ids)))
+        Team.query.filter_by(scouting_team_number=number).delete()
+        Event.query.filter_by(scouting_team_number=number).delete()
+    db.session.delete(alliance)
+    db.session.commit()
+
+
+def test_shared_rows_link_to_the_original_until_it_is_deleted():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        source = random.randint(60000, 69999)
+        alliance = ScoutingAlliance(alliance_name=f'Links {source}')
+        db.session.add(alliance)
+        db.session.flush()
+        event, team, match = _source_rows(source)
+        red, blue = _entry(match, team, source, 'red'), _entry(match, team, source, 'blue')
+        db.session.add_all([red, blue])
+        db.session.flush()
+        shared = [AllianceSharedScoutingData.create_from_scouting_data(e, alliance.id, source) for e in (red, blue)]
+        db.session.add_all(shared)
+        db.session.commit()
+        shared_ids = [s.id for s in shared]
+
+        try:
+            # The payload is stored once, on the original
+            assert all(s.is_link and s._data_json == '' and s.data == {'auto': 1} for s in shared)
+            red.data_json = json.dumps({'auto': 2})
+            db.session.commit()
+            db.session.expire_all()
+            assert db.session.get(AllianceSharedScoutingData, shared_ids[0]).data == {'auto': 2}
+
+            # Deleting the original, one at a time or in bulk, snapshots the payload first
+            db.session.delete(red)
+            db.session.commit()
+            ScoutingData.query.filter_by(id=blue.id).delete(synchronize_session=False)
+            db.session.commit()
+            db.session.expire_all()
+            rows = [db.session.get(AllianceSharedScoutingData, i) for i in shared_ids]
+            assert [(r.is_link, r.data) for r in rows] == [(False, {'auto': 2}), (False, {'auto': 1})]
+        finally:
+            _cleanup([source], alliance)
+
+
+def test_kept_alliance_data_outlives_source_edits_removal_and_wipe():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        source, keeper = random.sample(range(60000, 69999), 2)
+        alliance = ScoutingAlliance(alliance_name=f'Kept {keeper}')
+        db.session.add(alliance)
+        db.session.flush()
+        event, team, match = _source_rows(source)
+        red, blue = _entry(match, team, source, 'red'), _entry(match, team, source, 'blue')
+        pit = PitScoutingData(team_id=team.id, event_id=event.id, scouting_team_number=source, scout_name='pit',
+                              data_json=json.dumps({'drive': 'tank'}), local_id=str(uuid.uuid4()))
+        db.session.add_all([red, blue, pit])
+        db.session.flush()
+        db.session.add_all([AllianceSharedScoutingData.create_from_scouting_data(e, alliance.id, source)
+                            for e in (red, blue)] + [AllianceSharedPitData.create_from_pit_data(pit, alliance.id, source)])
+        db.session.commit()
+
+        def kept():
+            return sorted((e.alliance, e.data['auto']) for e in ScoutingData.query.filter_by(scouting_team_number=keeper))
+
+        try:
+            stats = copy_alliance_data_to_team(alliance.id, keeper)
+            assert (stats['scouting_linked'], stats['pit_linked'], stats['scouting_copied']) == (2, 1, 0)
+            assert kept() == []
+
+            # An edit copies the entry as it was granted and drops the original from the grant
+            red.data_json = json.dumps({'auto': 9})
+            db.session.commit()
+            assert kept() == [('red', 1)]
+            granted = ScoutingData.query.filter(ScoutingData.id.in_(granted_entry_ids(ScoutingData, keeper))).all()
+            assert granted == [blue]
+
+            # Leaving with remove_data deletes the shared rows and copies what the grant still read
+            assert remove_team_data_from_alliance(alliance.id, source) == (2, 1, 0)
+            db.session.commit()
+            assert kept() == [('blue', 1), ('red', 1)]
+            assert PitScoutingData.query.filter_by(scouting_team_number=keeper).count() == 1
+
+            # The copies use the keeper's own match and team rows, so a wipe of the source keeps them
+            ScoutingData.query.filter_by(scouting_team_number=source).delete(synchronize_session=False)
+            PitScoutingData.query.filter_by(scouting_team_number=source).delete(synchronize_session=False)
+            Match.query.filter_by(scouting_team_number=source).delete(synchronize_session=False)
+            db.session.execute(team_event.delete().where(team_event.c.team_id == team.id))
+            Team.query.filter_by(scouting_team_number=source).delete(synchronize_session=False)
+            Event.query.filter_by(scouting_team_number=source).delete(synchronize_session=False)
+            db.session.commit()
+            assert kept() == [('blue', 1), ('red', 1)]
+            copy = ScoutingData.query.filter_by(scouting_team_number=keeper).first()
+            assert copy.scout_name == f'[Alliance-{source}] scout'
+            assert (copy.match.scouting_team_number, copy.team.scouting_team_number) == (keeper, keeper)
+        finally:
+            _cleanup([source, keeper], alliance)
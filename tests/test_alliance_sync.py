@@ -0,0 +1,72 @@
+import json
+import random
+
+from app import create_app, db
+from app.models import (
+    AllianceDeletedData, AllianceSharedScoutingData, AllianceSyncCursor, Event, Match,
+    ScoutingAlliance, ScoutingData, Team,
+)
+from app.utils import alliance_sync
+
+
+def test_changes_are_shared_once_past_the_cursor_and_respect_tombstones():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        source = random.randint(90000, 99999)
+        alliance = ScoutingAlliance(alliance_name=f'Cursor {source}')
+        event = Event(name='Cursor', code=f'CUR{source}', year=2026, scouting_team_number=source)
+        teams = [Team(team_number=source * 10 + i, scouting_team_number=source) for i in range(3)]
+        db.session.add_all([alliance, event] + teams)
+        db.session.flush()
+        match = Match(match_number=1, match_type='Qualification', event_id=event.id, scouting_team_number=source)
+        db.session.add(match)
+        db.session.flush()
+        db.session.add(AllianceDeletedData(alliance_id=alliance.id, data_type='scouting', match_id=match.id,
+                                           team_id=teams[2].id, alliance_color='red',
+                                           source_scouting_team_number=source, deleted_by_team=source))
+        db.session.commit()
+        start = alliance_sync.current_change_seq()
+
+        def scout(team, name='scout'):
+            return ScoutingData(match_id=match.id, team_id=team.id, scouting_team_number=source, scout_name=name,
+                                alliance='red', data_json=json.dumps({'auto': 1}))
+
+        entries = [scout(teams[0]), scout(teams[1]), scout(teams[2]), scout(teams[1], '[Alliance-1] scout')]
+        db.session.add_all(entries)
+        db.session.commit()
+        seqs = [e.change_seq for e in entries]
+        assert seqs == sorted(seqs) and len(set(seqs)) == 4 and seqs[0] > start
+
+        try:
+            def run_cycle():
+                high = alliance_sync.current_change_seq()
+                since = alliance_sync.load_cursors([(alliance.id, source)]).get((alliance.id, source), start)
+                changed = alliance_sync.collect_member_changes(source, since, high, [event.id])
+                result = alliance_sync.share_member_changes(alliance.id, source, *changed)
+                alliance_sync.advance_cursor(alliance.id, source, high)
+                db.session.commit()
+                return result
+
+            scouting, pit, qualitative, created, updated = run_cycle()
+            # The alliance-received entry is skipped and the tombstoned one filtered out
+            assert [e.id for e in scouting] == [entries[0].id, entries[1].id]
+            assert (created, updated) == (2, 0)
+
+            # Caught up: nothing is fetched again
+            assert run_cycle()[3:] == (0, 0)
+
+            # An edit past the cursor reuses the existing link row instead of duplicating it
+            entries[0].data_json = json.dumps({'auto': 5})
+            db.session.commit()
+            scouting, _, _, created, updated = run_cycle()
+            assert [e.id for e in scouting] == [entries[0].id] and (created, updated) == (0, 0)
+            copies = AllianceSharedScoutingData.query.filter_by(alliance_id=alliance.id).all()
+            assert len(copies) == 2
+            assert [c.data for c in copies if c.original_scouting_data_id == entries[0].id] == [{'auto': 5}]
+        finally:
+            AllianceSharedScoutingData.query.filter_by(alliance_id=alliance.id).delete()
+            AllianceSyncCursor.query.filter_by(alliance_id=alliance.id).delete()
+            AllianceDeletedData.query.filter_by(alliance_id=alliance.id).delete()
+            for obj in entries + [match, event] + teams + [alliance]:
+                db.session.delete(obj)
+            db.session.commit()
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app import api_models
+from app.api_models import ApiUsageBuffer, TokenBucketRateLimiter
+
+
+def test_token_bucket_allows_up_to_capacity_then_blocks():
+    limiter = TokenBucketRateLimiter()
+    results = [limiter.consume(1, 3)[0] for _ in range(4)]
+    assert results == [True, True, True, False]
+
+
+def test_token_bucket_is_per_key_and_resets_on_limit_change():
+    limiter = TokenBucketRateLimiter()
+    assert limiter.consume(1, 1)[0] is True
+    assert limiter.consume(1, 1)[0] is False
+    assert limiter.consume(2, 1)[0] is True
+    # Raising the key's hourly limit starts a fresh bucket
+    assert limiter.consume(1, 5)[0] is True
+
+
+def test_usage_batch_is_kept_when_the_flush_fails(monkeypatch):
+    class FailingSession:
+        def bulk_insert_mappings(self, *args):
+            raise RuntimeError('database is locked')
+
+        def rollback(self):
+            pass
+
+    monkeypatch.setattr(api_models.api_db, 'Session', object())
+    monkeypatch.setattr(api_models.api_db, 'get_session', lambda: FailingSession())
+    monkeypatch.setattr(api_models.api_db, 'close_session', lambda session: None)
+
+    buffer = ApiUsageBuffer()
+    buffer._pending = [{'api_key_id': 1, 'status_code': 200, 'timestamp': datetime.now(timezone.utc)}]
+    buffer._pending.append(dict(buffer._pending[0], status_code=500))
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert [rec['status_code'] for rec in buffer._pending] == [200, 500]
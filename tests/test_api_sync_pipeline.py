@@ -0,0 +1,88 @@
+import uuid
+
+from app import create_app, db
+from app.models import Team, Match, Event
+from app.utils import api_sync_pipeline as pipeline
+
+
+def _job(stn, code, year=2026):
+    return {'scouting_team_number': stn, 'raw_event_code': code, 'event_code': f'{year}{code}',
+            'event_year': year, 'event_id': None, 'game_config': {}}
+
+
+def test_jobs_at_the_same_event_share_one_fetch(monkeypatch):
+    calls = {'teams': [], 'matches': []}
+    monkeypatch.setattr('app.utils.api_utils.get_teams_dual_api',
+                        lambda code: calls['teams'].append(code) or [{'team_number': 254}])
+    monkeypatch.setattr('app.utils.api_utils.get_matches_dual_api',
+                        lambda code: calls['matches'].append(code) or [])
+
+    jobs = [_job(1001, 'CALA'), _job(1002, 'cala'), _job(1003, 'NYRO')]
+    fetched = pipeline.fetch_event_data(jobs)
+
+    assert sorted(calls['teams']) == ['CALA', 'NYRO']
+    assert len(calls['matches']) == 2
+    assert fetched[(2026, 'CALA')]['teams'] == [{'team_number': 254}]
+
+
+def test_fetch_falls_back_to_next_team_credentials(monkeypatch):
+    from app.utils.config_manager import get_thread_game_config
+
+    def fake_teams(code):
+        if get_thread_game_config().get('bad'):
+            raise RuntimeError('401')
+        return [{'team_number': 1}]
+
+    monkeypatch.setattr('app.utils.api_utils.get_teams_dual_api', fake_teams)
+    monkeypatch.setattr('app.utils.api_utils.get_matches_dual_api', lambda code: [])
+
+    bad = dict(_job(1001, 'CALA'), game_config={'bad': True})
+    good = _job(1002, 'CALA')
+    fetched = pipeline.fetch_event_data([bad, good])
+
+    assert fetched[(2026, 'CALA')]['teams'] == [{'team_number': 1}]
+    assert fetched[(2026, 'CALA')]['teams_error'] is None
+
+
+def test_apply_upserts_teams_and_matches_in_bulk():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        stn = 9971
+        event = Event(name='Pipeline Event', code=f'2026PL{uuid.uuid4().hex[:4]}', year=2026,
+                      scouting_team_number=stn)
+        db.session.add(event)
+        existing = Team(team_number=97101, team_name='Old', scouting_team_number=stn)
+        db.session.add(existing)
+        db.session.commit()
+        try:
+            added, updated = pipeline.apply_team_data(event, stn, [
+                {'team_number': 97101, 'team_name': 'New'},
+                {'team_number': 97102, 'team_name': 'Fresh'},
+                {'team_number': 97102, 'team_name': 'Duplicate row'},
+            ])
+            assert (added, updated) == (1, 1)
+
+            matches = [
+                {'match_number': 1, 'match_type': 'Qualification', 'red_alliance': '97101', 'blue_alliance': '97102'},
+                {'match_number': 2, 'match_type': 'Qualification', 'red_alliance': '97102', 'blue_alliance': '97101'},
+            ]
+            assert pipeline.apply_match_data(event, stn, matches) == (2, 0)
+            db.session.commit()
+
+            matches[0]['red_score'] = 50
+            assert pipeline.apply_match_data(event, stn, matches) == (0, 1)
+            db.session.commit()
+
+            teams = Team.query.filter(Team.scouting_team_number == stn,
+                                      Team.team_number.in_([97101, 97102])).all()
+            assert {t.team_name for t in teams} == {'New', 'Fresh'}
+            assert all(event in t.events for t in teams)
+            assert Match.query.filter_by(event_id=event.id, match_number=1).one().red_score == 50
+        finally:
+            Match.query.filter_by(event_id=event.id).delete()
+            for team in Team.query.filter(Team.scouting_team_number == stn,
+                                          Team.team_number.in_([97101, 97102])).all():
+                team.events = []
+                db.session.delete(team)
+            db.session.delete(event)
+            db.session.commit()
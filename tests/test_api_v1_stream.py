@@ -0,0 +1,85 @@
+import gzip
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app, db
+from app.api_models import create_api_key, delete_api_key_permanently
+from app.models import Event, Match, PitScoutingData, ScoutingData, Team
+from app.routes.api_v1 import _encode_stream_cursor, _decode_stream_cursor, _gzip_chunks, _parse_since
+
+
+def test_stream_cursor_round_trip():
+    cursor = _encode_stream_cursor(3, 1234, '2026-01-01T00:00:00Z', '2026-02-01T00:00:00+00:00')
+    assert _decode_stream_cursor(cursor) == (3, 1234, '2026-01-01T00:00:00Z', '2026-02-01T00:00:00+00:00')
+
+
+def test_stream_cursor_rejects_garbage():
+    with pytest.raises(Exception):
+        _decode_stream_cursor('not-a-cursor')
+
+
+def test_parse_since_normalizes_to_naive_utc():
+    parsed = _parse_since('2026-03-01T12:00:00-05:00')
+    assert parsed.tzinfo is None
+    assert parsed.hour == 17
+
+
+def test_gzip_chunks_round_trip():
+    lines = [f'{{"n":{i}}}\n' for i in range(2000)]
+    body = b''.join(_gzip_chunks(iter(lines), flush_every=1024))
+    assert gzip.decompress(body).decode('utf-8') == ''.join(lines)
+
+
+def test_ndjson_since_applies_to_every_section():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        scouting_team = random.randint(60000, 69999)
+        rows = {}
+        for label in ('old', 'new'):
+            team = Team(team_number=scouting_team * 10 + len(rows), scouting_team_number=scouting_team)
+            event = Event(name=label, code=f'ND{label}{scouting_team}', year=2026, scouting_team_number=scouting_team)
+            db.session.add_all([team, event])
+            db.session.flush()
+            match = Match(match_number=1, match_type='Qualification', event_id=event.id,
+                          scouting_team_number=scouting_team)
+            db.session.add(match)
+            db.session.flush()
+            scouting = ScoutingData(match_id=match.id, team_id=team.id, scouting_team_number=scouting_team,
+                                    scout_name=label, alliance='red', data_json='{}')
+            pit = PitScoutingData(team_id=team.id, event_id=event.id, scouting_team_number=scouting_team,
+                                  scout_name=label, data_json='{}', local_id=f'{label}-{scouting_team}')
+            db.session.add_all([scouting, pit])
+            rows[label] = [team, event, match, scouting, pit]
+        db.session.commit()
+
+        long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+        for model, obj in zip((Team, Event, Match), rows['old'][:3]):
+            model.query.filter_by(id=obj.id).update({'updated_at': long_ago})
+        for obj in rows['old'][3:]:
+            obj.timestamp = long_ago
+        db.session.commit()
+        key = create_api_key(name='ndjson-since', team_number=scouting_team, created_by='test',
+                             permissions={'team_data_access': True})
+
+        try:
+            since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+            response = app.test_client().get('/api/v1/all', query_string={'format': 'ndjson', 'since': since},
+                                             headers={'X-API-Key': key['key']})
+            assert response.status_code == 200
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            ids = {}
+            for line in lines[1:-1]:
+                ids.setdefault(line['type'], []).append(line['data']['id'])
+            new = rows['new']
+            assert ids == {'teams': [new[0].id], 'events': [new[1].id], 'matches': [new[2].id],
+                           'scouting_data': [new[3].id], 'pit_scouting_data': [new[4].id]}
+            assert lines[-1]['type'] == 'end' and lines[-1]['count'] == 5
+        finally:
+            delete_api_key_permanently(key['id'], scouting_team)
+            for label in ('old', 'new'):
+                for obj in reversed(rows[label]):
+                    db.session.delete(obj)
+            db.session.commit()
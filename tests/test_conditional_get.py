@@ -0,0 +1,76 @@
+import uuid
+
+from app import create_app, db
+from app.models import User, Event
+from app.routes import mobile_api as ma
+from app.utils.change_tracking import bump_data_version, get_data_versions
+
+
+def test_data_version_counters_bump_independently():
+    before = get_data_versions(('etag_test_a', 'etag_test_b'))
+    bump_data_version('etag_test_a')
+    after = get_data_versions(('etag_test_a', 'etag_test_b'))
+    assert after[0] == before[0] + 1
+    assert after[1] == before[1]
+
+
+def test_mobile_events_returns_304_until_events_change():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        client = app.test_client()
+        username = f'etag_user_{uuid.uuid4().hex[:8]}'
+        user = User(username=username, scouting_team_number=9989)
+        user.set_password('testpass')
+        db.session.add(user)
+        db.session.commit()
+        event = None
+        try:
+            token = ma.create_token(user.id, user.username, user.scouting_team_number)
+            headers = {'Authorization': f'Bearer {token}'}
+
+            first = client.get('/api/mobile/events', headers=headers)
+            assert first.status_code == 200
+            etag = first.headers.get('ETag')
+            assert etag
+
+            cached = client.get('/api/mobile/events', headers={**headers, 'If-None-Match': etag})
+            assert cached.status_code == 304
+            assert cached.data == b''
+
+            event = Event(name='ETag Event', code=f'ET{uuid.uuid4().hex[:4]}', year=2026, scouting_team_number=9989)
+            db.session.add(event)
+            db.session.commit()
+
+            changed = client.get('/api/mobile/events', headers={**headers, 'If-None-Match': etag})
+            assert changed.status_code == 200
+            assert changed.headers.get('ETag') != etag
+        finally:
+            if event is not None:
+                db.session.delete(event)
+            db.session.delete(user)
+            db.session.commit()
+
+
+def test_mobile_matches_revalidate_after_a_game_config_save():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        client = app.test_client()
+        user = User(username=f'etag_cfg_{uuid.uuid4().hex[:8]}', scouting_team_number=9988)
+        user.set_password('testpass')
+        db.session.add(user)
+        db.session.commit()
+        try:
+            token = ma.create_token(user.id, user.username, user.scouting_team_number)
+            headers = {'Authorization': f'Bearer {token}'}
+            first = client.get('/api/mobile/matches', headers=headers)
+            assert first.status_code == 200
+            etag = first.headers.get('ETag')
+            assert client.get('/api/mobile/matches', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+            # The current event comes from the game config, so saving it changes the ETag
+            bump_data_version('game_config')
+            changed = client.get('/api/mobile/matches', headers={**headers, 'If-None-Match': etag})
+            assert changed.status_code == 200
+        finally:
+            db.session.delete(user)
+            db.session.commit()
@@ -0,0 +1,84 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app import create_app, db
+from app.models import Event, Match
+from app.utils import event_day_summary
+from app.utils.notification_service import create_end_of_day_summary
+
+
+def _match(match_id, minute, red=None, blue=None, winner=None):
+    start = datetime(2026, 3, 14, 15, 0)
+    return SimpleNamespace(id=match_id, match_type='Qualification', match_number=match_id,
+                           scheduled_time=start + timedelta(minutes=minute), predicted_time=None,
+                           red_score=red, blue_score=blue, winner=winner,
+                           red_teams=[1, 2, 3], blue_teams=[4, 5, 6])
+
+
+def test_day_aggregate_tracks_updates_and_removals():
+    day = event_day_summary.DayAggregate()
+    for m in (_match(1, 0, 50, 45, 'red'), _match(2, 10, 80, 100, 'blue'),
+              _match(3, 20, 60, 62, 'blue'), _match(4, 30)):
+        day.add(event_day_summary.match_record(m, None))
+
+    snap = day.snapshot()
+    assert [r['id'] for r in snap['matches']] == [1, 2, 3, 4]
+    assert snap['completed'] == 3 and snap['missing_count'] == 1
+    assert snap['highest']['id'] == 2 and snap['median_total'] == 122
+    assert [r['id'] for r in snap['close']] == [3, 1]
+    assert snap['top_wins'][0] == (4, 2)
+
+    # A score arriving for match 4 replaces its record
+    day.add(event_day_summary.match_record(_match(4, 30, 120, 90, 'red'), None))
+    day.discard(3)
+    snap = day.snapshot()
+    assert snap['completed'] == 3 and snap['missing_count'] == 0
+    assert snap['highest']['id'] == 4 and snap['close_count'] == 1
+    assert snap['avg_total'] == (95 + 180 + 210) / 3 and snap['median_total'] == 180
+    assert dict(snap['top_wins']) == {1: 2, 2: 2, 3: 2, 4: 1, 5: 1, 6: 1}
+    assert day.last_match()['id'] == 4
+
+
+def test_committed_scores_update_cached_day_without_rebuild(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        event = Event(name='Day Summary', code=f'DS{uuid.uuid4().hex[:6].upper()}', year=2026,
+                      scouting_team_number=9975)
+        db.session.add(event)
+        db.session.flush()
+        start = datetime.now(timezone.utc).replace(tzinfo=None, hour=12, minute=0, second=0, microsecond=0)
+        first = Match(match_number=1, match_type='Qualification', event_id=event.id, scouting_team_number=9975,
+                      red_alliance='11,12,13', blue_alliance='14,15,16', scheduled_time=start,
+                      red_score=40, blue_score=35, winner='red')
+        second = Match(match_number=2, match_type='Qualification', event_id=event.id, scouting_team_number=9975,
+                       red_alliance='11,14,17', blue_alliance='12,15,18',
+                       scheduled_time=start + timedelta(minutes=8))
+        db.session.add_all([first, second])
+        db.session.commit()
+
+        builds = []
+        real_build = event_day_summary._build
+        monkeypatch.setattr(event_day_summary, '_build', lambda e: builds.append(e.id) or real_build(e))
+        try:
+            _, message = create_end_of_day_summary(second)
+            assert 'Qualification 2: Result pending' in message
+            assert 'Total matches today: 2 (completed: 1)' in message
+
+            second.red_score, second.blue_score, second.winner = 70, 64, 'red'
+            db.session.commit()
+            _, message = create_end_of_day_summary(second)
+            assert len(builds) == 1
+            assert 'Qualification 2: Red 70 - Blue 64 (red)' in message
+            assert 'Total matches today: 2 (completed: 2)' in message
+            assert ' - Team 11: 2 win(s)' in message
+
+            db.session.delete(first)
+            db.session.commit()
+            _, message = create_end_of_day_summary(second)
+            assert len(builds) == 1 and 'Total matches today: 1 (completed: 1)' in message
+        finally:
+            Match.query.filter_by(event_id=event.id).delete(synchronize_session=False)
+            db.session.delete(event)
+            db.session.commit()
+            event_day_summary.invalidate_event()
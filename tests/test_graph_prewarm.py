@@ -0,0 +1,97 @@
+import threading
+import time
+
+from flask import g
+
+from app import create_app
+from app.routes import graphs
+from app.utils import graph_prewarm
+from app.utils.change_tracking import bump_data_version
+from app.utils.team_isolation import scouting_team_scope
+
+
+def test_concurrent_cold_metrics_requests_share_one_computation(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    calls = []
+
+    def slow_metrics(team_id, event_id=None, game_config=None):
+        calls.append(team_id)
+        time.sleep(0.2)
+        return {'metrics': {'total_points': 42}}
+
+    monkeypatch.setattr(graphs, 'calculate_team_metrics', slow_metrics)
+    monkeypatch.setattr('app.utils.analysis.get_current_epa_source', lambda: 'scouted_only')
+    with app.app_context():
+        key = graphs._team_metrics_cache_key(987654)
+    graphs._GRAPH_METRICS_CACHE.delete(key)
+
+    results = []
+
+    def view():
+        with app.app_context():
+            results.append(graphs._calculate_team_metrics_cached(987654))
+
+    threads = [threading.Thread(target=view) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [987654]
+    assert len(results) == 10 and all(r['metrics']['total_points'] == 42 for r in results)
+    graphs._GRAPH_METRICS_CACHE.delete(key)
+
+
+def test_prewarm_refreshes_only_current_event_keys_near_expiry(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    calls = []
+    team_config = {'season': 2026}
+    monkeypatch.setattr('app.utils.analysis.calculate_team_metrics',
+                        lambda team_id, event_id=None, game_config=None: calls.append(
+                            (team_id, event_id, game_config, g.scouting_team_number)) or {})
+    monkeypatch.setattr('app.utils.analysis.get_current_epa_source', lambda: 'scouted_only')
+    monkeypatch.setattr(graph_prewarm, 'current_event_teams', lambda: {
+        'event_ids': {5}, 'team_numbers': set(), 'team_ids': {111: {'game_config': team_config}},
+        'scouting_teams': {4242: team_config}})
+
+    with app.app_context():
+        with scouting_team_scope(4242):
+            keys = [graphs._team_metrics_cache_key(*args) for args in
+                    [(111, 5), (111, 6), (222, 5), (111, None), (111, 5, team_config), (111, 5, {'season': 1})]]
+        with scouting_team_scope(4343):
+            keys.append(graphs._team_metrics_cache_key(111, 5))
+        keys.append(graphs._team_metrics_cache_key(111, 5))
+    other_source = keys[0][:2] + ('tba_opr_only',) + keys[0][3:]
+    cache = graphs._GRAPH_METRICS_CACHE
+    for key in keys + [other_source]:
+        cache.set(key, {'old': True}, ttl=10)
+    try:
+        prewarmer = graph_prewarm.GraphCachePrewarmer()
+        prewarmer.app = app
+        summary = prewarmer.prewarm()
+
+        # Current-event keys of a known scouting team, rebuilt under that team's
+        # scope with the config they were cached for
+        assert sorted(calls, key=lambda c: (c[1] or 0, c[2] is not None)) == [
+            (111, None, None, 4242), (111, 5, None, 4242), (111, 5, team_config, 4242)]
+        assert summary['metrics'] == 3
+        assert cache.get(keys[0]) == {}
+        assert cache.get(other_source) == {'old': True}
+        assert cache.get(keys[5]) == {'old': True}
+    finally:
+        for key in keys + [other_source]:
+            cache.delete(key)
+
+
+def test_metrics_cache_key_separates_scope_and_config():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        with scouting_team_scope(4242):
+            own = graphs._team_metrics_cache_key(111, 5)
+            assert graphs._team_metrics_cache_key(111, 5) == own
+            assert graphs._team_metrics_cache_key(111, 5, {'season': 2026}) != own
+        with scouting_team_scope(4343):
+            assert graphs._team_metrics_cache_key(111, 5) != own
+        with scouting_team_scope(4242):
+            bump_data_version('game_config')
+            assert graphs._team_metrics_cache_key(111, 5) != own
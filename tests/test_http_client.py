@@ -0,0 +1,82 @@
+import requests
+
+from app.utils import http_client
+
+
+class _FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None, **kwargs):
+        self.calls.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def _response(status, body=b'', headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body
+    resp.headers.update(headers or {})
+    resp.url = 'https://www.thebluealliance.com/api/v3/status'
+    return resp
+
+
+def test_http_get_revalidates_with_etag_and_serves_304_from_cache(monkeypatch):
+    http_client.clear_http_cache()
+    session = _FakeSession([
+        _response(200, b'{"ok": 1}', {'ETag': '"abc"', 'Last-Modified': 'Sat, 01 Mar 2025 00:00:00 GMT'}),
+        _response(304),
+    ])
+    monkeypatch.setattr(http_client, 'get_session', lambda url: session)
+
+    url = 'https://www.thebluealliance.com/api/v3/status'
+    first = http_client.http_get(url, headers={'X-TBA-Auth-Key': 'k'})
+    second = http_client.http_get(url, headers={'X-TBA-Auth-Key': 'k'})
+
+    assert first.json() == {'ok': 1}
+    assert 'If-None-Match' not in session.calls[0]
+    assert session.calls[1]['If-None-Match'] == '"abc"'
+    assert session.calls[1]['If-Modified-Since'] == 'Sat, 01 Mar 2025 00:00:00 GMT'
+    assert second.status_code == 200
+    assert second.json() == {'ok': 1}
+    http_client.clear_http_cache()
+
+
+def test_http_get_cache_is_keyed_by_auth_header(monkeypatch):
+    http_client.clear_http_cache()
+    session = _FakeSession([
+        _response(200, b'[]', {'ETag': '"v1"'}),
+        _response(200, b'[]', {'ETag': '"v1"'}),
+    ])
+    monkeypatch.setattr(http_client, 'get_session', lambda url: session)
+
+    url = 'https://frc-api.firstinspires.org/v2.0/2025/events'
+    http_client.http_get(url, headers={'Authorization': 'Basic a'})
+    http_client.http_get(url, headers={'Authorization': 'Basic b'})
+
+    assert 'If-None-Match' not in session.calls[1]
+    http_client.clear_http_cache()
+
+
+def test_http_get_records_host_latency(monkeypatch):
+    session = _FakeSession([_response(200, b'{}')])
+    monkeypatch.setattr(http_client, 'get_session', lambda url: session)
+
+    http_client.http_get('https://api.statbotics.io/v3/team_year/254/2025')
+
+    stats = http_client.get_host_latency_stats()
+    assert stats['api.statbotics.io']['count'] >= 1
+
+
+def test_fan_out_keeps_order_and_returns_exceptions():
+    def work(n):
+        if n == 3:
+            raise ValueError('boom')
+        return n * 2
+
+    results = http_client.fan_out(work, range(6))
+
+    assert results[:3] == [0, 2, 4]
+    assert isinstance(results[3], ValueError)
+    assert results[4:] == [8, 10]
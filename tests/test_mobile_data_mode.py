@@ -195,7 +195,7 @@ def test_statbotics_team_matches_are_cached(monkeypatch):
             calls['count'] += 1
             return _FakeResponse()
 
-        monkeypatch.setattr('app.utils.statbotics_api_utils.requests.get', _fake_get)
+        monkeypatch.setattr('app.utils.statbotics_api_utils.http_get', _fake_get)
 
         team_number = 654321
         event_key = '2026test'
@@ -0,0 +1,117 @@
+import os
+import uuid
+
+from app import create_app, db, get_group_chat_file_path, get_group_members_file_path, save_group_members, socketio
+from app.models import Event, Match, User
+from app.routes.mobile_api import create_token
+from app.utils import mobile_push
+
+
+def test_delta_log_replays_by_audience_and_window():
+    log = mobile_push.DeltaLog(size=3)
+    log.append('match.score', {'id': 1})
+    log.append('chat.message', {'text': 'hi'}, audience={'alice', 'bob'})
+    log.append('scouting.entry', {'id': 7})
+
+    assert [d['seq'] for d in log.since(0, 'alice')] == [1, 2, 3]
+    assert [d['seq'] for d in log.since(1, 'carol')] == [3]
+    assert log.since(3, 'alice') == []
+
+    log.append('match.schedule', {'id': 2})
+    assert log.since(0, 'alice') is None  # seq 1 fell out of the window
+    assert [d['seq'] for d in log.since(1, 'alice')] == [2, 3, 4]
+    assert log.since(9, 'alice') is None
+
+    token = mobile_push.make_resume_token(4)
+    assert mobile_push.parse_resume_token(token) == 4
+    assert mobile_push.parse_resume_token('0000.4') is None
+
+
+def test_mobile_socket_streams_and_resumes_match_deltas():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        tag = uuid.uuid4().hex[:6]
+        user = User(username=f'tablet_{tag}', scouting_team_number=9976)
+        event = Event(name='Live', code=f'LV{tag.upper()}', year=2026, scouting_team_number=9976)
+        db.session.add_all([user, event])
+        db.session.flush()
+        match = Match(match_number=1, match_type='Qualification', event_id=event.id, scouting_team_number=9976,
+                      red_alliance='1,2,3', blue_alliance='4,5,6')
+        db.session.add(match)
+        db.session.commit()
+        token = create_token(user.id, user.username, 9976)
+
+        try:
+            assert not socketio.test_client(app, namespace='/mobile', auth={'token': 'bogus'}).is_connected('/mobile')
+
+            client = socketio.test_client(app, namespace='/mobile', auth={'token': token})
+            assert client.is_connected('/mobile')
+            ready = [m for m in client.get_received('/mobile') if m['name'] == 'mobile_ready'][0]['args'][0]
+            assert ready['team_number'] == 9976
+
+            match.red_score, match.blue_score, match.winner = 90, 70, 'red'
+            db.session.commit()
+            batches = [m['args'][0] for m in client.get_received('/mobile') if m['name'] == 'mobile_deltas']
+            assert len(batches) == 1
+            delta = batches[0]['deltas'][0]
+            assert delta['type'] == 'match.score' and delta['data']['red_score'] == 90
+            client.disconnect(namespace='/mobile')
+
+            # Changes made while disconnected are replayed from the resume token
+            match.predicted_time = match.scheduled_time = None
+            match.red_alliance = '1,2,7'
+            db.session.commit()
+            client = socketio.test_client(app, namespace='/mobile',
+                                          auth={'token': token, 'resume_token': batches[0]['resume_token']})
+            replayed = [m['args'][0] for m in client.get_received('/mobile') if m['name'] == 'mobile_deltas']
+            assert [d['type'] for d in replayed[0]['deltas']] == ['match.schedule']
+            assert replayed[0]['deltas'][0]['data']['red_alliance'] == '1,2,7'
+            client.disconnect(namespace='/mobile')
+
+            stale = socketio.test_client(app, namespace='/mobile', auth={'token': token, 'resume_token': 'x.1'})
+            assert [m['name'] for m in stale.get_received('/mobile')] == ['mobile_ready', 'mobile_resync']
+            stale.disconnect(namespace='/mobile')
+        finally:
+            for obj in (match, event, user):
+                db.session.delete(obj)
+            db.session.commit()
+
+
+def test_private_group_messages_reach_only_group_members():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        tag = uuid.uuid4().hex[:6]
+        member = User(username=f'member_{tag}', scouting_team_number=9975)
+        outsider = User(username=f'outsider_{tag}', scouting_team_number=9975)
+        db.session.add_all([member, outsider])
+        db.session.commit()
+        group = f'drive_{tag}'
+        save_group_members(9975, group, [member.username])
+        clients = {}
+
+        try:
+            for user in (member, outsider):
+                token = create_token(user.id, user.username, 9975)
+                clients[user.username] = socketio.test_client(app, namespace='/mobile', auth={'token': token})
+                clients[user.username].get_received('/mobile')
+
+            response = app.test_client().post(
+                '/api/mobile/chat/send', json={'group': group, 'body': 'strategy'},
+                headers={'Authorization': f'Bearer {create_token(member.id, member.username, 9975)}'})
+            assert response.status_code == 201
+
+            def deltas(username):
+                return [d for m in clients[username].get_received('/mobile') if m['name'] == 'mobile_deltas'
+                        for d in m['args'][0]['deltas']]
+
+            assert [d['data']['text'] for d in deltas(member.username)] == ['strategy']
+            assert deltas(outsider.username) == []
+        finally:
+            for client in clients.values():
+                client.disconnect(namespace='/mobile')
+            for path in (get_group_chat_file_path(9975, group), get_group_members_file_path(9975, group)):
+                if os.path.exists(path):
+                    os.remove(path)
+            for obj in (member, outsider):
+                db.session.delete(obj)
+            db.session.commit()
@@ -0,0 +1,51 @@
+import uuid
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import User
+from app.routes import mobile_api as ma
+
+
+def _count_user_queries(app, fn):
+    count = {'n': 0}
+
+    def _on_execute(*args, **kwargs):
+        count['n'] += 1
+
+    engine = db.engines['users']
+    event.listen(engine, 'before_cursor_execute', _on_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, 'before_cursor_execute', _on_execute)
+    return result, count['n']
+
+
+def test_cached_token_skips_user_lookup_and_honours_deactivation():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        client = app.test_client()
+        user = User(username=f'token_cache_{uuid.uuid4().hex[:8]}', scouting_team_number=9988)
+        user.set_password('testpass')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        try:
+            token = ma.create_token(user.id, user.username, user.scouting_team_number)
+            headers = {'Authorization': f'Bearer {token}'}
+
+            first, _ = _count_user_queries(app, lambda: client.get('/api/mobile/profiles/me', headers=headers))
+            assert first.status_code == 200
+
+            second, queries = _count_user_queries(app, lambda: client.get('/api/mobile/profiles/me', headers=headers))
+            assert second.status_code == 200
+            assert queries == 0
+
+            db.session.get(User, user_id).is_active = False
+            db.session.commit()
+            rejected = client.get('/api/mobile/profiles/me', headers=headers)
+            assert rejected.status_code == 401
+        finally:
+            db.session.delete(db.session.get(User, user_id))
+            db.session.commit()
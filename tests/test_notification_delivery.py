@@ -0,0 +1,126 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from app import create_app, db
+from app.models import Event, Match, User
+from app.models_misc import DeviceToken, NotificationLog, NotificationSubscription
+from app.utils import emailer, notification_delivery, notification_service, push_notifications
+
+
+def test_batch_pushes_concurrently_and_shares_payloads(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        tag = uuid.uuid4().hex[:6]
+        event = Event(name='Delivery', code=f'DL{tag.upper()}', year=2026, scouting_team_number=9973)
+        db.session.add(event)
+        db.session.flush()
+        match = Match(match_number=1, match_type='Qualification', event_id=event.id, scouting_team_number=9973)
+        users = [User(username=f'dl_{tag}_{i}', scouting_team_number=9973, email=f'dl{i}_{tag}@example.com')
+                 for i in range(3)]
+        db.session.add(match)
+        db.session.add_all(users)
+        db.session.commit()
+
+        devices, subs = [], []
+        for i, user in enumerate(users):
+            devices.append(DeviceToken(user_id=user.id, endpoint=f'https://push.example/{tag}/{i}',
+                                       p256dh_key='k', auth_key='a', device_name=f'd{i}'))
+            subs.append(NotificationSubscription(user_id=user.id, scouting_team_number=9973,
+                                                 notification_type='match_strategy', target_team_number=254))
+        # Second identical subscription for the first user
+        subs.append(NotificationSubscription(user_id=users[0].id, scouting_team_number=9973,
+                                             notification_type='match_strategy', target_team_number=254))
+        db.session.add_all(devices + subs)
+        db.session.commit()
+
+        renders, connections, sent_mail = [], [], []
+        active = {'now': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def fake_render(subscription, m):
+            renders.append(subscription.id)
+            return 'Strategy', 'Plan for match 1'
+
+        def fake_webpush(**kwargs):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.2)
+            with lock:
+                active['now'] -= 1
+
+        @contextmanager
+        def fake_connection():
+            connections.append(object())
+            yield connections[-1]
+
+        monkeypatch.setattr(notification_service, 'render_notification', fake_render)
+        monkeypatch.setattr(notification_service, 'render_notification_email',
+                            lambda m, t, title, message: (message, f'<p>{message}</p>'))
+        monkeypatch.setattr(push_notifications, 'get_vapid_keys', lambda: {'private_key': 'x', 'public_key': 'y'})
+        monkeypatch.setattr(push_notifications, 'webpush', fake_webpush)
+        monkeypatch.setattr(emailer, 'mail_connection', fake_connection)
+        monkeypatch.setattr(emailer, 'send_email',
+                            lambda to, subject, body, html=None, connection=None:
+                            sent_mail.append((to, connection)) or (True, 'Email sent'))
+
+        try:
+            started = time.monotonic()
+            logs = notification_delivery.deliver_notifications([(sub, match) for sub in subs])
+            elapsed = time.monotonic() - started
+
+            assert all(log is not None for log in logs)
+            assert renders == [subs[0].id]
+            assert active['max'] == 3 and elapsed < 0.5
+            assert len(connections) == 1 and len(sent_mail) == 3
+            assert {c for _, c in sent_mail} == {connections[0]}
+            assert [log.push_sent_count for log in logs] == [1, 1, 1, 1]
+            assert all(log.email_sent for log in logs)
+            assert notification_delivery.get_delivery_stats()['push']['sent'] >= 3
+        finally:
+            NotificationLog.query.filter(NotificationLog.user_id.in_([u.id for u in users])).delete(
+                synchronize_session=False)
+            for obj in subs + devices + users + [match, event]:
+                db.session.delete(obj)
+            db.session.commit()
+
+
+def test_match_briefing_is_shared_across_recipients(monkeypatch):
+    from app.utils.change_tracking import bump_data_version
+
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        tag = uuid.uuid4().hex[:6]
+        event = Event(name='Briefing', code=f'BR{tag.upper()}', year=2026, scouting_team_number=9974)
+        db.session.add(event)
+        db.session.flush()
+        match = Match(match_number=2, match_type='Qualification', event_id=event.id, scouting_team_number=9974,
+                      red_alliance='1,2,3', blue_alliance='4,5,6')
+        db.session.add(match)
+        db.session.commit()
+
+        calls = []
+
+        def fake_stats(team_number, scouting_team_number, leaderboard=None):
+            calls.append(team_number)
+            return {'total_avg': float(team_number * 10), 'auto_avg': 1.0, 'teleop_avg': 2.0,
+                    'match_count': 3, 'source_tag': 'scouted'}
+
+        monkeypatch.setattr(notification_service, 'get_team_epa_aware_stats', fake_stats)
+        try:
+            _, red_msg = notification_service.create_strategy_notification_message(match, 1)
+            _, blue_msg = notification_service.create_strategy_notification_message(match, 5)
+            assert sorted(calls) == [1, 2, 3, 4, 5, 6]
+            assert 'Team 1 is on Red Alliance' in red_msg and 'Blue Alliance wins by 90 points' in red_msg
+            assert 'Team 5 is on Blue Alliance' in blue_msg and 'Blue: 150 points' in blue_msg
+            assert '  Team 4: ~40.0 pts/match (scouted data), Auto: 1.0, Teleop: 2.0, 3 matches' in blue_msg
+
+            bump_data_version('scouting_data')
+            notification_service.create_strategy_notification_message(match, 1)
+            assert len(calls) == 12
+        finally:
+            db.session.delete(match)
+            db.session.delete(event)
+            db.session.commit()
@@ -0,0 +1,64 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from app import create_app, db
+from app.models_misc import NotificationQueue
+from app.utils.notification_timer import RETRY_DELAY, NotificationTimer, notification_timer
+
+
+def test_timer_orders_moves_and_wakes_on_earlier_entry():
+    timer = NotificationTimer()
+    now = datetime.now(timezone.utc)
+    timer.schedule(1, now + timedelta(minutes=5))
+    timer.schedule(2, now - timedelta(seconds=1))
+    timer.schedule(3, now - timedelta(seconds=2))
+    timer.schedule(3, now + timedelta(minutes=1))  # moved later
+    timer.cancel(2)
+    timer.schedule(4, now - timedelta(seconds=3))
+
+    assert timer.pop_due(now) == [4]
+    assert timer.next_due() == now + timedelta(minutes=1)
+    assert len(timer) == 2
+
+    # A waiter sleeping until an hour from now is woken by an earlier entry
+    woke = []
+
+    def waiter():
+        timer.wait(now + timedelta(hours=1))
+        woke.append(time.monotonic())
+
+    thread = threading.Thread(target=waiter)
+    started = time.monotonic()
+    thread.start()
+    time.sleep(0.1)
+    timer.schedule(5, datetime.now(timezone.utc) + timedelta(milliseconds=200))
+    thread.join(timeout=5)
+    assert woke and woke[0] - started < 2
+    assert timer.pop_due(datetime.now(timezone.utc) + timedelta(seconds=1)) == [5]
+
+
+def test_committed_queue_rows_reach_the_timer():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        send_at = (datetime.now(timezone.utc) + timedelta(minutes=30)).replace(microsecond=0)
+        entry = NotificationQueue(subscription_id=987654, match_id=987654,
+                                  scheduled_for=send_at.replace(tzinfo=None), status='pending')
+        db.session.add(entry)
+        db.session.commit()
+        try:
+            assert notification_timer._due.get(entry.id) == send_at
+
+            # A failed attempt is retried after RETRY_DELAY
+            attempt = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(hours=1)
+            entry.attempts = 1
+            entry.last_attempt = attempt
+            db.session.commit()
+            assert notification_timer._due.get(entry.id) == attempt + RETRY_DELAY
+
+            entry.status = 'sent'
+            db.session.commit()
+            assert entry.id not in notification_timer._due
+        finally:
+            db.session.delete(entry)
+            db.session.commit()
@@ -0,0 +1,43 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.utils.image_worker import compress_robot_image, PitImageWorker, MAX_IMAGE_EDGE
+
+
+def _make_image(fmt, size=(3000, 2000)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, (200, 40, 40)).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def test_compress_downscales_large_jpeg():
+    variants = compress_robot_image(_make_image('JPEG'))
+    out = Image.open(io.BytesIO(variants['jpeg']))
+    assert out.format == 'JPEG'
+    assert max(out.size) <= MAX_IMAGE_EDGE
+
+
+def test_compress_emits_webp_variant_for_png():
+    variants = compress_robot_image(_make_image('PNG', size=(800, 600)))
+    assert variants['jpeg']
+    if variants['webp'] is not None:
+        assert Image.open(io.BytesIO(variants['webp'])).format == 'WEBP'
+
+
+def test_compress_rejects_garbage():
+    with pytest.raises(ValueError):
+        compress_robot_image(b'not an image')
+
+
+def test_submit_refuses_when_not_running():
+    worker = PitImageWorker()
+    assert worker.submit(1) is False
+
+
+def test_submit_refuses_when_queue_full():
+    worker = PitImageWorker(maxsize=1)
+    worker.running = True  # accept submissions without starting threads
+    assert worker.submit(1) is True
+    assert worker.submit(2) is False
@@ -0,0 +1,48 @@
+import json
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from app import create_app
+from app.utils.plotly_compact import CHART_TEMPLATE, compact_figure_json, expand_figure
+
+THEME = {'plot_bg': '#ffffff', 'paper_bg': '#ffffff', 'text_main': '#111111'}
+
+
+def _team_figure():
+    fig = go.Figure()
+    for team in range(20):
+        fig.add_trace(go.Scatter(x=list(range(1, 13)), y=[team + m / 3 for m in range(12)], name=str(team)))
+    fig.add_trace(go.Heatmap(z=[[r * 4 + c + 1 / 3 for c in range(4)] for r in range(3)]))
+    fig.update_layout(title='Points', plot_bgcolor='#ffffff', paper_bgcolor='#ffffff',
+                      font=dict(color='#111111'))
+    return fig
+
+
+def test_compact_figure_is_smaller_and_round_trips():
+    fig = _team_figure()
+    text = compact_figure_json(fig, theme=THEME)
+    compact = json.loads(text)
+
+    assert len(text) < len(pio.to_json(fig)) / 2
+    assert compact['layout']['template'] == CHART_TEMPLATE
+    assert 'plot_bgcolor' not in compact['layout'] and 'font' not in compact['layout']
+    assert compact['data'][0]['y']['dtype'] == 'f4'
+    assert compact['data'][-1]['z']['shape'] == '3,4'
+
+    expanded = expand_figure(text, theme=THEME)
+    assert all(abs(a - (3 + m / 3)) < 1e-5 for m, a in enumerate(expanded['data'][3]['y']))
+    assert expanded['data'][-1]['z'][2] == [8.333333, 9.333333, 10.33333, 11.33333]
+    assert expanded['layout']['plot_bgcolor'] == '#ffffff'
+    assert expanded['layout']['font']['color'] == '#111111'
+    go.Figure(expanded)  # still a valid figure for image export
+
+
+def test_chart_template_script_is_cacheable():
+    app = create_app(test_config={'TESTING': True})
+    client = app.test_client()
+    first = client.get('/graphs/chart-template.js')
+    assert first.status_code == 200
+    assert b'window.PLOTLY_TEMPLATES["chart"]' in first.data
+    again = client.get('/graphs/chart-template.js', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
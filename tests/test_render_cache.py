@@ -0,0 +1,116 @@
+from app import create_app
+from app.utils.change_tracking import bump_data_version
+from app.utils.render_cache import DiskRenderCache, render_key, cached_render_response
+from app.utils import change_tracking, render_cache as render_cache_module
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskRenderCache(directory=str(tmp_path), max_bytes=10)
+    cache.put('a', 'json', b'12345')
+    cache.put('b', 'json', b'12345')
+    assert cache.get('a', 'json') == b'12345'
+    cache.put('c', 'json', b'12345')
+
+    assert cache.get('b', 'json') is None
+    assert not (tmp_path / 'b.json').exists()
+    assert cache.get('a', 'json') == b'12345'
+
+    # A new instance picks the files back up from disk
+    assert DiskRenderCache(directory=str(tmp_path), max_bytes=10).get('c', 'json') == b'12345'
+
+
+def test_render_key_changes_with_data_version():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        spec = {'view': 'shared_graph', 'teams': [254, 1678]}
+        first = render_key(spec)
+        assert render_key(spec) == first
+        bump_data_version('scouting_data')
+        assert render_key(spec) != first
+        assert render_key(dict(spec, teams=[254])) != render_key(spec)
+
+
+def test_cached_render_response_renders_once_and_answers_304(tmp_path, monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    monkeypatch.setattr(render_cache_module, 'render_cache', DiskRenderCache(directory=str(tmp_path)))
+    calls = []
+
+    def build():
+        calls.append(1)
+        return '{"plots": {}}'
+
+    with app.test_request_context('/graphs/shared/x'):
+        first = cached_render_response('k1', 'json', build)
+        assert first.status_code == 200
+        assert first.get_data() == b'{"plots": {}}'
+        assert first.headers['ETag'] == '"k1"'
+    with app.test_request_context('/graphs/shared/x'):
+        cached_render_response('k1', 'json', build)
+    with app.test_request_context('/graphs/shared/x', headers={'If-None-Match': '"k1"'}):
+        assert cached_render_response('k1', 'json', build).status_code == 304
+
+    assert calls == [1]
+
+
+def test_render_key_survives_a_restart_until_a_rendered_table_is_written(tmp_path, monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        def restart():
+            monkeypatch.setattr(change_tracking, '_data_versions', {})
+            cache = DiskRenderCache(directory=str(tmp_path))
+            monkeypatch.setattr(render_cache_module, 'render_cache', cache)
+            return cache
+
+        spec = {'view': 'shared_graph', 'teams': [254]}
+        cache = restart()
+        first = render_key(spec)
+        cache.put(first, 'json', b'{}')
+        restart()
+        assert render_key(spec) == first
+
+        bump_data_version('scouting_data')
+        assert not (tmp_path / f'{first}.json').exists()
+        restart()
+        assert render_key(spec) != first
+
+
+def test_render_key_does_not_repeat_after_a_later_write_and_restart(tmp_path, monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        def restart():
+            monkeypatch.setattr(change_tracking, '_data_versions', {})
+            cache = DiskRenderCache(directory=str(tmp_path))
+            monkeypatch.setattr(render_cache_module, 'render_cache', cache)
+            return cache
+
+        spec = {'view': 'shared_graph', 'teams': [254]}
+        cache = restart()
+        # Another epoch table starts the epoch before the chart is rendered
+        bump_data_version('custom_page')
+        rendered = render_key(spec)
+        cache.put(rendered, 'json', b'{}')
+        bump_data_version('scouting_data')
+        restart()
+        assert render_key(spec) != rendered
+
+
+def test_shared_graph_scope_follows_the_creator_not_the_viewer():
+    from flask import g
+    from app.routes.graphs import _shared_graph_scope_spec
+    from app.utils.team_isolation import scouting_team_scope
+
+    app = create_app(test_config={'TESTING': True})
+    with app.test_request_context('/graphs/shared/x'):
+        with scouting_team_scope(5454):
+            creator = _shared_graph_scope_spec()
+        assert creator['scouting_team'] == 5454
+        assert 'scouting_team_number' not in g
+
+        # A logged-in (mobile) viewer of another team gets the same scope
+        g.scouting_team_number = 1111
+        with scouting_team_scope(5454):
+            assert _shared_graph_scope_spec() == creator
+        assert g.scouting_team_number == 1111
+        with scouting_team_scope(5455):
+            assert render_key({'view': 'shared_graph', 'scope': _shared_graph_scope_spec()}) != \
+                render_key({'view': 'shared_graph', 'scope': creator})
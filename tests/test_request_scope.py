@@ -0,0 +1,54 @@
+import json
+import random
+
+from flask_login import login_user
+
+from app import create_app, db
+from app.models import ScoutingAlliance, ScoutingAllianceMember, TeamAllianceStatus, User
+from app.utils.config_manager import get_active_alliance_info, get_effective_game_config, is_alliance_mode_active
+from app.utils.request_scope import get_scope
+from app.utils.team_isolation import get_alliance_team_numbers, is_alliance_mode_active_for_current_user
+
+
+def test_scope_is_reused_within_a_request_until_the_alliance_changes():
+    app = create_app(test_config={'TESTING': True})
+    with app.test_request_context():
+        team, partner = random.sample(range(70000, 79999), 2)
+        alliance = ScoutingAlliance(alliance_name=f'Scope {team}', game_config_team=partner, pit_config_team=partner,
+                                    shared_game_config=json.dumps({'season': 2026, 'current_event_code': 'SCOPE'}))
+        user = User(username=f'scope_{team}', scouting_team_number=team)
+        db.session.add_all([alliance, user])
+        db.session.flush()
+        db.session.add_all([
+            ScoutingAllianceMember(alliance_id=alliance.id, team_number=team, status='accepted'),
+            ScoutingAllianceMember(alliance_id=alliance.id, team_number=partner, status='accepted'),
+        ])
+        status = TeamAllianceStatus(team_number=team, active_alliance_id=alliance.id, is_alliance_mode_active=True)
+        db.session.add(status)
+        db.session.commit()
+        login_user(user)
+
+        try:
+            scope = get_scope()
+            assert get_scope() is scope and get_scope(team) is scope
+            assert sorted(get_alliance_team_numbers()) == sorted([team, partner])
+            assert is_alliance_mode_active() and is_alliance_mode_active_for_current_user()
+            assert get_active_alliance_info()['alliance_id'] == alliance.id
+
+            config = get_effective_game_config()
+            assert config['current_event_code'] == 'SCOPE'
+            config['current_event_code'] = 'CHANGED'
+            # Callers get their own copy of the cached config
+            assert get_effective_game_config()['current_event_code'] == 'SCOPE'
+
+            status.is_alliance_mode_active = False
+            db.session.commit()
+            assert get_scope() is not scope
+            assert get_alliance_team_numbers() == []
+            assert not is_alliance_mode_active() and get_active_alliance_info() is None
+        finally:
+            db.session.delete(status)
+            ScoutingAllianceMember.query.filter_by(alliance_id=alliance.id).delete()
+            db.session.delete(alliance)
+            db.session.delete(user)
+            db.session.commit()
@@ -0,0 +1,48 @@
+import time
+
+from app import create_app, socketio
+from app.utils import socket_batcher
+from app.utils.socket_batcher import CoalescingEmitter, merge_alliance_sync, merge_list_changes
+
+
+def test_burst_of_emits_becomes_one_merged_message_per_room(monkeypatch):
+    create_app(test_config={'TESTING': True})
+    sent = []
+    monkeypatch.setattr(socketio, 'emit', lambda event, data, room=None, namespace=None: sent.append((event, room, data)))
+
+    emitter = CoalescingEmitter(window=0.05, max_wait=1.0)
+    emitter.register('lists_updated', merge_list_changes)
+    for team_id, action in ((1, 'add'), (2, 'add'), (1, 'remove')):
+        emitter.emit('lists_updated', {'event_id': 7, 'list_type': 'avoid', 'team_id': team_id, 'action': action},
+                     room='alliance_event_7')
+    emitter.emit('recommendations_updated', {'event_id': 7}, room='alliance_event_7')
+    emitter.emit('recommendations_updated', {'event_id': 7}, room='alliance_event_7')
+    assert sent == []
+
+    deadline = time.monotonic() + 5
+    while len(sent) < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not emitter.pending()
+    assert sorted(event for event, _, _ in sent) == ['lists_updated', 'recommendations_updated']
+    lists = [data for event, _, data in sent if event == 'lists_updated'][0]
+    assert lists['event_id'] == 7
+    assert [(c['team_id'], c['action']) for c in lists['changes']] == [(2, 'add'), (1, 'remove')]
+
+
+def test_alliance_sync_payloads_merge_and_dedupe_entries():
+    entry = {'team_number': 254, 'match_number': 3, 'data': {'auto': 4}}
+    first = {'from_team': 100, 'scouting_data': [entry], 'pit_data': [], 'qualitative_data': [], 'sync_id': 1}
+    second = {'from_team': 200, 'scouting_data': [dict(entry), {'team_number': 1678}], 'pit_data': [{'team_number': 5}],
+              'sync_id': 2, 'type': 'periodic_sync'}
+    merged = merge_alliance_sync([first, second, dict(second, sync_id=None)])
+
+    assert merged['scouting_data'] == [entry, {'team_number': 1678}]
+    assert merged['pit_data'] == [{'team_number': 5}]
+    assert merged['qualitative_data'] == []
+    assert merged['sync_ids'] == [1, 2]
+    assert merged['from_teams'] == [100, 200]
+    assert merged['batched'] == 3
+    assert merged['type'] == 'periodic_sync'
+
+    emitter = socket_batcher.get_emitter()
+    assert emitter is socket_batcher.get_emitter()
@@ -0,0 +1,17 @@
+from app import socketio_async_mode
+
+
+def test_async_mode_falls_back_to_threading_unless_eventlet_is_patched(monkeypatch):
+    monkeypatch.delenv('SOCKETIO_ASYNC_MODE', raising=False)
+    assert socketio_async_mode() == 'threading'
+
+    monkeypatch.setenv('SOCKETIO_ASYNC_MODE', 'bogus')
+    assert socketio_async_mode() == 'threading'
+
+    # Eventlet without monkey-patching the standard library would deadlock
+    monkeypatch.setenv('SOCKETIO_ASYNC_MODE', 'eventlet')
+    assert socketio_async_mode() == 'threading'
+
+    import eventlet.patcher
+    monkeypatch.setattr(eventlet.patcher, 'is_monkey_patched', lambda module: True)
+    assert socketio_async_mode() == 'eventlet'
@@ -1,3 +1,4 @@
+import time
 import types
 import pytest
 import requests
@@ -52,7 +53,7 @@ def test_get_team_epa_requests(monkeypatch):
         assert "statbotics.io" in url
         return DummyResp()
 
-    monkeypatch.setattr('app.utils.statbotics_api_utils.requests.get', fake_get)
+    monkeypatch.setattr('app.utils.statbotics_api_utils.http_get', fake_get)
 
     data = get_statbotics_team_epa(254, use_cache=False)
     assert data is not None
@@ -77,7 +78,7 @@ def test_prefers_official_client_statbotics_class(monkeypatch):
     fake_mod = types.SimpleNamespace(Statbotics=FakeStatbotics)
     monkeypatch.setattr('app.utils.statbotics_api_utils._sb_client', fake_mod)
     monkeypatch.setattr('app.utils.statbotics_api_utils._sb_instance', None)
-    monkeypatch.setattr('app.utils.statbotics_api_utils.requests.get',
+    monkeypatch.setattr('app.utils.statbotics_api_utils.http_get',
                         lambda *a, **k: (_ for _ in ()).throw(Exception("requests called")))
 
     data = get_statbotics_team_epa(254, use_cache=False)
@@ -112,7 +113,7 @@ def test_rest_api_fallback(monkeypatch):
             return DummyResp()
         raise Exception("should not reach HTML path")
 
-    monkeypatch.setattr('app.utils.statbotics_api_utils.requests.get', fake_get)
+    monkeypatch.setattr('app.utils.statbotics_api_utils.http_get', fake_get)
 
     data = get_statbotics_team_epa(1678, use_cache=False)
     assert data is not None
@@ -234,18 +235,23 @@ def test_get_epa_metrics_for_team_clamps_negative(monkeypatch):
 
 
 def test_refresh_opr_epa_for_event_calls_backends(monkeypatch):
-    called = {'epa': [], 'opr': []}
+    import threading
+    called = {'epa': [], 'stored': [], 'opr': []}
 
-    monkeypatch.setattr('app.utils.statbotics_api_utils.get_statbotics_team_epa',
-                        lambda tn, **kw: called['epa'].append((tn, kw)) or {'total': 11.1})
+    monkeypatch.setattr('app.utils.statbotics_api_utils.fetch_statbotics_team_epa',
+                        lambda tn: called['epa'].append(tn) or ({'total': 11.1}, False))
+    monkeypatch.setattr('app.utils.statbotics_api_utils.store_statbotics_team_epa',
+                        lambda tn, result, transient: called['stored'].append((tn, result, threading.get_ident())))
     monkeypatch.setattr('app.utils.tba_api_utils.get_tba_team_opr',
                         lambda tn, event_key=None: called['opr'].append((tn, event_key)) or {'total': 22.2})
 
     from app.utils.analysis import refresh_opr_epa_for_event
     refresh_opr_epa_for_event('2026ARLI', team_numbers=[254, 1678])
 
-    assert len(called['epa']) == 2
-    assert (254, {'use_cache': False}) in called['epa']
+    assert sorted(called['epa']) == [254, 1678]
+    # Fetched concurrently, but every cache write happens on the calling thread
+    assert [(tn, result) for tn, result, _ in called['stored']] == [(254, {'total': 11.1}), (1678, {'total': 11.1})]
+    assert {ident for _, _, ident in called['stored']} == {threading.get_ident()}
     assert len(called['opr']) == 2
     assert called['opr'][0][1] == '2026arli'
 
@@ -288,7 +294,7 @@ def test_get_team_epa_transient_network_error_does_not_cache_miss(monkeypatch):
     def fake_get(*args, **kwargs):
         raise requests.RequestException("timeout")
 
-    monkeypatch.setattr('app.utils.statbotics_api_utils.requests.get', fake_get)
+    monkeypatch.setattr('app.utils.statbotics_api_utils.http_get', fake_get)
 
     cache_calls = {'epa': 0, 'db': 0}
 
@@ -316,9 +322,112 @@ def test_rest_api_500_raises_transient_error(monkeypatch):
         def json(self):
             return {}
 
-    monkeypatch.setattr('app.utils.statbotics_api_utils.requests.get', lambda *args, **kwargs: DummyResp())
+    monkeypatch.setattr('app.utils.statbotics_api_utils.http_get', lambda *args, **kwargs: DummyResp())
 
     from app.utils.statbotics_api_utils import StatboticsTransientError, _rest_api_get_team_epa
 
     with pytest.raises(StatboticsTransientError):
         _rest_api_get_team_epa(254)
+
+
+# ---------------------------------------------------------------------------
+# Bulk listing fetches used by the EPA scheduler
+# ---------------------------------------------------------------------------
+
+class _ListResp:
+    status_code = 200
+
+    def __init__(self, rows, status_code=200):
+        self._rows = rows
+        self.status_code = status_code
+
+    def json(self):
+        return self._rows
+
+
+def test_fetch_team_years_follows_pages(monkeypatch):
+    import app.utils.statbotics_api_utils as sb
+
+    monkeypatch.setattr(sb, '_BULK_PAGE_SIZE', 2)
+    pages = {
+        0: [{'team': 1, 'epa': {'total_points': {'mean': 10.0}}},
+            {'team': 2, 'epa': {'total_points': {'mean': 20.0}}}],
+        2: [{'team': 3, 'epa': {'total_points': {'mean': 30.0}}}],
+    }
+    seen = []
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        assert url.endswith('/team_years')
+        seen.append(params['offset'])
+        return _ListResp(pages.get(params['offset'], []))
+
+    monkeypatch.setattr(sb, 'http_get', fake_get)
+
+    result = sb.fetch_statbotics_team_years(2025, team_numbers=[1, 3])
+    assert seen == [0, 2]
+    assert sorted(result) == [1, 3]
+    assert result[3]['total'] == 30.0
+
+
+def test_fetch_event_team_matches_groups_by_team(monkeypatch):
+    import app.utils.statbotics_api_utils as sb
+
+    rows = [{'team': 254, 'match': '2025cabl_qm1'},
+            {'team': 1678, 'match': '2025cabl_qm1'},
+            {'team': 254, 'match': '2025cabl_qm2'}]
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        assert params['event'] == '2025cabl'
+        return _ListResp(rows)
+
+    monkeypatch.setattr(sb, 'http_get', fake_get)
+
+    grouped = sb.fetch_statbotics_event_team_matches('2025CABL')
+    assert len(grouped[254]) == 2
+    assert len(grouped[1678]) == 1
+
+
+def test_bulk_fetch_raises_transient_on_5xx(monkeypatch):
+    import app.utils.statbotics_api_utils as sb
+
+    monkeypatch.setattr(sb, 'http_get', lambda *a, **k: _ListResp([], status_code=503))
+
+    with pytest.raises(sb.StatboticsTransientError):
+        sb.fetch_statbotics_team_years(2025)
+
+
+def test_concurrent_epa_lookups_share_one_fetch(monkeypatch):
+    """Simultaneous cold lookups for one team make a single Statbotics call."""
+    import threading
+    from app.utils import statbotics_api_utils as sb
+
+    sb.clear_epa_caches()
+    monkeypatch.setattr(sb, '_db_cache_get', lambda *a, **kw: None)
+    monkeypatch.setattr(sb, '_db_cache_put', lambda *a, **kw: None)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(team_number):
+        calls.append(team_number)
+        started.set()
+        release.wait(2)
+        return {'total': 30.0}, False
+
+    monkeypatch.setattr(sb, 'fetch_statbotics_team_epa', slow_fetch)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_statbotics_team_epa(9971)))
+               for _ in range(3)]
+    try:
+        threads[0].start()
+        assert started.wait(2)
+        for t in threads[1:]:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join(2)
+        assert calls == [9971]
+        assert results == [{'total': 30.0}] * 3
+    finally:
+        sb.clear_epa_caches()
@@ -0,0 +1,76 @@
+import uuid
+
+from app import create_app, db
+from app.models import Event, Match, ScoutingData, Team
+from app.utils import team_rankings
+from app.utils.change_tracking import bump_data_version
+
+
+class _Entry:
+    def __init__(self, auto, teleop, endgame):
+        self._values = {'apt': auto, 'tpt': teleop, 'ept': endgame, 'tot': auto + teleop + endgame}
+
+    def calculate_metric(self, metric_id):
+        return self._values[metric_id]
+
+
+def test_build_leaderboard_aggregates_and_ranks():
+    rows = [
+        (254, _Entry(10, 20, 5)), (254, _Entry(20, 30, 5)),
+        (1114, _Entry(5, 10, 0)),
+        (118, _Entry(0, 0, 0)), (118, _Entry(15, 40, 10)),
+        (2056, _Entry(30, 30, 10)),
+        (None, _Entry(99, 99, 99)),
+    ]
+    board = team_rankings.build_leaderboard(rows)
+
+    assert len(board) == 4 and None not in board
+    row = board.get(254)
+    assert row['auto_points'] == 15 and row['total_points'] == 45 and row['match_count'] == 2
+    assert board.get(118)['total_points'] == 32.5
+    assert board.get(118)['scored_total_avg'] == 65 and board.get(118)['scored_count'] == 1
+
+    full = [r['team_number'] for r in board.top('total_points')]
+    assert full == [2056, 254, 118, 1114]
+    assert [r['team_number'] for r in board.top('total_points', 2)] == full[:2]
+    assert [r['team_number'] for r in board.top('auto_points', 3)] == [2056, 254, 118]
+    assert board.get(9999) is None
+    assert team_rankings.build_leaderboard([]).top('total_points', 5) == []
+
+
+def test_leaderboard_is_cached_until_scouting_data_changes(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        code = f'RK{uuid.uuid4().hex[:6].upper()}'
+        event = Event(name='Rankings', code=code, year=2026, scouting_team_number=9972)
+        team = Team(team_number=99720 + uuid.uuid4().int % 9, team_name='Rank Bot', scouting_team_number=9972)
+        db.session.add_all([event, team])
+        db.session.flush()
+        match = Match(match_number=1, match_type='Qualification', event_id=event.id, scouting_team_number=9972)
+        db.session.add(match)
+        db.session.flush()
+        entry = ScoutingData(match_id=match.id, team_id=team.id, scouting_team_number=9972,
+                             scout_name='t', alliance='red')
+        entry.data = {}
+        db.session.add(entry)
+        db.session.commit()
+
+        loads = []
+        real_rows = team_rankings._scouting_rows
+        monkeypatch.setattr(team_rankings, '_scouting_rows',
+                            lambda *a: loads.append(a) or real_rows(*a))
+        try:
+            first = team_rankings.get_leaderboard(scouting_team_numbers=[9972], event_ids=[event.id])
+            again = team_rankings.get_leaderboard(scouting_team_numbers=[9972], event_ids=[event.id])
+            assert first is again and len(loads) == 1
+            assert first.get(team.team_number)['match_count'] == 1
+
+            bump_data_version('scouting_data')
+            team_rankings.get_leaderboard(scouting_team_numbers=[9972], event_ids=[event.id])
+            assert len(loads) == 2
+        finally:
+            ScoutingData.query.filter_by(team_id=team.id).delete(synchronize_session=False)
+            for obj in (match, team, event):
+                db.session.delete(obj)
+            db.session.commit()
+            team_rankings.clear_ranking_caches()
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from app.utils.tiered_cache import TieredCache, MISSING, get_cache_stats
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = TieredCache('test_lru', maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TieredCache('test_ttl', maxsize=10, ttl=0.05)
+    cache.set('k', 'v')
+    assert cache.get('k') == 'v'
+    time.sleep(0.08)
+    assert cache.get('k') is MISSING
+
+
+def test_concurrent_loads_share_one_call():
+    cache = TieredCache('test_single_flight', maxsize=10, ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(2)
+        return 'oprs'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('event', loader)))
+               for _ in range(20)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ['oprs'] * 20
+    assert cache.stats()['coalesced'] >= 1
+
+
+def test_stale_entry_is_served_while_refreshing():
+    cache = TieredCache('test_swr', maxsize=10, ttl=0.05, stale_ttl=60)
+    cache.set('k', 'old')
+    time.sleep(0.08)
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return 'new'
+
+    assert cache.get_or_load('k', loader) == 'old'
+    assert refreshed.wait(2)
+    for _ in range(50):
+        if cache.get('k') == 'new':
+            break
+        time.sleep(0.01)
+    assert cache.get('k') == 'new'
+    assert get_cache_stats()['test_swr']['stale_hits'] == 1
+
+
+def test_l2_is_consulted_before_loader_and_written_after():
+    class Store:
+        def __init__(self):
+            self.data = {'warm': 'from-db'}
+
+        def load(self, key):
+            return self.data.get(key, MISSING)
+
+        def store(self, key, value):
+            self.data[key] = value
+
+    store = Store()
+    cache = TieredCache('test_l2', maxsize=10, ttl=60, l2=store)
+
+    assert cache.get_or_load('warm', lambda: 'from-api') == 'from-db'
+    assert cache.get_or_load('cold', lambda: 'from-api') == 'from-api'
+    assert store.data['cold'] == 'from-api'
+    assert cache.stats()['l2_hits'] == 1
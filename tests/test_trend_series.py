@@ -0,0 +1,81 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.models import Event, Match, ScoutingData, Team
+from app.utils import trend_series
+from app.utils.change_tracking import bump_data_version
+
+
+def test_compute_trend_matches_reference_statistics():
+    values = [10, 12, 11, 15, 18, 17, 21]
+    stats = trend_series.compute_trend(values)
+
+    # Reference least-squares fit: x = 0..6
+    assert abs(stats['slope'] - 25 / 14) < 1e-9
+    assert abs(stats['intercept'] - 9.5) < 1e-9
+    assert abs(stats['predicted_next'] - (25 / 14 * 7 + 9.5)) < 1e-9
+    assert abs(stats['overall_mean'] - 104 / 7) < 1e-9
+    assert stats['overall_consistency'] == (4 - 2) / 6
+    assert stats['recent_slope'] > 0
+    assert stats['moving_average'][:3] == [10.0, 11.0, 11.0]
+
+    assert trend_series.compute_trend([])['predicted_next'] == 0
+    assert trend_series.linear_fit([1, 1], [3, 5]) == (0, 4.0)
+    assert trend_series.trend_factor([10, 10, 30], [1, 1, 1]) == 1.15
+    assert trend_series.trend_factor([5]) == 1.0
+
+
+def test_series_merges_committed_inserts_without_rebuilding(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        code = f'TS{uuid.uuid4().hex[:6].upper()}'
+        event = Event(name='Trend', code=code, year=2026, scouting_team_number=9971)
+        team = Team(team_number=99710 + uuid.uuid4().int % 9, team_name='Trend Bot', scouting_team_number=9971)
+        db.session.add_all([event, team])
+        db.session.flush()
+        matches = [Match(match_number=n, match_type='Qualification', event_id=event.id,
+                         scouting_team_number=9971) for n in (1, 2, 3)]
+        db.session.add_all(matches)
+        db.session.flush()
+        base = datetime(2026, 3, 1, 12, 0)
+
+        def add_entry(match, points, minutes):
+            entry = ScoutingData(match_id=match.id, team_id=team.id, scouting_team_number=9971,
+                                 scout_name='t', alliance='red', timestamp=base + timedelta(minutes=minutes))
+            entry.data = {'total_points': points}
+            db.session.add(entry)
+            db.session.commit()
+            return entry
+
+        try:
+            add_entry(matches[0], 10, 0)
+            add_entry(matches[1], 20, 10)
+            assert [r['points'] for r in trend_series.team_series(team.id, 9971)] == [10.0, 20.0]
+
+            queried = []
+            real_query = trend_series._query_rows
+            monkeypatch.setattr(trend_series, '_query_rows',
+                                lambda *a, **kw: queried.append(kw.get('ids')) or real_query(*a, **kw))
+
+            late = add_entry(matches[2], 30, 20)
+            assert [r['points'] for r in trend_series.team_series(team.id, 9971)] == [10.0, 20.0, 30.0]
+            assert queried == [{late.id}]
+
+            # Edits drop the series so it is rebuilt from the database
+            late.data = {'total_points': 5}
+            db.session.commit()
+            assert [r['points'] for r in trend_series.team_series(team.id, 9971)] == [10.0, 20.0, 5.0]
+            assert queried[-1] is None
+
+            # Saving a game config rebuilds the series, since points come from the config
+            queried.clear()
+            bump_data_version('game_config')
+            assert [r['points'] for r in trend_series.team_series(team.id, 9971)] == [10.0, 20.0, 5.0]
+            assert queried == [None]
+        finally:
+            ScoutingData.query.filter_by(team_id=team.id).delete(synchronize_session=False)
+            for obj in matches + [team, event]:
+                db.session.delete(obj)
+            db.session.commit()
+            trend_series.invalidate_team(team.id)
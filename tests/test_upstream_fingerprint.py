@@ -0,0 +1,171 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from app import create_app, db
+from app.models import UpstreamFingerprint
+from app.utils import upstream_fingerprint as fp
+from app.utils import api_sync_pipeline as pipeline
+
+
+def _response(status, body=b'', headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body
+    resp.headers.update(headers or {})
+    return resp
+
+
+def _cleanup(code):
+    UpstreamFingerprint.query.filter(
+        UpstreamFingerprint.resource_key.contains(code)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def test_probe_revalidates_and_reuses_hash_on_304(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        code = f'FP{uuid.uuid4().hex[:6].upper()}'
+        url = f'https://www.thebluealliance.com/api/v3/event/2026{code.lower()}/matches'
+        monkeypatch.setattr(fp, '_event_upstream_urls', lambda raw, season: [(url, {})])
+        sent = []
+        responses = [
+            _response(200, b'[{"key": "qm1"}]', {'ETag': '"v1"'}),
+            _response(304),
+            _response(200, b'[{"key": "qm1"}, {"key": "qm2"}]', {'ETag': '"v2"'}),
+        ]
+
+        def fake_get(u, headers=None, **kwargs):
+            sent.append(dict(headers or {}))
+            return responses.pop(0)
+
+        monkeypatch.setattr('app.utils.http_client.http_get', fake_get)
+        # Probe the upstream every time instead of sharing the last result
+        monkeypatch.setattr(fp, 'PROBE_SHARE_SECONDS', 0)
+        try:
+            fp.clear_probe_cache()
+            first = fp.probe_event_upstream(code, 2026)
+            fp.clear_probe_cache()
+            second = fp.probe_event_upstream(code, 2026)
+            fp.clear_probe_cache()
+            third = fp.probe_event_upstream(code, 2026)
+
+            assert 'If-None-Match' not in sent[0]
+            assert sent[1]['If-None-Match'] == '"v1"'
+            assert first == second
+            assert third != first
+        finally:
+            fp.clear_probe_cache()
+            UpstreamFingerprint.query.filter_by(scope=fp.SCOPE_URL, resource_key=url).delete()
+            _cleanup(code)
+
+
+def test_probe_is_shared_across_consumers_until_the_window_passes(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        code = f'FP{uuid.uuid4().hex[:6].upper()}'
+        url = f'https://www.thebluealliance.com/api/v3/event/2026{code.lower()}/matches'
+        monkeypatch.setattr(fp, '_event_upstream_urls', lambda raw, season: [(url, {})])
+        sent = []
+
+        def fake_get(u, headers=None, **kwargs):
+            sent.append(u)
+            return _response(200, b'[]', {'ETag': '"v1"'})
+
+        monkeypatch.setattr('app.utils.http_client.http_get', fake_get)
+        try:
+            fp.clear_probe_cache()
+            first = fp.probe_event_upstream(code, 2026)
+            # Another consumer, or another process without the in-memory copy
+            fp.clear_probe_cache()
+            assert fp.probe_event_for_config(code, 2026, {}) == first
+            assert len(sent) == 1
+
+            row = UpstreamFingerprint.lookup(fp.SCOPE_PROBE, fp.event_resource_key(code, 2026))
+            row.checked_at = row.checked_at - timedelta(seconds=fp.PROBE_SHARE_SECONDS + 1)
+            db.session.commit()
+            fp.clear_probe_cache()
+            assert fp.probe_event_upstream(code, 2026) == first
+            assert len(sent) == 2
+        finally:
+            fp.clear_probe_cache()
+            UpstreamFingerprint.query.filter_by(scope=fp.SCOPE_URL, resource_key=url).delete()
+            _cleanup(code)
+
+
+def test_event_unchanged_is_tracked_per_scouting_team():
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        code = f'FP{uuid.uuid4().hex[:6].upper()}'
+        try:
+            assert not fp.event_unchanged(fp.SCOPE_SYNC, code, 2026, 1001, 'abc')
+            fp.mark_event_applied(fp.SCOPE_SYNC, code, 2026, 1001, 'abc')
+
+            assert fp.event_unchanged(fp.SCOPE_SYNC, code, 2026, 1001, 'abc')
+            assert not fp.event_unchanged(fp.SCOPE_SYNC, code, 2026, 1002, 'abc')
+            assert not fp.event_unchanged(fp.SCOPE_SYNC, code, 2026, 1001, 'def')
+            assert not fp.event_unchanged(fp.SCOPE_SCHEDULE, code, 2026, 1001, 'abc')
+            assert not fp.event_unchanged(fp.SCOPE_SYNC, code, 2026, 1001, None)
+        finally:
+            _cleanup(code)
+
+
+def test_pipeline_skips_match_fetch_when_upstream_unchanged(monkeypatch):
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        code = f'FP{uuid.uuid4().hex[:6].upper()}'
+        calls = []
+        probe_row = {'scope': fp.SCOPE_PROBE, 'resource_key': fp.event_resource_key(code, 2026),
+                     'content_hash': 'same'}
+        monkeypatch.setattr(fp, 'fetch_event_probe', lambda raw, season: ('same', [probe_row]))
+        monkeypatch.setattr('app.utils.api_utils.get_teams_dual_api', lambda c: [])
+        monkeypatch.setattr('app.utils.api_utils.get_matches_dual_api',
+                            lambda c: calls.append(c) or [])
+        job = {'scouting_team_number': 1001, 'raw_event_code': code, 'event_code': f'2026{code}',
+               'event_year': 2026, 'event_id': None, 'game_config': {}}
+        try:
+            fetched = pipeline.fetch_event_data([job])
+            data = fetched[(2026, code)]
+            assert calls == [code]
+            # The fetch workers leave the probe for the calling thread to store
+            assert UpstreamFingerprint.lookup(fp.SCOPE_PROBE, probe_row['resource_key']) is None
+            pipeline.save_probe_records(fetched)
+            assert UpstreamFingerprint.lookup(fp.SCOPE_PROBE, probe_row['resource_key']).content_hash == 'same'
+            pipeline.mark_matches_applied(job, data)
+
+            data = pipeline.fetch_event_data([job])[(2026, code)]
+            assert calls == [code]
+            assert data['matches'] is None and pipeline.matches_unchanged(job, data)
+
+            pipeline.fetch_event_data([dict(job, force_refresh=True)])
+            assert calls == [code, code]
+        finally:
+            _cleanup(code)
+
+
+def test_match_times_are_only_marked_applied_once_matches_exist():
+    from app.models import Event, Match
+    from app.utils.match_time_fetcher import _match_times_applied
+
+    app = create_app(test_config={'TESTING': True})
+    with app.app_context():
+        code = f'2026MT{uuid.uuid4().hex[:4].upper()}'
+        event = Event(name='Times', code=code, year=2026, scouting_team_number=1001)
+        db.session.add(event)
+        db.session.commit()
+        try:
+            # The sync has not created the schedule yet
+            assert not _match_times_applied(code, 1001, 0)
+            match = Match(match_number=1, match_type='Qualification', event_id=event.id, scouting_team_number=1001)
+            db.session.add(match)
+            db.session.commit()
+            assert not _match_times_applied(code, 1001, 0)
+            assert _match_times_applied(code, 1001, 1)
+            match.scheduled_time = datetime.now(timezone.utc)
+            db.session.commit()
+            assert _match_times_applied(code, 1001, 0)
+        finally:
+            Match.query.filter_by(event_id=event.id).delete()
+            db.session.delete(event)
+            db.session.commit()